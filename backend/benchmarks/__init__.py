@@ -0,0 +1,10 @@
+"""
+Відтворюваний benchmark API на синтетичних даних CRM.
+
+    python -m benchmarks seed      # заповнити окрему Postgres БД (faker, фіксований seed)
+    python -m benchmarks run       # сценарії -> JSON звіт (p50/p95/p99, SQL запити)
+    python -m benchmarks compare base.json head.json
+
+Працює тільки з BENCHMARK_DATABASE_URL - робоча DATABASE_URL не використовується.
+Деталі - benchmarks/README.md.
+"""
@@ -0,0 +1,113 @@
+"""CLI: python -m benchmarks {seed,run,compare}"""
+import argparse
+import json
+import logging
+import sys
+
+from benchmarks import env
+
+
+def _seed(args) -> None:
+    from benchmarks.seed import SeedConfig, ensure_schema, reset, seed
+
+    config = SeedConfig(
+        seed=args.seed,
+        clients=args.clients,
+        conversations=args.conversations,
+        messages_per_conversation=args.messages_per_conversation,
+        attachment_ratio=args.attachment_ratio,
+        orders=args.orders,
+        kps=args.kps,
+        translators=args.translators,
+    ).scaled(args.scale)
+
+    ensure_schema()
+    from core.database import engine
+
+    if args.reset:
+        reset(engine)
+    counts = seed(engine, config)
+    print(json.dumps({"config": config.to_dict(), "rows": counts}, indent=2))
+
+
+def _run(args) -> None:
+    from benchmarks.runner import run, write_report
+
+    report = run(args.scenario, iterations=args.iterations, provider_latency_ms=args.provider_latency_ms)
+    write_report(report, args.output)
+    for name, result in report["scenarios"].items():
+        latency = result["latency_ms"]
+        print(
+            f"{name:<18} p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms "
+            f"queries={result['queries']['p50']} errors={result['errors']}"
+        )
+    print(f"Report: {args.output}")
+
+
+def _compare(args) -> int:
+    from benchmarks.runner import compare
+
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+    rows, regressions = compare(base, head, threshold=args.threshold)
+
+    header = ["scenario", "p50 ms", "p95 ms", "p99 ms", "queries", "errors"]
+    widths = [max(len(str(row[i])) for row in [header, *rows]) for i in range(len(header))]
+    for row in [header, *rows]:
+        print("  ".join(str(cell).ljust(width) for cell, width in zip(row, widths)))
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+def main(argv=None) -> int:
+    from benchmarks.scenarios import SCENARIOS
+    from benchmarks.seed import SeedConfig
+
+    defaults = SeedConfig()
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="CRM benchmark suite")
+    parser.add_argument("-v", "--verbose", action="store_true", help="логи застосунку рівня INFO")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="заповнити BENCHMARK_DATABASE_URL синтетичними даними")
+    seed_parser.add_argument("--seed", type=int, default=defaults.seed)
+    seed_parser.add_argument("--scale", type=float, default=1.0, help="множник усіх обсягів")
+    seed_parser.add_argument("--clients", type=int, default=defaults.clients)
+    seed_parser.add_argument("--conversations", type=int, default=defaults.conversations)
+    seed_parser.add_argument("--messages-per-conversation", type=int, default=defaults.messages_per_conversation)
+    seed_parser.add_argument("--attachment-ratio", type=float, default=defaults.attachment_ratio)
+    seed_parser.add_argument("--orders", type=int, default=defaults.orders)
+    seed_parser.add_argument("--kps", type=int, default=defaults.kps)
+    seed_parser.add_argument("--translators", type=int, default=defaults.translators)
+    seed_parser.add_argument("--reset", action="store_true", help="очистити таблиці benchmark перед заповненням")
+
+    run_parser = commands.add_parser("run", help="виконати сценарії і записати JSON звіт")
+    run_parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="можна кілька; за замовчуванням усі")
+    run_parser.add_argument("--iterations", type=int, default=None, help="перевизначити кількість ітерацій сценаріїв")
+    run_parser.add_argument("--provider-latency-ms", type=float, default=0.0, help="імітована затримка Telegram stub")
+    run_parser.add_argument("-o", "--output", default="benchmark-report.json")
+
+    compare_parser = commands.add_parser("compare", help="порівняти два звіти (exit 1 при регресії)")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("head")
+    compare_parser.add_argument("--threshold", type=float, default=0.2, help="допустиме зростання p95 (частка)")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    logging.getLogger("benchmarks").setLevel(logging.INFO)
+
+    if args.command == "compare":
+        return _compare(args)
+
+    env.configure()
+    if args.command == "seed":
+        _seed(args)
+    else:
+        _run(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""
+Прогін сценаріїв і JSON звіт.
+
+Запити йдуть через TestClient(main.app) з lifespan, тобто через той самий
+стек middleware, що й у проді. Кількість SQL запитів і час у БД беруться
+з заголовка Server-Timing (SQLInstrumentationMiddleware), латентність -
+повний цикл запиту на клієнті.
+"""
+import json
+import logging
+import platform
+import re
+import subprocess
+import time
+from datetime import datetime, timedelta, timezone
+from statistics import mean
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from benchmarks.env import BACKEND_DIR
+from benchmarks.scenarios import SCENARIOS, BenchContext, stub_providers
+
+logger = logging.getLogger(__name__)
+
+REPORT_VERSION = 1
+_SERVER_TIMING_RE = re.compile(r'db;dur=(?P<ms>[\d.]+);desc="(?P<count>\d+) queries"')
+SAMPLE_SIZE = 200  # скільки ідентифікаторів розмов/КП ротується між ітераціями
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Перцентиль з лінійною інтерполяцією (q в межах 0..100)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _summary(values: List[float], digits: int = 2) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"min": None, "mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+    return {
+        "min": round(min(values), digits),
+        "mean": round(mean(values), digits),
+        "p50": round(percentile(values, 50), digits),
+        "p95": round(percentile(values, 95), digits),
+        "p99": round(percentile(values, 99), digits),
+        "max": round(max(values), digits),
+    }
+
+
+def server_timing(header: Optional[str]) -> Tuple[Optional[int], Optional[float]]:
+    """(кількість SQL запитів, час у БД в мс) із заголовка Server-Timing"""
+    match = _SERVER_TIMING_RE.search(header or "")
+    if not match:
+        return None, None
+    return int(match["count"]), float(match["ms"])
+
+
+def _git_revision() -> Dict[str, Any]:
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+
+    try:
+        return {"sha": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain"))}
+    except (OSError, subprocess.CalledProcessError):
+        return {"sha": None, "dirty": None}
+
+
+def load_context(engine) -> Tuple[BenchContext, Any]:
+    """Ідентифікатори для сценаріїв і id адміністратора benchmark"""
+    from sqlalchemy import select
+
+    from benchmarks.seed import ADMIN_EMAIL
+    from models import KP
+    from modules.auth.models import User
+    from modules.communications.models import Conversation
+
+    with engine.connect() as conn:
+        admin_id = conn.execute(select(User.id).where(User.email == ADMIN_EMAIL)).scalar()
+        if admin_id is None:
+            raise SystemExit("No benchmark data - run `python -m benchmarks seed` first")
+        conversations = select(Conversation.id).where(Conversation.is_archived.is_(False)).order_by(Conversation.id)
+        context = BenchContext(
+            conversation_ids=conn.execute(conversations.limit(SAMPLE_SIZE)).scalars().all(),
+            telegram_conversation_ids=conn.execute(
+                conversations.where(Conversation.platform == "telegram").limit(SAMPLE_SIZE)
+            ).scalars().all(),
+            kp_ids=conn.execute(select(KP.id).order_by(KP.id).limit(SAMPLE_SIZE)).scalars().all(),
+        )
+    return context, admin_id
+
+
+def _delete_sent_messages(engine, since: datetime) -> None:
+    """Прибрати повідомлення send_message - наступний прогін бачить той самий набір даних"""
+    from sqlalchemy import delete
+
+    from benchmarks.scenarios import SENT_MESSAGE_PREFIX
+    from modules.communications.models import Message
+
+    with engine.begin() as conn:
+        conn.execute(delete(Message).where(
+            Message.created_at >= since,
+            Message.content.like(f"{SENT_MESSAGE_PREFIX}%"),
+        ))
+
+
+def run(
+    names: Optional[Iterable[str]] = None,
+    iterations: Optional[int] = None,
+    provider_latency_ms: float = 0.0,
+) -> Dict[str, Any]:
+    """Виконати сценарії (за замовчуванням - усі) і повернути звіт"""
+    from fastapi.testclient import TestClient
+
+    import main
+    from benchmarks.seed import dataset_counts
+    from core.database import engine
+    from core.security import create_access_token
+
+    selected = [SCENARIOS[name] for name in (names or SCENARIOS)]
+    context, admin_id = load_context(engine)
+    dataset = dataset_counts(engine)
+    started_at = datetime.now(timezone.utc)
+    token = create_access_token({"sub": str(admin_id), "is_admin": True}, expires_delta=timedelta(hours=12))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    results: Dict[str, Any] = {}
+    with stub_providers(provider_latency_ms), TestClient(main.app) as client:
+        for scenario in selected:
+            latencies: List[float] = []
+            queries: List[float] = []
+            db_ms: List[float] = []
+            statuses: Dict[str, int] = {}
+            total = iterations or scenario.iterations
+            for i in range(scenario.warmup + total):
+                path, kwargs = scenario.build(context, i)
+                started = time.perf_counter()
+                response = client.request(scenario.method, path, headers=headers, **kwargs)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                if i < scenario.warmup:
+                    continue
+                statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+                if response.status_code not in scenario.expect:
+                    logger.warning(f"{scenario.name}: {response.status_code} {response.text[:200]}")
+                    continue
+                latencies.append(elapsed_ms)
+                count, duration = server_timing(response.headers.get("server-timing"))
+                if count is not None:
+                    queries.append(count)
+                    db_ms.append(duration)
+
+            results[scenario.name] = {
+                "method": scenario.method,
+                "iterations": total,
+                "errors": total - len(latencies),
+                "statuses": statuses,
+                "latency_ms": _summary(latencies),
+                "queries": _summary(queries, digits=1),
+                "db_ms": _summary(db_ms),
+            }
+            logger.info(
+                f"{scenario.name}: p50={results[scenario.name]['latency_ms']['p50']} ms "
+                f"p95={results[scenario.name]['latency_ms']['p95']} ms "
+                f"queries={results[scenario.name]['queries']['p50']}"
+            )
+
+    _delete_sent_messages(engine, started_at)
+    return {
+        "version": REPORT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git": _git_revision(),
+        "python": platform.python_version(),
+        "options": {"iterations": iterations, "provider_latency_ms": provider_latency_ms},
+        "dataset": dataset,
+        "scenarios": results,
+    }
+
+
+def write_report(report: Dict[str, Any], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any], threshold: float = 0.2) -> Tuple[List[List[str]], List[str]]:
+    """
+    Порівняти два звіти. Регресія - p95 латентності зріс більше ніж на
+    threshold (частка) або медіана SQL запитів зросла.
+    Повертає рядки таблиці і список регресій.
+    """
+    rows: List[List[str]] = []
+    regressions: List[str] = []
+    if base.get("dataset") != head.get("dataset"):
+        regressions.append("dataset differs between reports - results are not comparable")
+
+    def delta(old: Optional[float], new: Optional[float]) -> str:
+        if old is None or new is None:
+            return "n/a"
+        if not old:
+            return f"{new:g}"
+        return f"{new:g} ({(new - old) / old * 100:+.0f}%)"
+
+    for name in sorted(set(base["scenarios"]) | set(head["scenarios"])):
+        old, new = base["scenarios"].get(name), head["scenarios"].get(name)
+        if old is None or new is None:
+            rows.append([name, "only in " + ("head" if old is None else "base"), "", "", "", ""])
+            continue
+        old_latency, new_latency = old["latency_ms"], new["latency_ms"]
+        rows.append([
+            name,
+            delta(old_latency["p50"], new_latency["p50"]),
+            delta(old_latency["p95"], new_latency["p95"]),
+            delta(old_latency["p99"], new_latency["p99"]),
+            delta(old["queries"]["p50"], new["queries"]["p50"]),
+            f"{new['errors']}",
+        ])
+        if old_latency["p95"] and new_latency["p95"] and new_latency["p95"] > old_latency["p95"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {old_latency['p95']} -> {new_latency['p95']} ms")
+        if (old["queries"]["p50"] or 0) < (new["queries"]["p50"] or 0):
+            regressions.append(f"{name}: queries {old['queries']['p50']} -> {new['queries']['p50']}")
+        if new["errors"] > old["errors"]:
+            regressions.append(f"{name}: errors {old['errors']} -> {new['errors']}")
+    return rows, regressions
@@ -0,0 +1,135 @@
+"""
+Сценарії benchmark: HTTP запити до API на засіяних даних.
+
+Кожен сценарій - метод, шлях і параметри для i-ї ітерації; ідентифікатори
+(розмови, КП) беруться з BenchContext по колу, тож прогін детермінований.
+Провайдери месенджерів не викликаються: stub_providers() підміняє
+Telegram клієнт (send_message сценарій працює тільки з telegram розмовами).
+"""
+import asyncio
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+from uuid import UUID
+
+
+@dataclass
+class BenchContext:
+    """Дані, на які посилаються сценарії (вибираються з БД після seed)"""
+    conversation_ids: List[UUID]
+    telegram_conversation_ids: List[UUID]
+    kp_ids: List[int]
+
+    @staticmethod
+    def pick(values: list, i: int):
+        return values[i % len(values)]
+
+
+SENT_MESSAGE_PREFIX = "Benchmark message #"
+
+Request = Tuple[str, Dict[str, Any]]  # (шлях, kwargs для TestClient.request)
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    build: Callable[[BenchContext, int], Request]
+    iterations: int = 50
+    warmup: int = 3
+    expect: Tuple[int, ...] = (200,)
+
+
+def _inbox(ctx: BenchContext, i: int) -> Request:
+    return "/api/v1/communications/inbox", {"params": {"limit": 50}}
+
+
+def _conversation(ctx: BenchContext, i: int) -> Request:
+    conversation_id = ctx.pick(ctx.conversation_ids, i)
+    return f"/api/v1/communications/conversations/{conversation_id}", {"params": {"limit": 100}}
+
+
+def _send_message(ctx: BenchContext, i: int) -> Request:
+    conversation_id = ctx.pick(ctx.telegram_conversation_ids, i)
+    return (
+        f"/api/v1/communications/conversations/{conversation_id}/messages",
+        {"json": {"content": f"{SENT_MESSAGE_PREFIX}{i}"}},
+    )
+
+
+def _orders(ctx: BenchContext, i: int) -> Request:
+    return "/api/v1/crm/orders", {"params": {"limit": 100}}
+
+
+def _kp_list(ctx: BenchContext, i: int) -> Request:
+    return "/api/v1/kp", {"params": {"limit": 100}}
+
+
+def _kp_pdf(ctx: BenchContext, i: int) -> Request:
+    return f"/api/v1/kp/{ctx.pick(ctx.kp_ids, i)}/pdf", {}
+
+
+def _payments_export(ctx: BenchContext, i: int) -> Request:
+    # Останні 30 днів - в межах EXPORT_SYNC_MAX_ROWS для типових обсягів seed
+    return "/api/v1/finance/payments/export", {"params": {"date_from": (date.today() - timedelta(days=30)).isoformat()}}
+
+
+SCENARIOS: Dict[str, Scenario] = {scenario.name: scenario for scenario in [
+    Scenario("get_inbox", "GET", _inbox),
+    Scenario("get_conversation", "GET", _conversation),
+    Scenario("crm_orders", "GET", _orders),
+    Scenario("kp_list", "GET", _kp_list),
+    Scenario("kp_pdf", "GET", _kp_pdf, iterations=20, warmup=2),
+    Scenario("payments_export", "GET", _payments_export, iterations=10, warmup=1),
+    # Останнім: додає повідомлення в розмови (runner видаляє їх після прогону)
+    Scenario("send_message", "POST", _send_message),
+]}
+
+
+@dataclass
+class _StubTelegramClient:
+    """Telethon-подібний клієнт без мережі; latency імітує відповідь провайдера"""
+    latency: float = 0.0
+    sent: List[Any] = field(default_factory=list)
+
+    async def _wait(self) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def get_entity(self, entity):
+        await self._wait()
+        return entity
+
+    async def send_message(self, entity, content):
+        await self._wait()
+        self.sent.append((entity, content))
+
+    async def send_file(self, entity, files, caption=None):
+        await self._wait()
+        self.sent.append((entity, caption))
+
+    async def iter_dialogs(self):
+        return
+        yield
+
+
+@contextmanager
+def stub_providers(latency_ms: float = 0.0) -> Iterator[_StubTelegramClient]:
+    """Підмінити конфіг і клієнт TelegramService на час прогону"""
+    from modules.communications.services.telegram import TelegramService
+
+    client = _StubTelegramClient(latency=latency_ms / 1000)
+
+    async def get_client(self):
+        return client
+
+    def load_config(self, db):
+        return {"api_id": 0, "api_hash": "", "session_string": "benchmark"}
+
+    original = TelegramService._get_client, TelegramService._load_config
+    TelegramService._get_client, TelegramService._load_config = get_client, load_config
+    try:
+        yield client
+    finally:
+        TelegramService._get_client, TelegramService._load_config = original
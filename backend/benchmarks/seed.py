@@ -0,0 +1,411 @@
+"""
+Синтетичні дані CRM для benchmark.
+
+Дані детерміновані: faker і random ініціалізуються одним seed, UUID
+генеруються з того ж random - однаковий SeedConfig дає однаковий набір
+рядків (зсувається лише якір часу - момент заповнення). Рядки вставляються
+пачками через Core insert (executemany), без ORM графів.
+"""
+import logging
+import random
+import time
+import uuid
+from dataclasses import asdict, dataclass, fields, replace
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List
+
+from faker import Faker
+from sqlalchemy import func, select, text
+
+logger = logging.getLogger(__name__)
+
+BENCH_DOMAIN = "bench.example"
+ADMIN_EMAIL = f"admin@{BENCH_DOMAIN}"
+BATCH_SIZE = 5000
+
+LANGUAGES = ["Angielski", "Niemiecki", "Ukraiński", "Rosyjski", "Francuski", "Hiszpański", "Włoski"]
+TRANSLATION_TYPES = ["Umowa", "Zaświadczenie", "Szkolne", "Samochodowe"]
+ORDER_SOURCES = ["WhatsApp", "Email", "Formularz kontaktowy", "Telegram", "Instagram"]
+# Частка розмов по платформах (telegram - платформа сценарію send_message)
+PLATFORM_WEIGHTS = {"telegram": 40, "whatsapp": 20, "email": 20, "instagram": 10, "facebook": 10}
+ATTACHMENT_KINDS = [
+    ("image", "image/jpeg", ".jpg"),
+    ("document", "application/pdf", ".pdf"),
+    ("document", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", ".docx"),
+    ("audio", "audio/ogg", ".ogg"),
+]
+
+# Таблиці з даними benchmark (порядок - для TRUNCATE ... CASCADE)
+SEEDED_TABLES = [
+    "communications_attachments",
+    "communications_messages",
+    "communications_conversations",
+    "finance_transactions",
+    "crm_order_progress",
+    "timeline_steps",
+    "crm_orders",
+    "translator_languages",
+    "translators",
+    "crm_clients",
+    "kps",
+    "users",
+]
+
+
+@dataclass
+class SeedConfig:
+    """Обсяги синтетичних даних"""
+    seed: int = 42
+    managers: int = 10
+    clients: int = 2000
+    translators: int = 150
+    orders: int = 5000
+    conversations: int = 3000
+    messages_per_conversation: int = 25  # середнє, розподіл 1..2N-1
+    attachment_ratio: float = 0.1
+    kps: int = 2000
+    days: int = 365  # глибина історії
+
+    def scaled(self, factor: float) -> "SeedConfig":
+        """Той самий профіль даних з обсягами * factor"""
+        volumes = {"managers", "clients", "translators", "orders", "conversations", "kps"}
+        return replace(self, **{
+            f.name: max(1, int(getattr(self, f.name) * factor)) for f in fields(self) if f.name in volumes
+        })
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class _Generator:
+    """Детермінований генератор рядків для одного SeedConfig"""
+
+    def __init__(self, config: SeedConfig, anchor: datetime):
+        self.config = config
+        self.anchor = anchor
+        self.rng = random.Random(config.seed)
+        self.fake = Faker("pl_PL")
+        self.fake.seed_instance(config.seed)
+
+    def uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def moment(self, not_before: datetime = None) -> datetime:
+        """Випадковий момент в межах історії (і не раніше not_before)"""
+        start = not_before or self.anchor - timedelta(days=self.config.days)
+        span = max((self.anchor - start).total_seconds(), 1)
+        return start + timedelta(seconds=self.rng.uniform(0, span))
+
+    def money(self, low: float, high: float) -> Decimal:
+        return Decimal(str(round(self.rng.uniform(low, high), 2)))
+
+
+def _insert(conn, table, rows: Iterable[Dict[str, Any]]) -> int:
+    """Пачкова вставка; ключі, яких немає в таблиці (старіша схема), відкидаються"""
+    columns = set(table.c.keys())
+    batch: List[Dict[str, Any]] = []
+    total = 0
+    for row in rows:
+        batch.append({key: value for key, value in row.items() if key in columns})
+        if len(batch) >= BATCH_SIZE:
+            conn.execute(table.insert(), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        conn.execute(table.insert(), batch)
+        total += len(batch)
+    return total
+
+
+def ensure_schema() -> None:
+    """
+    Таблиці для порожньої БД: спершу async моделі (users з UUID id),
+    потім legacy create_all з db.py (kps та інші старі таблиці).
+    """
+    import asyncio
+
+    from core.migrations import create_missing_tables
+
+    asyncio.run(create_missing_tables())
+    import db  # noqa: F401  create_all при імпорті
+
+
+def reset(engine) -> None:
+    """Очистити таблиці benchmark (тільки окрема БД - див. env.configure)"""
+    with engine.begin() as conn:
+        existing = set(conn.execute(text(
+            "SELECT table_name FROM information_schema.tables WHERE table_schema = 'public'"
+        )).scalars())
+        tables = [name for name in SEEDED_TABLES if name in existing]
+        if tables:
+            conn.execute(text(f"TRUNCATE {', '.join(tables)} RESTART IDENTITY CASCADE"))
+
+
+def seed(engine, config: SeedConfig) -> Dict[str, int]:
+    """Заповнити БД. Повертає кількість вставлених рядків по таблицях."""
+    from models import KP
+    from modules.auth.models import User
+    from modules.communications.models import Attachment, Conversation, Message
+    from modules.crm.models import (
+        Client, ClientSource, Order, OrderProgress, OrderStatus, TimelineStep,
+        Translator, TranslatorLanguage, TranslatorStatus,
+    )
+    from modules.crm.services.timeline import TIMELINE_STEP_ORDER, progress_from_mask
+    from modules.finance.models import PaymentMethod, PaymentStatus, Transaction
+
+    gen = _Generator(config, anchor=datetime.now(timezone.utc).replace(microsecond=0))
+    rng, fake = gen.rng, gen.fake
+    counts: Dict[str, int] = {}
+    started = time.perf_counter()
+
+    with engine.begin() as conn:
+        if conn.execute(select(func.count()).select_from(User.__table__).where(User.email == ADMIN_EMAIL)).scalar():
+            raise SystemExit("Benchmark data already present - run `seed --reset` to recreate it")
+
+        # --- Користувачі ---
+        users = [{
+            "id": gen.uuid(), "email": ADMIN_EMAIL, "first_name": "Bench", "last_name": "Admin",
+            "role": "OWNER", "is_admin": True, "is_active": True,
+        }]
+        for i in range(config.managers):
+            users.append({
+                "id": gen.uuid(), "email": f"manager{i}@{BENCH_DOMAIN}",
+                "first_name": fake.first_name(), "last_name": fake.last_name(),
+                "role": "MANAGER", "is_admin": False, "is_active": True,
+            })
+        counts["users"] = _insert(conn, User.__table__, users)
+        manager_ids = [row["id"] for row in users]
+
+        # --- Клієнти ---
+        sources = [source.value for source in ClientSource]
+        clients = [{
+            "id": gen.uuid(),
+            "full_name": fake.name(),
+            "email": fake.email() if rng.random() < 0.7 else None,
+            "phone": fake.phone_number(),
+            "source": rng.choice(sources),
+            "created_at": gen.moment(),
+        } for _ in range(config.clients)]
+        counts["crm_clients"] = _insert(conn, Client.__table__, clients)
+        client_ids = [row["id"] for row in clients]
+
+        # --- Перекладачі ---
+        statuses = [status.value for status in TranslatorStatus]
+        counts["translators"] = _insert(conn, Translator.__table__, ({
+            "name": fake.name(),
+            "email": f"translator{i}@{BENCH_DOMAIN}",
+            "phone": fake.phone_number(),
+            "status": rng.choice(statuses),
+            "rating": round(rng.uniform(3, 5), 1),
+            "completed_orders": rng.randint(0, 500),
+        } for i in range(config.translators)))
+        translator_ids = conn.execute(
+            select(Translator.id).where(Translator.email.like(f"%@{BENCH_DOMAIN}")).order_by(Translator.id)
+        ).scalars().all()
+        counts["translator_languages"] = _insert(conn, TranslatorLanguage.__table__, ({
+            "translator_id": translator_id,
+            "language": language,
+            "rate_per_page": round(rng.uniform(30, 120), 2),
+        } for translator_id in translator_ids for language in rng.sample(LANGUAGES, rng.randint(1, 3))))
+
+        # --- Замовлення, етапи timeline, прогрес, платежі ---
+        order_statuses = [status.value for status in OrderStatus]
+        methods = [method.value for method in PaymentMethod]
+        orders, steps, progress, transactions = [], [], [], []
+        for i in range(config.orders):
+            created_at = gen.moment()
+            order_id = gen.uuid()
+            manager_id = rng.choice(manager_ids)
+            price = gen.money(80, 2500)
+            orders.append({
+                "id": order_id,
+                "client_id": rng.choice(client_ids),
+                "manager_id": manager_id,
+                "order_number": f"BENCH/{i + 1:06d}",
+                "description": fake.sentence(nb_words=6),
+                "status": rng.choice(order_statuses),
+                "deadline": created_at + timedelta(days=rng.randint(1, 30)),
+                "language": rng.choice(["en", "de", "uk", "ru", "fr"]),
+                "translation_type": rng.choice(TRANSLATION_TYPES),
+                "payment_method": rng.choice(methods),
+                "price_netto": (price / Decimal("1.23")).quantize(Decimal("0.01")),
+                "price_brutto": price,
+                "order_source": rng.choice(ORDER_SOURCES),
+                "is_archived": rng.random() < 0.1,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+
+            # Етапи переважно по порядку; зрідка один пропущено (прогрес зупиняється на ньому)
+            done = rng.randint(1, len(TIMELINE_STEP_ORDER))
+            skipped = rng.randrange(done) if done > 2 and rng.random() < 0.05 else None
+            mask = 0
+            step_at = created_at
+            for index, step_type in enumerate(TIMELINE_STEP_ORDER[:done]):
+                if index == skipped:
+                    continue
+                step_at = gen.moment(not_before=step_at)
+                mask |= 1 << index
+                steps.append({
+                    "order_id": order_id,
+                    "step_type": step_type.value,
+                    "completed": True,
+                    "completed_at": step_at,
+                    "completed_by_id": manager_id,
+                    "created_at": step_at,
+                })
+            completed_steps, current_stage = progress_from_mask(mask)
+            progress.append({
+                "order_id": order_id,
+                "steps_mask": mask,
+                "completed_steps": completed_steps,
+                "current_stage": current_stage,
+            })
+
+            if mask & (1 << 3):  # PAYMENT_RECEIVED
+                for part in range(rng.choice([1, 1, 1, 2])):
+                    paid_at = gen.moment(not_before=created_at)
+                    transactions.append({
+                        "id": gen.uuid(),
+                        "order_id": order_id,
+                        "amount_gross": price if part == 0 else gen.money(20, 300),
+                        "payment_date": paid_at.date(),
+                        "service_date": created_at.date(),
+                        "receipt_number": f"BENCH-R-{i + 1:06d}-{part}",
+                        "payment_method": rng.choice(methods),
+                        "payment_status": PaymentStatus.SUCCEEDED.value,
+                        "currency": "PLN",
+                        "created_at": paid_at,
+                    })
+        counts["crm_orders"] = _insert(conn, Order.__table__, orders)
+        counts["timeline_steps"] = _insert(conn, TimelineStep.__table__, steps)
+        counts["crm_order_progress"] = _insert(conn, OrderProgress.__table__, progress)
+        counts["finance_transactions"] = _insert(conn, Transaction.__table__, transactions)
+        del orders, steps, progress, transactions
+
+        # --- Розмови, повідомлення, вкладення ---
+        platforms = list(PLATFORM_WEIGHTS)
+        weights = list(PLATFORM_WEIGHTS.values())
+        counts["communications_conversations"] = 0
+        counts["communications_messages"] = 0
+        counts["communications_attachments"] = 0
+        conversations, messages, attachments = [], [], []
+        for i in range(config.conversations):
+            platform = rng.choices(platforms, weights)[0]
+            conversation_id = gen.uuid()
+            created_at = gen.moment()
+            message_at = created_at
+            count = rng.randint(1, max(1, 2 * config.messages_per_conversation - 1))
+            unread_from = count - rng.choice([0, 0, 0, 1, 2, 3])
+            for n in range(count):
+                message_at = gen.moment(not_before=message_at)
+                direction = "inbound" if rng.random() < 0.55 else "outbound"
+                message_id = gen.uuid()
+                message_attachments = None
+                message_type = "text" if platform != "email" else "html"
+                if rng.random() < config.attachment_ratio:
+                    file_type, mime_type, ext = rng.choice(ATTACHMENT_KINDS)
+                    attachment_id = gen.uuid()
+                    file_path = f"attachments/{attachment_id}{ext}"
+                    file_size = rng.randint(10_000, 5_000_000)
+                    original_name = f"{fake.word()}{ext}"
+                    message_type = "image" if file_type == "image" else "file"
+                    attachments.append({
+                        "id": attachment_id,
+                        "message_id": message_id,
+                        "file_path": file_path,
+                        "file_type": file_type,
+                        "mime_type": mime_type,
+                        "original_name": original_name,
+                        "file_size": file_size,
+                        "created_at": message_at,
+                    })
+                    message_attachments = [{
+                        "id": str(attachment_id),
+                        "type": file_type,
+                        "filename": original_name,
+                        "mime_type": mime_type,
+                        "size": file_size,
+                        "url": f"/media/{file_path}",
+                    }]
+                messages.append({
+                    "id": message_id,
+                    "conversation_id": conversation_id,
+                    "direction": direction,
+                    "type": message_type,
+                    "content": fake.paragraph(nb_sentences=rng.randint(1, 4)),
+                    "status": ("sent" if n >= unread_from else "read") if direction == "inbound" else "sent",
+                    "attachments": message_attachments,
+                    "meta_data": {"bench": True},
+                    "is_from_me": direction == "outbound",
+                    "sent_at": message_at,
+                    "external_id": f"bench-{i}-{n}",
+                    "created_at": message_at,
+                })
+            if platform == "telegram":
+                external_id = str(100_000_000 + i)
+            elif platform == "email":
+                external_id = f"client{i}@{BENCH_DOMAIN}"
+            else:
+                external_id = f"bench-{platform}-{i}"
+            conversations.append({
+                "id": conversation_id,
+                "client_id": rng.choice(client_ids) if rng.random() < 0.7 else None,
+                "platform": platform,
+                "external_id": external_id,
+                "subject": fake.sentence(nb_words=5) if platform == "email" else None,
+                "assigned_manager_id": rng.choice(manager_ids) if rng.random() < 0.6 else None,
+                "is_archived": rng.random() < 0.1,
+                "last_message_at": message_at,
+                "created_at": created_at,
+                "updated_at": message_at,
+            })
+            # Пачками, щоб не тримати всі повідомлення в пам'яті
+            if len(messages) >= BATCH_SIZE or i == config.conversations - 1:
+                counts["communications_conversations"] += _insert(conn, Conversation.__table__, conversations)
+                counts["communications_messages"] += _insert(conn, Message.__table__, messages)
+                counts["communications_attachments"] += _insert(conn, Attachment.__table__, attachments)
+                conversations, messages, attachments = [], [], []
+
+        # --- Legacy KP ---
+        formats = ["Кейтерінг", "Фуршет", "Кава-брейк", "Доставка боксів"]
+        kps = []
+        for i in range(config.kps):
+            people = rng.randint(10, 300)
+            per_person = round(rng.uniform(150, 900), 2)
+            kps.append({
+                "title": f"КП {fake.company()}",
+                "people_count": people,
+                "price_per_person": per_person,
+                "total_price": round(people * per_person, 2),
+                "client_name": fake.name(),
+                "client_email": fake.email(),
+                "client_phone": fake.phone_number(),
+                "event_format": rng.choice(formats),
+                "event_group": rng.choice(["Доставка боксів", "Кейтерінг", "Інше"]),
+                "event_date": gen.moment() + timedelta(days=rng.randint(0, 60)),
+                "event_location": fake.city(),
+                "status": rng.choice(["in_work", "approved", "rejected", "completed"]),
+                "created_at": gen.moment(),
+            })
+        counts["kps"] = _insert(conn, KP.__table__, kps)
+
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        conn.commit()
+
+    logger.info(f"Seeded {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s: {counts}")
+    return counts
+
+
+def dataset_counts(engine) -> Dict[str, int]:
+    """Фактичні обсяги таблиць (потрапляють у звіт для порівнянності прогонів)"""
+    with engine.connect() as conn:
+        existing = set(conn.execute(text(
+            "SELECT table_name FROM information_schema.tables WHERE table_schema = 'public'"
+        )).scalars())
+        return {
+            name: conn.execute(text(f"SELECT count(*) FROM {name}")).scalar()
+            for name in SEEDED_TABLES if name in existing
+        }
@@ -0,0 +1,227 @@
+"""
+Імпорт каталогу (items / categories / subcategories) з CSV або Excel.
+
+Рядки файлу йдуть у staging таблицю через COPY, а категорії, підкатегорії
+та страви створюються / оновлюються кількома set-based запитами в одній
+транзакції (див. core.bulk_import). Страви зіставляються за назвою без
+урахування регістру.
+
+Режими:
+- insert_missing=True (CSV меню) - нові страви створюються;
+  insert_missing=False (оновлення з Excel) - тільки оновлення існуючих,
+  решта повертається як not_found;
+- deactivate_missing=True - повний прайс: страви, яких немає у файлі,
+  деактивуються (active = false), а присутні - активуються;
+- dry_run=True - звіт без змін у БД.
+"""
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from catalog_service import bump_catalog_version
+from core.bulk_import import (
+    MAX_REPORTED_ERRORS,
+    NUMERIC_PATTERN,
+    NUMERIC_TEXT_SQL,
+    ImportReport,
+    clean_cell,
+    copy_rows,
+    create_stage,
+    finish,
+    iter_csv_rows,
+    reject_rows,
+)
+
+STAGE_TABLE = "menu_import_stage"
+
+MENU_COLUMNS = ("category", "subcategory", "name", "price", "weight", "volume", "unit", "description")
+
+MENU_CSV_ALIASES = {
+    "category": ("category", "категорія", "kategoria"),
+    "subcategory": ("subcategory", "підкатегорія", "podkategoria"),
+    "name": ("name", "назва", "страва", "nazwa"),
+    "price": ("price", "ціна", "cena"),
+    "weight": ("weight", "вага", "вихід", "waga"),
+    "volume": ("volume", "об'єм", "обʼєм", "objętość"),
+    "unit": ("unit", "од.", "одиниця", "jednostka"),
+    "description": ("description", "опис", "opis"),
+}
+
+# Поля items, які оновлюються значенням з файлу (порожнє у файлі - залишається старе)
+_TEXT_FIELDS = ("weight", "volume", "unit", "description")
+
+
+@dataclass
+class MenuImportReport(ImportReport):
+    found: int = 0
+    created_categories: int = 0
+    created_subcategories: int = 0
+    not_found: List[str] = field(default_factory=list)
+
+    def to_dict(self, max_errors: Optional[int] = MAX_REPORTED_ERRORS) -> Dict:
+        data = super().to_dict(max_errors)
+        data["not_found_count"] = len(self.not_found)
+        if max_errors is not None:
+            data["not_found"] = self.not_found[:max_errors]
+        return data
+
+
+def read_menu_csv(path: Path) -> Iterator[Tuple]:
+    """Рядки CSV меню; без заголовка колонки йдуть у порядку MENU_COLUMNS."""
+    return iter_csv_rows(path, MENU_COLUMNS, MENU_CSV_ALIASES, positional=MENU_COLUMNS)
+
+
+def read_menu_excel(path: Path) -> Iterator[Tuple]:
+    """
+    Рядки Excel меню: назва аркуша = категорія, рядок без ціни = підкатегорія,
+    рядок з ціною = страва (перша колонка - назва, друга - ціна).
+    row_num = номер аркуша * 100000 + номер рядка на аркуші.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet_index, ws in enumerate(workbook.worksheets):
+            category = clean_cell(ws.title)
+            subcategory = None
+            for row_index, row in enumerate(ws.iter_rows(max_col=2, values_only=True), start=1):
+                name = clean_cell(row[0]) if row else None
+                price = clean_cell(row[1]) if row and len(row) > 1 else None
+                if not name:
+                    continue
+                if price is None:
+                    subcategory = name
+                    continue
+                row_num = sheet_index * 100000 + row_index
+                yield (row_num, category, subcategory, name, price, None, None, None, None)
+    finally:
+        workbook.close()
+
+
+def import_menu(
+    db: Session,
+    rows: Iterable[Tuple],
+    insert_missing: bool = True,
+    deactivate_missing: bool = False,
+    dry_run: bool = False,
+) -> MenuImportReport:
+    """
+    Застосувати рядки (row_num, *MENU_COLUMNS) до каталогу.
+    not_found у звіті - назви страв, яких немає в БД (тільки insert_missing=False).
+    """
+    report = MenuImportReport(dry_run=dry_run)
+    try:
+        create_stage(
+            db, STAGE_TABLE, MENU_COLUMNS,
+            extra_columns=("category_id integer", "subcategory_id integer", "item_id integer"),
+        )
+        report.total_rows = copy_rows(db, STAGE_TABLE, MENU_COLUMNS, rows)
+
+        db.execute(text(f"UPDATE {STAGE_TABLE} SET price = {NUMERIC_TEXT_SQL.format(column='price')}"))
+        report.errors = reject_rows(db, STAGE_TABLE, [
+            ("name", "Порожня назва", "name IS NULL"),
+            ("price", "Ціна не є числом", f"price IS NOT NULL AND price !~ '{NUMERIC_PATTERN}'"),
+            ("subcategory", "Підкатегорія без категорії", "subcategory IS NOT NULL AND category IS NULL"),
+            ("name", "Повтор назви у файлі", (
+                f"name IS NOT NULL AND row_num NOT IN "
+                f"(SELECT min(row_num) FROM {STAGE_TABLE} WHERE name IS NOT NULL GROUP BY lower(name))"
+            )),
+        ])
+
+        report.created_categories = db.execute(text(f"""
+            INSERT INTO categories (name)
+            SELECT DISTINCT ON (lower(s.category)) s.category
+            FROM {STAGE_TABLE} s
+            WHERE NOT s.rejected AND s.category IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM categories c WHERE lower(c.name) = lower(s.category))
+            ORDER BY lower(s.category), s.row_num
+        """)).rowcount
+        db.execute(text(f"""
+            UPDATE {STAGE_TABLE} s SET category_id = c.id
+            FROM (SELECT lower(name) AS key, min(id) AS id FROM categories GROUP BY lower(name)) c
+            WHERE c.key = lower(s.category)
+        """))
+
+        report.created_subcategories = db.execute(text(f"""
+            INSERT INTO subcategories (name, category_id)
+            SELECT DISTINCT ON (s.category_id, lower(s.subcategory)) s.subcategory, s.category_id
+            FROM {STAGE_TABLE} s
+            WHERE NOT s.rejected AND s.subcategory IS NOT NULL AND s.category_id IS NOT NULL
+              AND NOT EXISTS (
+                  SELECT 1 FROM subcategories sc
+                  WHERE sc.category_id = s.category_id AND lower(sc.name) = lower(s.subcategory)
+              )
+            ORDER BY s.category_id, lower(s.subcategory), s.row_num
+        """)).rowcount
+        db.execute(text(f"""
+            UPDATE {STAGE_TABLE} s SET subcategory_id = sc.id
+            FROM (
+                SELECT category_id, lower(name) AS key, min(id) AS id
+                FROM subcategories GROUP BY category_id, lower(name)
+            ) sc
+            WHERE sc.category_id = s.category_id AND sc.key = lower(s.subcategory)
+        """))
+
+        db.execute(text(f"""
+            UPDATE {STAGE_TABLE} s SET item_id = i.id
+            FROM (SELECT lower(name) AS key, min(id) AS id FROM items WHERE name IS NOT NULL GROUP BY lower(name)) i
+            WHERE i.key = lower(s.name) AND NOT s.rejected
+        """))
+        report.found = db.execute(text(
+            f"SELECT count(*) FROM {STAGE_TABLE} WHERE item_id IS NOT NULL"
+        )).scalar()
+
+        assignments = [
+            "price = COALESCE(s.price::double precision, i.price)",
+            "subcategory_id = COALESCE(s.subcategory_id, i.subcategory_id)",
+            *(f"{name} = COALESCE(s.{name}, i.{name})" for name in _TEXT_FIELDS),
+        ]
+        changes = [
+            "(s.price IS NOT NULL AND i.price IS DISTINCT FROM s.price::double precision)",
+            "(s.subcategory_id IS NOT NULL AND i.subcategory_id IS DISTINCT FROM s.subcategory_id)",
+            *(f"(s.{name} IS NOT NULL AND i.{name} IS DISTINCT FROM s.{name})" for name in _TEXT_FIELDS),
+        ]
+        if deactivate_missing:
+            assignments.append("active = true")
+            changes.append("i.active IS NOT true")
+        report.updated = db.execute(text(f"""
+            UPDATE items i SET {', '.join(assignments)}
+            FROM {STAGE_TABLE} s
+            WHERE i.id = s.item_id AND ({' OR '.join(changes)})
+        """)).rowcount
+        report.unchanged = report.found - report.updated
+
+        if insert_missing:
+            report.inserted = db.execute(text(f"""
+                INSERT INTO items (name, price, subcategory_id, weight, volume, unit, description, active)
+                SELECT s.name, s.price::double precision, s.subcategory_id,
+                       s.weight, s.volume, s.unit, s.description, true
+                FROM {STAGE_TABLE} s
+                WHERE NOT s.rejected AND s.item_id IS NULL
+                ORDER BY s.row_num
+            """)).rowcount
+        else:
+            report.not_found = list(db.execute(text(f"""
+                SELECT name FROM {STAGE_TABLE}
+                WHERE NOT rejected AND item_id IS NULL
+                ORDER BY row_num
+            """)).scalars())
+
+        if deactivate_missing:
+            # Відхилені рядки теж рахуються "присутніми" - помилка у файлі не вимикає страву
+            report.deactivated = db.execute(text(f"""
+                UPDATE items i SET active = false
+                WHERE i.active IS NOT false
+                  AND NOT EXISTS (SELECT 1 FROM {STAGE_TABLE} s WHERE lower(s.name) = lower(i.name))
+            """)).rowcount
+
+        if report.inserted or report.updated or report.deactivated \
+                or report.created_categories or report.created_subcategories:
+            bump_catalog_version(db)
+    except Exception:
+        db.rollback()
+        raise
+    return finish(db, report)
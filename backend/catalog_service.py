@@ -0,0 +1,120 @@
+"""
+Каталог (страви / обладнання) - денормалізований read model для екранів КП.
+
+Знімок каталогу = усі items з назвами підкатегорії та категорії + списки
+категорій і підкатегорій, зібрані трьома колонковими запитами (без ORM графа
+і без Item.kp_items). Знімок серіалізується в JSON один раз і тримається
+в пам'яті процесу разом з версією.
+
+Версія каталогу зберігається в app_settings (catalog_version) і збільшується
+в тій самій транзакції, що й зміна каталогу (bump_catalog_version), тож
+кожен воркер бачить зміни інших процесів: на запит читається тільки версія,
+а знімок перебудовується лише коли вона змінилась. Версія ж є ETag відповіді.
+"""
+import json
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+import models
+
+CATALOG_VERSION_KEY = "catalog_version"
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: int
+    body: bytes
+
+    @property
+    def etag(self) -> str:
+        return f'"catalog-{self.version}"'
+
+
+_lock = threading.Lock()
+_snapshot: Optional[CatalogSnapshot] = None
+
+
+def get_catalog_version(db: Session) -> int:
+    value = db.execute(
+        select(models.AppSetting.value).where(models.AppSetting.key == CATALOG_VERSION_KEY)
+    ).scalar()
+    try:
+        return int(value) if value else 0
+    except ValueError:
+        return 0
+
+
+def bump_catalog_version(db: Session) -> None:
+    """
+    Позначити каталог зміненим. Викликати до commit зміни -
+    нова версія стане видимою разом зі зміною (або відкотиться разом з нею).
+    """
+    db.execute(
+        text(
+            "INSERT INTO app_settings (key, value) VALUES (:key, '1') "
+            "ON CONFLICT (key) DO UPDATE SET "
+            "value = (COALESCE(NULLIF(app_settings.value, ''), '0')::bigint + 1)::text, "
+            "updated_at = now()"
+        ),
+        {"key": CATALOG_VERSION_KEY},
+    )
+
+
+def _build_catalog(db: Session, version: int) -> CatalogSnapshot:
+    Item, Subcategory, Category = models.Item, models.Subcategory, models.Category
+
+    item_rows = db.execute(
+        select(
+            Item.id,
+            Item.name,
+            Item.description,
+            Item.price,
+            Item.stock_quantity,
+            Item.loss_price,
+            Item.weight,
+            Item.volume,
+            Item.unit,
+            Item.photo_url,
+            Item.active,
+            Item.subcategory_id,
+            Subcategory.name.label("subcategory_name"),
+            Subcategory.category_id,
+            Category.name.label("category_name"),
+        )
+        .outerjoin(Subcategory, Subcategory.id == Item.subcategory_id)
+        .outerjoin(Category, Category.id == Subcategory.category_id)
+        .where(Item.name.isnot(None))
+        .order_by(Item.id)
+    ).all()
+    categories = db.execute(select(Category.id, Category.name).order_by(Category.id)).all()
+    subcategories = db.execute(
+        select(Subcategory.id, Subcategory.name, Subcategory.category_id)
+        .where(Subcategory.category_id.isnot(None))
+        .order_by(Subcategory.id)
+    ).all()
+
+    payload = {
+        "version": version,
+        "items": [dict(row._mapping) for row in item_rows],
+        "categories": [dict(row._mapping) for row in categories],
+        "subcategories": [dict(row._mapping) for row in subcategories],
+    }
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return CatalogSnapshot(version=version, body=body)
+
+
+def get_catalog(db: Session) -> CatalogSnapshot:
+    """Поточний знімок каталогу (перебудовується тільки при зміні версії)."""
+    global _snapshot
+    version = get_catalog_version(db)
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = _build_catalog(db, version)
+        return _snapshot
@@ -0,0 +1,205 @@
+"""
+Bulk import - спільні частини set-based імпорту довідників.
+
+Схема імпорту:
+1. рядки файлу стрімляться в тимчасову staging таблицю через COPY
+   (без ORM об'єктів і без запиту на кожен рядок);
+2. валідація - SQL умови по staging таблиці, невалідні рядки позначаються
+   rejected і потрапляють у звіт з номером рядка;
+3. diff та застосування (INSERT / UPDATE / деактивація) - кілька
+   set-based запитів в одній транзакції;
+4. dry_run - та сама послідовність, але з rollback замість commit.
+
+Staging таблиця створюється як TEMP ... ON COMMIT DROP, тож зникає
+разом з транзакцією і не конфліктує між паралельними імпортами.
+"""
+import csv
+import io
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+# Скільки рядків буферизується перед відправкою в COPY
+COPY_BATCH_ROWS = 5000
+
+# Скільки помилок повертати у відповіді API (повний список - у логах / CLI)
+MAX_REPORTED_ERRORS = 200
+
+# Нормалізація тексту ціни: "1 200,50 zł" -> "1200.50"
+NUMERIC_TEXT_SQL = (
+    "NULLIF(replace(regexp_replace({column}, '(zł|pln|грн|\\s)', '', 'gi'), ',', '.'), '')"
+)
+NUMERIC_PATTERN = "^-?[0-9]+(\\.[0-9]+)?$"
+
+
+@dataclass
+class ImportReport:
+    dry_run: bool = False
+    total_rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deactivated: int = 0
+    errors: List[Dict] = field(default_factory=list)
+
+    def to_dict(self, max_errors: Optional[int] = MAX_REPORTED_ERRORS) -> Dict:
+        data = asdict(self)
+        data["errors_count"] = len(self.errors)
+        if max_errors is not None:
+            data["errors"] = self.errors[:max_errors]
+        return data
+
+
+# ---------- Читання файлів ----------
+
+def clean_cell(value) -> Optional[str]:
+    """Значення клітинки як рядок без пробілів по краях; порожнє -> None."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def detect_delimiter(sample: str) -> str:
+    return ";" if sample.count(";") > sample.count(",") else ","
+
+
+def map_header(header: Sequence[str], aliases: Dict[str, Sequence[str]]) -> Dict[str, int]:
+    """Колонка -> індекс у файлі за назвами заголовків (без урахування регістру)."""
+    normalized = [str(name or "").strip().lower() for name in header]
+    mapping = {}
+    for column, names in aliases.items():
+        for index, name in enumerate(normalized):
+            if name in names:
+                mapping[column] = index
+                break
+    return mapping
+
+
+def iter_csv_rows(
+    path: Path,
+    columns: Sequence[str],
+    aliases: Dict[str, Sequence[str]],
+    positional: Sequence[str] = (),
+) -> Iterator[Tuple]:
+    """
+    Рядки CSV як (row_num, *значення columns).
+
+    Колонки визначаються за заголовком (aliases); якщо жодна не впізнана -
+    перший рядок вважається даними, а колонки йдуть у порядку positional.
+    """
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        delimiter = detect_delimiter(f.read(4096))
+        f.seek(0)
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return
+        mapping = map_header(header, aliases)
+        first_row_num = 2
+        pending = []
+        if not mapping:
+            mapping = {column: index for index, column in enumerate(positional)}
+            first_row_num = 1
+            pending = [header]
+
+        for row_num, row in enumerate(_chain_rows(pending, reader), start=first_row_num):
+            values = [
+                clean_cell(row[mapping[column]]) if column in mapping and mapping[column] < len(row) else None
+                for column in columns
+            ]
+            if any(values):
+                yield (row_num, *values)
+
+
+def _chain_rows(pending: List, reader) -> Iterator:
+    yield from pending
+    yield from reader
+
+
+# ---------- Staging та COPY ----------
+
+def create_stage(db: Session, table: str, columns: Sequence[str], extra_columns: Sequence[str] = ()) -> None:
+    """
+    Тимчасова staging таблиця: row_num + текстові колонки файлу
+    + службові колонки (extra_columns - повні визначення, напр. "item_id integer").
+    """
+    definitions = ["row_num integer NOT NULL", *(f"{column} text" for column in columns)]
+    definitions += ["rejected boolean NOT NULL DEFAULT false", *extra_columns]
+    db.execute(text(f"CREATE TEMP TABLE {table} ({', '.join(definitions)}) ON COMMIT DROP"))
+
+
+def copy_rows(db: Session, table: str, columns: Sequence[str], rows: Iterable[Sequence]) -> int:
+    """
+    Залити рядки (row_num, *columns) у staging таблицю через COPY FROM STDIN.
+    Йде через з'єднання сесії, тобто в тій самій транзакції.
+
+    Returns:
+        Кількість рядків
+    """
+    cursor = db.connection().connection.cursor()
+    statement = f"COPY {table} (row_num, {', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    total = 0
+
+    def flush():
+        buffer.seek(0)
+        cursor.copy_expert(statement, buffer)
+        buffer.seek(0)
+        buffer.truncate()
+
+    try:
+        for row in rows:
+            # None та "" у FORMAT csv без лапок - NULL
+            writer.writerow(row)
+            total += 1
+            if total % COPY_BATCH_ROWS == 0:
+                flush()
+        if buffer.tell():
+            flush()
+    finally:
+        cursor.close()
+    return total
+
+
+def reject_rows(db: Session, table: str, checks: Sequence[Tuple[str, str, str]]) -> List[Dict]:
+    """
+    Позначити rejected рядки, що не пройшли перевірки.
+
+    checks - (поле, повідомлення, SQL умова по колонках staging таблиці).
+    Рядок може отримати кілька помилок; позначення робиться одним UPDATE.
+    """
+    if not checks:
+        return []
+    params = {}
+    selects = []
+    for index, (column, message, condition) in enumerate(checks):
+        params[f"field_{index}"] = column
+        params[f"message_{index}"] = message
+        selects.append(
+            f"SELECT row_num, CAST(:field_{index} AS text) AS field, CAST(:message_{index} AS text) AS message "
+            f"FROM {table} WHERE {condition}"
+        )
+    errors = db.execute(
+        text(f"SELECT row_num, field, message FROM ({' UNION ALL '.join(selects)}) AS bad ORDER BY row_num, field"),
+        params,
+    ).all()
+    if errors:
+        db.execute(
+            text(f"UPDATE {table} SET rejected = true WHERE row_num = ANY(:rows)"),
+            {"rows": sorted({row.row_num for row in errors})},
+        )
+    return [{"row": row.row_num, "field": row.field, "error": row.message} for row in errors]
+
+
+def finish(db: Session, report: ImportReport) -> ImportReport:
+    """Commit або rollback (dry_run) транзакції імпорту."""
+    if report.dry_run:
+        db.rollback()
+    else:
+        db.commit()
+    return report
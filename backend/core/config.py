@@ -47,11 +47,32 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "")
     SMTP_FROM: str = os.getenv("SMTP_FROM", "")
     
+    # Redis (Celery broker, кеші, міжпроцесна інвалідація)
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    
+    # Autobot: скільки місяців зберігати партиції autobot_logs (агрегати не видаляються)
+    AUTOBOT_LOG_RETENTION_MONTHS: int = int(os.getenv("AUTOBOT_LOG_RETENTION_MONTHS", "6"))
+    
+    # SQL інструментація запитів (core/sql_instrumentation.py)
+    SQL_INSTRUMENTATION: bool = os.getenv("SQL_INSTRUMENTATION", "true").lower() == "true"
+    SQL_SLOW_QUERY_MS: float = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+    SQL_REPEAT_THRESHOLD: int = int(os.getenv("SQL_REPEAT_THRESHOLD", "5"))
+    # Перевищення бюджету запитів маршруту - помилка (CI / тести), інакше warning
+    SQL_QUERY_BUDGET_STRICT: bool = os.getenv("SQL_QUERY_BUDGET_STRICT", str(APP_ENV == "test")).lower() == "true"
+    
+    # Монітор event loop: лаг і блокуючі виклики (core/loop_monitor.py)
+    LOOP_MONITOR: bool = os.getenv("LOOP_MONITOR", "true").lower() == "true"
+    LOOP_MONITOR_INTERVAL_MS: float = float(os.getenv("LOOP_MONITOR_INTERVAL_MS", "100"))
+    LOOP_BLOCK_THRESHOLD_MS: float = float(os.getenv("LOOP_BLOCK_THRESHOLD_MS", "100"))
+    LOOP_MONITOR_REPORT_INTERVAL_S: float = float(os.getenv("LOOP_MONITOR_REPORT_INTERVAL_S", "300"))
+    
     # Telegram
     TELEGRAM_ENABLED: bool = os.getenv("TELEGRAM_ENABLED", "false").lower() == "true"
     
     # RAG Integration
     RAG_TOKEN: str = os.getenv("RAG_TOKEN", "adme_rag_secret_987654321")
+    # Скільки секунд жити відповіді в кеші RAG (0 - кеш вимкнено)
+    AI_REPLY_CACHE_TTL_SECONDS: int = int(os.getenv("AI_REPLY_CACHE_TTL_SECONDS", str(24 * 3600)))
     
     class Config:
         env_file = ".env"
@@ -4,6 +4,7 @@ Database connection and session management.
 from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
 from core.config import settings
+from core import sql_instrumentation
 
 # Initialize Base
 Base = declarative_base()
@@ -18,6 +19,8 @@ engine = create_engine(
     echo=False,
 )
 
+sql_instrumentation.install(engine)
+
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from core.config import settings
+from core import sql_instrumentation
 
 
 class Base(DeclarativeBase):
@@ -13,6 +14,8 @@ engine = create_async_engine(
     future=True
 )
 
+sql_instrumentation.install(engine)
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -0,0 +1,178 @@
+"""
+Excel export - спільний двигун для потокових xlsx експортів.
+
+Книги будуються в openpyxl write-only режимі: рядки пишуться в лист одразу
+при append і не тримаються в пам'яті, а стилі задаються один раз як
+NamedStyle і посилаються за назвою (без окремих Font/Border на кожну клітинку).
+
+xlsx - це zip, тому файл спочатку збирається в тимчасовому файлі на диску,
+а вже потім віддається клієнту чанками через StreamingResponse.
+"""
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+from fastapi.responses import StreamingResponse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+from core.config import settings
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Готові файли фонових експортів. Не media - вона публічно роздається nginx.
+EXPORTS_DIR = settings.UPLOADS_DIR / "exports"
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+THIN_BORDER = Border(
+    left=Side(style="thin"),
+    right=Side(style="thin"),
+    top=Side(style="thin"),
+    bottom=Side(style="thin"),
+)
+
+# Базові стилі, доступні в кожній книзі
+CELL = "cell"
+MONEY = "money"
+DATE = "date"
+BOLD = "bold"
+TITLE = "title"
+
+
+def _base_styles() -> list:
+    return [
+        NamedStyle(name=CELL, border=THIN_BORDER),
+        NamedStyle(
+            name=MONEY,
+            border=THIN_BORDER,
+            number_format="#,##0.00",
+            alignment=Alignment(horizontal="right"),
+        ),
+        NamedStyle(name=DATE, border=THIN_BORDER, alignment=Alignment(horizontal="center")),
+        NamedStyle(name=BOLD, font=Font(bold=True)),
+        NamedStyle(name=TITLE, font=Font(bold=True, size=12)),
+    ]
+
+
+def header_style(
+    name: str,
+    fill: Optional[str] = None,
+    font_color: str = "000000",
+    wrap: bool = False,
+) -> NamedStyle:
+    """Стиль заголовка колонки (жирний, по центру, з рамкою та опційною заливкою)."""
+    style = NamedStyle(
+        name=name,
+        font=Font(bold=True, color=font_color),
+        border=THIN_BORDER,
+        alignment=Alignment(horizontal="center", vertical="center", wrap_text=wrap),
+    )
+    if fill:
+        style.fill = PatternFill(start_color=fill, end_color=fill, fill_type="solid")
+    return style
+
+
+class ExcelWriter:
+    """
+    Обгортка над write-only Workbook.
+
+    Usage:
+        writer = ExcelWriter(extra_styles=[header_style("head", fill="4472C4")])
+        ws = writer.sheet("Дані", widths=[5, 30])
+        writer.append(ws, ["№", "Назва"], style="head")
+        for row in rows:
+            writer.append(ws, row, styles=[CELL, CELL])
+        writer.save(path)
+    """
+
+    def __init__(self, extra_styles: Iterable[NamedStyle] = ()):
+        self.workbook = Workbook(write_only=True)
+        for style in [*_base_styles(), *extra_styles]:
+            self.workbook.add_named_style(style)
+
+    def sheet(self, title: str, widths: Sequence[float] = ()):
+        """Новий лист. Ширини колонок у write-only режимі задаються до першого рядка."""
+        ws = self.workbook.create_sheet(title)
+        for col_idx, width in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(col_idx)].width = width
+        return ws
+
+    def append(
+        self,
+        ws,
+        values: Sequence[Any],
+        style: Optional[str] = None,
+        styles: Optional[Sequence[Optional[str]]] = None,
+    ) -> None:
+        """
+        Дописати рядок. style - один стиль для всіх клітинок,
+        styles - стиль для кожної колонки (None = без стилю).
+        """
+        if styles is None:
+            styles = [style] * len(values)
+        row = []
+        for value, cell_style in zip(values, styles):
+            if cell_style is None:
+                row.append(value)
+                continue
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = cell_style
+            row.append(cell)
+        ws.append(row)
+
+    def save(self, path: Path) -> Path:
+        self.workbook.save(path)
+        return path
+
+
+def temp_export_path(prefix: str = "export_") -> Path:
+    """Шлях тимчасового файлу для синхронного експорту (видаляється після віддачі)."""
+    fd, name = tempfile.mkstemp(prefix=prefix, suffix=".xlsx")
+    os.close(fd)
+    return Path(name)
+
+
+def job_export_path(job_id: str) -> Path:
+    """Шлях файлу фонового експорту (спільний volume backend та celery worker)."""
+    EXPORTS_DIR.mkdir(parents=True, exist_ok=True)
+    return EXPORTS_DIR / f"{job_id}.xlsx"
+
+
+def _iter_file(path: Path, delete: bool) -> Iterator[bytes]:
+    try:
+        with open(path, "rb") as f:
+            while chunk := f.read(STREAM_CHUNK_SIZE):
+                yield chunk
+    finally:
+        if delete:
+            path.unlink(missing_ok=True)
+
+
+def xlsx_response(path: Path, filename: str, delete: bool = True) -> StreamingResponse:
+    """Віддати готовий xlsx чанками; delete=True - прибрати файл після відправки."""
+    return StreamingResponse(
+        _iter_file(path, delete),
+        media_type=XLSX_MEDIA_TYPE,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Length": str(path.stat().st_size),
+        },
+    )
+
+
+def cleanup_exports(max_age_seconds: int) -> int:
+    """Прибрати файли фонових експортів, старші за max_age_seconds."""
+    if not EXPORTS_DIR.exists():
+        return 0
+    threshold = time.time() - max_age_seconds
+    removed = 0
+    for path in EXPORTS_DIR.glob("*.xlsx"):
+        if path.stat().st_mtime < threshold:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
@@ -0,0 +1,209 @@
+"""
+Housekeeping - періодичне прибирання даних невеликими set-based батчами.
+
+Кожна задача - цикл коротких транзакцій:
+    UPDATE / DELETE ... WHERE id IN (SELECT id ... LIMIT n FOR UPDATE SKIP LOCKED)
+з commit після кожного батчу. Рядки, які зараз змінює API, пропускаються
+(SKIP LOCKED) і потраплять у наступний запуск, а lock_timeout не дає
+батчу довго чекати на блокування - гаряча communications_conversations
+не блокується на весь час прибирання.
+
+Запуск обмежений HOUSEKEEPING_MAX_RUN_SECONDS - незавершена робота
+продовжиться в наступному запуску за розкладом. Перекриття запусків
+виключає Redis lock на задачу (run_exclusive).
+
+Прогрес кожного запуску (рядки, батчі, тривалість, помилка) пишеться
+в лог і в Redis hash housekeeping:last_run:{job}.
+"""
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+HOUSEKEEPING_BATCH_SIZE = 500
+HOUSEKEEPING_MAX_RUN_SECONDS = 600
+# Пауза між батчами - дає місце запитам API
+HOUSEKEEPING_BATCH_PAUSE_SECONDS = 0.05
+HOUSEKEEPING_LOCK_TIMEOUT = "2s"
+
+ARCHIVE_AFTER_DAYS = 30
+
+JOB_ARCHIVE_CONVERSATIONS = "archive_conversations"
+JOB_DELETE_EXPIRED_NOTIFICATIONS = "delete_expired_notifications"
+
+_LOCK_PREFIX = "housekeeping:lock"
+_STATS_PREFIX = "housekeeping:last_run"
+
+
+@dataclass
+class JobStats:
+    job: str
+    rows: int = 0
+    batches: int = 0
+    duration_seconds: float = 0.0
+    completed: bool = False
+    skipped: bool = False
+    error: Optional[str] = None
+
+
+def _redis():
+    from core.redis_client import get_redis
+    return get_redis()
+
+
+def run_batches(
+    db: Session,
+    job: str,
+    step: Callable[[Session, int], int],
+    batch_size: int = HOUSEKEEPING_BATCH_SIZE,
+    max_seconds: float = HOUSEKEEPING_MAX_RUN_SECONDS,
+) -> JobStats:
+    """
+    Виконувати step (один батч, повертає кількість рядків) окремими
+    транзакціями, поки батч не вийде неповним або не закінчиться час.
+    """
+    stats = JobStats(job=job)
+    started = time.monotonic()
+    is_postgres = db.get_bind().dialect.name == "postgresql"
+    while True:
+        try:
+            if is_postgres:
+                db.execute(text(f"SET LOCAL lock_timeout = '{HOUSEKEEPING_LOCK_TIMEOUT}'"))
+            rows = step(db, batch_size)
+            db.commit()
+        except DBAPIError as e:
+            db.rollback()
+            stats.error = str(e.orig if e.orig is not None else e)[:500]
+            logger.warning(f"Housekeeping {job}: batch failed after {stats.rows} rows: {stats.error}")
+            break
+        stats.rows += rows
+        stats.batches += 1
+        if rows < batch_size:
+            stats.completed = True
+            break
+        if time.monotonic() - started >= max_seconds:
+            logger.info(f"Housekeeping {job}: time budget exhausted, continuing next run")
+            break
+        time.sleep(HOUSEKEEPING_BATCH_PAUSE_SECONDS)
+    stats.duration_seconds = round(time.monotonic() - started, 3)
+    return stats
+
+
+def run_exclusive(job: str, run: Callable[[], JobStats], lock_seconds: int) -> JobStats:
+    """
+    Запустити job, якщо його зараз не виконує інший воркер. lock_seconds -
+    TTL блокування (має бути більшим за time_limit задачі).
+    """
+    try:
+        lock = _redis().lock(f"{_LOCK_PREFIX}:{job}", timeout=lock_seconds, blocking=False)
+        acquired = lock.acquire()
+    except Exception as e:
+        logger.error(f"Housekeeping {job}: cannot take run lock: {e}")
+        return JobStats(job=job, skipped=True, error=str(e))
+    if not acquired:
+        logger.info(f"Housekeeping {job}: previous run still in progress, skipping")
+        return JobStats(job=job, skipped=True)
+    try:
+        stats = run()
+    finally:
+        try:
+            lock.release()
+        except Exception:
+            # TTL уже минув - lock звільнився сам
+            pass
+    _record(stats)
+    return stats
+
+
+def _record(stats: JobStats) -> None:
+    logger.info(
+        f"Housekeeping {stats.job}: {stats.rows} rows in {stats.batches} batches, "
+        f"{stats.duration_seconds}s, completed={stats.completed}"
+    )
+    try:
+        values = {key: str(value) for key, value in asdict(stats).items() if value is not None}
+        values["finished_at"] = datetime.now(timezone.utc).isoformat()
+        key = f"{_STATS_PREFIX}:{stats.job}"
+        pipe = _redis().pipeline()
+        pipe.delete(key)
+        pipe.hset(key, mapping=values)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"Housekeeping {stats.job}: failed to store metrics: {e}")
+
+
+def last_runs() -> Dict[str, Dict[str, str]]:
+    """Метрики останніх запусків усіх задач."""
+    client = _redis()
+    return {
+        job: client.hgetall(f"{_STATS_PREFIX}:{job}")
+        for job in (JOB_ARCHIVE_CONVERSATIONS, JOB_DELETE_EXPIRED_NOTIFICATIONS)
+    }
+
+
+# ---------- Задачі ----------
+
+def archive_conversations(db: Session, older_than_days: int = ARCHIVE_AFTER_DAYS, **options) -> JobStats:
+    """Архівувати розмови без нових повідомлень довше older_than_days днів."""
+    from modules.communications.models import Conversation
+
+    threshold = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+
+    def step(db: Session, batch_size: int) -> int:
+        batch = (
+            select(Conversation.id)
+            .where(
+                Conversation.is_archived == False,  # noqa: E712
+                Conversation.last_message_at.isnot(None),
+                Conversation.last_message_at < threshold,
+            )
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        return db.execute(
+            update(Conversation)
+            .where(Conversation.id.in_(batch))
+            .values(is_archived=True)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+
+    return run_batches(db, JOB_ARCHIVE_CONVERSATIONS, step, **options)
+
+
+def delete_expired_notifications(db: Session, **options) -> JobStats:
+    """Видалити нотифікації з минулим expires_at і поправити лічильники непрочитаних."""
+    from modules.notifications import unread_counter
+    from modules.notifications.models import Notification
+
+    now = datetime.now(timezone.utc)
+
+    def step(db: Session, batch_size: int) -> int:
+        batch = (
+            select(Notification.id)
+            .where(Notification.expires_at < now)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        deleted = db.execute(
+            delete(Notification)
+            .where(Notification.id.in_(batch))
+            .returning(Notification.user_id, Notification.is_read)
+            .execution_options(synchronize_session=False)
+        ).all()
+        deltas: Dict = {}
+        for user_id, is_read in deleted:
+            if not is_read:
+                deltas[user_id] = deltas.get(user_id, 0) - 1
+        # Лічильник коригується до commit: у гіршому разі він тимчасово
+        # менший, а TTL лічильника обмежує розбіжність
+        unread_counter.increment(deltas)
+        return len(deleted)
+
+    return run_batches(db, JOB_DELETE_EXPIRED_NOTIFICATIONS, step, **options)
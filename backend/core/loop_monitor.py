@@ -0,0 +1,213 @@
+"""
+Монітор event loop: лаг і блокуючі виклики в async коді.
+
+Heartbeat корутина прокидається кожні LOOP_MONITOR_INTERVAL_MS і пише
+запізнення в event_loop_lag_seconds. Watchdog потік стежить за heartbeat:
+якщо loop не відповідає довше LOOP_BLOCK_THRESHOLD_MS, він знімає стек
+потоку loop (sys._current_frames) і поточну задачу, поки блокування триває.
+Після відновлення подія приписується:
+- маршруту - LoopMonitorMiddleware зберігає scope задачі запиту; фонові
+  задачі підписуються іменем корутини;
+- місцю в коді - найглибший кадр застосунку (backend/, без site-packages),
+  тобто рядок, з якого викликано sync Session, SDK, файловий I/O тощо.
+
+Експорт: event_loop_blocked_seconds_total / event_loop_blocks_total
+{route, site} (рейтинг - topk по rate), warning зі стеком (одне місце -
+не частіше ніж раз на LOOP_MONITOR_REPORT_INTERVAL_S) і періодичний лог
+топ місць за сумарним часом блокування.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from contextlib import suppress
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from core import metrics
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+STACK_LIMIT = 40
+MAX_SAMPLES = 50  # стеків на одне блокування
+TOP_N = 10
+
+# Задача запиту -> ASGI scope (route з'являється в scope після роутингу)
+_task_scopes: Dict[asyncio.Task, dict] = {}
+
+
+@dataclass
+class _Blocker:
+    """Агрегат блокувань одного (маршрут, місце) за інтервал звіту"""
+    count: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+
+
+def _route_of(task: Optional[asyncio.Task]) -> str:
+    if task is None:
+        return "callback"
+    scope = _task_scopes.get(task)
+    if scope is not None:
+        path = getattr(scope.get("route"), "path", None) or "unmatched"
+        return f"{scope.get('method', 'WS')} {path}"
+    return f"task {getattr(task.get_coro(), '__qualname__', 'unknown')}"
+
+
+def _site_of(stack: traceback.StackSummary) -> str:
+    """Найглибший кадр коду застосунку: 'шлях/до/файлу.py:функція'"""
+    for frame in reversed(stack):
+        if "site-packages" in frame.filename or frame.filename == __file__:
+            continue
+        try:
+            path = Path(frame.filename).resolve().relative_to(BACKEND_DIR)
+        except ValueError:
+            continue
+        return f"{path.as_posix()}:{frame.name}"
+    return "external"
+
+
+class LoopMonitor:
+    def __init__(self, interval_ms: float, threshold_ms: float, report_interval_s: float):
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.report_interval = report_interval_s
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_id: Optional[int] = None
+        self._beat = 0.0
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._blockers: Dict[Tuple[str, str], _Blocker] = {}
+        self._logged_at: Dict[str, float] = {}
+
+    def start(self) -> None:
+        """Запустити в потоці event loop (lifespan / main() лістенера)"""
+        if not settings.LOOP_MONITOR or self._heartbeat_task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat_task = self._loop.create_task(self._heartbeat(), name="loop-monitor-heartbeat")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+        logger.info(
+            f"Event loop monitor started (interval {self.interval * 1000:.0f} ms, "
+            f"threshold {self.threshold * 1000:.0f} ms)"
+        )
+
+    async def stop(self) -> None:
+        if self._heartbeat_task is None:
+            return
+        self._stop.set()
+        self._heartbeat_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._heartbeat_task
+        self._watchdog.join(timeout=1)
+        self._heartbeat_task = self._watchdog = None
+        self._log_top()
+
+    async def _heartbeat(self) -> None:
+        last_report = time.monotonic()
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            metrics.EVENT_LOOP_LAG.observe(max(now - expected, 0.0))
+            self._beat = now
+            if now - last_report >= self.report_interval:
+                last_report = now
+                self._log_top()
+
+    def _watch(self) -> None:
+        """Потік watchdog: стеки loop, поки heartbeat не оновлюється"""
+        poll = min(self.threshold / 4, 0.025)
+        samples: List[Tuple[str, traceback.StackSummary]] = []
+        blocked_beat = 0.0
+        while not self._stop.wait(poll):
+            beat = self._beat
+            if time.monotonic() - beat - self.interval >= self.threshold:
+                blocked_beat = beat
+                if len(samples) < MAX_SAMPLES:
+                    sample = self._sample()
+                    if sample is not None:
+                        samples.append(sample)
+            elif samples and beat != blocked_beat:
+                # Перший heartbeat після блокування: запізнення - тривалість (оцінка знизу, до інтервалу)
+                self._record(samples, max(beat - blocked_beat - self.interval, self.threshold))
+                samples = []
+
+    def _sample(self) -> Optional[Tuple[str, traceback.StackSummary]]:
+        frame = sys._current_frames().get(self._thread_id)
+        if frame is None:
+            return None
+        # current_task(loop) з іншого потоку - лише читання словника задач
+        task = asyncio.current_task(self._loop)
+        return _route_of(task), traceback.extract_stack(frame, limit=STACK_LIMIT)
+
+    def _record(self, samples: List[Tuple[str, traceback.StackSummary]], duration: float) -> None:
+        keyed = [(route, _site_of(stack), stack) for route, stack in samples]
+        (route, site), _ = Counter((route, site) for route, site, _ in keyed).most_common(1)[0]
+        stack = next(stack for r, s, stack in keyed if (r, s) == (route, site))
+
+        metrics.EVENT_LOOP_BLOCKED_SECONDS.labels(route, site).inc(duration)
+        metrics.EVENT_LOOP_BLOCKS.labels(route, site).inc()
+        with self._lock:
+            blocker = self._blockers.setdefault((route, site), _Blocker())
+            blocker.count += 1
+            blocker.total_s += duration
+            blocker.max_s = max(blocker.max_s, duration)
+
+        now = time.monotonic()
+        if now - self._logged_at.get(site, -self.report_interval) >= self.report_interval:
+            self._logged_at[site] = now
+            logger.warning(
+                f"Event loop blocked {duration * 1000:.0f} ms in {route} at {site}\n"
+                + "".join(stack.format())
+            )
+
+    def _log_top(self) -> None:
+        with self._lock:
+            top = sorted(self._blockers.items(), key=lambda item: item[1].total_s, reverse=True)[:TOP_N]
+            self._blockers.clear()
+        if not top:
+            return
+        lines = [
+            f"  {blocker.total_s * 1000:.0f} ms total, {blocker.count}x, max {blocker.max_s * 1000:.0f} ms - {route} at {site}"
+            for (route, site), blocker in top
+        ]
+        logger.warning("Top event loop blockers:\n" + "\n".join(lines))
+
+
+class LoopMonitorMiddleware:
+    """ASGI middleware: scope запиту для атрибуції блокувань маршруту"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket") or not settings.LOOP_MONITOR:
+            await self.app(scope, receive, send)
+            return
+
+        task = asyncio.current_task()
+        _task_scopes[task] = scope
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _task_scopes.pop(task, None)
+
+
+loop_monitor = LoopMonitor(
+    settings.LOOP_MONITOR_INTERVAL_MS,
+    settings.LOOP_BLOCK_THRESHOLD_MS,
+    settings.LOOP_MONITOR_REPORT_INTERVAL_S,
+)
@@ -0,0 +1,243 @@
+"""
+Prometheus метрики API, лістенерів і Celery воркерів.
+
+API віддає GET /metrics (main.py). Окремі процеси - telegram_listener.py,
+email_imap_listener.py, Matrix listener (standalone) і Celery worker -
+піднімають sidecar HTTP сервер start_sidecar(port) на METRICS_PORT.
+
+Celery worker працює в prefork режимі: задачі виконуються в дочірніх
+процесах, тому метрики задач пишуться в PROMETHEUS_MULTIPROC_DIR і
+збираються sidecar-ом головного процесу (MultiProcessCollector).
+
+Локально (тести) метрики знімаються без зовнішніх сервісів: render()
+повертає текст у форматі Prometheus з поточного реєстру.
+"""
+import functools
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+LAG_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900)
+TASK_BUCKETS = (0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 150, 300)
+
+# --- API ---
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Латентність HTTP запитів по маршруту",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+WEBSOCKET_CONNECTIONS = Gauge(
+    "websocket_connections",
+    "Активні WebSocket з'єднання процесу",
+    ["channel"],
+    multiprocess_mode="livesum",
+)
+
+# --- Event loop (core/loop_monitor.py) ---
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Запізнення heartbeat event loop відносно запланованого часу",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+EVENT_LOOP_BLOCKED_SECONDS = Counter(
+    "event_loop_blocked_seconds",
+    "Сумарний час блокування event loop по маршруту і місцю в коді",
+    ["route", "site"],
+)
+EVENT_LOOP_BLOCKS = Counter(
+    "event_loop_blocks",
+    "Кількість блокувань event loop довше порогу по маршруту і місцю в коді",
+    ["route", "site"],
+)
+
+# --- Inbound ingestion ---
+INBOUND_QUEUE_DEPTH = Gauge(
+    "inbound_pipeline_queue_depth",
+    "Вхідні повідомлення в черзі InboundPipeline (ще не записані в БД)",
+    multiprocess_mode="livesum",
+)
+INGESTION_LAG = Histogram(
+    "ingestion_lag_seconds",
+    "Затримка вхідного повідомлення від часу платформи до етапу (db_commit, ws_push)",
+    ["platform", "stage"],
+    buckets=LAG_BUCKETS,
+)
+
+# --- Outbound ---
+OUTBOUND_SEND_DURATION = Histogram(
+    "outbound_send_duration_seconds",
+    "Латентність відправки повідомлення на платформу",
+    ["platform"],
+    buckets=LATENCY_BUCKETS,
+)
+OUTBOUND_SEND_FAILURES = Counter(
+    "outbound_send_failures_total",
+    "Невдалі відправки повідомлень по платформі",
+    ["platform"],
+)
+
+# --- Celery ---
+CELERY_TASK_DURATION = Histogram(
+    "celery_task_duration_seconds",
+    "Час виконання Celery задач",
+    ["task", "state"],
+    buckets=TASK_BUCKETS,
+)
+
+
+class DBPoolCollector:
+    """Стан пулів з'єднань SQLAlchemy на момент scrape."""
+
+    def __init__(self):
+        self._engines: Dict[str, object] = {}
+
+    def add(self, name: str, engine) -> None:
+        self._engines[name] = getattr(engine, "sync_engine", engine)
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        family = GaugeMetricFamily(
+            "db_pool_connections",
+            "З'єднання пулу SQLAlchemy за станом",
+            labels=["engine", "state"],
+        )
+        for name, engine in self._engines.items():
+            pool = engine.pool
+            for state, method in (("size", "size"), ("checked_out", "checkedout"),
+                                  ("checked_in", "checkedin"), ("overflow", "overflow")):
+                if hasattr(pool, method):
+                    family.add_metric([name, state], getattr(pool, method)())
+        yield family
+
+
+class CeleryQueueCollector:
+    """Довжина черг Celery в Redis брокері (LLEN на scrape)."""
+
+    def __init__(self, queue_names: Iterable[str]):
+        self.queue_names = list(queue_names)
+
+    def collect(self) -> Iterable[GaugeMetricFamily]:
+        from core.redis_client import get_redis
+
+        family = GaugeMetricFamily("celery_queue_depth", "Задачі в черзі брокера", labels=["queue"])
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            for name in self.queue_names:
+                pipe.llen(name)
+            for name, depth in zip(self.queue_names, pipe.execute()):
+                family.add_metric([name], depth)
+        except Exception as e:
+            logger.warning(f"Celery queue depth unavailable: {e}")
+        yield family
+
+
+db_pools = DBPoolCollector()
+REGISTRY.register(db_pools)
+
+
+def register_websocket_manager(channel: str, manager) -> None:
+    """Gauge з'єднань читає manager.active_connections на scrape."""
+    WEBSOCKET_CONNECTIONS.labels(channel).set_function(lambda: len(manager.active_connections))
+
+
+def observe_ingestion(platform: str, stage: str, since: Optional[datetime]) -> None:
+    """Затримка від часу платформи (since) до поточного етапу."""
+    if since is None:
+        return
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    lag = (datetime.now(timezone.utc) - since).total_seconds()
+    INGESTION_LAG.labels(platform, stage).observe(max(lag, 0.0))
+
+
+def observe_send(send: Callable) -> Callable:
+    """
+    Декоратор MessengerService.send_message: латентність і невдачі по платформі.
+    Невдача - виняток або повідомлення зі статусом failed.
+    """
+    @functools.wraps(send)
+    async def wrapper(self, *args, **kwargs):
+        platform = getattr(self.platform, "value", str(self.platform))
+        started = time.perf_counter()
+        try:
+            message = await send(self, *args, **kwargs)
+        except Exception:
+            OUTBOUND_SEND_FAILURES.labels(platform).inc()
+            raise
+        finally:
+            OUTBOUND_SEND_DURATION.labels(platform).observe(time.perf_counter() - started)
+        if getattr(getattr(message, "status", None), "value", getattr(message, "status", None)) == "failed":
+            OUTBOUND_SEND_FAILURES.labels(platform).inc()
+        return message
+
+    return wrapper
+
+
+def render(registry: CollectorRegistry = REGISTRY) -> Tuple[bytes, str]:
+    """Поточні метрики у текстовому форматі Prometheus."""
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def multiprocess_registry(*collectors) -> CollectorRegistry:
+    """Реєстр, що агрегує метрики дочірніх процесів з PROMETHEUS_MULTIPROC_DIR."""
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    for collector in collectors:
+        registry.register(collector)
+    return registry
+
+
+def start_sidecar(port: Optional[int] = None, registry: CollectorRegistry = REGISTRY) -> None:
+    """Підняти /metrics HTTP сервер процесу (лістенери, воркери)."""
+    port = port or int(os.getenv("METRICS_PORT", "0"))
+    if not port:
+        return
+    start_http_server(port, registry=registry)
+    logger.info(f"Metrics sidecar listening on :{port}")
+
+
+class MetricsMiddleware:
+    """ASGI middleware: латентність HTTP запиту по шаблону маршруту."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", None)
+            if route is not None:  # невідомі шляхи (404) не створюють нових labels
+                HTTP_REQUEST_DURATION.labels(scope["method"], route, str(status["code"])).observe(
+                    time.perf_counter() - started
+                )
@@ -0,0 +1,117 @@
+"""
+Keyset (cursor) pagination - спільні утиліти для list endpoints.
+
+Курсор - це base64url JSON зі значеннями ключа сортування останнього рядка
+сторінки (наприклад, [payment_date, id]). Наступна сторінка вибирається
+умовою (sort_col, id) < (:sort_value, :id), що працює по індексу і не
+сповільнюється на глибоких сторінках, на відміну від OFFSET.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, List, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, tuple_
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    return value
+
+
+def _from_json(value: Any, column) -> Any:
+    """Привести значення з курсора до Python-типу колонки."""
+    if value is None:
+        return None
+    try:
+        python_type = column.expression.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type in (Decimal, UUID, int, float):
+        return python_type(value)
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """Закодувати значення ключа сортування в непрозорий курсор."""
+    raw = json.dumps([_to_json(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence, extra: int = 0) -> List[Any]:
+    """
+    Розкодувати курсор для заданих колонок.
+
+    extra - кількість додаткових службових значень після ключа сортування
+    (наприклад, порядковий номер останнього рядка); вони повертаються як є.
+
+    Raises:
+        HTTPException 400: якщо курсор пошкоджений або не відповідає сортуванню
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if not isinstance(values, list) or len(values) != len(columns) + extra:
+            raise ValueError("cursor shape mismatch")
+        keys = [_from_json(value, column) for value, column in zip(values, columns)]
+        return keys + values[len(columns):]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_condition(columns: Sequence, values: Sequence, descending: bool = True):
+    """
+    Умова "рядки після курсора" для ORDER BY columns (усі в одному напрямку).
+
+    Для NOT NULL колонок використовується row-value порівняння, яке Postgres
+    обслуговує композитним індексом. Якщо перше значення курсора NULL
+    (nullable колонка сортування, NULLS LAST) - продовжуємо серед NULL рядків.
+    """
+    first, *rest = columns
+    if values[0] is None:
+        tail = tuple_(*rest) < tuple_(*values[1:]) if descending else tuple_(*rest) > tuple_(*values[1:])
+        return and_(first.is_(None), tail)
+    if descending:
+        condition = tuple_(*columns) < tuple_(*values)
+    else:
+        condition = tuple_(*columns) > tuple_(*values)
+    if getattr(first.expression, "nullable", False):
+        condition = or_(condition, first.is_(None))
+    return condition
+
+
+def order_by_keyset(columns: Sequence, descending: bool = True) -> list:
+    """
+    ORDER BY для keyset пагінації, NULL значення - в кінці.
+
+    Порядок має збігатися з індексом, інакше Postgres сортує всі рядки
+    замість читання індексу. NOT NULL колонки - простий DESC (зворотне
+    сканування індексу (col, id)); nullable колонки - DESC NULLS LAST, під
+    них індекс (col DESC NULLS LAST, id DESC). ASC у Postgres і так NULLS LAST.
+    """
+    if not descending:
+        return [column.asc() for column in columns]
+    return [
+        column.desc().nulls_last() if getattr(column.expression, "nullable", False) else column.desc()
+        for column in columns
+    ]
+
+
+def page_cursor(rows: Sequence, limit: int, key) -> Optional[str]:
+    """
+    Курсор наступної сторінки. Запит має вибирати limit + 1 рядків:
+    якщо "зайвий" рядок є - сторінка не остання.
+    """
+    if len(rows) <= limit:
+        return None
+    return encode_cursor(*key(rows[limit - 1]))
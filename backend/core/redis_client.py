@@ -0,0 +1,35 @@
+"""
+Redis client - спільне з'єднання з Redis для кешів та координації між процесами.
+
+Клієнт створюється ліниво і окремо в кожному процесі (після fork у Celery
+prefork воркерах сокети батьківського процесу не використовуються).
+"""
+import os
+import threading
+from typing import Optional
+
+import redis
+
+from core.config import settings
+
+_lock = threading.Lock()
+_client: Optional[redis.Redis] = None
+_client_pid: Optional[int] = None
+
+
+def get_redis() -> redis.Redis:
+    """Redis клієнт поточного процесу (decode_responses=True - значення як str)."""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _lock:
+            if _client is None or _client_pid != pid:
+                _client = redis.Redis.from_url(
+                    settings.REDIS_URL,
+                    decode_responses=True,
+                    socket_connect_timeout=2,
+                    socket_timeout=5,
+                    health_check_interval=30,
+                )
+                _client_pid = pid
+    return _client
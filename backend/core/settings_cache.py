@@ -0,0 +1,233 @@
+"""
+Settings cache - налаштування інтеграцій у пам'яті процесу.
+
+Знімок містить усі рядки app_settings (key/value) та singleton таблиці
+налаштувань (AI, платежі, InPost). Він завантажується один раз і далі
+читається без запитів до БД.
+
+Інвалідація:
+- після commit сесії, що змінила app_settings або singleton таблицю,
+  процес-автор одразу позначає свій знімок застарілим, збільшує версію
+  в Redis (settings:version) і публікує її в канал settings:invalidate;
+- кожен процес (API воркери, Celery, listeners) слухає канал у фоновому
+  потоці і при повідомленні перезавантажує знімок на наступному читанні;
+- SETTINGS_MAX_AGE_SECONDS - страховка, якщо повідомлення втрачено
+  (Redis недоступний або перезапускався).
+
+Singleton рядки віддаються як SimpleNamespace копії колонок - тільки для
+читання. Для змін потрібно завантажити ORM рядок у своїй сесії.
+
+Похідні кеші (напр. календар автобота) порівнюють settings_generation()
+зі збереженим значенням і перебудовуються після тієї ж інвалідації.
+"""
+import copy
+import importlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from itertools import chain
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_VERSION_KEY = "settings:version"
+SETTINGS_CHANNEL = "settings:invalidate"
+
+# Максимальний вік знімка, навіть якщо інвалідацій не було
+SETTINGS_MAX_AGE_SECONDS = 300
+
+# Singleton таблиці налаштувань: назва -> "модуль:Модель"
+SINGLETON_MODELS = {
+    "ai": "modules.ai_integration.models:AISettings",
+    "payment": "modules.payment.models:PaymentSettings",
+    "inpost": "modules.postal_services.models:InPostSettings",
+}
+
+# Зміни в цих таблицях інвалідують кеш (autobot_* - для календаря автобота)
+WATCHED_TABLES = {
+    "app_settings", "ai_settings", "payment_settings", "inpost_settings",
+    "autobot_settings", "autobot_holidays",
+}
+
+_SESSION_FLAG = "settings_cache_dirty"
+
+
+@dataclass(frozen=True)
+class SettingsSnapshot:
+    version: int
+    values: Dict[str, Optional[str]] = field(default_factory=dict)
+    singletons: Dict[str, Optional[SimpleNamespace]] = field(default_factory=dict)
+
+
+def row_snapshot(row) -> SimpleNamespace:
+    """Копія значень колонок ORM рядка (незалежна від сесії)."""
+    mapper = inspect(row).mapper
+    return SimpleNamespace(**{
+        attr.key: copy.deepcopy(getattr(row, attr.key)) for attr in mapper.column_attrs
+    })
+
+
+def _load_model(path: str):
+    module_name, class_name = path.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def _redis():
+    from core.redis_client import get_redis
+    return get_redis()
+
+
+class _SettingsCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[SettingsSnapshot] = None
+        self._loaded_at = 0.0
+        # Збільшується при кожній інвалідації; завантаження, що почалось
+        # до інвалідації, не вважається свіжим
+        self._generation = 0
+        self._loaded_generation = -1
+        self._listener_pid: Optional[int] = None
+
+    def get(self) -> SettingsSnapshot:
+        self._ensure_listener()
+        snapshot = self._snapshot
+        if (
+            snapshot is not None
+            and self._loaded_generation == self._generation
+            and time.monotonic() - self._loaded_at < SETTINGS_MAX_AGE_SECONDS
+        ):
+            return snapshot
+        with self._lock:
+            if (
+                self._snapshot is None
+                or self._loaded_generation != self._generation
+                or time.monotonic() - self._loaded_at >= SETTINGS_MAX_AGE_SECONDS
+            ):
+                generation = self._generation
+                self._snapshot = self._load()
+                self._loaded_at = time.monotonic()
+                self._loaded_generation = generation
+            return self._snapshot
+
+    def invalidate_local(self) -> None:
+        self._generation += 1
+
+    def _load(self) -> SettingsSnapshot:
+        from core.database import SessionLocal
+
+        version = 0
+        try:
+            version = int(_redis().get(SETTINGS_VERSION_KEY) or 0)
+        except Exception as e:
+            logger.warning(f"Settings cache: cannot read version from Redis: {e}")
+
+        db = SessionLocal()
+        try:
+            values = dict(db.execute(text("SELECT key, value FROM app_settings")).all())
+            singletons = {}
+            for name, path in SINGLETON_MODELS.items():
+                row = db.query(_load_model(path)).first()
+                singletons[name] = row_snapshot(row) if row is not None else None
+        finally:
+            db.close()
+        return SettingsSnapshot(version=version, values=values, singletons=singletons)
+
+    def _ensure_listener(self) -> None:
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+        with self._lock:
+            if self._listener_pid == pid:
+                return
+            self._listener_pid = pid
+            # Після fork знімок батьківського процесу міг застаріти
+            self._generation += 1
+            thread = threading.Thread(target=self._listen, name="settings-cache-listener", daemon=True)
+            thread.start()
+
+    def _listen(self) -> None:
+        import redis
+        from core.config import settings
+
+        while True:
+            try:
+                client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(SETTINGS_CHANNEL)
+                # Повідомлення могли пройти, поки не було підписки
+                self.invalidate_local()
+                for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.invalidate_local()
+            except Exception as e:
+                logger.warning(f"Settings cache listener disconnected: {e}")
+                time.sleep(5)
+
+
+_cache = _SettingsCache()
+
+
+def get_settings_snapshot() -> SettingsSnapshot:
+    """Поточний знімок налаштувань (без запитів до БД, якщо не інвалідований)."""
+    return _cache.get()
+
+
+def get_app_setting(key: str) -> Optional[str]:
+    return _cache.get().values.get(key)
+
+
+def get_app_settings(keys) -> Dict[str, Optional[str]]:
+    values = _cache.get().values
+    return {key: values.get(key) for key in keys}
+
+
+def get_singleton(name: str) -> Optional[SimpleNamespace]:
+    """Singleton налаштування (ai / payment / inpost) або None, якщо рядка немає."""
+    return _cache.get().singletons.get(name)
+
+
+def settings_generation() -> int:
+    """Лічильник інвалідацій у цьому процесі (для похідних кешів)."""
+    _cache._ensure_listener()
+    return _cache._generation
+
+
+def invalidate_settings() -> None:
+    """Інвалідувати кеш у цьому процесі та в усіх інших (через Redis)."""
+    _cache.invalidate_local()
+    try:
+        client = _redis()
+        version = client.incr(SETTINGS_VERSION_KEY)
+        client.publish(SETTINGS_CHANNEL, version)
+    except Exception as e:
+        # Інші процеси підхоплять зміни через SETTINGS_MAX_AGE_SECONDS
+        logger.warning(f"Settings cache: cannot publish invalidation: {e}")
+
+
+# ---------- Відстеження змін у сесіях ----------
+
+@event.listens_for(Session, "after_flush")
+def _collect_settings_changes(session, flush_context):
+    if session.info.get(_SESSION_FLAG):
+        return
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if getattr(obj, "__tablename__", None) in WATCHED_TABLES:
+            session.info[_SESSION_FLAG] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_settings_changes(session):
+    if session.info.pop(_SESSION_FLAG, False):
+        invalidate_settings()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_settings_changes(session):
+    session.info.pop(_SESSION_FLAG, None)
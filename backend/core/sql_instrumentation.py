@@ -0,0 +1,159 @@
+"""
+Інструментація SQL в межах запиту: кількість запитів, час у БД, повтори, повільні запити.
+
+install(engine) вішає події before/after_cursor_execute на engine (для async
+engine - на engine.sync_engine). SQLInstrumentationMiddleware відкриває
+QueryStats на кожен HTTP запит (ContextVar - видно і в threadpool sync
+endpoints), після обробки:
+- додає заголовок Server-Timing: db;dur=<мс>;desc="<N> queries";
+- логує повільні запити і statement-и, що повторились >= SQL_REPEAT_THRESHOLD
+  разів (типовий N+1: selectin ланцюжки, lookup на рядок, повторні count());
+- перевіряє бюджет запитів маршруту (QUERY_BUDGETS). У тестовому режимі
+  (APP_ENV=test або SQL_QUERY_BUDGET_STRICT=true) перевищення - помилка
+  QueryBudgetExceeded, тож тест endpoint-а падає в CI; інакше - warning.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Бюджет запитів на маршрут: (метод, шаблон шляху) -> максимум SQL statement-ів
+QUERY_BUDGETS: Dict[Tuple[str, str], int] = {
+    ("GET", "/api/v1/communications/inbox"): 12,
+    ("GET", "/api/v1/crm/orders"): 10,
+    ("GET", "/api/v1/kp"): 6,
+}
+
+_current: ContextVar[Optional["QueryStats"]] = ContextVar("sql_query_stats", default=None)
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN\s*\((?:\s*(?:\?|%\(\w+\)s|\$\d+|(?<!:):\w+)\s*,?)+\)", re.IGNORECASE)
+_PARAM_RE = re.compile(r"%\(\w+\)s|\$\d+|(?<![:\w]):\w+|\?")
+_SPACE_RE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Endpoint виконав більше SQL запитів, ніж дозволяє бюджет маршруту."""
+
+
+@dataclass
+class QueryStats:
+    """Статистика SQL одного запиту"""
+    count: int = 0
+    total_ms: float = 0.0
+    fingerprints: Counter = field(default_factory=Counter)
+    slow: List[Tuple[float, str]] = field(default_factory=list)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        return [(fp, n) for fp, n in self.fingerprints.most_common() if n >= threshold]
+
+
+def fingerprint(statement: str) -> str:
+    """Нормалізований statement: без літералів, параметрів і довжини IN списків."""
+    text = _IN_LIST_RE.sub("IN (?)", statement)
+    text = _LITERAL_RE.sub("?", text)
+    text = _PARAM_RE.sub("?", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("sql_instrumentation_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    starts = conn.info.get("sql_instrumentation_start")
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+    stats.count += 1
+    stats.total_ms += elapsed_ms
+    stats.fingerprints[fingerprint(statement)] += 1
+    if elapsed_ms >= settings.SQL_SLOW_QUERY_MS:
+        stats.slow.append((elapsed_ms, statement))
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get("sql_instrumentation_start") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def install(engine) -> None:
+    """Підключити інструментацію до engine (sync або async)."""
+    if not settings.SQL_INSTRUMENTATION:
+        return
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+def _route_key(scope) -> Tuple[str, str]:
+    route = scope.get("route")
+    return scope.get("method", ""), getattr(route, "path", None) or scope.get("path", "")
+
+
+def report(scope, stats: QueryStats) -> None:
+    """Лог повторів/повільних запитів і перевірка бюджету маршруту."""
+    method, path = _route_key(scope)
+    for elapsed_ms, statement in stats.slow:
+        logger.warning(f"Slow SQL ({elapsed_ms:.1f} ms) in {method} {path}: {_SPACE_RE.sub(' ', statement)[:500]}")
+    for statement, n in stats.repeated(settings.SQL_REPEAT_THRESHOLD):
+        logger.warning(f"Repeated SQL x{n} in {method} {path} (possible N+1): {statement[:500]}")
+
+    budget = QUERY_BUDGETS.get((method, path))
+    if budget is not None and stats.count > budget:
+        message = f"{method} {path} executed {stats.count} SQL queries (budget {budget})"
+        if settings.SQL_QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class SQLInstrumentationMiddleware:
+    """ASGI middleware: QueryStats на HTTP запит + Server-Timing заголовок."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.SQL_INSTRUMENTATION:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                report(scope, stats)
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={stats.total_ms:.1f};desc="{stats.count} queries"'.encode(),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
@@ -1,9 +1,12 @@
 from sqlalchemy.orm import Session, selectinload
 import re
-from datetime import datetime
+from datetime import datetime, timedelta
+from decimal import Decimal
 
 import models as models
 import schema as schemas
+from catalog_service import bump_catalog_version
+from core.settings_cache import get_app_setting, get_app_settings
 
 
 def parse_weight_to_float(weight_str: str | float | None) -> float:
@@ -35,17 +38,25 @@ def parse_weight_to_float(weight_str: str | float | None) -> float:
     
     return 0.0
 
+def _item_query(db: Session):
+    # Підкатегорія з категорією потрібні в schema.Item - вантажимо разом, без N+1
+    return db.query(models.Item).options(
+        selectinload(models.Item.subcategory).selectinload(models.Subcategory.category)
+    )
+
+
 def get_items(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Item).offset(skip).limit(limit).all()
+    return _item_query(db).order_by(models.Item.id).offset(skip).limit(limit).all()
 
 
 def get_item(db: Session, item_id: int):
-    return db.query(models.Item).filter(models.Item.id == item_id).first()
+    return _item_query(db).filter(models.Item.id == item_id).first()
 
 
 def create_item(db: Session, item: schemas.ItemUpdate):
     db_item = models.Item(**item.dict())
     db.add(db_item)
+    bump_catalog_version(db)
     db.commit()
     db.refresh(db_item)
     return db_item
@@ -66,6 +77,7 @@ def update_item(db: Session, item_id: int, item_data: schemas.ItemUpdate):
         setattr(db_item, key, value)
         print(f"[CRUD] Updated {key}: {old_value} -> {value}")
 
+    bump_catalog_version(db)
     db.commit()
     db.refresh(db_item)
     
@@ -87,6 +99,7 @@ def delete_item(db: Session, item_id: int):
     # (це не блокує видалення, але можна додати перевірку якщо потрібно)
 
     db.delete(db_item)
+    bump_catalog_version(db)
     db.commit()
     return True
 
@@ -95,6 +108,7 @@ def delete_item(db: Session, item_id: int):
 def create_category(db: Session, name: str):
     db_category = models.Category(name=name)
     db.add(db_category)
+    bump_catalog_version(db)
     db.commit()
     db.refresh(db_category)
     return db_category
@@ -107,6 +121,7 @@ def delete_category(db: Session, category_id: int):
     if not category:
         return False
     db.delete(category)
+    bump_catalog_version(db)
     db.commit()
     return True
 
@@ -115,6 +130,7 @@ def delete_category(db: Session, category_id: int):
 def create_subcategory(db: Session, name: str, category_id: int):
     db_subcategory = models.Subcategory(name=name, category_id=category_id)
     db.add(db_subcategory)
+    bump_catalog_version(db)
     db.commit()
     db.refresh(db_subcategory)
     return db_subcategory
@@ -133,6 +149,7 @@ def delete_subcategory(db: Session, subcategory_id: int):
     if not subcategory:
         return False
     db.delete(subcategory)
+    bump_catalog_version(db)
     db.commit()
     return True
 
@@ -144,6 +161,7 @@ def delete_categories(db: Session, category_ids: list[int]):
         return False
     for category in categories:
         db.delete(category)
+    bump_catalog_version(db)
     db.commit()
     return True
 
@@ -155,11 +173,79 @@ def delete_subcategories(db: Session, subcategory_ids: list[int]):
         return False
     for subcategory in subcategories:
         db.delete(subcategory)
+    bump_catalog_version(db)
     db.commit()
     return True
 
 
 # KP CRUD
+KP_STATS_TOP = 10
+
+
+def get_kp_stats(db: Session) -> dict:
+    """
+    Агрегати КП для дашборда, пораховані в SQL по всіх КП (а не по завантаженій
+    сторінці): кількість і сума по статусах, топ клієнтів, КП по менеджерах,
+    топ товарів за виручкою (кількість * ціна товару; позиція без кількості = 1).
+    """
+    from sqlalchemy import func, select
+
+    revenue = func.coalesce(func.sum(models.KP.total_price), 0)
+    by_status = db.execute(
+        select(models.KP.status, func.count(models.KP.id), revenue).group_by(models.KP.status)
+    ).all()
+
+    top_clients = db.execute(
+        select(
+            models.KP.client_id,
+            func.max(models.KP.client_name),
+            revenue.label("total"),
+            func.count(models.KP.id),
+        )
+        .where(models.KP.client_id.isnot(None))
+        .group_by(models.KP.client_id)
+        .order_by(revenue.desc())
+        .limit(KP_STATS_TOP)
+    ).all()
+
+    managers = db.execute(
+        select(models.KP.created_by_id, func.count(models.KP.id), revenue)
+        .where(models.KP.created_by_id.isnot(None))
+        .group_by(models.KP.created_by_id)
+    ).all()
+
+    quantity = func.coalesce(models.KPItem.quantity, 1)
+    item_revenue = func.sum(quantity * func.coalesce(models.Item.price, 0))
+    top_items = db.execute(
+        select(models.KPItem.item_id, func.sum(quantity), item_revenue)
+        .join(models.Item, models.Item.id == models.KPItem.item_id)
+        .group_by(models.KPItem.item_id)
+        .order_by(item_revenue.desc())
+        .limit(KP_STATS_TOP)
+    ).all()
+
+    return {
+        "total": sum(count for _, count, _ in by_status),
+        "total_revenue": float(sum(total for _, _, total in by_status)),
+        "by_status": [
+            {"status": status, "count": count, "revenue": float(total)}
+            for status, count, total in by_status
+        ],
+        "top_clients": [
+            {"client_id": client_id, "client_name": name, "revenue": float(total), "kp_count": count}
+            for client_id, name, total, count in top_clients
+        ],
+        "managers": [
+            {"manager_id": manager_id, "kp_count": count, "revenue": float(total)}
+            for manager_id, count, total in managers
+        ],
+        "top_items": [
+            {"item_id": item_id, "quantity": int(qty or 0), "revenue": float(total or 0)}
+            for item_id, qty, total in top_items
+        ],
+    }
+
+
 def delete_kp(db: Session, kp_id: int):
     db_item = get_kp(db, kp_id)
     if not db_item:
@@ -639,18 +725,113 @@ def update_kp(db: Session, kp_id: int, kp_in: schemas.KPCreate):
     return updated_kp
 
 
-def get_all_kps(db: Session):
-    # Повертаємо КП разом з позиціями та менеджером, щоб фронтенд міг показувати деталізацію
-    return (
-        db.query(models.KP)
-        .options(
-            selectinload(models.KP.items).selectinload(models.KPItem.item),
-            selectinload(models.KP.event_formats),
-            selectinload(models.KP.created_by),
+# Колонки KP, що повертаються у списку (KPSummary)
+KP_SUMMARY_COLUMNS = (
+    "id", "title", "status", "created_at", "created_by_id",
+    "client_id", "client_name", "client_email", "client_phone",
+    "event_format", "event_group", "event_date", "event_time", "event_location",
+    "people_count", "template_id", "total_price", "price_per_person",
+    "menu_total", "equipment_total", "service_total", "transport_total",
+    "total_amount", "final_amount", "discount_amount", "cashback_amount",
+)
+
+
+def get_kps_page(
+    db: Session,
+    status: list[str] | None = None,
+    client_id: int | None = None,
+    client: str | None = None,
+    manager_id: int | None = None,
+    date_from=None,
+    date_to=None,
+    limit: int = 50,
+    cursor: str | None = None,
+    include_items: bool = False,
+) -> dict:
+    """
+    Сторінка списку КП: проекція колонок + агрегати по позиціях у SQL,
+    keyset пагінація по (created_at, id). Позиції (Item/KPItem ORM) не вантажаться;
+    include_items додає компактний [{item_id, quantity, event_format_id}] через json_agg.
+
+    date_from / date_to фільтрують по даті заходу (event_date).
+    """
+    from sqlalchemy import func, literal_column, select
+    from core.pagination import decode_cursor, keyset_condition, order_by_keyset, page_cursor
+
+    item_stats = (
+        select(
+            models.KPItem.kp_id.label("kp_id"),
+            func.count(models.KPItem.id).label("item_count"),
+            func.coalesce(func.sum(models.KPItem.quantity), 0).label("items_quantity"),
         )
-        .all()
+        .group_by(models.KPItem.kp_id)
+        .subquery()
+    )
+    format_count = (
+        select(func.count(models.KPEventFormat.id))
+        .where(models.KPEventFormat.kp_id == models.KP.id)
+        .scalar_subquery()
+    )
+    manager_name = _user_display_name()
+
+    columns = [getattr(models.KP, name).label(name) for name in KP_SUMMARY_COLUMNS]
+    columns += [
+        manager_name.label("manager_name"),
+        func.coalesce(item_stats.c.item_count, 0).label("item_count"),
+        func.coalesce(item_stats.c.items_quantity, 0).label("items_quantity"),
+        format_count.label("format_count"),
+    ]
+    if include_items:
+        item_json = func.json_build_object(
+            literal_column("'item_id'"), models.KPItem.item_id,
+            literal_column("'quantity'"), models.KPItem.quantity,
+            literal_column("'event_format_id'"), models.KPItem.event_format_id,
+        )
+        columns.append(
+            select(func.coalesce(func.json_agg(item_json), literal_column("'[]'::json")))
+            .where(models.KPItem.kp_id == models.KP.id)
+            .scalar_subquery()
+            .label("items")
+        )
+
+    query = (
+        db.query(*columns)
+        .select_from(models.KP)
+        .outerjoin(item_stats, item_stats.c.kp_id == models.KP.id)
+        .outerjoin(models.User, models.User.id == models.KP.created_by_id)
     )
 
+    if status:
+        query = query.filter(models.KP.status.in_(status))
+    if client_id:
+        query = query.filter(models.KP.client_id == client_id)
+    if client:
+        pattern = f"%{client}%"
+        query = query.filter(
+            (models.KP.client_name.ilike(pattern))
+            | (models.KP.client_email.ilike(pattern))
+            | (models.KP.client_phone.ilike(pattern))
+        )
+    if manager_id:
+        query = query.filter(models.KP.created_by_id == manager_id)
+    if date_from:
+        query = query.filter(models.KP.event_date >= date_from)
+    if date_to:
+        query = query.filter(models.KP.event_date < date_to + timedelta(days=1))
+
+    key_columns = [models.KP.created_at, models.KP.id]
+    if cursor:
+        query = query.filter(keyset_condition(key_columns, decode_cursor(cursor, key_columns)))
+
+    rows = query.order_by(*order_by_keyset(key_columns)).limit(limit + 1).all()
+    next_cursor = page_cursor(rows, limit, lambda row: (row.created_at, row.id))
+
+    return {
+        "items": [dict(row._mapping) for row in rows[:limit]],
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+    }
+
 
 def delete_kp(db: Session, kp_id: int):
     kp = get_kp(db, kp_id)
@@ -923,18 +1104,12 @@ def set_setting(db: Session, key: str, value: str | None):
 
 
 def get_setting(db: Session, key: str) -> str | None:
-    setting = db.query(models.AppSetting).filter(models.AppSetting.key == key).first()
-    return setting.value if setting else None
+    # З кешу налаштувань (core.settings_cache), інвалідується після set_setting в будь-якому процесі
+    return get_app_setting(key)
 
 
 def get_settings(db: Session, keys: list[str]) -> dict[str, str | None]:
-    rows = (
-        db.query(models.AppSetting)
-        .filter(models.AppSetting.key.in_(keys))
-        .all()
-    )
-    mapping = {row.key: row.value for row in rows}
-    return {k: mapping.get(k) for k in keys}
+    return get_app_settings(keys)
 
 
 # Password Reset Code CRUD
@@ -1225,8 +1400,31 @@ def get_client(db: Session, client_id: int):
     return db.query(models.Client).filter(models.Client.id == client_id).first()
 
 
+# Агрегат клієнта -> його legacy частина (loyalty_engine рахує legacy + earned)
+LEGACY_SPEND_FIELDS = {
+    "total_orders": "legacy_orders",
+    "lifetime_spent": "legacy_spent",
+    "current_year_spent": "legacy_year_spent",
+}
+
+
+def _apply_manual_spend(client: models.Client, data: dict) -> None:
+    """Ручна зміна агрегатів іде в legacy частину, щоб перерахунок її не стер."""
+    for field, legacy in LEGACY_SPEND_FIELDS.items():
+        if data.get(field) is None:
+            continue
+        delta = Decimal(str(data[field])) - Decimal(str(getattr(client, field) or 0))
+        value = max(Decimal(str(getattr(client, legacy) or 0)) + delta, Decimal("0"))
+        setattr(client, legacy, int(value) if field == "total_orders" else value)
+
+
 def create_client(db: Session, client_in: schemas.ClientCreate):
-    client = models.Client(**client_in.dict(exclude_unset=True))
+    data = client_in.dict(exclude_unset=True)
+    client = models.Client(**{key: value for key, value in data.items() if key not in LEGACY_SPEND_FIELDS})
+    _apply_manual_spend(client, data)
+    for field in LEGACY_SPEND_FIELDS:
+        if data.get(field) is not None:
+            setattr(client, field, data[field])
     db.add(client)
     db.commit()
     db.refresh(client)
@@ -1239,6 +1437,7 @@ def update_client(db: Session, client_id: int, client_in: schemas.ClientUpdate):
         return None
 
     update_data = client_in.dict(exclude_unset=True)
+    _apply_manual_spend(client, update_data)
     for key, value in update_data.items():
         setattr(client, key, value)
 
@@ -1251,7 +1450,6 @@ def upsert_client_from_kp(db: Session, kp: models.KP):
     """
     Автоматично створює або оновлює клієнта на основі даних КП.
     Пошук клієнта: спочатку по телефону, потім по email, потім по імені.
-    Оновлює накопичувальну статистику клієнта.
     """
     if not (kp.client_name or kp.client_phone or kp.client_email):
         return None
@@ -1266,9 +1464,7 @@ def upsert_client_from_kp(db: Session, kp: models.KP):
     if not client and kp.client_name:
         client = query.filter(models.Client.full_name == kp.client_name).first()
 
-    is_new_client = False
     if not client:
-        is_new_client = True
         client = models.Client(
             name=kp.client_name or kp.title,
             phone=kp.client_phone or "",
@@ -1281,17 +1477,195 @@ def upsert_client_from_kp(db: Session, kp: models.KP):
     if not kp.client_id:
         kp.client_id = client.id
 
-    # Оновлюємо накопичувальну статистику (тільки для нових КП)
-    # Це базова логіка - детальне оновлення робиться в loyalty_service
-    if is_new_client:
-        client.total_orders = 1
-        client.lifetime_spent = kp.total_price or 0
-    # Для існуючих клієнтів статистика оновлюється окремо при зміні статусу КП
+    # total_orders / lifetime_spent рахує тільки loyalty_engine.record_kp_earning
+    # при нарахуванні кешбеку за КП - тут статистика не змінюється
 
     db.commit()
     db.refresh(client)
     return client
 
+############################################################
+# Listings (clients / questionnaires / checklists)
+############################################################
+
+CLIENT_LIST_COLUMNS = (
+    "id", "company_name", "phone", "email", "total_orders",
+    "lifetime_spent", "current_year_spent", "cashback_balance",
+    "cashback_earned_total", "cashback_used_total", "cashback_expires_at",
+    "loyalty_tier", "cashback_rate", "is_custom_rate",
+    "yearly_photographer_used", "yearly_robot_used", "bonus_year",
+    "notes", "created_at", "updated_at",
+)
+
+
+def _user_display_name():
+    """Ім'я користувача в SQL: "first last", інакше email (як у списках КП)."""
+    from sqlalchemy import func
+
+    return func.coalesce(
+        func.nullif(func.concat_ws(" ", models.User.first_name, models.User.last_name), ""),
+        models.User.email,
+    )
+
+
+def _listing_page(query, model, limit: int, cursor: str | None = None, skip: int = 0) -> dict:
+    """
+    Спільна сторінка legacy списків: ORDER BY (created_at, id) DESC, limit + 1 рядків.
+
+    cursor - keyset пагінація (next_cursor попередньої сторінки);
+    skip залишено для старих клієнтів API і застосовується тільки без курсора.
+    """
+    from core.pagination import decode_cursor, keyset_condition, order_by_keyset, page_cursor
+
+    key_columns = [model.created_at, model.id]
+    if cursor:
+        query = query.filter(keyset_condition(key_columns, decode_cursor(cursor, key_columns)))
+    elif skip:
+        query = query.offset(skip)
+
+    rows = query.order_by(*order_by_keyset(key_columns)).limit(limit + 1).all()
+    next_cursor = page_cursor(rows, limit, lambda row: (row.created_at, row.id))
+    return {
+        "items": [dict(row._mapping) for row in rows[:limit]],
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+    }
+
+
+def get_clients_page(
+    db: Session,
+    search: str | None = None,
+    limit: int = 100,
+    cursor: str | None = None,
+    skip: int = 0,
+) -> dict:
+    """
+    Сторінка клієнтів з id останньої анкети (корельований підзапит по
+    client_questionnaires.client_id) - один запит на сторінку + count.
+    """
+    from sqlalchemy import or_, select
+
+    latest_questionnaire = (
+        select(models.ClientQuestionnaire.id)
+        .where(models.ClientQuestionnaire.client_id == models.Client.id)
+        .order_by(models.ClientQuestionnaire.created_at.desc(), models.ClientQuestionnaire.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    filters = []
+    if search:
+        pattern = f"%{search}%"
+        filters.append(
+            or_(
+                models.Client.name.ilike(pattern),
+                models.Client.company_name.ilike(pattern),
+                models.Client.phone.ilike(pattern),
+                models.Client.email.ilike(pattern),
+            )
+        )
+
+    total = db.query(models.Client.id).filter(*filters).count()
+    query = db.query(
+        models.Client.name.label("name"),
+        *(getattr(models.Client, name).label(name) for name in CLIENT_LIST_COLUMNS),
+        latest_questionnaire.label("questionnaire_id"),
+    ).filter(*filters)
+    page = _listing_page(query, models.Client, limit, cursor, skip)
+    return {
+        "total": total,
+        "clients": page["items"],
+        "next_cursor": page["next_cursor"],
+        "has_more": page["has_more"],
+    }
+
+
+def get_questionnaires_page(
+    db: Session,
+    manager_id: int | None = None,
+    limit: int = 100,
+    cursor: str | None = None,
+    skip: int = 0,
+) -> dict:
+    """Сторінка анкет з даними клієнта та менеджера через JOIN (без запитів на рядок)."""
+    questionnaire = models.ClientQuestionnaire
+    filters = [questionnaire.manager_id == manager_id] if manager_id else []
+
+    total = db.query(questionnaire.id).filter(*filters).count()
+    query = (
+        db.query(
+            *questionnaire.__table__.columns,
+            models.Client.name.label("client_name"),
+            models.Client.phone.label("client_phone"),
+            models.Client.company_name.label("client_company"),
+            _user_display_name().label("manager_name"),
+            models.User.email.label("manager_email"),
+        )
+        .select_from(questionnaire)
+        .outerjoin(models.Client, models.Client.id == questionnaire.client_id)
+        .outerjoin(models.User, models.User.id == questionnaire.manager_id)
+        .filter(*filters)
+    )
+    page = _listing_page(query, questionnaire, limit, cursor, skip)
+    return {
+        "questionnaires": page["items"],
+        "total": total,
+        "next_cursor": page["next_cursor"],
+        "has_more": page["has_more"],
+    }
+
+
+def get_checklists_page(
+    db: Session,
+    checklist_type: str | None = None,
+    status: str | None = None,
+    manager_id: int | None = None,
+    limit: int = 100,
+    cursor: str | None = None,
+    skip: int = 0,
+) -> dict:
+    """
+    Сторінка чеклістів з іменами клієнта/менеджера через JOIN;
+    total / box_count / catering_count - одним GROUP BY checklist_type.
+    """
+    from sqlalchemy import func
+
+    checklist = models.Checklist
+    filters = []
+    if checklist_type:
+        filters.append(checklist.checklist_type == checklist_type)
+    if status:
+        filters.append(checklist.status == status)
+    if manager_id:
+        filters.append(checklist.manager_id == manager_id)
+
+    counts = dict(
+        db.query(checklist.checklist_type, func.count(checklist.id))
+        .filter(*filters)
+        .group_by(checklist.checklist_type)
+        .all()
+    )
+
+    query = (
+        db.query(
+            *checklist.__table__.columns,
+            func.coalesce(models.Client.name, checklist.contact_name).label("client_name"),
+            _user_display_name().label("manager_name"),
+        )
+        .select_from(checklist)
+        .outerjoin(models.Client, models.Client.id == checklist.client_id)
+        .outerjoin(models.User, models.User.id == checklist.manager_id)
+        .filter(*filters)
+    )
+    page = _listing_page(query, checklist, limit, cursor, skip)
+    return {
+        "checklists": page["items"],
+        "total": sum(counts.values()),
+        "box_count": counts.get("box", 0),
+        "catering_count": counts.get("catering", 0),
+        "next_cursor": page["next_cursor"],
+        "has_more": page["has_more"],
+    }
+
 ############################################################
 # Benefits (discounts and cashback levels)
 ############################################################
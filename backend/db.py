@@ -78,3 +78,7 @@ else:
                     conn.execute(text("ALTER TABLE recipes ADD COLUMN notes TEXT"))
     except Exception as e:
         print(f"Warning: fallback DB auto-migration skipped/failed: {e}")
+
+# Лічильники SQL на запит (Server-Timing, бюджети запитів)
+from core import sql_instrumentation  # noqa: E402
+sql_instrumentation.install(engine)
@@ -456,3 +456,43 @@ def send_translation_request_email(
         print(f"Error sending translation request email: {e}")
         raise
 
+
+
+def _send_plain_email(to_email: str, subject: str, body_text: str) -> bool:
+    """Відправляє простий текстовий лист через SMTP з налаштувань."""
+    config = _load_smtp_config()
+    host = config["host"]
+    port = config["port"]
+    user = config["user"]
+    password = config["password"]
+
+    if not user or not password:
+        raise ValueError("SMTP credentials not configured. Please set SMTP settings in the system settings.")
+
+    if not host:
+        raise ValueError("SMTP host is empty. Please configure SMTP settings.")
+
+    msg = MIMEMultipart()
+    msg['From'] = f"{config['from_name']} <{config['from_email']}>"
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body_text, 'plain', 'utf-8'))
+
+    if port == 465:
+        server = smtplib.SMTP_SSL(host, port, timeout=30)
+    else:
+        server = smtplib.SMTP(host, port, timeout=30)
+        server.starttls()
+
+    server.login(user, password)
+    server.send_message(msg)
+    server.quit()
+    return True
+
+
+def send_translation_withdrawal_email(to_email: str, order_number: str, body_text: str) -> bool:
+    """
+    Повідомляє перекладача, що пропозицію перекладу відкликано
+    (broadcast: замовлення прийняв інший перекладач)
+    """
+    return _send_plain_email(to_email, f"Пропозицію відкликано - Замовлення {order_number}", body_text)
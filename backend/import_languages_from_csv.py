@@ -7,17 +7,21 @@ CSV format expected:
 - Column 2: name_en (English name, optional, e.g., "English")
 - Column 3: base_client_price (Base price in PLN, e.g., "200.00")
 
+Rows are loaded into a staging table with COPY and applied with set-based
+INSERT / UPDATE in one transaction (see modules/crm/language_import.py).
+Existing languages (matched by name_pl, case-insensitive) get price / name_en updated.
+
 Usage:
-    python import_languages_from_csv.py <path_to_csv_file>
+    python import_languages_from_csv.py <path_to_csv_file> [--dry-run] [--deactivate-missing]
     
 Example:
     python import_languages_from_csv.py languages.csv
+    python import_languages_from_csv.py languages.csv --dry-run
 """
+import argparse
 import os
 import sys
-import csv
 from pathlib import Path
-from decimal import Decimal
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent))
@@ -37,10 +41,9 @@ import modules.finance.models  # noqa: F401 - Transaction (залежить ві
 import modules.notifications.models  # noqa: F401 - Notification models
 
 from core.database import SessionLocal
-from modules.crm.crud_languages import create_language, get_languages
-from modules.crm.schemas import LanguageCreate
+from modules.crm.language_import import import_languages, read_languages_csv
 
-def import_languages_from_csv(csv_path: Path):
+def import_languages_from_csv(csv_path: Path, dry_run: bool = False, deactivate_missing: bool = False):
     """Import languages from CSV file"""
     print(f"📄 Reading CSV file: {csv_path}")
     
@@ -49,252 +52,44 @@ def import_languages_from_csv(csv_path: Path):
         return False
     
     db = SessionLocal()
-    created_count = 0
-    updated_count = 0
-    skipped_count = 0
-    errors = []
-    
     try:
-        # Get existing languages to check for duplicates
-        existing_languages = {lang.name_pl.lower(): lang for lang in get_languages(db, skip=0, limit=1000, active_only=False)}
-        
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            # Try to detect delimiter
-            sample = f.read(1024)
-            f.seek(0)
-            delimiter = ',' if sample.count(',') > sample.count(';') else ';'
-            
-            reader = csv.DictReader(f, delimiter=delimiter)
-            
-            # Check if we have the expected column names
-            if reader.fieldnames:
-                # Try to map column names to our expected format
-                field_map = {}
-                for field in reader.fieldnames:
-                    field_lower = field.lower().strip()
-                    if 'language' in field_lower or 'nazwa' in field_lower or 'name' in field_lower:
-                        field_map['name_pl'] = field
-                    elif 'price' in field_lower or 'cena' in field_lower or 'pln' in field_lower:
-                        field_map['price'] = field
-                    elif 'note' in field_lower or 'uwaga' in field_lower:
-                        field_map['notes'] = field
-                
-                # If we found the columns, use DictReader
-                if 'name_pl' in field_map or 'price' in field_map:
-                    for row_num, row in enumerate(reader, start=2):
-                        if not row or all(not str(v).strip() for v in row.values()):
-                            continue
-                        
-                        try:
-                            # Extract data using field mapping
-                            name_pl = row.get(field_map.get('name_pl', reader.fieldnames[0]), '').strip()
-                            price_str = row.get(field_map.get('price', reader.fieldnames[1] if len(reader.fieldnames) > 1 else ''), '0').strip()
-                            notes = row.get(field_map.get('notes', ''), '').strip() if field_map.get('notes') else ''
-                            
-                            if not name_pl:
-                                skipped_count += 1
-                                print(f"⚠️  Row {row_num}: Skipping - no language name")
-                                continue
-                            
-                            # Parse price
-                            try:
-                                price_str = price_str.replace('zł', '').replace('PLN', '').replace(' ', '').replace(',', '.')
-                                base_client_price = Decimal(price_str)
-                            except (ValueError, AttributeError):
-                                print(f"⚠️  Row {row_num}: Invalid price '{price_str}', using 0")
-                                base_client_price = Decimal('0')
-                            
-                            # Check if language already exists
-                            if name_pl.lower() in existing_languages:
-                                existing_lang = existing_languages[name_pl.lower()]
-                                print(f"ℹ️  Row {row_num}: Language '{name_pl}' already exists (ID: {existing_lang.id})")
-                                skipped_count += 1
-                                continue
-                            
-                            # Create language
-                            language_data = LanguageCreate(
-                                name_pl=name_pl,
-                                name_en=None,  # CSV doesn't have English name
-                                base_client_price=base_client_price
-                            )
-                            
-                            new_language = create_language(db, language_data)
-                            existing_languages[name_pl.lower()] = new_language
-                            created_count += 1
-                            print(f"✅ Row {row_num}: Created '{name_pl}' with price {base_client_price} zł" + (f" (Notes: {notes})" if notes else ""))
-                            
-                        except Exception as e:
-                            error_msg = f"Row {row_num}: {str(e)}"
-                            errors.append(error_msg)
-                            print(f"❌ {error_msg}")
-                    
-                    # Print summary and return
-                    print("\n" + "="*50)
-                    print("📊 Import Summary:")
-                    print(f"   ✅ Created: {created_count}")
-                    print(f"   ⏭️  Skipped: {skipped_count}")
-                    if errors:
-                        print(f"   ❌ Errors: {len(errors)}")
-                        for error in errors[:10]:
-                            print(f"      - {error}")
-                    print("="*50)
-                    db.close()
-                    return True
-            
-            # If DictReader doesn't work, try reading as list
-            if not reader.fieldnames:
-                f.seek(0)
-                reader = csv.reader(f, delimiter=delimiter)
-                # Read header
-                header = next(reader, None)
-                if not header:
-                    print("❌ CSV file is empty")
-                    return False
-                
-                # Try to detect column order
-                # Expected: name_pl, name_en (optional), base_client_price
-                name_pl_idx = 0
-                name_en_idx = 1 if len(header) > 1 else None
-                price_idx = 2 if len(header) > 2 else (1 if name_en_idx is None else 2)
-                
-                for row_num, row in enumerate(reader, start=2):
-                    if not row or all(not cell.strip() for cell in row):
-                        continue
-                    
-                    try:
-                        # Extract data
-                        name_pl = row[name_pl_idx].strip() if len(row) > name_pl_idx else ""
-                        name_en = row[name_en_idx].strip() if name_en_idx and len(row) > name_en_idx else ""
-                        price_str = row[price_idx].strip() if len(row) > price_idx else "0"
-                        
-                        if not name_pl:
-                            skipped_count += 1
-                            print(f"⚠️  Row {row_num}: Skipping - no name_pl")
-                            continue
-                        
-                        # Parse price
-                        try:
-                            # Remove currency symbols and spaces
-                            price_str = price_str.replace('zł', '').replace('PLN', '').replace(' ', '').replace(',', '.')
-                            base_client_price = Decimal(price_str)
-                        except (ValueError, AttributeError):
-                            print(f"⚠️  Row {row_num}: Invalid price '{price_str}', using 0")
-                            base_client_price = Decimal('0')
-                        
-                        # Check if language already exists
-                        if name_pl.lower() in existing_languages:
-                            existing_lang = existing_languages[name_pl.lower()]
-                            print(f"ℹ️  Row {row_num}: Language '{name_pl}' already exists (ID: {existing_lang.id})")
-                            skipped_count += 1
-                            continue
-                        
-                        # Create language
-                        language_data = LanguageCreate(
-                            name_pl=name_pl,
-                            name_en=name_en if name_en else None,
-                            base_client_price=base_client_price
-                        )
-                        
-                        new_language = create_language(db, language_data)
-                        existing_languages[name_pl.lower()] = new_language
-                        created_count += 1
-                        print(f"✅ Row {row_num}: Created '{name_pl}' with price {base_client_price} zł")
-                        
-                    except Exception as e:
-                        error_msg = f"Row {row_num}: {str(e)}"
-                        errors.append(error_msg)
-                        print(f"❌ {error_msg}")
-            else:
-                # Use DictReader if it works
-                for row_num, row in enumerate(reader, start=2):
-                    try:
-                        # Try different column name variations
-                        name_pl = (
-                            row.get('name_pl') or 
-                            row.get('Name PL') or 
-                            row.get('Nazwa PL') or 
-                            row.get('Język') or
-                            row.get('Language') or
-                            list(row.values())[0] if row else ""
-                        ).strip()
-                        
-                        name_en = (
-                            row.get('name_en') or 
-                            row.get('Name EN') or 
-                            row.get('Nazwa EN') or
-                            row.get('English') or
-                            (list(row.values())[1] if len(row) > 1 else "")
-                        ).strip() or None
-                        
-                        price_str = (
-                            row.get('base_client_price') or 
-                            row.get('Base Price') or 
-                            row.get('Cena') or
-                            row.get('Price') or
-                            (list(row.values())[-1] if row else "0")
-                        ).strip()
-                        
-                        if not name_pl:
-                            skipped_count += 1
-                            print(f"⚠️  Row {row_num}: Skipping - no name_pl")
-                            continue
-                        
-                        # Parse price
-                        try:
-                            price_str = price_str.replace('zł', '').replace('PLN', '').replace(' ', '').replace(',', '.')
-                            base_client_price = Decimal(price_str)
-                        except (ValueError, AttributeError):
-                            print(f"⚠️  Row {row_num}: Invalid price '{price_str}', using 0")
-                            base_client_price = Decimal('0')
-                        
-                        # Check if language already exists
-                        if name_pl.lower() in existing_languages:
-                            existing_lang = existing_languages[name_pl.lower()]
-                            print(f"ℹ️  Row {row_num}: Language '{name_pl}' already exists (ID: {existing_lang.id})")
-                            skipped_count += 1
-                            continue
-                        
-                        # Create language
-                        language_data = LanguageCreate(
-                            name_pl=name_pl,
-                            name_en=name_en if name_en else None,
-                            base_client_price=base_client_price
-                        )
-                        
-                        new_language = create_language(db, language_data)
-                        existing_languages[name_pl.lower()] = new_language
-                        created_count += 1
-                        print(f"✅ Row {row_num}: Created '{name_pl}' with price {base_client_price} zł")
-                        
-                    except Exception as e:
-                        error_msg = f"Row {row_num}: {str(e)}"
-                        errors.append(error_msg)
-                        print(f"❌ {error_msg}")
-        
-        print("\n" + "="*50)
-        print("📊 Import Summary:")
-        print(f"   ✅ Created: {created_count}")
-        print(f"   ⏭️  Skipped: {skipped_count}")
-        if errors:
-            print(f"   ❌ Errors: {len(errors)}")
-            for error in errors[:10]:  # Show first 10 errors
-                print(f"      - {error}")
-        print("="*50)
-        
-        return True
-        
+        report = import_languages(
+            db,
+            read_languages_csv(csv_path),
+            deactivate_missing=deactivate_missing,
+            dry_run=dry_run,
+        )
     except Exception as e:
-        print(f"❌ Error reading CSV file: {str(e)}")
+        print(f"❌ Error importing CSV file: {str(e)}")
         return False
     finally:
         db.close()
 
+    print("\n" + "="*50)
+    print("📊 Import Summary" + (" (dry run, nothing saved)" if dry_run else "") + ":")
+    print(f"   📄 Rows: {report.total_rows}")
+    print(f"   ✅ Created: {report.inserted}")
+    print(f"   🔄 Updated: {report.updated}")
+    print(f"   ⏭️  Unchanged: {report.unchanged}")
+    if deactivate_missing:
+        print(f"   💤 Deactivated: {report.deactivated}")
+    if report.errors:
+        print(f"   ❌ Errors: {len(report.errors)}")
+        for error in report.errors:
+            print(f"      - Row {error['row']} ({error['field']}): {error['error']}")
+    print("="*50)
+    
+    return True
+
 def main():
-    csv_path = None
+    parser = argparse.ArgumentParser(description="Import languages from CSV file")
+    parser.add_argument("csv_path", nargs="?", type=Path)
+    parser.add_argument("--dry-run", action="store_true", help="Show report without saving changes")
+    parser.add_argument("--deactivate-missing", action="store_true", help="Deactivate languages missing in the file")
+    args = parser.parse_args()
+    csv_path = args.csv_path
     
-    if len(sys.argv) >= 2:
-        csv_path = Path(sys.argv[1])
-    else:
+    if csv_path is None:
         # Try to find languages.csv in project root
         base_dir = Path(__file__).parent.parent
         default_csv = base_dir / "languages.csv"
@@ -327,7 +122,7 @@ def main():
             print(f"   Tried: {csv_path.resolve()}")
             sys.exit(1)
     
-    success = import_languages_from_csv(csv_path)
+    success = import_languages_from_csv(csv_path, dry_run=args.dry_run, deactivate_missing=args.deactivate_missing)
     sys.exit(0 if success else 1)
 
 if __name__ == "__main__":
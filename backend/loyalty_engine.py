@@ -0,0 +1,426 @@
+"""
+Loyalty engine - set-based розрахунки програми лояльності для всіх клієнтів.
+
+Запуски (run):
+    year_end    - згоряння кешбеку за минулий рік (один INSERT ... SELECT у
+                  cashback_transactions + один UPDATE clients), скидання
+                  річних бонусів Diamond і current_year_spent, перерахунок рівнів
+    recalculate - total_orders / lifetime_spent / current_year_spent як
+                  legacy частина клієнта + нарахування по КП (транзакції
+                  "earned") і перерахунок рівнів
+
+Кожен запуск - одна транзакція з фіксованою кількістю SQL-запитів незалежно
+від кількості клієнтів. run_id ідемпотентний: рядок loyalty_runs
+створюється в тій самій транзакції, повторний запуск з тим самим run_id
+повертає збережений звіт і нічого не змінює. dry_run рахує той самий звіт
+без змін у БД.
+
+Між запусками агрегати клієнта підтримуються інкрементально
+(record_kp_earning): нарахування за КП - один UPDATE clients з новим рівнем.
+"""
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Optional
+from uuid import uuid4
+
+from sqlalchemy import and_, case, func, insert, literal, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import models
+from loyalty_service import LOYALTY_TIERS, calculate_cashback_for_kp
+
+logger = logging.getLogger(__name__)
+
+RUN_YEAR_END = "year_end"
+RUN_RECALCULATE = "recalculate"
+RUN_KINDS = (RUN_YEAR_END, RUN_RECALCULATE)
+
+DEFAULT_CASHBACK_RATE = Decimal("3.0")
+TRANSACTION_EARNED = "earned"
+TRANSACTION_EXPIRED = "expired"
+
+Client = models.Client
+CashbackTransaction = models.CashbackTransaction
+
+
+@dataclass
+class LoyaltyRunReport:
+    run_id: str
+    kind: str
+    dry_run: bool = False
+    already_applied: bool = False
+    expired_clients: int = 0
+    expired_amount: str = "0"
+    bonuses_reset: int = 0
+    spend_corrected: int = 0
+    # "silver->gold": кількість клієнтів
+    tier_changes: Dict[str, int] = field(default_factory=dict)
+    finished_at: Optional[str] = None
+
+
+def default_run_id(kind: str, today: date) -> str:
+    """year_end - один запуск на рік; recalculate - кожен запуск новий."""
+    if kind == RUN_YEAR_END:
+        return f"year-end-{today.year}"
+    return f"{kind}-{today.isoformat()}-{uuid4().hex[:8]}"
+
+
+def tier_case(lifetime_spent):
+    """SQL вираз: рівень для суми lifetime_spent (пороги з LOYALTY_TIERS)."""
+    return case(
+        *(
+            (lifetime_spent >= tier["min_spent"], name)
+            for name, tier in sorted(LOYALTY_TIERS.items(), key=lambda item: -item[1]["min_spent"])
+            if tier["min_spent"] > 0
+        ),
+        else_="silver",
+    )
+
+
+def rate_case(lifetime_spent):
+    """SQL вираз: % кешбеку для суми lifetime_spent."""
+    return case(
+        *(
+            (lifetime_spent >= tier["min_spent"], literal(Decimal(str(tier["cashback_rate"]))))
+            for _, tier in sorted(LOYALTY_TIERS.items(), key=lambda item: -item[1]["min_spent"])
+            if tier["min_spent"] > 0
+        ),
+        else_=literal(Decimal(str(LOYALTY_TIERS["silver"]["cashback_rate"]))),
+    )
+
+
+_not_custom = func.coalesce(Client.is_custom_rate, False) == False  # noqa: E712
+
+
+# ---------- Рівні ----------
+
+def _tier_changes(db: Session, lifetime_spent, source=None, client_ids: Optional[Iterable[int]] = None) -> Dict[str, int]:
+    """Скільки клієнтів змінить рівень (current -> new) для заданого lifetime_spent."""
+    new_tier = tier_case(lifetime_spent)
+    query = select(func.coalesce(Client.loyalty_tier, "silver"), new_tier, func.count())
+    if source is not None:
+        query = query.select_from(source)
+    query = query.where(_not_custom, func.coalesce(Client.loyalty_tier, "silver") != new_tier)
+    if client_ids is not None:
+        query = query.where(Client.id.in_(list(client_ids)))
+    query = query.group_by(func.coalesce(Client.loyalty_tier, "silver"), new_tier)
+    return {f"{old}->{new}": count for old, new, count in db.execute(query)}
+
+
+def recalculate_tiers(db: Session, client_ids: Optional[Iterable[int]] = None, dry_run: bool = False) -> Dict[str, int]:
+    """Рівень і % кешбеку за lifetime_spent одним UPDATE (без commit)."""
+    client_ids = list(client_ids) if client_ids is not None else None
+    lifetime = func.coalesce(Client.lifetime_spent, 0)
+    changes = _tier_changes(db, lifetime, client_ids=client_ids)
+    if dry_run:
+        return changes
+    statement = (
+        update(Client)
+        .where(
+            _not_custom,
+            or_(
+                Client.loyalty_tier.is_distinct_from(tier_case(lifetime)),
+                Client.cashback_rate.is_distinct_from(rate_case(lifetime)),
+            ),
+        )
+        .values(loyalty_tier=tier_case(lifetime), cashback_rate=rate_case(lifetime))
+        .execution_options(synchronize_session=False)
+    )
+    if client_ids is not None:
+        statement = statement.where(Client.id.in_(client_ids))
+    db.execute(statement)
+    return changes
+
+
+# ---------- Кінець року ----------
+
+def _expirable(today: date):
+    return and_(Client.cashback_balance > 0, Client.cashback_expires_at < today)
+
+
+def _expire_cashback(db: Session, today: date, report: LoyaltyRunReport) -> None:
+    expirable = _expirable(today)
+    candidates = select(Client.id, Client.cashback_balance).where(expirable)
+    if not report.dry_run:
+        # Блокуємо клієнтів до кінця транзакції: INSERT і UPDATE бачать ті самі баланси
+        candidates = candidates.with_for_update()
+    candidates = candidates.subquery()
+    count, amount = db.execute(
+        select(func.count(), func.coalesce(func.sum(candidates.c.cashback_balance), 0)).select_from(candidates)
+    ).one()
+    report.expired_clients = count
+    report.expired_amount = str(Decimal(str(amount)))
+    if report.dry_run or not count:
+        return
+
+    description = f"Кешбек згорів (кінець {today.year - 1} року)"
+    db.execute(
+        insert(CashbackTransaction).from_select(
+            ["client_id", "transaction_type", "amount", "balance_after", "description", "created_at"],
+            select(
+                Client.id,
+                literal(TRANSACTION_EXPIRED),
+                -Client.cashback_balance,
+                literal(Decimal("0")),
+                literal(description),
+                literal(datetime.utcnow()),
+            ).where(expirable),
+        )
+    )
+    db.execute(
+        update(Client)
+        .where(expirable)
+        .values(cashback_balance=Decimal("0"), cashback_expires_at=date(today.year, 12, 31))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _reset_yearly(db: Session, today: date, report: LoyaltyRunReport) -> None:
+    """Новий рік: річні бонуси Diamond і current_year_spent з нуля."""
+    stale = func.coalesce(Client.bonus_year, 0) < today.year
+    if report.dry_run:
+        report.bonuses_reset = db.scalar(select(func.count()).select_from(Client).where(stale))
+        return
+    report.bonuses_reset = db.execute(
+        update(Client)
+        .where(stale)
+        .values(
+            current_year_spent=Decimal("0"),
+            legacy_year_spent=Decimal("0"),
+            yearly_photographer_used=False,
+            yearly_robot_used=False,
+            bonus_year=today.year,
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+# ---------- Перерахунок агрегатів ----------
+
+def _earned_totals(year_start: datetime):
+    """Агрегати по КП з нарахуванням кешбеку, по клієнтах."""
+    amount = func.coalesce(models.KP.total_amount, 0)
+    return (
+        select(
+            CashbackTransaction.client_id.label("client_id"),
+            func.count().label("orders"),
+            func.coalesce(func.sum(amount), 0).label("lifetime"),
+            func.coalesce(func.sum(amount).filter(CashbackTransaction.created_at >= year_start), 0).label("current_year"),
+        )
+        .join(models.KP, models.KP.id == CashbackTransaction.kp_id)
+        .where(CashbackTransaction.transaction_type == TRANSACTION_EARNED)
+        .group_by(CashbackTransaction.client_id)
+        .subquery("earned")
+    )
+
+
+def _recalculate_spend(db: Session, today: date, report: LoyaltyRunReport):
+    """
+    total_orders / lifetime_spent / current_year_spent = legacy частина
+    клієнта (дані до нарахувань по КП, імпорт, ручні правки) + нарахування
+    по КП (транзакції "earned").
+    Повертає вираз нового lifetime_spent і FROM для прогнозу рівнів у dry_run.
+    """
+    earned = _earned_totals(datetime(today.year, 1, 1))
+    orders = func.coalesce(Client.legacy_orders, 0) + func.coalesce(earned.c.orders, 0)
+    lifetime = func.coalesce(Client.legacy_spent, 0) + func.coalesce(earned.c.lifetime, 0)
+    current_year = func.coalesce(Client.legacy_year_spent, 0) + func.coalesce(earned.c.current_year, 0)
+
+    def differs(orders, lifetime, current_year):
+        return or_(
+            Client.total_orders.is_distinct_from(orders),
+            Client.lifetime_spent.is_distinct_from(lifetime),
+            Client.current_year_spent.is_distinct_from(current_year),
+        )
+
+    source = Client.__table__.outerjoin(earned, earned.c.client_id == Client.id)
+    report.spend_corrected = db.scalar(
+        select(func.count()).select_from(source).where(differs(orders, lifetime, current_year))
+    )
+    if report.dry_run:
+        return lifetime, source
+
+    # Клієнти з нарахуваннями - UPDATE ... FROM агрегатів
+    with_earned = (
+        func.coalesce(Client.legacy_orders, 0) + earned.c.orders,
+        func.coalesce(Client.legacy_spent, 0) + earned.c.lifetime,
+        func.coalesce(Client.legacy_year_spent, 0) + earned.c.current_year,
+    )
+    db.execute(
+        update(Client)
+        .where(Client.id == earned.c.client_id, differs(*with_earned))
+        .values(total_orders=with_earned[0], lifetime_spent=with_earned[1], current_year_spent=with_earned[2])
+        .execution_options(synchronize_session=False)
+    )
+    # Без нарахувань - тільки legacy частина
+    legacy = (
+        func.coalesce(Client.legacy_orders, 0),
+        func.coalesce(Client.legacy_spent, 0),
+        func.coalesce(Client.legacy_year_spent, 0),
+    )
+    has_earned = select(earned.c.client_id).where(earned.c.client_id == Client.id).exists()
+    db.execute(
+        update(Client)
+        .where(~has_earned, differs(*legacy))
+        .values(total_orders=legacy[0], lifetime_spent=legacy[1], current_year_spent=legacy[2])
+        .execution_options(synchronize_session=False)
+    )
+    return None, None
+
+
+# ---------- Запуск ----------
+
+def run(
+    db: Session,
+    kind: str,
+    run_id: Optional[str] = None,
+    dry_run: bool = False,
+    today: Optional[date] = None,
+) -> LoyaltyRunReport:
+    """
+    Виконати запуск kind для всіх клієнтів однією транзакцією.
+
+    Повторний run_id повертає збережений звіт (already_applied=True).
+    """
+    if kind not in RUN_KINDS:
+        raise ValueError(f"Невідомий тип запуску: {kind}")
+    today = today or date.today()
+    run_id = run_id or default_run_id(kind, today)
+
+    applied = _applied_report(db, run_id)
+    if applied is not None:
+        return applied
+
+    report = LoyaltyRunReport(run_id=run_id, kind=kind, dry_run=dry_run)
+    if not dry_run:
+        # Рядок запуску першим: паралельний запуск з тим самим run_id
+        # чекає на PK і отримує IntegrityError замість повторної роботи
+        db.add(models.LoyaltyRun(run_id=run_id, kind=kind))
+        try:
+            db.flush()
+        except IntegrityError:
+            db.rollback()
+            return _applied_report(db, run_id) or LoyaltyRunReport(run_id=run_id, kind=kind, already_applied=True)
+
+    try:
+        if kind == RUN_YEAR_END:
+            _expire_cashback(db, today, report)
+            _reset_yearly(db, today, report)
+            report.tier_changes = recalculate_tiers(db, dry_run=dry_run)
+        else:
+            projected, source = _recalculate_spend(db, today, report)
+            if dry_run:
+                report.tier_changes = _tier_changes(db, projected, source=source)
+            else:
+                report.tier_changes = recalculate_tiers(db)
+    except Exception:
+        db.rollback()
+        raise
+
+    report.finished_at = datetime.utcnow().isoformat()
+    if dry_run:
+        db.rollback()
+        return report
+
+    db.query(models.LoyaltyRun).filter(models.LoyaltyRun.run_id == run_id).update(
+        {"report": asdict(report)}, synchronize_session=False
+    )
+    db.commit()
+    logger.info(
+        f"Loyalty run {run_id}: expired {report.expired_clients} clients ({report.expired_amount}), "
+        f"spend corrected {report.spend_corrected}, tier changes {report.tier_changes}"
+    )
+    return report
+
+
+def _applied_report(db: Session, run_id: str) -> Optional[LoyaltyRunReport]:
+    applied = db.get(models.LoyaltyRun, run_id)
+    if applied is None:
+        return None
+    values = dict(applied.report or {"run_id": run_id, "kind": applied.kind})
+    values["already_applied"] = True
+    return LoyaltyRunReport(**values)
+
+
+# ---------- Інкрементальні агрегати ----------
+
+def record_kp_earning(db: Session, kp: models.KP, today: Optional[date] = None) -> models.CashbackTransaction:
+    """
+    Нарахування кешбеку за КП і оновлення агрегатів клієнта одним UPDATE.
+
+    Ідемпотентно по КП: повторний виклик повертає вже створену транзакцію.
+    """
+    # client може бути призначений через relationship ще до flush
+    client_id = kp.client_id or (kp.client.id if kp.client is not None else None)
+    if not client_id:
+        raise ValueError("КП не пов'язано з клієнтом")
+    today = today or date.today()
+
+    # Блокування рядка клієнта серіалізує нарахування по ньому
+    client = db.execute(
+        select(Client.cashback_rate, Client.is_custom_rate, Client.bonus_year)
+        .where(Client.id == client_id)
+        .with_for_update()
+    ).one_or_none()
+    if client is None:
+        raise ValueError("КП не пов'язано з клієнтом")
+
+    earned = db.scalar(
+        select(CashbackTransaction)
+        .where(CashbackTransaction.kp_id == kp.id, CashbackTransaction.transaction_type == TRANSACTION_EARNED)
+    )
+    if earned is not None:
+        return earned
+
+    menu_total = Decimal(str(kp.menu_total)) if kp.menu_total else Decimal("0")
+    total = Decimal(str(kp.total_amount)) if kp.total_amount else Decimal("0")
+    rate = Decimal(str(client.cashback_rate)) if client.cashback_rate else DEFAULT_CASHBACK_RATE
+    amount = calculate_cashback_for_kp(menu_total, rate)
+
+    values = {
+        "cashback_balance": func.coalesce(Client.cashback_balance, 0) + amount,
+        "cashback_earned_total": func.coalesce(Client.cashback_earned_total, 0) + amount,
+        "lifetime_spent": func.coalesce(Client.lifetime_spent, 0) + total,
+        "total_orders": func.coalesce(Client.total_orders, 0) + 1,
+        "cashback_expires_at": date(today.year, 12, 31),
+    }
+    if (client.bonus_year or 0) < today.year:
+        # Перше нарахування в новому році (раніше за year_end запуск)
+        values.update(
+            current_year_spent=total,
+            legacy_year_spent=Decimal("0"),
+            yearly_photographer_used=False,
+            yearly_robot_used=False,
+            bonus_year=today.year,
+        )
+    else:
+        values["current_year_spent"] = func.coalesce(Client.current_year_spent, 0) + total
+    if not client.is_custom_rate:
+        new_lifetime = func.coalesce(Client.lifetime_spent, 0) + total
+        values.update(loyalty_tier=tier_case(new_lifetime), cashback_rate=rate_case(new_lifetime))
+
+    balance_after = db.execute(
+        update(Client)
+        .where(Client.id == client_id)
+        .values(**values)
+        .returning(Client.cashback_balance)
+        .execution_options(synchronize_session=False)
+    ).scalar_one()
+
+    kp.cashback_earned = float(amount)
+    kp.cashback_rate_applied = float(rate)
+    transaction = models.CashbackTransaction(
+        client_id=client_id,
+        kp_id=kp.id,
+        transaction_type=TRANSACTION_EARNED,
+        amount=amount,
+        balance_after=balance_after,
+        description=f"Нараховано за КП #{kp.id} ({float(rate)}%)",
+    )
+    db.add(transaction)
+    # commit також expire-ить kp.client - агрегати перечитаються з БД
+    db.commit()
+    return transaction
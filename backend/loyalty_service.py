@@ -61,19 +61,15 @@ def calculate_loyalty_tier(lifetime_spent: Decimal) -> tuple[str, Decimal]:
 
 def update_client_loyalty_tier(db: Session, client: models.Client):
     """
-    Оновлення рівня лояльності клієнта
+    Оновлення рівня лояльності клієнта (set-based вираз loyalty_engine)
     """
+    import loyalty_engine
+
     # Якщо індивідуальні умови - не чіпаємо
     if client.is_custom_rate:
         return
-    
-    # Розрахунок нового рівня
-    new_tier, new_rate = calculate_loyalty_tier(client.lifetime_spent)
-    
-    # Оновлення якщо змінився
-    if client.loyalty_tier != new_tier:
-        client.loyalty_tier = new_tier
-        client.cashback_rate = new_rate
+
+    if loyalty_engine.recalculate_tiers(db, client_ids=[client.id]):
         db.commit()
 
 
@@ -171,94 +167,26 @@ def earn_cashback_from_kp(
     kp: models.KP
 ) -> models.CashbackTransaction:
     """
-    Нарахування кешбеку після створення/підтвердження КП
+    Нарахування кешбеку після створення/підтвердження КП.
+    Агрегати клієнта (баланс, витрати, к-ть замовлень, рівень) оновлюються
+    інкрементально одним UPDATE - див. loyalty_engine.record_kp_earning
     """
-    client = kp.client
-    
-    if not client:
-        raise ValueError("КП не пов'язано з клієнтом")
-    
-    # Розрахунок кешбеку тільки на меню
-    menu_total = Decimal(str(kp.menu_total)) if kp.menu_total else Decimal("0")
-    cashback_rate = Decimal(str(client.cashback_rate)) if client.cashback_rate else Decimal("3.0")
-    
-    cashback_amount = calculate_cashback_for_kp(
-        menu_total,
-        cashback_rate
-    )
-    
-    # Нарахування
-    client.cashback_balance = Decimal(str(client.cashback_balance)) + cashback_amount
-    client.cashback_earned_total = Decimal(str(client.cashback_earned_total)) + cashback_amount
-    total_amount_decimal = Decimal(str(kp.total_amount)) if kp.total_amount else Decimal("0")
-    client.lifetime_spent = Decimal(str(client.lifetime_spent)) + total_amount_decimal
-    client.current_year_spent = Decimal(str(client.current_year_spent)) + total_amount_decimal
-    client.total_orders += 1
-    
-    # Оновлення дати згоряння (31 грудня поточного року)
-    current_year = datetime.now().year
-    client.cashback_expires_at = date(current_year, 12, 31)
-    
-    # Оновлення КП
-    kp.cashback_earned = float(cashback_amount)
-    kp.cashback_rate_applied = float(cashback_rate)
-    
-    # Перевірка чи підвищився рівень
-    update_client_loyalty_tier(db, client)
-    
-    # Транзакція
-    transaction = models.CashbackTransaction(
-        client_id=client.id,
-        kp_id=kp.id,
-        transaction_type="earned",
-        amount=cashback_amount,
-        balance_after=client.cashback_balance,
-        description=f"Нараховано за КП #{kp.id} ({float(cashback_rate)}%)"
-    )
-    db.add(transaction)
-    db.commit()
-    
-    return transaction
+    import loyalty_engine
+
+    return loyalty_engine.record_kp_earning(db, kp)
 
 
 def expire_cashback_year_end(db: Session):
     """
     Cron job - Згоряння кешбеку в кінці року
-    Запускати 1 січня
+    Запускається Celery beat (expire_cashback_task) у перший тиждень січня;
+    run_id "year-end-{рік}" - повторні запуски тижня нічого не змінюють
     """
-    today = date.today()
-    
-    # Знайти всіх клієнтів з кешбеком що згорів
-    clients = db.query(models.Client).filter(
-        models.Client.cashback_balance > 0,
-        models.Client.cashback_expires_at < today
-    ).all()
-    
-    for client in clients:
-        expired_amount = Decimal(str(client.cashback_balance))
-        
-        # Обнулення
-        client.cashback_balance = Decimal("0")
-        client.cashback_expires_at = date(today.year, 12, 31)
-        client.current_year_spent = Decimal("0")  # Скинути поточний рік
-        
-        # Скинути бонуси Diamond
-        client.yearly_photographer_used = False
-        client.yearly_robot_used = False
-        client.bonus_year = today.year
-        
-        # Транзакція
-        transaction = models.CashbackTransaction(
-            client_id=client.id,
-            transaction_type="expired",
-            amount=-expired_amount,
-            balance_after=Decimal("0"),
-            description=f"Кешбек згорів (кінець {today.year - 1} року)"
-        )
-        db.add(transaction)
-    
-    db.commit()
-    print(f"Expired cashback for {len(clients)} clients")
+    import loyalty_engine
+
+    report = loyalty_engine.run(db, loyalty_engine.RUN_YEAR_END)
+    print(f"Expired cashback for {report.expired_clients} clients")
+    return report.expired_clients
 
 
 def use_diamond_bonus(
@@ -1,19 +1,22 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status, WebSocket, WebSocketDisconnect, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy import text
 from db import Base, engine
 from core.config import settings
+from core.sql_instrumentation import SQLInstrumentationMiddleware
+from core.loop_monitor import LoopMonitorMiddleware, loop_monitor
+from core import metrics
 from pathlib import Path
 from modules.auth.router import router as auth_router
 from modules.auth.models import User
 from modules.crm.router import router as crm_router
 from modules.crm.models import Client, Order, InternalNote, TimelineStep, Translator, TranslatorLanguage, TranslationRequest, Office, Language, Specialization, TranslatorLanguageRate
 from modules.finance.router import router as finance_router
-from modules.finance.models import Transaction
+from modules.finance.models import Transaction, FinanceDailyRollup
 from modules.payment.router import router as payment_router
 from modules.payment.models import PaymentSettings, PaymentTransaction, PaymentLink
 from modules.communications.router import router as communications_router, messages_manager
@@ -34,6 +37,7 @@ from modules.integrations.router import router as integrations_router
 from modules.integrations.matrix.router import router as matrix_router
 from modules.postal_services.router import router as postal_services_router
 from modules.postal_services.models import InPostShipment, InPostSettings
+from modules.analytics.router import router as analytics_router
 from routes import router as legacy_router
 # Імпортуємо моделі з routes для автоматичного створення таблиць
 import models  # noqa: F401
@@ -48,6 +52,8 @@ async def lifespan(app: FastAPI):
     Ініціалізація при старті додатку.
     Створює тільки нові таблиці (async Base), не чіпає старі таблиці.
     """
+    loop_monitor.start()
+
     # НЕ створюємо старі таблиці (Base.metadata.create_all) - вони вже існують
     # Створюємо тільки нові таблиці з async моделей
     try:
@@ -66,6 +72,10 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Matrix listener failed to start: {e}")
 
+    # Нотифікації з інших процесів (нагадування, Celery) для наших WebSocket
+    from modules.notifications.relay import relay_listener
+    await relay_listener.start()
+
     yield
 
     # Cleanup on shutdown
@@ -73,6 +83,8 @@ async def lifespan(app: FastAPI):
         await matrix_listener.stop()
     except Exception as e:
         logger.warning(f"Matrix listener stop error: {e}")
+    await relay_listener.stop()
+    await loop_monitor.stop()
 
 
 app = FastAPI(
@@ -107,6 +119,10 @@ if FRONTEND_URL and FRONTEND_URL not in allowed_origins:
     elif FRONTEND_URL.startswith("https://"):
         allowed_origins.append(FRONTEND_URL.replace("https://", "wss://"))
 
+app.add_middleware(SQLInstrumentationMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(LoopMonitorMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
@@ -148,6 +164,7 @@ app.include_router(ai_router, prefix="/api/v1")
 app.include_router(integrations_router, prefix="/api/v1")
 app.include_router(matrix_router, prefix="/api/v1")
 app.include_router(postal_services_router, prefix="/api/v1")
+app.include_router(analytics_router, prefix="/api/v1")
 app.include_router(legacy_router, prefix="/api/v1")
 
 media_dir = settings.get_media_dir()
@@ -192,6 +209,28 @@ def health_check():
         )
 
 
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus метрики API (латентність маршрутів, пули БД, WebSocket, ingestion)."""
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
+
+
+def _register_metrics_sources():
+    from core.database import engine as core_engine
+    from core.db import engine as async_engine
+    from modules.notifications.websocket import manager as notifications_manager
+
+    metrics.db_pools.add("legacy", engine)
+    metrics.db_pools.add("core", core_engine)
+    metrics.db_pools.add("async", async_engine)
+    metrics.register_websocket_manager("messages", messages_manager)
+    metrics.register_websocket_manager("notifications", notifications_manager)
+
+
+_register_metrics_sources()
+
+
 # WebSocket endpoint for real-time messages (defined at app level to avoid middleware issues)
 @app.websocket("/api/v1/communications/ws/{user_id}")
 async def websocket_messages_endpoint(websocket: WebSocket, user_id: str):
@@ -283,6 +322,14 @@ async def broadcast_message(notification: dict = Body(None)):
     
     logger.info(f"Broadcast endpoint called. Active connections: {list(messages_manager.active_connections.keys())}")
     
+    if notification and notification.get("type") == "batch":
+        # Batch from the inbound pipeline: one HTTP call per committed batch
+        events = notification.get("events") or []
+        logger.info(f"Broadcasting batch of {len(events)} notifications")
+        for event in events:
+            await messages_manager.broadcast(event)
+        return {"status": "ok", "message": f"{len(events)} notifications broadcast", "connected_users": len(messages_manager.active_connections)}
+    
     if notification:
         # Use provided notification
         logger.info(f"Broadcasting notification: {notification.get('type')} for conversation: {notification.get('conversation_id')}")
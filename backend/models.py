@@ -1,6 +1,6 @@
 # DB Models
 
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime, JSON, Text, Numeric, Date
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, DateTime, JSON, Text, Numeric, Date, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime, date
@@ -53,7 +53,8 @@ class Item(Base):
 
     active = Column(Boolean, default=True)
     
-    kp_items = relationship("KPItem", back_populates="item", lazy="selectin")
+    # Не selectin: позиції всіх історичних КП не потрібні при читанні каталогу
+    kp_items = relationship("KPItem", back_populates="item", lazy="select")
 
     # created_at = Column(String, server_default=func.now())
 
@@ -170,6 +171,10 @@ class Template(Base):
 
 class KP(Base):
     __tablename__ = "kps"
+    __table_args__ = (
+        # Keyset пагінація GET /kp (crud.get_kps_page)
+        Index("ix_kps_created_at_id", text("created_at DESC NULLS LAST"), text("id DESC")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -365,6 +370,10 @@ class ManagerSmtpAccount(Base):
 
 class Client(Base):
     __tablename__ = "clients"
+    __table_args__ = (
+        # Keyset пагінація списку (crud._listing_page)
+        Index("ix_clients_created_at_id", text("created_at DESC NULLS LAST"), text("id DESC")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)  # Ім'я контакту
@@ -376,6 +385,11 @@ class Client(Base):
     total_orders = Column(Integer, default=0)  # Загальна к-ть замовлень
     lifetime_spent = Column(Numeric(10, 2), default=0)  # Загальна сума за весь час
     current_year_spent = Column(Numeric(10, 2), default=0)  # Сума за поточний рік
+    # Частина агрегатів поза нарахуваннями по КП (дані до loyalty engine, імпорт,
+    # ручні правки): loyalty_engine перераховує агрегати як legacy + earned
+    legacy_orders = Column(Integer, default=0)
+    legacy_spent = Column(Numeric(10, 2), default=0)
+    legacy_year_spent = Column(Numeric(10, 2), default=0)
     
     # Кешбек
     cashback_balance = Column(Numeric(10, 2), default=0)  # Поточний кешбек
@@ -410,6 +424,10 @@ class Client(Base):
 class ClientQuestionnaire(Base):
     """Анкета клієнта для відділу продажів"""
     __tablename__ = "client_questionnaires"
+    __table_args__ = (
+        # Keyset пагінація списку (crud._listing_page)
+        Index("ix_client_questionnaires_created_at_id", text("created_at DESC NULLS LAST"), text("id DESC")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
@@ -487,9 +505,13 @@ class ClientQuestionnaire(Base):
 class CashbackTransaction(Base):
     """Історія операцій з кешбеком"""
     __tablename__ = "cashback_transactions"
+    __table_args__ = (
+        # Нарахування по КП: ідемпотентність і агрегати loyalty engine
+        Index("ix_cashback_transactions_kp_id_type", "kp_id", "transaction_type"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
     kp_id = Column(Integer, ForeignKey("kps.id"), nullable=True)
     
     transaction_type = Column(String, nullable=False)  # "earned" | "used" | "expired"
@@ -504,12 +526,26 @@ class CashbackTransaction(Base):
     kp = relationship("KP")
 
 
+class LoyaltyRun(Base):
+    """Запуск loyalty engine (idempotency по run_id + звіт)"""
+    __tablename__ = "loyalty_runs"
+
+    run_id = Column(String(100), primary_key=True)  # "year-end-2027", "recalculate-..."
+    kind = Column(String(30), nullable=False)  # "year_end" | "recalculate"
+    report = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 class Checklist(Base):
     """
     Чекліст для боксів або кейтерингу.
     Використовується відділом продажів для збору інформації перед формуванням КП.
     """
     __tablename__ = "checklists"
+    __table_args__ = (
+        # Keyset пагінація списку (crud._listing_page)
+        Index("ix_checklists_created_at_id", text("created_at DESC NULLS LAST"), text("id DESC")),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
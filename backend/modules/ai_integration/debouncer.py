@@ -0,0 +1,141 @@
+"""
+AI reply debouncer - одна RAG відповідь на серію повідомлень клієнта.
+
+Кожне вхідне повідомлення (лістенери, webhooks) додається у Redis буфер
+розмови і збільшує лічильник серії; process_ai_reply_task ставиться з
+затримкою AISettings.trigger_delay_seconds. Коли задача спрацьовує:
+- якщо за цей час прийшло новіше повідомлення, лічильник уже інший -
+  задача завершується як superseded (її замінила задача новішого повідомлення);
+- інакше буфер атомарно забирається (Lua) і всі повідомлення серії
+  зливаються в один запит до RAG;
+- якщо менеджер відповів у розмові після початку серії - RAG не викликається.
+
+Стан у Redis, тож серія коректно збирається, навіть якщо повідомлення
+прийшли через різні процеси (API воркери, Telegram / Email лістенери).
+"""
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from core.settings_cache import get_singleton
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRIGGER_DELAY_SECONDS = 10
+
+# Буфер живе довше за затримку - на випадок черги в Celery
+BURST_TTL_EXTRA_SECONDS = 600
+
+# Максимум повідомлень серії, що йдуть у RAG (старіші відкидаються)
+MAX_BURST_MESSAGES = 20
+
+_KEY_PREFIX = "ai:burst"
+
+# KEYS[1] = seq, KEYS[2] = messages; ARGV[1] = очікуваний seq
+_CLAIM_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return false
+end
+local messages = redis.call('LRANGE', KEYS[2], 0, -1)
+redis.call('DEL', KEYS[2])
+return messages
+"""
+
+
+def _keys(conversation_id: str):
+    return f"{_KEY_PREFIX}:{conversation_id}:seq", f"{_KEY_PREFIX}:{conversation_id}:messages"
+
+
+def _redis():
+    from core.redis_client import get_redis
+    return get_redis()
+
+
+def ai_reply_delay(platform: str) -> Optional[int]:
+    """Затримка для каналу або None, якщо AI для нього вимкнений."""
+    settings = get_singleton("ai")
+    if not settings or not settings.is_enabled or platform not in (settings.active_channels or []):
+        return None
+    delay = settings.trigger_delay_seconds
+    return DEFAULT_TRIGGER_DELAY_SECONDS if delay is None else delay
+
+
+def schedule_ai_reply(
+    conversation_id: str,
+    platform: str,
+    content: Optional[str],
+    message_id: Optional[str] = None,
+    received_at: Optional[datetime] = None,
+    context: Optional[Dict[str, Any]] = None,
+) -> Optional[int]:
+    """
+    Додати вхідне повідомлення в серію розмови і (пере)запланувати AI відповідь.
+
+    Returns:
+        Номер серії або None, якщо AI для каналу вимкнений / немає тексту / помилка
+    """
+    if not content or not content.strip():
+        return None
+    delay = ai_reply_delay(platform)
+    if delay is None:
+        return None
+
+    conversation_id = str(conversation_id)
+    seq_key, messages_key = _keys(conversation_id)
+    received_at = received_at or datetime.now(timezone.utc)
+    entry = json.dumps({
+        "id": str(message_id) if message_id else None,
+        "content": content,
+        "at": received_at.timestamp(),
+    }, ensure_ascii=False)
+    ttl = delay + BURST_TTL_EXTRA_SECONDS
+    try:
+        pipe = _redis().pipeline()
+        pipe.rpush(messages_key, entry)
+        pipe.ltrim(messages_key, -MAX_BURST_MESSAGES, -1)
+        pipe.incr(seq_key)
+        pipe.expire(messages_key, ttl)
+        pipe.expire(seq_key, ttl)
+        seq = pipe.execute()[2]
+
+        from tasks.celery_app import celery_app
+        celery_app.send_task(
+            "process_ai_reply_task",
+            kwargs={
+                "conversation_id": conversation_id,
+                "message": None,
+                "platform": platform,
+                "context": context,
+                "burst_seq": seq,
+            },
+            countdown=delay,
+        )
+        return seq
+    except Exception as e:
+        logger.warning(f"Failed to schedule AI reply for conversation {conversation_id}: {e}")
+        return None
+
+
+def claim_burst(conversation_id: str, seq: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Забрати повідомлення серії, якщо seq - остання серія розмови.
+    None - серію замінило новіше повідомлення (або буфер вже забрано).
+    """
+    seq_key, messages_key = _keys(str(conversation_id))
+    raw = _redis().eval(_CLAIM_SCRIPT, 2, seq_key, messages_key, str(seq))
+    if raw is None:
+        return None
+    messages = [json.loads(item) for item in raw]
+    return messages or None
+
+
+def merge_burst(messages: List[Dict[str, Any]]) -> str:
+    """Текст серії для RAG - повідомлення в порядку надходження."""
+    return "\n".join(message["content"] for message in messages if message.get("content"))
+
+
+def burst_started_at(messages: List[Dict[str, Any]]) -> datetime:
+    started = min((message.get("at") or time.time()) for message in messages)
+    return datetime.fromtimestamp(started, tz=timezone.utc)
@@ -45,6 +45,13 @@ class AISettings(Base):
         nullable=False,
         default=list
     )
+    # FAQ питання, відповіді на які можна кешувати (reply_cache) навіть без
+    # metadata.cacheable від RAG; схожі формулювання теж рахуються
+    reply_cache_faq: Mapped[list[str]] = mapped_column(
+        JSON().with_variant(JSONB, "postgresql"),
+        nullable=False,
+        default=list
+    )
     
     # Webhook Security
     webhook_secret: Mapped[str] = mapped_column(
@@ -0,0 +1,324 @@
+"""
+RAG reply cache - кеш відповідей AI на повторювані питання клієнтів.
+
+Ключ - нормалізоване питання + scope (офіс і канал). Пошук:
+1. точний збіг нормалізованого тексту (один GET у Redis);
+2. схожість - TF-IDF по символьних n-грамах, косинус >= SIMILARITY_THRESHOLD.
+   Індекс питань scope-у будується в пам'яті процесу з Redis і
+   перебудовується тільки після запису в цей scope.
+
+Записи живуть AI_REPLY_CACHE_TTL_SECONDS. invalidate_reply_cache() збільшує
+покоління - усі ключі попереднього покоління стають недосяжними одразу
+в усіх процесах (і зникають самі по TTL).
+
+RAG викликається в контексті розмови, тому кешуються тільки загальні
+відповіді з достатньою confidence: RAG позначив їх metadata.cacheable = true
+або питання збігається (точно чи схоже) з FAQ зі списку AI налаштувань
+(ai_settings.reply_cache_faq) - без цього з реальним RAG кеш не наповнюється.
+Питання з цифрами (номери замовлень, дати, телефони) або email не
+зберігаються і не шукаються в кеші.
+
+Метрики (hits_exact / hits_similar / misses / stores) - лічильники в Redis,
+GET /ai/reply-cache/stats.
+"""
+import hashlib
+import json
+import logging
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SIMILARITY_THRESHOLD = 0.86
+NGRAM_SIZE = 3
+MAX_QUESTION_LENGTH = 300
+MIN_CACHE_CONFIDENCE = 0.6
+# Скільки питань тримати в індексі одного scope (найстаріші витісняються)
+MAX_ENTRIES_PER_SCOPE = 2000
+
+_PREFIX = "ai:reply"
+_GENERATION_KEY = f"{_PREFIX}:generation"
+_STATS_KEY = f"{_PREFIX}:stats"
+
+_PUNCTUATION = re.compile(r"[^\w\s]", re.UNICODE)
+_DIGITS = re.compile(r"\d+")
+_EMAIL = re.compile(r"[^\s@]+@[^\s@]+")
+_SPACES = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class CachedReply:
+    reply: str
+    confidence: Optional[float]
+    metadata: Optional[Dict[str, Any]]
+    match: str  # exact | similar
+    similarity: float
+
+
+def normalize_question(text: str) -> str:
+    """Нижній регістр, без пунктуації / емодзі та зайвих пробілів."""
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    text = _PUNCTUATION.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def has_personal_details(text: str) -> bool:
+    """Цифри (номер замовлення, дата, телефон) або email - питання про конкретного клієнта."""
+    return bool(_DIGITS.search(text or "")) or bool(_EMAIL.search(text or ""))
+
+
+def make_scope(platform: str, office_id: Optional[Any] = None) -> str:
+    return f"{office_id or 0}:{platform}"
+
+
+def _ngrams(normalized: str) -> Counter:
+    padded = f" {normalized} "
+    return Counter(padded[i:i + NGRAM_SIZE] for i in range(max(len(padded) - NGRAM_SIZE + 1, 1)))
+
+
+def _digest(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def _redis():
+    from core.redis_client import get_redis
+    return get_redis()
+
+
+# ---------- Індекс схожості (в пам'яті процесу) ----------
+
+class QuestionIndex:
+    """TF-IDF вектори питань одного scope + інвертований індекс по n-грамах."""
+
+    def __init__(self, entries: Dict[str, str]):
+        self.version: Optional[str] = None
+        documents = {digest: _ngrams(question) for digest, question in entries.items()}
+        df = Counter()
+        for grams in documents.values():
+            df.update(grams.keys())
+        total = len(documents)
+        self.idf = {gram: math.log((1 + total) / (1 + count)) + 1 for gram, count in df.items()}
+        # Невідомі n-грами отримують максимальну idf - вони знижують схожість
+        self.default_idf = math.log(1 + total) + 1
+        self.postings: Dict[str, List[Tuple[str, float]]] = {}
+        for digest, grams in documents.items():
+            vector = self._weights(grams)
+            for gram, weight in vector.items():
+                self.postings.setdefault(gram, []).append((digest, weight))
+
+    def _weights(self, grams: Counter) -> Dict[str, float]:
+        vector = {gram: count * self.idf.get(gram, self.default_idf) for gram, count in grams.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        return {gram: weight / norm for gram, weight in vector.items()}
+
+    def best_match(self, normalized: str) -> Tuple[Optional[str], float]:
+        scores: Dict[str, float] = {}
+        for gram, weight in self._weights(_ngrams(normalized)).items():
+            for digest, doc_weight in self.postings.get(gram, ()):
+                scores[digest] = scores.get(digest, 0.0) + weight * doc_weight
+        if not scores:
+            return None, 0.0
+        digest = max(scores, key=scores.get)
+        return digest, scores[digest]
+
+
+_index_lock = threading.Lock()
+_indexes: Dict[str, QuestionIndex] = {}
+
+
+def _scope_index(client, generation: str, scope: str) -> QuestionIndex:
+    index_key = f"{_PREFIX}:{generation}:index:{scope}"
+    version_key = f"{_PREFIX}:{generation}:version:{scope}"
+    version = client.get(version_key) or "0"
+    cache_key = f"{generation}:{scope}"
+    index = _indexes.get(cache_key)
+    if index is not None and index.version == version:
+        return index
+    with _index_lock:
+        index = _indexes.get(cache_key)
+        if index is None or index.version != version:
+            entries = {
+                digest: json.loads(value)["question"]
+                for digest, value in client.hgetall(index_key).items()
+            }
+            index = QuestionIndex(entries)
+            index.version = version
+            # Індекси старих поколінь більше не потрібні
+            for key in [key for key in _indexes if not key.startswith(f"{generation}:")]:
+                del _indexes[key]
+            _indexes[cache_key] = index
+        return index
+
+
+@lru_cache(maxsize=8)
+def _faq_index(faq: Tuple[str, ...]) -> Tuple[FrozenSet[str], QuestionIndex]:
+    normalized = {normalize_question(question) for question in faq} - {""}
+    return frozenset(normalized), QuestionIndex({_digest(question): question for question in normalized})
+
+
+def is_faq_question(normalized: str, faq: Sequence[str]) -> bool:
+    """Нормалізоване питання збігається з FAQ точно або зі схожістю >= SIMILARITY_THRESHOLD."""
+    if not faq or not normalized:
+        return False
+    questions, index = _faq_index(tuple(faq))
+    if normalized in questions:
+        return True
+    return index.best_match(normalized)[1] >= SIMILARITY_THRESHOLD
+
+
+# ---------- Публічний API ----------
+
+def _generation(client) -> str:
+    return client.get(_GENERATION_KEY) or "0"
+
+
+def _count(client, metric: str) -> None:
+    try:
+        client.hincrby(_STATS_KEY, metric, 1)
+    except Exception:
+        pass
+
+
+def lookup(question: str, scope: str) -> Optional[CachedReply]:
+    """Знайти відповідь у кеші (точний збіг, потім схожість). None - промах."""
+    normalized = normalize_question(question)
+    if not normalized or len(normalized) > MAX_QUESTION_LENGTH or has_personal_details(question):
+        return None
+    try:
+        client = _redis()
+        generation = _generation(client)
+        entry_prefix = f"{_PREFIX}:{generation}:entry:{scope}"
+
+        raw = client.get(f"{entry_prefix}:{_digest(normalized)}")
+        if raw and _is_cacheable(raw):
+            _count(client, "hits_exact")
+            return _to_reply(raw, "exact", 1.0)
+
+        index = _scope_index(client, generation, scope)
+        digest, similarity = index.best_match(normalized)
+        if digest and similarity >= SIMILARITY_THRESHOLD:
+            raw = client.get(f"{entry_prefix}:{digest}")
+            if raw and _is_cacheable(raw):
+                _count(client, "hits_similar")
+                return _to_reply(raw, "similar", similarity)
+            # Запис прострочений - прибираємо з індексу
+            client.hdel(f"{_PREFIX}:{generation}:index:{scope}", digest)
+            client.incr(f"{_PREFIX}:{generation}:version:{scope}")
+        _count(client, "misses")
+    except Exception as e:
+        logger.warning(f"RAG reply cache lookup failed: {e}")
+    return None
+
+
+def store(
+    question: str,
+    scope: str,
+    reply: str,
+    confidence: Optional[float] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    faq: Sequence[str] = (),
+) -> bool:
+    """
+    Зберегти відповідь RAG, якщо її можна перевикористати: metadata.cacheable
+    від RAG або питання з FAQ списку. Returns: чи збережено.
+    """
+    normalized = normalize_question(question)
+    if not normalized or not reply or len(normalized) > MAX_QUESTION_LENGTH:
+        return False
+    if has_personal_details(question):
+        return False
+    if confidence is not None and confidence < MIN_CACHE_CONFIDENCE:
+        return False
+    # Тільки загальні відповіді (не залежать від розмови)
+    if (metadata or {}).get("cacheable") is not True and not is_faq_question(normalized, faq):
+        return False
+    ttl = settings.AI_REPLY_CACHE_TTL_SECONDS
+    if ttl <= 0:
+        return False
+    try:
+        client = _redis()
+        generation = _generation(client)
+        digest = _digest(normalized)
+        index_key = f"{_PREFIX}:{generation}:index:{scope}"
+        pipe = client.pipeline()
+        pipe.set(
+            f"{_PREFIX}:{generation}:entry:{scope}:{digest}",
+            json.dumps(
+                {"reply": reply, "confidence": confidence, "metadata": metadata, "cacheable": True},
+                ensure_ascii=False,
+            ),
+            ex=ttl,
+        )
+        pipe.hset(index_key, digest, json.dumps({"question": normalized, "at": time.time()}, ensure_ascii=False))
+        pipe.expire(index_key, ttl)
+        pipe.incr(f"{_PREFIX}:{generation}:version:{scope}")
+        pipe.expire(f"{_PREFIX}:{generation}:version:{scope}", ttl)
+        pipe.hlen(index_key)
+        size = pipe.execute()[-1]
+        if size > MAX_ENTRIES_PER_SCOPE:
+            _evict_oldest(client, index_key, size - MAX_ENTRIES_PER_SCOPE)
+        _count(client, "stores")
+        return True
+    except Exception as e:
+        logger.warning(f"RAG reply cache store failed: {e}")
+        return False
+
+
+def _evict_oldest(client, index_key: str, count: int) -> None:
+    entries = sorted(
+        ((json.loads(value).get("at", 0), digest) for digest, value in client.hgetall(index_key).items())
+    )
+    stale = [digest for _, digest in entries[:count]]
+    if stale:
+        client.hdel(index_key, *stale)
+
+
+def invalidate_reply_cache() -> int:
+    """Скинути весь кеш відповідей (нове покоління ключів). Returns: нове покоління."""
+    client = _redis()
+    generation = client.incr(_GENERATION_KEY)
+    client.hincrby(_STATS_KEY, "invalidations", 1)
+    return generation
+
+
+def cache_stats() -> Dict[str, Any]:
+    client = _redis()
+    stats = {key: int(value) for key, value in client.hgetall(_STATS_KEY).items()}
+    hits = stats.get("hits_exact", 0) + stats.get("hits_similar", 0)
+    lookups = hits + stats.get("misses", 0)
+    return {
+        "generation": int(_generation(client)),
+        "hits_exact": stats.get("hits_exact", 0),
+        "hits_similar": stats.get("hits_similar", 0),
+        "misses": stats.get("misses", 0),
+        "stores": stats.get("stores", 0),
+        "invalidations": stats.get("invalidations", 0),
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        "ttl_seconds": settings.AI_REPLY_CACHE_TTL_SECONDS,
+    }
+
+
+def _is_cacheable(raw: str) -> bool:
+    """Записи, збережені до перевірки cacheable / FAQ, не віддаються"""
+    data = json.loads(raw)
+    return data.get("cacheable") is True or (data.get("metadata") or {}).get("cacheable") is True
+
+
+def _to_reply(raw: str, match: str, similarity: float) -> CachedReply:
+    data = json.loads(raw)
+    return CachedReply(
+        reply=data["reply"],
+        confidence=data.get("confidence"),
+        metadata=data.get("metadata"),
+        match=match,
+        similarity=round(similarity, 4),
+    )
@@ -14,8 +14,10 @@ from .schemas import (
     AISettingsCreate,
     AISettingsUpdate,
     RAGMessageRequest,
-    RAGMessageResponse
+    RAGMessageResponse,
+    ReplyCacheStats
 )
+from . import reply_cache
 
 router = APIRouter(prefix="/ai", tags=["ai-integration"])
 
@@ -98,3 +100,32 @@ def get_webhook_secret(
     settings = service.get_or_create_settings()
     return {"webhook_secret": settings.webhook_secret}
 
+
+
+@router.get("/reply-cache/stats", response_model=ReplyCacheStats)
+def get_reply_cache_stats(
+    user: auth_models.User = Depends(get_current_user_db)
+):
+    """Метрики кешу відповідей RAG (hit / miss)"""
+    try:
+        return reply_cache.cache_stats()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Reply cache is unavailable: {e}"
+        )
+
+
+@router.post("/reply-cache/invalidate", response_model=ReplyCacheStats)
+def invalidate_reply_cache(
+    user: auth_models.User = Depends(get_current_user_db)
+):
+    """Очистити кеш відповідей RAG (наприклад, після оновлення бази знань)"""
+    try:
+        reply_cache.invalidate_reply_cache()
+        return reply_cache.cache_stats()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Reply cache is unavailable: {e}"
+        )
@@ -34,6 +34,10 @@ class AISettingsBase(BaseModel):
         default_factory=list,
         description="Активні канали для AI (telegram, whatsapp, email, instagram, facebook)"
     )
+    reply_cache_faq: List[str] = Field(
+        default_factory=list,
+        description="FAQ питання, відповіді RAG на які кешуються (і на схожі формулювання)"
+    )
     
     @field_validator('rag_api_key', 'rag_token', mode='before')
     @classmethod
@@ -52,6 +56,14 @@ class AISettingsBase(BaseModel):
             return []
         return [ch for ch in v if ch in valid_channels]
     
+    @field_validator('reply_cache_faq', mode='before')
+    @classmethod
+    def validate_faq(cls, v):
+        """Порожні рядки і не-список - без FAQ"""
+        if not isinstance(v, list):
+            return []
+        return [str(q).strip() for q in v if q and str(q).strip()]
+    
     @field_validator('rag_api_url')
     @classmethod
     def validate_url(cls, v):
@@ -74,6 +86,7 @@ class AISettingsUpdate(BaseModel):
     is_enabled: Optional[bool] = None
     trigger_delay_seconds: Optional[int] = Field(None, ge=0, le=300)
     active_channels: Optional[List[str]] = None
+    reply_cache_faq: Optional[List[str]] = None
     
     @field_validator('active_channels', mode='before')
     @classmethod
@@ -86,6 +99,16 @@ class AISettingsUpdate(BaseModel):
             return None
         return [ch for ch in v if ch in valid_channels]
     
+    @field_validator('reply_cache_faq', mode='before')
+    @classmethod
+    def validate_faq(cls, v):
+        """Порожні рядки відкидаються; None - без змін"""
+        if v is None:
+            return None
+        if not isinstance(v, list):
+            return None
+        return [str(q).strip() for q in v if q and str(q).strip()]
+    
     @field_validator('rag_api_url', mode='before')
     @classmethod
     def validate_url(cls, v):
@@ -130,3 +153,15 @@ class RAGMessageResponse(BaseModel):
     confidence: Optional[float] = Field(None, ge=0, le=1, description="Рівень впевненості")
     metadata: Optional[dict] = Field(None, description="Додаткові метадані")
 
+
+
+class ReplyCacheStats(BaseModel):
+    """Метрики кешу відповідей RAG"""
+    generation: int
+    hits_exact: int
+    hits_similar: int
+    misses: int
+    stores: int
+    invalidations: int
+    hit_rate: float
+    ttl_seconds: int
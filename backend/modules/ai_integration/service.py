@@ -1,10 +1,14 @@
 """
 AI Integration Service - Business logic for RAG integration
 """
+import asyncio
 import httpx
 import logging
+from types import SimpleNamespace
 from typing import Optional, Dict, Any
 from sqlalchemy.orm import Session
+from core.settings_cache import get_singleton
+from . import reply_cache
 from .models import AISettings
 from .schemas import RAGMessageRequest, RAGMessageResponse
 
@@ -17,13 +21,16 @@ class AIService:
     def __init__(self, db: Session):
         self.db = db
     
-    def get_settings(self) -> Optional[AISettings]:
-        """Отримати налаштування AI (завжди одна запис)"""
-        return self.db.query(AISettings).first()
+    def get_settings(self) -> Optional[SimpleNamespace]:
+        """
+        Налаштування AI (завжди один запис) з кешу налаштувань - тільки для читання.
+        Для змін - get_or_create_settings().
+        """
+        return get_singleton("ai")
     
     def get_or_create_settings(self) -> AISettings:
-        """Отримати або створити налаштування AI"""
-        settings = self.get_settings()
+        """Отримати або створити налаштування AI (ORM рядок у сесії сервісу)"""
+        settings = self.db.query(AISettings).first()
         if not settings:
             settings = AISettings()
             self.db.add(settings)
@@ -72,6 +79,16 @@ class AIService:
             logger.debug(f"Platform {platform} is not in active channels")
             return None
         
+        # Повторне питання - відповідь з кешу, без виклику RAG
+        scope = reply_cache.make_scope(platform, (context or {}).get("office_id"))
+        cached = await asyncio.to_thread(reply_cache.lookup, message, scope)
+        if cached:
+            return RAGMessageResponse(
+                reply=cached.reply,
+                confidence=cached.confidence,
+                metadata={**(cached.metadata or {}), "cache": cached.match, "similarity": cached.similarity}
+            )
+        
         if not settings.rag_api_key:
             logger.warning("RAG API key is not configured")
             return None
@@ -97,11 +114,16 @@ class AIService:
                 
                 data = response.json()
                 
-                return RAGMessageResponse(
+                result = RAGMessageResponse(
                     reply=data.get("reply", ""),
                     confidence=data.get("confidence"),
                     metadata=data.get("metadata")
                 )
+                await asyncio.to_thread(
+                    reply_cache.store, message, scope, result.reply, result.confidence, result.metadata,
+                    getattr(settings, "reply_cache_faq", None) or (),
+                )
+                return result
         
         except httpx.HTTPError as e:
             logger.error(f"HTTP error when calling RAG API: {e}")
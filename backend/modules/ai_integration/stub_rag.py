@@ -0,0 +1,91 @@
+"""
+Локальний stand-in RAG сервер для розробки та тестів.
+
+Реалізує той самий контракт, що й зовнішній RAG (POST {rag_api_url}/chat),
+і відповідає з FAQ файлу (JSON: [{"question": ..., "reply": ...}]) за
+найближчим питанням або шаблонною відповіддю. GET /stats - кількість
+викликів /chat (перевірка, що повторні питання йдуть з кешу).
+
+Запуск:
+    python -m modules.ai_integration.stub_rag --port 8765 --faq faq.json --delay 0.5
+і в налаштуваннях AI: rag_api_url = http://localhost:8765, rag_api_key - будь-який.
+"""
+import argparse
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Header, HTTPException
+from pydantic import BaseModel
+
+from .reply_cache import QuestionIndex, normalize_question
+
+DEFAULT_FAQ = [
+    {
+        "question": "які у вас години роботи",
+        "reply": "Ми працюємо з понеділка по п'ятницю з 9:00 до 17:00.",
+    },
+    {
+        "question": "скільки коштує присяжний переклад свідоцтва про народження",
+        "reply": "Присяжний переклад свідоцтва про народження - від 120 zł, термін 1-2 робочі дні.",
+    },
+]
+
+FALLBACK_REPLY = "Дякуємо за повідомлення! Менеджер відповість найближчим часом."
+
+# Нижче цього порогу питання вважається невідомим
+MATCH_THRESHOLD = 0.5
+
+
+class ChatRequest(BaseModel):
+    message: str
+    conversation_id: Optional[str] = None
+    platform: Optional[str] = None
+    context: Dict[str, Any] = {}
+
+
+def create_app(faq: Optional[List[Dict[str, str]]] = None, delay: float = 0.0, api_key: Optional[str] = None) -> FastAPI:
+    faq = faq or DEFAULT_FAQ
+    replies = {str(index): item["reply"] for index, item in enumerate(faq)}
+    index = QuestionIndex({str(i): normalize_question(item["question"]) for i, item in enumerate(faq)})
+    calls = {"chat": 0}
+
+    app = FastAPI(title="Stub RAG")
+
+    @app.post("/chat")
+    async def chat(request: ChatRequest, authorization: Optional[str] = Header(None)):
+        if api_key and authorization != f"Bearer {api_key}":
+            raise HTTPException(status_code=401, detail="Invalid API key")
+        calls["chat"] += 1
+        if delay:
+            await asyncio.sleep(delay)
+        key, score = index.best_match(normalize_question(request.message))
+        if key is not None and score >= MATCH_THRESHOLD:
+            return {"reply": replies[key], "confidence": round(score, 4), "metadata": {"stub": True, "cacheable": True}}
+        return {"reply": FALLBACK_REPLY, "confidence": 0.3, "metadata": {"stub": True, "cacheable": False}}
+
+    @app.get("/stats")
+    async def stats():
+        return calls
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Локальний stand-in RAG сервер")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--faq", type=Path, default=None, help="JSON: [{\"question\": ..., \"reply\": ...}]")
+    parser.add_argument("--delay", type=float, default=0.0, help="Штучна затримка відповіді, секунди")
+    parser.add_argument("--api-key", default=None, help="Перевіряти Authorization: Bearer <key>")
+    args = parser.parse_args()
+
+    faq_items = json.loads(args.faq.read_text(encoding="utf-8")) if args.faq else None
+    uvicorn.run(create_app(faq_items, args.delay, args.api_key), host=args.host, port=args.port)
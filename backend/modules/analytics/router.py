@@ -1,11 +1,18 @@
 """
 Analytics routes - dashboards and reports endpoints.
 """
-from fastapi import APIRouter, Depends
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from core.database import get_db
+from core.rbac import Scope, get_user_scopes
 from modules.auth.dependencies import get_current_user_db
+from modules.crm.models import Client
+from modules.finance.rollups import REVENUE_STATUSES, SOURCE_ORDER, SOURCE_TRANSACTION, query_rollups
 import models
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
@@ -13,16 +20,41 @@ router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 @router.get("/dashboard")
 def get_dashboard(
+    date_from: Optional[date] = Query(None, description="За замовчуванням останні 30 днів"),
+    date_to: Optional[date] = Query(None),
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user_db),
 ):
-    """Get dashboard data."""
-    # TODO: Implement dashboard metrics
-    return {
-        "metrics": {
-            "clients": 0,
-            "orders": 0,
-            "revenue": 0,
-        }
+    """
+    Get dashboard data.
+
+    orders / revenue беруться з finance_daily_rollups; менеджери без
+    CRM_VIEW_ALL бачать тільки свої замовлення та виручку.
+    """
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=29)
+
+    user_scopes = get_user_scopes(user)
+    see_all = Scope.CRM_VIEW_ALL in user_scopes or Scope.ADMIN_ALL in user_scopes
+    manager_id = None if see_all else user.id
+
+    orders = query_rollups(db, SOURCE_ORDER, date_from, date_to, manager_id=manager_id)[0]
+    metrics = {
+        "orders": orders.tx_count,
+        "orders_amount": float(orders.amount),
     }
+    if see_all:
+        metrics["clients"] = db.query(func.count(Client.id)).scalar()
+    if Scope.FINANCE_VIEW_REVENUE in user_scopes or see_all:
+        revenue = query_rollups(
+            db, SOURCE_TRANSACTION, date_from, date_to,
+            manager_id=manager_id,
+            statuses=REVENUE_STATUSES,
+        )[0]
+        metrics["revenue"] = float(revenue.amount)
 
+    return {
+        "date_from": date_from.isoformat(),
+        "date_to": date_to.isoformat(),
+        "metrics": metrics,
+    }
@@ -0,0 +1,170 @@
+"""
+Autobot log sink - буферизований запис логів бота.
+
+record() тільки кладе запис у буфер процесу (без запитів і commit у шляху
+обробки повідомлення). Фоновий потік скидає буфер батчами - одним
+multi-row INSERT у autobot_logs і одним upsert лічильників autobot_daily_stats
+в одній транзакції:
+- кожні SINK_FLUSH_INTERVAL_SECONDS або одразу, коли набралось SINK_BATCH_SIZE;
+- при завершенні процесу (atexit, у Celery - worker_process_shutdown).
+
+Якщо БД недоступна, батч повертається в буфер; буфер обмежений
+SINK_MAX_BUFFER записами - найстаріші відкидаються з попередженням у лог.
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import insert, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from .log_stats import STATS_LOCK_KEY, ensure_partitions, month_start, stats_day
+from .models import AutobotDailyStat, AutobotLog
+
+logger = logging.getLogger(__name__)
+
+SINK_BATCH_SIZE = 200
+SINK_FLUSH_INTERVAL_SECONDS = 2.0
+SINK_MAX_BUFFER = 10_000
+
+
+class _LogSink:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._buffer: List[Dict] = []
+        self._dropped = 0
+        self._worker_pid: Optional[int] = None
+
+    def record(self, entry: Dict) -> None:
+        self._ensure_worker()
+        with self._lock:
+            if len(self._buffer) >= SINK_MAX_BUFFER:
+                self._buffer.pop(0)
+                self._dropped += 1
+            self._buffer.append(entry)
+            size = len(self._buffer)
+        if size >= SINK_BATCH_SIZE:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Записати все з буфера. Returns: кількість записаних логів."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = self._buffer[:SINK_BATCH_SIZE]
+                    del self._buffer[:SINK_BATCH_SIZE]
+                    dropped, self._dropped = self._dropped, 0
+                if dropped:
+                    logger.warning(f"Autobot log sink buffer overflow: dropped {dropped} entries")
+                if not batch:
+                    return written
+                try:
+                    _write_batch(batch)
+                except Exception as e:
+                    logger.error(f"Autobot log sink: failed to write {len(batch)} entries: {e}")
+                    with self._lock:
+                        self._buffer[:0] = batch
+                        overflow = len(self._buffer) - SINK_MAX_BUFFER
+                        if overflow > 0:
+                            del self._buffer[:overflow]
+                            self._dropped += overflow
+                    return written
+                written += len(batch)
+
+    def _ensure_worker(self) -> None:
+        pid = os.getpid()
+        if self._worker_pid == pid:
+            return
+        with self._lock:
+            if self._worker_pid == pid:
+                return
+            if self._worker_pid is not None:
+                # Після fork буфер належить батьківському процесу - він його і запише
+                self._buffer = []
+            self._worker_pid = pid
+            thread = threading.Thread(target=self._run, name="autobot-log-sink", daemon=True)
+            thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(SINK_FLUSH_INTERVAL_SECONDS)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Autobot log sink flush failed: {e}", exc_info=True)
+
+
+def _write_batch(batch: List[Dict]) -> None:
+    from core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        ensure_partitions(db, [month_start(entry["created_at"].astimezone(timezone.utc).date()) for entry in batch])
+
+        counters = Counter(
+            (stats_day(entry["created_at"]), entry["office_id"], entry["action_taken"], entry["success"])
+            for entry in batch
+        )
+        stats = pg_insert(AutobotDailyStat).values([
+            {"day": day, "office_id": office_id, "action_taken": action, "success": success, "count": count}
+            for (day, office_id, action, success), count in counters.items()
+        ])
+        stats = stats.on_conflict_do_update(
+            index_elements=[AutobotDailyStat.day, AutobotDailyStat.office_id,
+                            AutobotDailyStat.action_taken, AutobotDailyStat.success],
+            set_={"count": AutobotDailyStat.count + stats.excluded.count},
+        )
+
+        db.execute(text("SELECT pg_advisory_xact_lock_shared(:key)"), {"key": STATS_LOCK_KEY})
+        db.execute(insert(AutobotLog.__table__), batch)
+        db.execute(stats)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+_sink = _LogSink()
+atexit.register(_sink.flush)
+
+
+def record_log(
+    settings_id: int,
+    office_id: int,
+    message_id: Optional[str],
+    action_taken: str,
+    success: bool,
+    client_id: Optional[UUID] = None,
+    order_id: Optional[UUID] = None,
+    error_message: Optional[str] = None,
+    meta_data: Optional[dict] = None,
+) -> None:
+    """Поставити лог дії бота в чергу на запис (час події фіксується зараз)."""
+    _sink.record({
+        "settings_id": settings_id,
+        "office_id": office_id,
+        "message_id": message_id,
+        "client_id": client_id,
+        "order_id": order_id,
+        "action_taken": action_taken,
+        "success": success,
+        "error_message": error_message,
+        "meta_data": meta_data,
+        "created_at": datetime.now(timezone.utc),
+    })
+
+
+def flush_logs() -> int:
+    """Синхронно записати буфер (завершення процесу, тести, CLI)."""
+    return _sink.flush()
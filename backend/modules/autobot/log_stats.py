@@ -0,0 +1,225 @@
+"""
+Autobot logs - місячні партиції, retention та денні агрегати.
+
+autobot_logs партиціонована по created_at (RANGE, партиція на місяць з
+межами в UTC, назва autobot_logs_YYYYMM):
+- ensure_partitions створює партиції наперед (beat задача + log_sink перед
+  записом батчу в новий місяць);
+- drop_expired_partitions видаляє партиції, старші за
+  AUTOBOT_LOG_RETENTION_MONTHS, - цілою таблицею, без DELETE по рядках.
+
+autobot_daily_stats - лічильники (день офісу, офіс, дія, успіх). log_sink
+збільшує їх у тій самій транзакції, що й вставка батчу логів, тож агрегати
+переживають видалення партицій. rebuild_stats перераховує дні з логів
+(backfill / виправлення).
+"""
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Set
+
+import pytz
+from sqlalchemy import Date, and_, cast, delete, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from .models import AutobotDailyStat, AutobotLog
+from .working_calendar import OFFICE_TIMEZONE
+
+logger = logging.getLogger(__name__)
+
+LOG_TABLE = "autobot_logs"
+PARTITION_PREFIX = f"{LOG_TABLE}_"
+
+# Скільки місяців наперед тримати готові партиції
+PARTITIONS_AHEAD = 2
+
+# Спільний ключ advisory lock: запис батчу бере shared, rebuild_stats - exclusive
+STATS_LOCK_KEY = 728_341_002
+
+ACTION_AUTO_REPLY = "auto_reply"
+ACTION_AI_REPLY = "ai_reply"
+ACTION_CLIENT_CREATED = "client_created"
+ACTION_ORDER_CREATED = "order_created"
+ACTION_FILE_SAVED = "file_saved"
+
+# Місяці, партиції яких цей процес уже перевірив
+_known_months: Set[date] = set()
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITION_PREFIX}{month:%Y%m}"
+
+
+def stats_day(created_at: datetime) -> date:
+    """День офісу, до якого належить лог."""
+    return created_at.astimezone(pytz.timezone(OFFICE_TIMEZONE)).date()
+
+
+def _is_partitioned(db: Session) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    relkind = db.execute(
+        text("SELECT relkind FROM pg_class WHERE relname = :name AND relkind IN ('p', 'r')"),
+        {"name": LOG_TABLE},
+    ).scalar()
+    return relkind == "p"
+
+
+def ensure_partitions(db: Session, months: Optional[List[date]] = None) -> List[str]:
+    """
+    Створити відсутні партиції: для вказаних місяців або для поточного
+    і PARTITIONS_AHEAD наступних. Нічого не робить, якщо таблиця ще не
+    партиціонована (міграція partition_autobot_logs.sql не застосована).
+
+    Returns:
+        Назви партицій, які перевірено / створено
+    """
+    if months is None:
+        current = month_start(datetime.now(timezone.utc).date())
+        months = [add_months(current, offset) for offset in range(PARTITIONS_AHEAD + 1)]
+    months = sorted({month_start(month) for month in months} - _known_months)
+    if not months or not _is_partitioned(db):
+        return []
+    names = []
+    for month in months:
+        name = partition_name(month)
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {LOG_TABLE} "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+        ))
+        names.append(name)
+    db.commit()
+    _known_months.update(months)
+    return names
+
+
+def list_partitions(db: Session) -> List[str]:
+    return list(db.execute(text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = :name
+        ORDER BY c.relname
+    """), {"name": LOG_TABLE}).scalars())
+
+
+def drop_expired_partitions(db: Session, retention_months: int) -> List[str]:
+    """
+    Видалити партиції місяців, що закінчились раніше ніж retention_months
+    місяців тому (поточний місяць не рахується).
+
+    Returns:
+        Назви видалених партицій
+    """
+    if retention_months < 1 or not _is_partitioned(db):
+        return []
+    cutoff = add_months(month_start(datetime.now(timezone.utc).date()), -retention_months)
+    dropped = []
+    for name in list_partitions(db):
+        suffix = name[len(PARTITION_PREFIX):]
+        if not name.startswith(PARTITION_PREFIX) or len(suffix) != 6 or not suffix.isdigit():
+            continue
+        month = date(int(suffix[:4]), int(suffix[4:]), 1)
+        if month < cutoff:
+            db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            dropped.append(name)
+            _known_months.discard(month)
+    db.commit()
+    return dropped
+
+
+def rebuild_stats(db: Session, date_from: date, date_to: date) -> int:
+    """
+    Перерахувати autobot_daily_stats за дні [date_from, date_to] з autobot_logs.
+    Дні, логи яких уже видалені retention, перераховувати не можна - вони обнуляться.
+
+    Returns:
+        Кількість записаних рядків агрегатів
+    """
+    day = cast(func.timezone(OFFICE_TIMEZONE, AutobotLog.created_at), Date)
+    # Запас у добу з кожного боку - межі дня офісу не збігаються з UTC
+    created_from = datetime.combine(date_from - timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+    created_to = datetime.combine(date_to + timedelta(days=2), datetime.min.time(), tzinfo=timezone.utc)
+    try:
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": STATS_LOCK_KEY})
+        db.execute(delete(AutobotDailyStat).where(
+            AutobotDailyStat.day >= date_from, AutobotDailyStat.day <= date_to,
+        ))
+        written = db.execute(insert(AutobotDailyStat).from_select(
+            [AutobotDailyStat.day, AutobotDailyStat.office_id, AutobotDailyStat.action_taken,
+             AutobotDailyStat.success, AutobotDailyStat.count],
+            select(day, AutobotLog.office_id, AutobotLog.action_taken, AutobotLog.success, func.count())
+            .where(
+                AutobotLog.created_at >= created_from,
+                AutobotLog.created_at < created_to,
+                day >= date_from,
+                day <= date_to,
+            )
+            .group_by(day, AutobotLog.office_id, AutobotLog.action_taken, AutobotLog.success),
+        )).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return written
+
+
+def query_stats(db: Session, date_from: date, date_to: date, office_id: Optional[int] = None) -> List:
+    """
+    Денна статистика по офісах: надіслані відповіді (AI / статичні), помилки,
+    створені клієнти та замовлення, збереження файлів.
+    """
+    count = AutobotDailyStat.count
+    action = AutobotDailyStat.action_taken
+    succeeded = AutobotDailyStat.success.is_(True)
+
+    def total(*conditions):
+        return func.coalesce(func.sum(count).filter(and_(*conditions)), 0)
+
+    query = (
+        select(
+            AutobotDailyStat.day,
+            AutobotDailyStat.office_id,
+            total(succeeded, action.in_((ACTION_AUTO_REPLY, ACTION_AI_REPLY))).label("replies_sent"),
+            total(succeeded, action == ACTION_AI_REPLY).label("ai_replies"),
+            total(succeeded, action == ACTION_AUTO_REPLY).label("static_replies"),
+            total(AutobotDailyStat.success.is_(False)).label("failures"),
+            total(succeeded, action == ACTION_CLIENT_CREATED).label("clients_created"),
+            total(succeeded, action == ACTION_ORDER_CREATED).label("orders_created"),
+            total(succeeded, action == ACTION_FILE_SAVED).label("file_saves"),
+        )
+        .where(AutobotDailyStat.day >= date_from, AutobotDailyStat.day <= date_to)
+        .group_by(AutobotDailyStat.day, AutobotDailyStat.office_id)
+        .order_by(AutobotDailyStat.day, AutobotDailyStat.office_id)
+    )
+    if office_id is not None:
+        query = query.where(AutobotDailyStat.office_id == office_id)
+    return db.execute(query).all()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from core.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Перерахувати autobot_daily_stats за період")
+    parser.add_argument("--since", type=date.fromisoformat, required=True, help="YYYY-MM-DD")
+    parser.add_argument("--until", type=date.fromisoformat, default=None, help="YYYY-MM-DD (за замовчуванням сьогодні)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        written = rebuild_stats(db, args.since, args.until or datetime.now(timezone.utc).date())
+        logger.info(f"Rebuilt autobot stats: {written} rows")
+    finally:
+        db.close()
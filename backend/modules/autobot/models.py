@@ -73,8 +73,9 @@ https://www.tlumaczeniamt.pl/cennik/
     
     # Relationships
     office: Mapped["Office"] = relationship("Office", back_populates="autobot_settings", lazy="joined")
-    holidays: Mapped[list["AutobotHoliday"]] = relationship("AutobotHoliday", back_populates="settings", cascade="all, delete-orphan", lazy="selectin")
-    logs: Mapped[list["AutobotLog"]] = relationship("AutobotLog", back_populates="settings", lazy="selectin")
+    holidays: Mapped[list["AutobotHoliday"]] = relationship("AutobotHoliday", back_populates="settings", cascade="all, delete-orphan", lazy="select")
+    # Історія логів росте необмежено - ніколи не вантажиться разом з налаштуваннями
+    logs: Mapped[list["AutobotLog"]] = relationship("AutobotLog", back_populates="settings", lazy="raise", passive_deletes=True)
 
 
 class AutobotHoliday(Base):
@@ -91,21 +92,28 @@ class AutobotHoliday(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Relationships
-    settings: Mapped["AutobotSettings"] = relationship("AutobotSettings", back_populates="holidays", lazy="joined")
+    settings: Mapped["AutobotSettings"] = relationship("AutobotSettings", back_populates="holidays", lazy="select")
 
 
 class AutobotLog(Base):
-    """Лог роботи бота"""
+    """
+    Лог роботи бота.
+
+    Таблиця партиціонована по місяцях (created_at), тому created_at входить
+    у первинний ключ. Рядки пишуться батчами через log_sink, старі партиції
+    видаляє retention задача; статистика читається з AutobotDailyStat.
+    """
     __tablename__ = "autobot_logs"
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    settings_id: Mapped[int] = mapped_column(Integer, ForeignKey("autobot_settings.id"), nullable=False, index=True)
-    office_id: Mapped[int] = mapped_column(Integer, ForeignKey("offices.id"), nullable=False, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True, index=True)
+    settings_id: Mapped[int] = mapped_column(Integer, ForeignKey("autobot_settings.id", ondelete="CASCADE"), nullable=False, index=True)
+    office_id: Mapped[int] = mapped_column(Integer, ForeignKey("offices.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Деталі
     message_id: Mapped[str | None] = mapped_column(String(255), nullable=True, index=True)  # ID вхідного повідомлення
-    client_id: Mapped[UUID | None] = mapped_column(ForeignKey("crm_clients.id"), nullable=True, index=True)
-    order_id: Mapped[UUID | None] = mapped_column(ForeignKey("crm_orders.id"), nullable=True, index=True)
+    client_id: Mapped[UUID | None] = mapped_column(ForeignKey("crm_clients.id", ondelete="SET NULL"), nullable=True, index=True)
+    order_id: Mapped[UUID | None] = mapped_column(ForeignKey("crm_orders.id", ondelete="SET NULL"), nullable=True, index=True)
     
     # Дії
     action_taken: Mapped[str] = mapped_column(String(100), nullable=False, index=True)  # 'auto_reply', 'client_created', 'order_created', 'file_saved'
@@ -117,7 +125,7 @@ class AutobotLog(Base):
         JSON().with_variant(JSONB, "postgresql"),
         nullable=True,
     )
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True, server_default=func.now(), nullable=False, index=True)
     
     # Relationships
     settings: Mapped["AutobotSettings"] = relationship("AutobotSettings", back_populates="logs", lazy="joined")
@@ -125,3 +133,20 @@ class AutobotLog(Base):
     client: Mapped["Client | None"] = relationship("Client", lazy="joined")
     order: Mapped["Order | None"] = relationship("Order", lazy="joined")
 
+
+
+class AutobotDailyStat(Base):
+    """
+    Денні агрегати логів бота по офісу, дії та результату.
+
+    Оновлюються інкрементально разом з кожним батчем логів (log_sink),
+    перераховуються з autobot_logs командою python -m modules.autobot.log_stats.
+    День - за часом офісу (Europe/Warsaw).
+    """
+    __tablename__ = "autobot_daily_stats"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    office_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    action_taken: Mapped[str] = mapped_column(String(100), primary_key=True)
+    success: Mapped[bool] = mapped_column(Boolean, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime, timedelta
 import pytz
 
 from core.database import get_db
@@ -15,9 +15,12 @@ from .schemas import (
     HolidayCreate,
     HolidayResponse,
     AutobotStatusResponse,
+    AutobotDayStats,
+    AutobotStatsResponse,
     WorkingHours
 )
 from .models import AutobotSettings
+from .log_stats import query_stats
 
 router = APIRouter(prefix="/autobot", tags=["autobot"])
 
@@ -98,18 +101,46 @@ def get_autobot_status(
 ):
     """Отримати поточний статус бота"""
     service = AutobotService(db)
-    is_working, reason = service.is_working_hours(office_id)
-    
     now = datetime.now(pytz.timezone('Europe/Warsaw'))
+    is_working, reason = service.is_working_hours(office_id, now)
+    
+    next_opening = None
+    if not is_working:
+        next_opening = service.next_working_time(office_id, now)
     
     return AutobotStatusResponse(
         is_working_hours=is_working,
         current_time=now.strftime("%H:%M:%S"),
-        next_working_period=None,  # TODO: Розрахувати наступний робочий період
+        next_working_period=next_opening.isoformat() if next_opening else None,
         message=reason
     )
 
 
+@router.get("/stats", response_model=AutobotStatsResponse)
+def get_autobot_stats(
+    date_from: Optional[date] = Query(None, description="Початок періоду (за замовчуванням 30 днів тому)"),
+    date_to: Optional[date] = Query(None, description="Кінець періоду включно (за замовчуванням сьогодні)"),
+    office_id: Optional[int] = Query(None),
+    db: Session = Depends(get_db),
+    user: auth_models.User = Depends(get_current_user_db)
+):
+    """Денна статистика бота по офісах (з агрегатів, без читання логів)"""
+    date_to = date_to or datetime.now(pytz.timezone('Europe/Warsaw')).date()
+    date_from = date_from or date_to - timedelta(days=29)
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from must be before date_to"
+        )
+    
+    rows = query_stats(db, date_from, date_to, office_id)
+    return AutobotStatsResponse(
+        date_from=date_from,
+        date_to=date_to,
+        days=[AutobotDayStats(**row._mapping) for row in rows]
+    )
+
+
 @router.post("/holidays", response_model=HolidayResponse)
 def add_holiday(
     holiday: HolidayCreate,
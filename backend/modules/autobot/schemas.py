@@ -91,3 +91,22 @@ class AutobotStatusResponse(BaseModel):
     next_working_period: Optional[str] = None
     message: str
 
+
+
+class AutobotDayStats(BaseModel):
+    """Статистика бота за день по офісу"""
+    day: date
+    office_id: int
+    replies_sent: int
+    ai_replies: int
+    static_replies: int
+    failures: int
+    clients_created: int
+    orders_created: int
+    file_saves: int
+
+
+class AutobotStatsResponse(BaseModel):
+    date_from: date
+    date_to: date
+    days: List[AutobotDayStats]
@@ -1,11 +1,11 @@
-from datetime import datetime, time, date
+from datetime import datetime, time
 from typing import Optional, List, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
 from uuid import UUID, uuid4
-import pytz
 
-from .models import AutobotSettings, AutobotHoliday, AutobotLog
+from .models import AutobotSettings, AutobotHoliday
+from .log_sink import record_log
+from .working_calendar import REASON_DISABLED, get_office_calendar
 from .schemas import AutobotSettingsCreate, AutobotSettingsUpdate, HolidayCreate
 from ..crm.models import Client, Order, ClientSource, OrderStatus, Office
 from ..communications.models import Message
@@ -134,69 +134,26 @@ class AutobotService:
         check_time: Optional[datetime] = None
     ) -> Tuple[bool, str]:
         """
-        Перевірити чи зараз робочі години
+        Перевірити чи зараз робочі години (за скомпільованим календарем офісу)
         
         Returns:
             Tuple[bool, str]: (чи робочі години, причина)
         """
-        settings = self.get_settings(office_id)
-        if not settings or not settings.enabled:
-            return True, "Бот вимкнено"
-        
-        # Використовуємо поточний час або переданий
-        now = check_time or datetime.now(pytz.timezone('Europe/Warsaw'))
-        current_date = now.date()
-        current_time = now.time()
-        weekday = now.weekday()  # 0 = Monday
-        
-        # Перевірка на свято
-        if self._is_holiday(settings.id, current_date):
-            return False, "Сьогодні неробочий день (свято)"
-        
-        # Отримати робочі години для поточного дня
-        day_names = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
-        day_name = day_names[weekday]
-        
-        start_time = getattr(settings, f"{day_name}_start")
-        end_time = getattr(settings, f"{day_name}_end")
-        
-        # Якщо не задано робочі години для цього дня
-        if not start_time or not end_time:
-            return False, "Сьогодні неробочий день"
-        
-        # Перевірка часу
-        if start_time <= current_time <= end_time:
-            return True, "Робочий час"
-        
-        return False, "Зараз неробочий час"
+        calendar = get_office_calendar(self.db, office_id)
+        if not calendar:
+            return True, REASON_DISABLED
+        return calendar.is_open(check_time)
     
-    def _is_holiday(self, settings_id: int, check_date: date) -> bool:
-        """Перевірити чи є дата святом"""
-        # Точна дата
-        exact_match = self.db.query(AutobotHoliday).filter(
-            and_(
-                AutobotHoliday.settings_id == settings_id,
-                AutobotHoliday.date == check_date
-            )
-        ).first()
-        
-        if exact_match:
-            return True
-        
-        # Щорічне свято (день і місяць співпадають)
-        # Отримуємо всі щорічні свята і перевіряємо в Python
-        recurring_holidays = self.db.query(AutobotHoliday).filter(
-            and_(
-                AutobotHoliday.settings_id == settings_id,
-                AutobotHoliday.is_recurring == True
-            )
-        ).all()
-        
-        for holiday in recurring_holidays:
-            if holiday.date.month == check_date.month and holiday.date.day == check_date.day:
-                return True
-        
-        return False
+    def next_working_time(
+        self,
+        office_id: int,
+        check_time: Optional[datetime] = None
+    ) -> Optional[datetime]:
+        """Початок найближчого робочого періоду (None - автобот не налаштований або немає робочих днів)"""
+        calendar = get_office_calendar(self.db, office_id)
+        if not calendar:
+            return None
+        return calendar.next_opening(check_time)
     
     def add_holiday(
         self, 
@@ -260,15 +217,15 @@ class AutobotService:
             "order_id": None
         }
         
-        settings = self.get_settings(office_id)
-        if not settings or not settings.enabled:
-            return result
-        
-        # Перевірка робочих годин
+        # Перевірка робочих годин (без запиту налаштувань у робочий час)
         is_working, reason = self.is_working_hours(office_id)
         
         if is_working:
-            # Робочий час - нічого не робимо
+            # Робочий час або бот вимкнено - нічого не робимо
+            return result
+        
+        settings = self.get_settings(office_id)
+        if not settings or not settings.enabled:
             return result
         
         # Неробочий час - активуємо бота
@@ -621,8 +578,8 @@ class AutobotService:
         error_message: Optional[str] = None,
         meta_data: Optional[dict] = None
     ):
-        """Записати лог дії бота"""
-        log_entry = AutobotLog(
+        """Записати лог дії бота (буферизовано, без commit сесії)"""
+        record_log(
             settings_id=settings_id,
             office_id=office_id,
             message_id=message_id,
@@ -633,7 +590,3 @@ class AutobotService:
             error_message=error_message,
             meta_data=meta_data
         )
-        
-        self.db.add(log_entry)
-        self.db.commit()
-
@@ -0,0 +1,184 @@
+"""
+Календар робочих годин офісів для автобота.
+
+Календар офісу компілюється з autobot_settings та autobot_holidays один раз:
+- тиждень - 7 пар (початок, кінець) або None для неробочого дня;
+- точні свята - множина дат, щорічні - множина (місяць, день).
+
+Перевірка "чи відкрито офіс у момент T" - індекс дня тижня + пошук у
+множинах, без запитів до БД. Календарі всіх офісів завантажуються двома
+колонковими запитами (без ORM об'єктів, тож без holidays / logs) і
+тримаються в пам'яті процесу.
+
+Інвалідація - через settings cache: autobot_settings та autobot_holidays
+входять у WATCHED_TABLES, тож commit зміни інвалідує календарі в усіх
+процесах (див. core.settings_cache.settings_generation).
+"""
+import threading
+import time as monotonic_time
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, FrozenSet, Optional, Tuple
+
+import pytz
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from core.settings_cache import SETTINGS_MAX_AGE_SECONDS, settings_generation
+from .models import AutobotHoliday, AutobotSettings
+
+# Усі офіси працюють за варшавським часом
+OFFICE_TIMEZONE = "Europe/Warsaw"
+
+DAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+REASON_DISABLED = "Бот вимкнено"
+REASON_HOLIDAY = "Сьогодні неробочий день (свято)"
+REASON_DAY_OFF = "Сьогодні неробочий день"
+REASON_CLOSED = "Зараз неробочий час"
+REASON_OPEN = "Робочий час"
+
+
+@dataclass(frozen=True)
+class OfficeCalendar:
+    office_id: int
+    settings_id: int
+    enabled: bool
+    timezone: str
+    # Індекс = weekday() (0 = понеділок)
+    week: Tuple[Optional[Tuple[time, time]], ...]
+    holidays: FrozenSet[date]
+    recurring_holidays: FrozenSet[Tuple[int, int]]
+
+    def local_time(self, at: Optional[datetime] = None) -> datetime:
+        """Момент у часовому поясі офісу (naive час вважається вже локальним)."""
+        tz = pytz.timezone(self.timezone)
+        if at is None:
+            return datetime.now(tz)
+        if at.tzinfo is None:
+            return tz.localize(at)
+        return at.astimezone(tz)
+
+    def is_holiday(self, day: date) -> bool:
+        return day in self.holidays or (day.month, day.day) in self.recurring_holidays
+
+    def hours_for(self, day: date) -> Optional[Tuple[time, time]]:
+        """Робочі години дня або None (вихідний / свято)."""
+        if self.is_holiday(day):
+            return None
+        return self.week[day.weekday()]
+
+    def is_open(self, at: Optional[datetime] = None) -> Tuple[bool, str]:
+        """
+        Чи робочий час у момент at.
+
+        Returns:
+            Tuple[bool, str]: (чи робочі години, причина)
+        """
+        if not self.enabled:
+            return True, REASON_DISABLED
+        now = self.local_time(at)
+        if self.is_holiday(now.date()):
+            return False, REASON_HOLIDAY
+        hours = self.week[now.weekday()]
+        if hours is None:
+            return False, REASON_DAY_OFF
+        start, end = hours
+        if start <= now.time() <= end:
+            return True, REASON_OPEN
+        return False, REASON_CLOSED
+
+    def next_opening(self, at: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Найближчий початок робочого часу після at (у часовому поясі офісу).
+        None - якщо в тижні немає жодного робочого дня.
+        """
+        if not any(self.week):
+            return None
+        now = self.local_time(at)
+        tz = pytz.timezone(self.timezone)
+        # Кожне свято відсуває відкриття максимум на тиждень
+        max_days = 7 * (1 + len(self.holidays) + len(self.recurring_holidays))
+        day = now.date()
+        for offset in range(max_days + 1):
+            current = day + timedelta(days=offset)
+            hours = self.hours_for(current)
+            if hours is None:
+                continue
+            start = tz.localize(datetime.combine(current, hours[0]))
+            if start > now:
+                return start
+        return None
+
+
+class _CalendarCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calendars: Optional[Dict[int, OfficeCalendar]] = None
+        self._generation = -1
+        self._loaded_at = 0.0
+
+    def get(self, db: Session) -> Dict[int, OfficeCalendar]:
+        generation = settings_generation()
+        calendars = self._calendars
+        if calendars is not None and self._is_fresh(generation):
+            return calendars
+        with self._lock:
+            if self._calendars is None or not self._is_fresh(generation):
+                self._calendars = _load_calendars(db)
+                self._generation = generation
+                self._loaded_at = monotonic_time.monotonic()
+            return self._calendars
+
+    def _is_fresh(self, generation: int) -> bool:
+        return (
+            self._generation == generation
+            and monotonic_time.monotonic() - self._loaded_at < SETTINGS_MAX_AGE_SECONDS
+        )
+
+
+def _load_calendars(db: Session) -> Dict[int, OfficeCalendar]:
+    day_columns = []
+    for day_name in DAY_NAMES:
+        day_columns += [getattr(AutobotSettings, f"{day_name}_start"), getattr(AutobotSettings, f"{day_name}_end")]
+
+    settings_rows = db.execute(
+        select(AutobotSettings.id, AutobotSettings.office_id, AutobotSettings.enabled, *day_columns)
+    ).all()
+    holiday_rows = db.execute(
+        select(AutobotHoliday.settings_id, AutobotHoliday.date, AutobotHoliday.is_recurring)
+    ).all()
+
+    exact: Dict[int, set] = {}
+    recurring: Dict[int, set] = {}
+    for row in holiday_rows:
+        if row.is_recurring:
+            recurring.setdefault(row.settings_id, set()).add((row.date.month, row.date.day))
+        else:
+            exact.setdefault(row.settings_id, set()).add(row.date)
+
+    calendars = {}
+    for row in settings_rows:
+        values = row._mapping
+        week = []
+        for day_name in DAY_NAMES:
+            start, end = values[f"{day_name}_start"], values[f"{day_name}_end"]
+            week.append((start, end) if start and end else None)
+        calendars[row.office_id] = OfficeCalendar(
+            office_id=row.office_id,
+            settings_id=row.id,
+            enabled=row.enabled,
+            timezone=OFFICE_TIMEZONE,
+            week=tuple(week),
+            holidays=frozenset(exact.get(row.id, ())),
+            recurring_holidays=frozenset(recurring.get(row.id, ())),
+        )
+    return calendars
+
+
+_cache = _CalendarCache()
+
+
+def get_office_calendar(db: Session, office_id: int) -> Optional[OfficeCalendar]:
+    """Скомпільований календар офісу або None, якщо автобот не налаштований."""
+    return _cache.get(db).get(office_id)
@@ -116,9 +116,9 @@ def get_current_user_or_rag(
     # Спочатку перевіряємо X-RAG-TOKEN
     if x_rag_token:
         try:
-            # Перевіряємо RAG токен напряму
-            from modules.ai_integration.models import AISettings
-            ai_settings = db.query(AISettings).first()
+            # Перевіряємо RAG токен (з кешу налаштувань, без запиту до БД)
+            from core.settings_cache import get_singleton
+            ai_settings = get_singleton("ai")
             
             if ai_settings and ai_settings.rag_token and x_rag_token == ai_settings.rag_token:
                 logger.info("✅ Авторизація через X-RAG-TOKEN успішна")
@@ -200,6 +200,19 @@ class MessengerService(ABC):
         if conversation and not conversation.client_id and direction == MessageDirection.INBOUND:
             self._auto_create_client_from_conversation(conversation, metadata)
         
+        # AI відповідь - одна на серію повідомлень (див. ai_integration.debouncer)
+        if direction == MessageDirection.INBOUND and not is_from_me:
+            from modules.ai_integration.debouncer import schedule_ai_reply
+            schedule_ai_reply(
+                conversation_id=str(conversation_id),
+                platform=self.platform.value if hasattr(self.platform, "value") else str(self.platform),
+                content=content,
+                message_id=str(message.id),
+                # Час отримання сервером (не платформи) - з ним порівнюється
+                # Message.created_at відповідей менеджера (_manager_replied_since)
+                received_at=message.created_at,
+            )
+        
         return message
     
     def extract_client_info(self, sender_info: Dict[str, Any]) -> Dict[str, Any]:
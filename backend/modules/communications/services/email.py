@@ -20,6 +20,7 @@ from modules.communications.models import (
     MessageStatus,
     Conversation,
 )
+from core import metrics
 from modules.communications.services.base import MessengerService
 from modules.communications.models import Conversation
 from core.database import SessionLocal
@@ -69,6 +70,7 @@ class EmailService(MessengerService):
             "imap_port": int(os.getenv("IMAP_PORT", "993")),
         }
     
+    @metrics.observe_send
     async def send_message(
         self,
         conversation_id: UUID,
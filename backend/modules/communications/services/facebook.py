@@ -16,6 +16,7 @@ from modules.communications.models import (
     MessageStatus,
     Conversation,
 )
+from core import metrics
 from modules.communications.services.base import MessengerService
 
 
@@ -124,6 +125,7 @@ class FacebookService(MessengerService):
         time_diff = now - last_message_time
         return time_diff < timedelta(hours=24)
     
+    @metrics.observe_send
     async def send_message(
         self,
         conversation_id: UUID,
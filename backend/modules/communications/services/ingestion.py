@@ -0,0 +1,378 @@
+"""
+Inbound ingestion pipeline - спільний батчевий запис вхідних повідомлень.
+
+Лістенери (Telegram, Email IMAP, Matrix/WhatsApp) не пишуть у БД напряму,
+а передають нормалізовані InboundEvent у pipeline. Pipeline збирає події
+в мікро-батчі (за розміром або за таймером у кілька мілісекунд) і записує
+повідомлення, вкладення та оновлення розмов однією транзакцією з
+multi-row INSERT. Realtime-події публікуються тільки після commit.
+"""
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+import httpx
+from sqlalchemy import String, Integer, DateTime, bindparam, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from core import metrics
+from modules.communications.models import Attachment, Conversation, Message
+from modules.communications.utils.media import delete_media_file
+
+logger = logging.getLogger(__name__)
+
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "100"))
+INGEST_MAX_DELAY_MS = int(os.getenv("INGEST_MAX_DELAY_MS", "5"))
+
+PLATFORM_ICONS = {
+    'telegram': '✈️',
+    'whatsapp': '💬',
+    'email': '📧',
+    'instagram': '📷',
+    'facebook': '👥',
+}
+PLATFORM_NAMES = {
+    'telegram': 'Telegram',
+    'whatsapp': 'WhatsApp',
+    'email': 'Email',
+    'instagram': 'Instagram',
+    'facebook': 'Facebook',
+}
+
+Publisher = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+
+@dataclass
+class InboundEvent:
+    """Нормалізоване вхідне повідомлення від будь-якого лістенера."""
+    platform: str
+    external_id: str
+    content: str
+    msg_type: str = "text"
+    sender_name: Optional[str] = None
+    subject: Optional[str] = None
+    # Email: оновлювати subject існуючої розмови (Re:/Fwd:)
+    update_subject: bool = False
+    manager_smtp_account_id: Optional[int] = None
+    # JSON для communications_messages.attachments
+    attachments: Optional[List[Dict[str, Any]]] = None
+    # Рядки для communications_attachments (файл вже збережено на диск)
+    attachment_rows: List[Dict[str, Any]] = field(default_factory=list)
+    meta_data: Optional[Dict[str, Any]] = None
+    # Message-ID email / event_id Matrix - для дедуплікації
+    external_message_id: Optional[str] = None
+    # Скорочений текст для WebSocket нотифікації (за замовчуванням content)
+    preview: Optional[str] = None
+    message_id: UUID = field(default_factory=uuid4)
+    received_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    # Час повідомлення на платформі (дата Telegram, Date листа, origin_server_ts Matrix) - для метрики затримки
+    platform_at: Optional[datetime] = None
+
+
+def build_notification(event: InboundEvent, conv_id: str) -> Dict[str, Any]:
+    """Побудувати new_message нотифікацію у форматі, який очікує фронтенд."""
+    return {
+        "type": "new_message",
+        "conversation_id": conv_id,
+        "platform": event.platform,
+        "platform_icon": PLATFORM_ICONS.get(event.platform, '💬'),
+        "platform_name": PLATFORM_NAMES.get(event.platform, event.platform.title()),
+        "message": {
+            "id": str(event.message_id),
+            "conversation_id": conv_id,
+            "direction": "inbound",
+            "type": event.msg_type,
+            "content": event.preview if event.preview is not None else event.content,
+            "status": "sent",
+            "attachments": event.attachments,
+            "created_at": event.received_at.isoformat(),
+        },
+        "conversation": {
+            "id": conv_id,
+            "platform": event.platform,
+            "external_id": event.external_id,
+            "client_name": event.sender_name or event.external_id,
+        },
+    }
+
+
+def http_publisher(broadcast_url: str) -> Publisher:
+    """
+    Publisher для окремих процесів (telegram_listener, email_imap_listener):
+    один POST на broadcast-message з усім батчем замість запиту на кожне повідомлення.
+    """
+    async def publish(notifications: List[Dict[str, Any]]) -> None:
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                broadcast_url,
+                json={"type": "batch", "events": notifications},
+                timeout=5.0,
+            )
+            logger.info(f"WebSocket batch notification sent ({len(notifications)} events): {response.status_code}")
+
+    return publish
+
+
+def _schedule_ai_replies(written: List[Tuple[InboundEvent, str]]):
+    """Поставити вхідні повідомлення в серії AI відповідей (debouncer)."""
+    from modules.ai_integration.debouncer import schedule_ai_reply
+
+    for event, conv_id in written:
+        schedule_ai_reply(
+            conversation_id=conv_id,
+            platform=event.platform,
+            content=event.content,
+            message_id=str(event.message_id),
+            received_at=event.received_at,
+        )
+
+
+class InboundPipeline:
+    """
+    Мікро-батчер вхідних повідомлень.
+
+    Використання:
+        pipeline = InboundPipeline(SessionLocal, http_publisher(url))
+        await pipeline.start()
+        await pipeline.submit(InboundEvent(...))
+        ...
+        await pipeline.stop()
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        publish: Optional[Publisher] = None,
+        max_batch_size: int = INGEST_BATCH_SIZE,
+        max_delay_ms: int = INGEST_MAX_DELAY_MS,
+    ):
+        self._session_factory = session_factory
+        self._publish = publish
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Запустити фонову задачу запису."""
+        if self._task and not self._task.done():
+            return
+        self._queue = asyncio.Queue()
+        queue = self._queue
+        metrics.INBOUND_QUEUE_DEPTH.set_function(queue.qsize)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Inbound pipeline started (batch={self.max_batch_size}, delay={self.max_delay * 1000:.0f}ms)")
+
+    async def stop(self):
+        """Дописати чергу і зупинити фонову задачу."""
+        if not self._task:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        logger.info("Inbound pipeline stopped")
+
+    async def submit(self, event: InboundEvent):
+        """Додати подію в чергу. Не чекає на запис у БД."""
+        if not self._task:
+            await self.start()
+        await self._queue.put(event)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            event = await self._queue.get()
+            if event is None:
+                break
+            batch = [event]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if event is None:
+                    stopping = True
+                    break
+                batch.append(event)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[InboundEvent]):
+        try:
+            written = await asyncio.to_thread(self._write_batch, batch)
+        except Exception as e:
+            logger.error(f"Inbound batch of {len(batch)} failed: {e}", exc_info=True)
+            if len(batch) == 1:
+                return
+            # Один "поганий" рядок не повинен губити весь burst - пишемо по одному
+            written = []
+            for event in batch:
+                try:
+                    written.extend(await asyncio.to_thread(self._write_batch, [event]))
+                except Exception as single_error:
+                    logger.error(
+                        f"Dropping inbound {event.platform} message from {event.external_id}: {single_error}",
+                        exc_info=True,
+                    )
+
+        for event, _ in written:
+            metrics.observe_ingestion(event.platform, "db_commit", event.platform_at or event.received_at)
+
+        if written and self._publish:
+            try:
+                await self._publish([build_notification(event, conv_id) for event, conv_id in written])
+            except Exception as e:
+                logger.warning(f"Failed to publish {len(written)} inbound notifications: {e}")
+            else:
+                for event, _ in written:
+                    metrics.observe_ingestion(event.platform, "ws_push", event.platform_at or event.received_at)
+
+        if written:
+            await asyncio.to_thread(_schedule_ai_replies, written)
+
+    # ------------------------------------------------------------------
+    # DB write (runs in a worker thread)
+    # ------------------------------------------------------------------
+
+    def _write_batch(self, batch: List[InboundEvent]) -> List[Tuple[InboundEvent, str]]:
+        db = self._session_factory()
+        try:
+            with db.begin():
+                conv_ids = self._resolve_conversations(db, batch)
+                fresh = self._drop_duplicates(db, batch, conv_ids)
+                if fresh:
+                    self._insert_messages(db, fresh, conv_ids)
+                    self._update_conversations(db, fresh, conv_ids)
+        finally:
+            db.close()
+
+        logger.info(f"Inbound batch committed: {len(fresh)} messages ({len(batch) - len(fresh)} duplicates skipped)")
+        return [(event, str(conv_ids[(event.platform, event.external_id)])) for event in fresh]
+
+    def _resolve_conversations(self, db, batch: List[InboundEvent]) -> Dict[Tuple[str, str], UUID]:
+        """Знайти або створити розмови для всіх (platform, external_id) батчу двома запитами."""
+        conv = Conversation.__table__
+        first_by_key: Dict[Tuple[str, str], InboundEvent] = {}
+        for event in batch:
+            first_by_key.setdefault((event.platform, event.external_id), event)
+
+        def lookup(keys):
+            rows = db.execute(
+                select(conv.c.id, conv.c.platform, conv.c.external_id)
+                .where(tuple_(conv.c.platform, conv.c.external_id).in_(list(keys)))
+            )
+            return {(row.platform, row.external_id): row.id for row in rows}
+
+        conv_ids = lookup(first_by_key.keys())
+        missing = [key for key in first_by_key if key not in conv_ids]
+        if missing:
+            now = datetime.now(timezone.utc)
+            db.execute(
+                pg_insert(conv)
+                .values([
+                    {
+                        "id": uuid4(),
+                        "platform": platform,
+                        "external_id": external_id,
+                        "subject": first_by_key[(platform, external_id)].subject,
+                        "manager_smtp_account_id": first_by_key[(platform, external_id)].manager_smtp_account_id,
+                        "is_archived": False,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for platform, external_id in missing
+                ])
+                # Паралельний лістенер міг створити розмову між SELECT та INSERT
+                .on_conflict_do_nothing(index_elements=["platform", "external_id"])
+            )
+            conv_ids.update(lookup(missing))
+            logger.info(f"Created {len(missing)} new conversations")
+        return conv_ids
+
+    def _drop_duplicates(self, db, batch: List[InboundEvent], conv_ids) -> List[InboundEvent]:
+        """Відкинути повідомлення, які вже є в БД або повторюються в батчі (за external_message_id)."""
+        msg = Message.__table__
+        ext_ids = {event.external_message_id for event in batch if event.external_message_id}
+        seen = set()
+        if ext_ids:
+            rows = db.execute(
+                select(msg.c.conversation_id, msg.c.external_id).where(msg.c.external_id.in_(ext_ids))
+            )
+            seen = {(row.conversation_id, row.external_id) for row in rows}
+
+        fresh = []
+        for event in batch:
+            if event.external_message_id:
+                key = (conv_ids[(event.platform, event.external_id)], event.external_message_id)
+                if key in seen:
+                    for row in event.attachment_rows:
+                        delete_media_file(row["file_path"])
+                    continue
+                seen.add(key)
+            fresh.append(event)
+        return fresh
+
+    def _insert_messages(self, db, events: List[InboundEvent], conv_ids):
+        """Multi-row INSERT повідомлень, потім їх вкладень."""
+        db.execute(
+            Message.__table__.insert(),
+            [
+                {
+                    "id": event.message_id,
+                    "conversation_id": conv_ids[(event.platform, event.external_id)],
+                    "direction": "inbound",
+                    "type": event.msg_type,
+                    "content": event.content,
+                    "status": "sent",
+                    "attachments": event.attachments,
+                    "meta_data": event.meta_data,
+                    "is_from_me": None,
+                    "sent_at": event.received_at,
+                    "external_id": event.external_message_id,
+                    "created_at": event.received_at,
+                }
+                for event in events
+            ],
+        )
+        attachment_rows = [
+            {**row, "message_id": event.message_id}
+            for event in events
+            for row in event.attachment_rows
+        ]
+        if attachment_rows:
+            db.execute(Attachment.__table__.insert(), attachment_rows)
+
+    def _update_conversations(self, db, events: List[InboundEvent], conv_ids):
+        """Одне executemany UPDATE на всі розмови батчу: розархівувати, last_message_at, subject."""
+        conv = Conversation.__table__
+        updates: Dict[UUID, Dict[str, Any]] = {}
+        for event in events:
+            conv_id = conv_ids[(event.platform, event.external_id)]
+            params = updates.setdefault(conv_id, {"b_id": conv_id, "b_last": event.received_at, "b_subject": None, "b_smtp": None})
+            params["b_last"] = max(params["b_last"], event.received_at)
+            if event.update_subject and event.subject:
+                params["b_subject"] = event.subject
+            if event.manager_smtp_account_id:
+                params["b_smtp"] = event.manager_smtp_account_id
+
+        last = bindparam("b_last", type_=DateTime(timezone=True))
+        db.execute(
+            conv.update()
+            .where(conv.c.id == bindparam("b_id"))
+            .values(
+                is_archived=False,
+                last_message_at=func.greatest(func.coalesce(conv.c.last_message_at, last), last),
+                updated_at=last,
+                subject=func.coalesce(bindparam("b_subject", type_=String), conv.c.subject),
+                manager_smtp_account_id=func.coalesce(conv.c.manager_smtp_account_id, bindparam("b_smtp", type_=Integer)),
+            ),
+            list(updates.values()),
+        )
@@ -17,6 +17,7 @@ from modules.communications.models import (
     MessageStatus,
     Conversation,
 )
+from core import metrics
 from modules.communications.services.base import MessengerService
 
 
@@ -202,6 +203,7 @@ class InstagramService(MessengerService):
         time_diff = now - last_message_time
         return time_diff < timedelta(hours=24)
     
+    @metrics.observe_send
     async def send_message(
         self,
         conversation_id: UUID,
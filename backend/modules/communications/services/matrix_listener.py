@@ -20,8 +20,8 @@ from typing import Optional
 from uuid import uuid4
 
 import httpx
-from sqlalchemy import text
-from sqlalchemy.exc import IntegrityError
+
+from modules.communications.services.ingestion import InboundEvent, InboundPipeline
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +58,7 @@ class MatrixListener:
         self._joined_rooms: dict = {}  # room_id -> {members: set()}
         self.running = False
         self._task: Optional[asyncio.Task] = None
+        self._pipeline: Optional[InboundPipeline] = None
 
     # ------------------------------------------------------------------
     # Token persistence
@@ -114,6 +115,10 @@ class MatrixListener:
             logger.warning("MATRIX_BOT_PASSWORD not set — Matrix listener disabled")
             return
 
+        from db import SessionLocal
+        self._pipeline = InboundPipeline(SessionLocal, publish=self._publish)
+        await self._pipeline.start()
+
         self._task = asyncio.create_task(self._run())
         logger.info("Matrix listener background task started")
 
@@ -126,6 +131,8 @@ class MatrixListener:
                 await self._task
             except asyncio.CancelledError:
                 pass
+        if self._pipeline:
+            await self._pipeline.stop()
         # Save state before shutdown
         self._save_token()
         if self._http:
@@ -321,94 +328,33 @@ class MatrixListener:
         phone = self._extract_phone(sender)
         sender_name = content.get("displayname") or phone
 
-        # Persist to database
-        from db import SessionLocal
-        db = SessionLocal()
-        try:
-            # Duplicate check
-            dup = db.execute(
-                text("SELECT id FROM communications_messages WHERE meta_data->>'matrix_event_id' = :eid LIMIT 1"),
-                {"eid": event_id},
-            ).fetchone()
-            if dup:
-                return
-
-            conv_id = self._get_or_create_conversation(db, phone, sender_name)
-
-            msg_id = str(uuid4())
-            now = datetime.now(timezone.utc)
-
-            db.execute(text("""
-                INSERT INTO communications_messages
-                    (id, conversation_id, direction, type, content, status,
-                     attachments, meta_data, created_at)
-                VALUES
-                    (:id, :conv_id, 'inbound', :msg_type, :content, 'sent',
-                     CAST(:att AS jsonb), CAST(:meta AS jsonb), :now)
-            """), {
-                "id": msg_id,
-                "conv_id": conv_id,
-                "content": text_content or "",
-                "msg_type": msg_type,
-                "att": json.dumps(attachments) if attachments else None,
-                "meta": json.dumps({
-                    "matrix_event_id": event_id,
-                    "matrix_room_id": room_id,
-                    "matrix_sender": sender,
-                    "source": "matrix_bridge",
-                }),
-                "now": now,
-            })
-
-            db.execute(text("""
-                UPDATE communications_conversations
-                SET updated_at = :now, is_archived = false
-                WHERE id = :conv_id
-            """), {"now": now, "conv_id": conv_id})
-
-            db.commit()
-            logger.info(f"WhatsApp msg from {phone}: {(text_content or '')[:60]}")
-
-            await self._broadcast(conv_id, msg_id, text_content, sender_name, phone, msg_type)
-
-        except Exception as e:
-            db.rollback()
-            logger.error(f"Error saving message: {e}", exc_info=True)
-        finally:
-            db.close()
+        # Persist via inbound pipeline (batched with other events, deduplicated by event_id)
+        await self._pipeline.submit(InboundEvent(
+            platform="whatsapp",
+            external_id=phone,
+            content=text_content or "",
+            msg_type=msg_type,
+            sender_name=sender_name,
+            subject=sender_name,
+            attachments=attachments,
+            meta_data={
+                "matrix_event_id": event_id,
+                "matrix_room_id": room_id,
+                "matrix_sender": sender,
+                "source": "matrix_bridge",
+            },
+            external_message_id=event_id or None,
+            platform_at=(
+                datetime.fromtimestamp(event["origin_server_ts"] / 1000, tz=timezone.utc)
+                if event.get("origin_server_ts") else None
+            ),
+        ))
+        logger.info(f"WhatsApp msg from {phone}: {(text_content or '')[:60]}")
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
 
-    def _get_or_create_conversation(self, db, external_id: str, subject: str = None) -> str:
-        row = db.execute(
-            text("SELECT id FROM communications_conversations WHERE platform = 'whatsapp' AND external_id = :eid"),
-            {"eid": external_id},
-        ).fetchone()
-        if row:
-            return str(row[0])
-
-        conv_id = str(uuid4())
-        now = datetime.now(timezone.utc)
-        try:
-            db.execute(text("""
-                INSERT INTO communications_conversations
-                    (id, platform, external_id, subject, created_at, updated_at)
-                VALUES (:id, 'whatsapp', :eid, :subject, :now, :now)
-            """), {"id": conv_id, "eid": external_id, "subject": subject, "now": now})
-            db.commit()
-        except IntegrityError:
-            db.rollback()
-            row = db.execute(
-                text("SELECT id FROM communications_conversations WHERE platform = 'whatsapp' AND external_id = :eid"),
-                {"eid": external_id},
-            ).fetchone()
-            if row:
-                return str(row[0])
-            raise
-        return conv_id
-
     @staticmethod
     def _extract_phone(sender: str) -> str:
         """@whatsapp_380501234567:matrix.adme-ai.com → +380501234567"""
@@ -452,33 +398,15 @@ class MatrixListener:
 
         return content.get("body", ""), "text", None
 
-    async def _broadcast(self, conv_id, msg_id, content, sender_name, phone, msg_type):
-        """Send WebSocket notification to all connected CRM users."""
-        try:
-            from modules.communications.router import messages_manager
-
-            await messages_manager.broadcast({
-                "type": "new_message",
-                "conversation_id": conv_id,
-                "platform": "whatsapp",
-                "message": {
-                    "id": msg_id,
-                    "conversation_id": conv_id,
-                    "direction": "inbound",
-                    "type": msg_type,
-                    "content": content or "",
-                    "status": "sent",
-                    "created_at": datetime.now(timezone.utc).isoformat(),
-                },
-                "conversation": {
-                    "id": conv_id,
-                    "platform": "whatsapp",
-                    "external_id": phone,
-                    "client_name": sender_name or phone,
-                },
-            })
-        except Exception as e:
-            logger.warning(f"WebSocket broadcast failed: {e}")
+    async def _publish(self, notifications: list):
+        """Send WebSocket notifications to all connected CRM users (after DB commit)."""
+        from modules.communications.router import messages_manager
+
+        for notification in notifications:
+            try:
+                await messages_manager.broadcast(notification)
+            except Exception as e:
+                logger.warning(f"WebSocket broadcast failed: {e}")
 
     # ------------------------------------------------------------------
     # QR Login / Status  (used by router endpoints)
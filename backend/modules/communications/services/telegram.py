@@ -17,6 +17,7 @@ from modules.communications.models import (
     MessageStatus,
     Message,
 )
+from core import metrics
 from modules.communications.services.base import MessengerService
 from modules.communications.models import Conversation
 
@@ -101,6 +102,7 @@ class TelegramService(MessengerService):
         
         return self._client
     
+    @metrics.observe_send
     async def send_message(
         self,
         conversation_id: UUID,
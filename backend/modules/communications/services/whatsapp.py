@@ -16,6 +16,7 @@ from modules.communications.models import (
     MessageStatus,
     Conversation,
 )
+from core import metrics
 from modules.communications.services.base import MessengerService
 
 
@@ -232,6 +233,7 @@ class WhatsAppService(MessengerService):
             })
             return base_payload
     
+    @metrics.observe_send
     async def send_message(
         self,
         conversation_id: UUID,
@@ -47,27 +47,20 @@ def determine_file_type(mime_type: str, filename: str = "") -> str:
         return 'file'
 
 
-def save_media_file(
-    db: Session,
-    message_id: UUID,
+def store_media_file(
     file_data: bytes,
     mime_type: str,
     original_name: str,
     file_type: Optional[str] = None,
-) -> Attachment:
+) -> Dict[str, Any]:
     """
-    Зберегти медіа-файл на диск та створити запис в БД.
+    Зберегти медіа-файл на диск без запису в БД.
+    
+    Використовується inbound pipeline, який вставляє рядки
+    communications_attachments батчем разом з повідомленнями.
     
-    Args:
-        db: Database session
-        message_id: ID повідомлення
-        file_data: Байти файлу
-        mime_type: MIME тип файлу
-        original_name: Оригінальна назва файлу
-        file_type: Тип файлу (image, document, audio, video). Якщо None, визначається автоматично.
-        
     Returns:
-        Attachment об'єкт
+        Словник з полями рядка communications_attachments (без message_id)
     """
     # Визначити тип файлу якщо не вказано
     if not file_type:
@@ -93,23 +86,57 @@ def save_media_file(
         f.write(file_data)
     
     file_size = len(file_data)
+    logger.info(f"💾 Saved media file: {original_name} ({file_size} bytes) -> {file_path}")
+    
+    return {
+        "id": uuid4(),
+        "file_path": f"attachments/{filename}",  # Відносний шлях: attachments/filename
+        "file_type": file_type,
+        "mime_type": mime_type,
+        "original_name": original_name,
+        "file_size": file_size,
+    }
+
+
+def delete_media_file(file_path: str) -> None:
+    """Видалити файл, збережений store_media_file (наприклад, для дубліката повідомлення)."""
+    try:
+        (get_media_dir() / file_path).unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning(f"Could not delete media file {file_path}: {e}")
+
+
+def save_media_file(
+    db: Session,
+    message_id: UUID,
+    file_data: bytes,
+    mime_type: str,
+    original_name: str,
+    file_type: Optional[str] = None,
+) -> Attachment:
+    """
+    Зберегти медіа-файл на диск та створити запис в БД.
+    
+    Args:
+        db: Database session
+        message_id: ID повідомлення
+        file_data: Байти файлу
+        mime_type: MIME тип файлу
+        original_name: Оригінальна назва файлу
+        file_type: Тип файлу (image, document, audio, video). Якщо None, визначається автоматично.
+        
+    Returns:
+        Attachment об'єкт
+    """
+    stored = store_media_file(file_data, mime_type, original_name, file_type)
     
     # Створити запис в БД - зберігаємо відносний шлях без префіксу media/
-    attachment = Attachment(
-        message_id=message_id,
-        file_path=f"attachments/{filename}",  # Відносний шлях: attachments/filename
-        file_type=file_type,
-        mime_type=mime_type,
-        original_name=original_name,
-        file_size=file_size,
-    )
+    attachment = Attachment(message_id=message_id, **stored)
     
     # Додати до сесії, але НЕ робити commit - це зробить викликаючий код
     db.add(attachment)
     db.flush()  # Flush щоб отримати ID, але не commit
     
-    logger.info(f"💾 Saved media file: {original_name} ({file_size} bytes) -> {file_path}")
-    
     return attachment
 
 
@@ -0,0 +1,113 @@
+"""
+Імпорт мов (languages) з CSV: COPY у staging таблицю + set-based upsert.
+
+Мови зіставляються за name_pl без урахування регістру:
+- нові створюються;
+- у існуючих оновлюються base_client_price та name_en (якщо є у файлі);
+- deactivate_missing=True - мови, яких немає у файлі, стають is_active = false,
+  а присутні у файлі - активуються.
+"""
+from pathlib import Path
+from typing import Iterable, Iterator, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core.bulk_import import (
+    NUMERIC_PATTERN,
+    NUMERIC_TEXT_SQL,
+    ImportReport,
+    copy_rows,
+    create_stage,
+    finish,
+    iter_csv_rows,
+    reject_rows,
+)
+
+STAGE_TABLE = "language_import_stage"
+
+LANGUAGE_COLUMNS = ("name_pl", "name_en", "price")
+
+LANGUAGE_CSV_ALIASES = {
+    "name_pl": ("name_pl", "name pl", "nazwa pl", "nazwa", "język", "language", "name"),
+    "name_en": ("name_en", "name en", "nazwa en", "english"),
+    "price": ("base_client_price", "base price", "price", "price_pln", "cena", "pln"),
+}
+
+
+def read_languages_csv(path: Path) -> Iterator[Tuple]:
+    """
+    Рядки CSV мов. Підтримувані формати:
+    Language,Price_PLN[,Notes] / name_pl,name_en,base_client_price / name_pl,base_client_price.
+    Без заголовка колонки йдуть як name_pl,name_en,price.
+    """
+    return iter_csv_rows(path, LANGUAGE_COLUMNS, LANGUAGE_CSV_ALIASES, positional=LANGUAGE_COLUMNS)
+
+
+def import_languages(
+    db: Session,
+    rows: Iterable[Tuple],
+    deactivate_missing: bool = False,
+    dry_run: bool = False,
+) -> ImportReport:
+    """Застосувати рядки (row_num, name_pl, name_en, price) до таблиці languages."""
+    report = ImportReport(dry_run=dry_run)
+    try:
+        create_stage(db, STAGE_TABLE, LANGUAGE_COLUMNS, extra_columns=("language_id integer",))
+        report.total_rows = copy_rows(db, STAGE_TABLE, LANGUAGE_COLUMNS, rows)
+
+        db.execute(text(f"UPDATE {STAGE_TABLE} SET price = {NUMERIC_TEXT_SQL.format(column='price')}"))
+        report.errors = reject_rows(db, STAGE_TABLE, [
+            ("name_pl", "Порожня назва мови", "name_pl IS NULL"),
+            ("name_pl", "Назва довша за 100 символів", "length(name_pl) > 100"),
+            ("name_en", "Назва довша за 100 символів", "length(name_en) > 100"),
+            ("price", "Ціна не є числом", f"price IS NOT NULL AND price !~ '{NUMERIC_PATTERN}'"),
+            ("name_pl", "Повтор мови у файлі", (
+                f"name_pl IS NOT NULL AND row_num NOT IN "
+                f"(SELECT min(row_num) FROM {STAGE_TABLE} WHERE name_pl IS NOT NULL GROUP BY lower(name_pl))"
+            )),
+        ])
+
+        db.execute(text(f"""
+            UPDATE {STAGE_TABLE} s SET language_id = l.id
+            FROM languages l
+            WHERE lower(l.name_pl) = lower(s.name_pl) AND NOT s.rejected
+        """))
+        found = db.execute(text(
+            f"SELECT count(*) FROM {STAGE_TABLE} WHERE language_id IS NOT NULL"
+        )).scalar()
+
+        activate = ", is_active = true" if deactivate_missing else ""
+        activate_change = " OR l.is_active IS NOT true" if deactivate_missing else ""
+        report.updated = db.execute(text(f"""
+            UPDATE languages l SET
+                base_client_price = COALESCE(s.price::numeric, l.base_client_price),
+                name_en = COALESCE(s.name_en, l.name_en),
+                updated_at = now(){activate}
+            FROM {STAGE_TABLE} s
+            WHERE l.id = s.language_id AND (
+                (s.price IS NOT NULL AND l.base_client_price IS DISTINCT FROM s.price::numeric)
+                OR (s.name_en IS NOT NULL AND l.name_en IS DISTINCT FROM s.name_en){activate_change}
+            )
+        """)).rowcount
+        report.unchanged = found - report.updated
+
+        report.inserted = db.execute(text(f"""
+            INSERT INTO languages (name_pl, name_en, base_client_price, is_active)
+            SELECT s.name_pl, s.name_en, COALESCE(s.price::numeric, 0), true
+            FROM {STAGE_TABLE} s
+            WHERE NOT s.rejected AND s.language_id IS NULL
+            ORDER BY s.row_num
+            ON CONFLICT (name_pl) DO NOTHING
+        """)).rowcount
+
+        if deactivate_missing:
+            report.deactivated = db.execute(text(f"""
+                UPDATE languages l SET is_active = false, updated_at = now()
+                WHERE l.is_active
+                  AND NOT EXISTS (SELECT 1 FROM {STAGE_TABLE} s WHERE lower(s.name_pl) = lower(l.name_pl))
+            """)).rowcount
+    except Exception:
+        db.rollback()
+        raise
+    return finish(db, report)
@@ -2,7 +2,7 @@ from uuid import UUID, uuid4
 from enum import Enum
 from datetime import datetime
 from typing import TYPE_CHECKING, List
-from sqlalchemy import String, DateTime, ForeignKey, Integer, Text, Float, Boolean, ARRAY, Numeric, UniqueConstraint
+from sqlalchemy import String, DateTime, ForeignKey, Integer, Text, Float, Boolean, ARRAY, Numeric, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID as PostgresUUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -110,7 +110,7 @@ class Office(Base):
         "AutobotSettings", 
         back_populates="office", 
         uselist=False, 
-        lazy="selectin"
+        lazy="select"
     )
 
 
@@ -150,6 +150,11 @@ class Order(Base):
     translation_requests: Mapped[list["TranslationRequest"]] = relationship("TranslationRequest", back_populates="order", lazy="selectin", cascade="all, delete-orphan")
     inpost_shipments: Mapped[list["InPostShipment"]] = relationship("InPostShipment", back_populates="order", lazy="selectin", cascade="all, delete-orphan", foreign_keys="[InPostShipment.order_id]")
     shipments: Mapped[list["Shipment"]] = relationship("Shipment", back_populates="order", lazy="selectin", cascade="all, delete-orphan", foreign_keys="[Shipment.order_id]")
+    
+    __table_args__ = (
+        # Keyset пагінація GET /crm/orders: ORDER BY created_at DESC, id DESC
+        Index('idx_crm_orders_created_at_id', 'created_at', 'id'),
+    )
 
 
 class InternalNote(Base):
@@ -180,8 +185,20 @@ class TimelineStep(Base):
     step_metadata: Mapped[str | None] = mapped_column(Text, nullable=True)  # JSON для додаткових даних
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     
-    order: Mapped["Order"] = relationship("Order", back_populates="timeline_steps", lazy="joined")
-    completed_by: Mapped["User | None"] = relationship("User", foreign_keys=[completed_by_id], lazy="joined")
+    # Не joined: інакше кожен етап тягне весь граф Order (client, manager, office, колекції)
+    order: Mapped["Order"] = relationship("Order", back_populates="timeline_steps", lazy="select")
+    completed_by: Mapped["User | None"] = relationship("User", foreign_keys=[completed_by_id], lazy="select")
+
+
+class OrderProgress(Base):
+    """Кешований прогрес Timeline замовлення (read model для канбану)"""
+    __tablename__ = "crm_order_progress"
+
+    order_id: Mapped[UUID] = mapped_column(PostgresUUID(as_uuid=True), ForeignKey("crm_orders.id", ondelete="CASCADE"), primary_key=True)
+    steps_mask: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # біт i - завершено етап TIMELINE_STEP_ORDER[i]
+    completed_steps: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # завершено етапів по порядку
+    current_stage: Mapped[str | None] = mapped_column(String, nullable=True)  # останній етап з completed_steps
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
 
 class TranslatorStatus(str, Enum):
@@ -229,6 +246,7 @@ class TranslationRequestStatus(str, Enum):
     PENDING = "pending"
     ACCEPTED = "accepted"
     DECLINED = "declined"
+    WITHDRAWN = "withdrawn"  # Broadcast: інший перекладач прийняв першим
 
 
 class TranslationRequest(Base):
@@ -247,6 +265,8 @@ class TranslationRequest(Base):
     
     offered_rate: Mapped[float] = mapped_column(Float, nullable=False)
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Спільний для пропозицій одного broadcast - перший accept відкликає решту
+    broadcast_id: Mapped[UUID | None] = mapped_column(PostgresUUID(as_uuid=True), nullable=True, index=True)
     
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     
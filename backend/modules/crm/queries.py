@@ -0,0 +1,168 @@
+"""
+CRM queries - проекції для list endpoints (без завантаження ORM графа).
+
+Список замовлень вибирає тільки потрібні колонки; агрегати (сума оплат,
+останній етап timeline, статус доставки, статус онлайн-оплати, прийнятий
+перекладач) рахуються корельованими підзапитами в тому ж SELECT, а не
+selectin-завантаженням усіх пов'язаних колекцій.
+"""
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+
+from modules.auth.models import User
+from modules.crm.models import (
+    Client, Office, Order, TimelineStep, TranslationRequest, TranslationRequestStatus, Translator,
+)
+from modules.finance.models import Shipment, Transaction
+from modules.finance.rollups import REVENUE_STATUSES
+from modules.payment.models import PaymentTransaction
+
+
+def _paid_amount():
+    return (
+        select(func.coalesce(func.sum(Transaction.amount_gross), 0))
+        .where(
+            Transaction.order_id == Order.id,
+            func.coalesce(Transaction.payment_status, "").in_(REVENUE_STATUSES),
+        )
+        .scalar_subquery()
+    )
+
+
+def _latest(column, order_id_column, order_column):
+    """Значення column з останнього (за order_column) запису для замовлення."""
+    return (
+        select(column)
+        .where(order_id_column == Order.id)
+        .order_by(order_column.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def _timeline_steps():
+    """Компактний timeline: [{step_type, completed, completed_at}] одним json_agg."""
+    step = func.json_build_object(
+        literal_column("'step_type'"), TimelineStep.step_type,
+        literal_column("'completed'"), TimelineStep.completed,
+        literal_column("'completed_at'"), TimelineStep.completed_at,
+    )
+    return (
+        select(func.coalesce(
+            func.json_agg(aggregate_order_by(step, TimelineStep.created_at)),
+            literal_column("'[]'::json"),
+        ))
+        .where(TimelineStep.order_id == Order.id)
+        .scalar_subquery()
+    )
+
+
+def _accepted_translator():
+    """Прийнятий запит перекладача: {id, name, rate, response_at} або NULL."""
+    translator = func.json_build_object(
+        literal_column("'id'"), Translator.id,
+        literal_column("'name'"), Translator.name,
+        literal_column("'rate'"), TranslationRequest.offered_rate,
+        literal_column("'response_at'"), TranslationRequest.response_at,
+    )
+    return (
+        select(translator)
+        .select_from(TranslationRequest)
+        .join(Translator, Translator.id == TranslationRequest.translator_id)
+        .where(
+            TranslationRequest.order_id == Order.id,
+            TranslationRequest.status == TranslationRequestStatus.ACCEPTED.value,
+        )
+        .order_by(TranslationRequest.response_at.desc().nullslast(), TranslationRequest.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+# Поле списку -> SQL вираз. Порядок визначає порядок ключів у відповіді.
+ORDER_LIST_FIELDS = {
+    "id": lambda: Order.id,
+    "order_number": lambda: Order.order_number,
+    "status": lambda: Order.status,
+    "client_id": lambda: Order.client_id,
+    "client_name": lambda: Client.full_name,
+    "manager_id": lambda: Order.manager_id,
+    "manager_name": lambda: func.coalesce(
+        func.nullif(func.concat_ws(" ", User.first_name, User.last_name), ""),
+        User.email,
+    ),
+    "office_id": lambda: Order.office_id,
+    "office_name": lambda: Office.name,
+    "description": lambda: Order.description,
+    "deadline": lambda: Order.deadline,
+    "file_url": lambda: Order.file_url,
+    "language": lambda: Order.language,
+    "translation_type": lambda: Order.translation_type,
+    "payment_method": lambda: Order.payment_method,
+    "price_netto": lambda: Order.price_netto,
+    "price_brutto": lambda: Order.price_brutto,
+    "reference_code": lambda: Order.reference_code,
+    "repertorium_number": lambda: Order.repertorium_number,
+    "follow_up_date": lambda: Order.follow_up_date,
+    "order_source": lambda: Order.order_source,
+    "is_archived": lambda: Order.is_archived,
+    "created_at": lambda: Order.created_at,
+    "updated_at": lambda: Order.updated_at,
+    # Агрегати
+    "paid_amount": _paid_amount,
+    "payment_status": lambda: _latest(PaymentTransaction.status, PaymentTransaction.order_id, PaymentTransaction.created_at),
+    "last_step_type": lambda: _latest(TimelineStep.step_type, TimelineStep.order_id, TimelineStep.completed_at),
+    "last_step_at": lambda: _latest(TimelineStep.completed_at, TimelineStep.order_id, TimelineStep.completed_at),
+    "shipment_status": lambda: _latest(Shipment.status, Shipment.order_id, Shipment.created_at),
+    "accepted_translator": _accepted_translator,
+    "timeline_steps": _timeline_steps,
+}
+
+# Поля, що повертаються без fields= (timeline_steps - тільки на запит)
+DEFAULT_ORDER_LIST_FIELDS = [name for name in ORDER_LIST_FIELDS if name != "timeline_steps"]
+
+# Потрібні для keyset курсора, додаються завжди
+_KEY_FIELDS = ("id", "created_at")
+
+# Які join потрібні для полів
+_FIELD_JOINS = {
+    "client_name": "client",
+    "manager_name": "manager",
+    "office_name": "office",
+}
+
+
+def parse_order_fields(fields: Optional[str]) -> List[str]:
+    """
+    Розібрати fields=a,b,c. Невідоме поле - HTTP 400.
+    id та created_at додаються завжди (потрібні для курсора).
+    """
+    if not fields:
+        return list(DEFAULT_ORDER_LIST_FIELDS)
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in ORDER_LIST_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    selected = [name for name in ORDER_LIST_FIELDS if name in requested or name in _KEY_FIELDS]
+    return selected
+
+
+def orders_list_query(db: Session, field_names: List[str]):
+    """SELECT тільки вибраних полів з потрібними outer join."""
+    query = db.query(*[ORDER_LIST_FIELDS[name]().label(name) for name in field_names]).select_from(Order)
+    joins = {_FIELD_JOINS[name] for name in field_names if name in _FIELD_JOINS}
+    if "client" in joins:
+        query = query.outerjoin(Client, Client.id == Order.client_id)
+    if "manager" in joins:
+        query = query.outerjoin(User, User.id == Order.manager_id)
+    if "office" in joins:
+        query = query.outerjoin(Office, Office.id == Order.office_id)
+    return query
+
+
+def order_row_to_dict(row, field_names: List[str]) -> Dict:
+    return {name: getattr(row, name) for name in field_names}
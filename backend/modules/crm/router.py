@@ -1,7 +1,7 @@
 """
 CRM routes - clients, orders, KP endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, Body, Request
+from fastapi import APIRouter, Depends, HTTPException, Body, Request, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from uuid import UUID
@@ -13,6 +13,9 @@ from modules.auth.dependencies import get_current_user_db
 from fastapi import Header, status
 from modules.crm import models, schemas
 from modules.crm.services import timeline as timeline_service
+from modules.crm.services import translator_matching
+from modules.crm.services import translation_offers
+from modules.crm.services import reminders  # noqa: F401 - session hooks планування нагадувань
 from modules.crm import crud_languages
 from modules.auth import models as auth_models
 
@@ -36,9 +39,9 @@ def get_current_user_or_rag_crm(
     # Спочатку перевіряємо X-RAG-TOKEN
     if x_rag_token:
         try:
-            # Перевіряємо RAG токен напряму
-            from modules.ai_integration.models import AISettings
-            ai_settings = db.query(AISettings).first()
+            # Перевіряємо RAG токен (з кешу налаштувань, без запиту до БД)
+            from core.settings_cache import get_singleton
+            ai_settings = get_singleton("ai")
             
             if ai_settings and ai_settings.rag_token and x_rag_token == ai_settings.rag_token:
                 logger.info("✅ Авторизація через X-RAG-TOKEN успішна (CRM)")
@@ -336,18 +339,31 @@ def delete_client(
     return {"status": "deleted", "id": client_id}
 
 
-@router.get("/orders", response_model=List[schemas.OrderRead])
+@router.get("/orders")
 def get_orders(
     status: Optional[str] = None,
     client_id: Optional[str] = None,
     include_archived: bool = False,  # Чи включати архівовані замовлення
-    skip: int = 0,
-    limit: int = 100,
+    fields: Optional[str] = Query(None, description="Поля через кому (за замовчуванням - усі, крім timeline_steps)"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor з попередньої сторінки"),
     db: Session = Depends(get_db),
     user: auth_models.User = Depends(get_current_user_db),
 ):
-    """Get orders list with optional filtering."""
-    query = db.query(models.Order)
+    """
+    Get orders list with optional filtering.
+    
+    Повертає проекцію (тільки потрібні колонки + агрегати paid_amount,
+    payment_status, last_step_*, shipment_status, accepted_translator), а не ORM
+    граф замовлення.
+    Повне замовлення з усіма зв'язками - GET /orders/{id}.
+    Keyset пагінація по (created_at, id).
+    """
+    from core.pagination import decode_cursor, keyset_condition, order_by_keyset, page_cursor
+    from modules.crm.queries import order_row_to_dict, orders_list_query, parse_order_fields
+    
+    field_names = parse_order_fields(fields)
+    query = orders_list_query(db, field_names)
     
     # За замовчуванням не показуємо архівовані замовлення
     if not include_archived:
@@ -357,42 +373,24 @@ def get_orders(
         query = query.filter(models.Order.status == status)
     
     if client_id:
-        from uuid import UUID
         try:
             client_uuid = UUID(client_id)
             query = query.filter(models.Order.client_id == client_uuid)
         except ValueError:
             pass
     
-    # Завантажуємо shipments для всіх замовлень
-    from sqlalchemy.orm import joinedload
-    from modules.finance.models import Shipment
-    orders = (
-        query
-        .options(joinedload(models.Order.shipments))
-        .order_by(models.Order.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    key_columns = [models.Order.created_at, models.Order.id]
+    if cursor:
+        query = query.filter(keyset_condition(key_columns, decode_cursor(cursor, key_columns)))
     
-    # Fix timeline_steps metadata for response - використовуємо get_attribute для прямого доступу
-    from sqlalchemy.orm.attributes import get_attribute
-    for order in orders:
-        for step in order.timeline_steps:
-            # Отримуємо значення напряму з колонки через get_attribute
-            try:
-                step_metadata = get_attribute(step, 'step_metadata')
-                # Перевіряємо, що це рядок або None
-                if not isinstance(step_metadata, (str, type(None))):
-                    step_metadata = None
-            except:
-                step_metadata = None
-            
-            # Встановлюємо як атрибут metadata для правильного маппінгу
-            step.metadata = step_metadata
+    rows = query.order_by(*order_by_keyset(key_columns)).limit(limit + 1).all()
+    next_cursor = page_cursor(rows, limit, lambda row: (row.created_at, row.id))
     
-    return orders
+    return {
+        "items": [order_row_to_dict(row, field_names) for row in rows[:limit]],
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+    }
 
 
 @router.get("/orders/{order_id}", response_model=schemas.OrderRead)
@@ -718,33 +716,52 @@ def delete_note(
 
 
 # Timeline endpoints
+TIMELINE_PROGRESS_MAX_IDS = 500
+
+
+def _timeline_order_id(db: Session, order_id: str) -> UUID:
+    """UUID замовлення для Timeline (404 без завантаження графа Order)"""
+    try:
+        order_uuid = UUID(order_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Order not found")
+    if not timeline_service.order_exists(db, order_uuid):
+        raise HTTPException(status_code=404, detail="Order not found")
+    return order_uuid
+
+
+@router.get("/timeline/progress", response_model=List[schemas.TimelineProgressRead])
+def get_timeline_progress(
+    order_ids: List[UUID] = Query(..., description="ID замовлень (канбан)"),
+    db: Session = Depends(get_db),
+    user: auth_models.User = Depends(get_current_user_db),
+):
+    """Прогрес Timeline для багатьох замовлень одним запитом (з кешу crm_order_progress)."""
+    if len(order_ids) > TIMELINE_PROGRESS_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many order_ids (max {TIMELINE_PROGRESS_MAX_IDS})",
+        )
+    progress = timeline_service.get_progress_bulk(db, order_ids)
+    return [
+        schemas.TimelineProgressRead(
+            order_id=order_id,
+            completed_steps=progress.get(order_id, (0, None))[0],
+            total_steps=timeline_service.TOTAL_STEPS,
+            current_stage=progress.get(order_id, (0, None))[1],
+        )
+        for order_id in dict.fromkeys(order_ids)
+    ]
+
+
 @router.get("/orders/{order_id}/timeline", response_model=list[schemas.TimelineStepRead])
 def get_order_timeline(
     order_id: str,
     db: Session = Depends(get_db),
     user: auth_models.User = Depends(get_current_user_db),
 ):
-    """Get timeline steps for an order."""
-    order = db.query(models.Order).filter(models.Order.id == order_id).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    # Fix timeline_steps metadata for response - використовуємо get_attribute для прямого доступу
-    from sqlalchemy.orm.attributes import get_attribute
-    for step in order.timeline_steps:
-        # Отримуємо значення напряму з колонки через get_attribute
-        try:
-            step_metadata = get_attribute(step, 'step_metadata')
-            # Перевіряємо, що це рядок або None
-            if not isinstance(step_metadata, (str, type(None))):
-                step_metadata = None
-        except:
-            step_metadata = None
-        
-        # Встановлюємо як атрибут metadata для правильного маппінгу
-        step.metadata = step_metadata
-    
-    return order.timeline_steps
+    """Get timeline steps for an order (з іменем виконавця, без графа Order)."""
+    return timeline_service.list_steps(db, _timeline_order_id(db, order_id))
 
 
 @router.post("/orders/{order_id}/timeline/mark-ready")
@@ -754,11 +771,9 @@ def mark_translation_ready(
     user: auth_models.User = Depends(get_current_user_db),
 ):
     """Manual: Позначити переклад готовим (етап 6)"""
-    order = db.query(models.Order).filter(models.Order.id == order_id).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
+    order_uuid = _timeline_order_id(db, order_id)
     
-    step = timeline_service.mark_translation_ready(db, order.id, user.id)
+    step = timeline_service.mark_translation_ready(db, order_uuid, user.id)
     return step
 
 
@@ -770,11 +785,9 @@ def mark_order_issued(
     user: auth_models.User = Depends(get_current_user_db),
 ):
     """Manual: Позначити замовлення виданим/відправленим (етап 7)"""
-    order = db.query(models.Order).filter(models.Order.id == order_id).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
+    order_uuid = _timeline_order_id(db, order_id)
     
-    step = timeline_service.mark_issued_sent(db, order.id, user.id, tracking_number)
+    step = timeline_service.mark_issued_sent(db, order_uuid, user.id, tracking_number)
     return step
 
 
@@ -797,11 +810,9 @@ def mark_payment_link_sent(
     if not payment_link:
         raise HTTPException(status_code=400, detail="payment_link is required")
     
-    order = db.query(models.Order).filter(models.Order.id == order_id).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
+    order_uuid = _timeline_order_id(db, order_id)
     
-    step = timeline_service.mark_payment_link_sent(db, order.id, user.id, payment_link)
+    step = timeline_service.mark_payment_link_sent(db, order_uuid, user.id, payment_link)
     return step
 
 
@@ -813,9 +824,7 @@ def mark_translator_assigned(
     user: auth_models.User = Depends(get_current_user_db),
 ):
     """Auto: Позначити перекладача призначеним (етап 5)"""
-    order = db.query(models.Order).filter(models.Order.id == order_id).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
+    order_uuid = _timeline_order_id(db, order_id)
     
     from uuid import UUID
     try:
@@ -823,7 +832,7 @@ def mark_translator_assigned(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid translator_id format")
     
-    step = timeline_service.mark_translator_assigned(db, order.id, translator_uuid, user.id)
+    step = timeline_service.mark_translator_assigned(db, order_uuid, translator_uuid, user.id)
     return step
 
 
@@ -835,11 +844,9 @@ def mark_payment_received(
     user: auth_models.User = Depends(get_current_user_db),
 ):
     """Auto/Manual: Позначити оплату отриманою (етап 4)"""
-    order = db.query(models.Order).filter(models.Order.id == order_id).first()
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
+    order_uuid = _timeline_order_id(db, order_id)
     
-    step = timeline_service.mark_payment_received(db, order.id, transaction_id)
+    step = timeline_service.mark_payment_received(db, order_uuid, transaction_id)
     return step
 
 
@@ -915,23 +922,61 @@ def get_translators(
         query = query.filter(models.Translator.status == status)
     
     if language:
-        query = query.join(models.TranslatorLanguage).filter(
-            models.TranslatorLanguage.language == language
-        )
-    
-    translators = query.all()
+        # Нормалізований індекс: "Angielski", "english", "en" - одна мова;
+        # індекс містить усі статуси, status фільтрується запитом вище
+        translator_ids = translator_matching.get_translator_index(db).translator_ids(language)
+        if not translator_ids:
+            return []
+        query = query.filter(models.Translator.id.in_(translator_ids))
     
-    # Parse specializations from JSON for each translator's languages
-    import json
-    for translator in translators:
-        for lang in translator.languages:
-            if lang.specializations and isinstance(lang.specializations, str):
-                try:
-                    lang.specializations = json.loads(lang.specializations)
-                except:
-                    lang.specializations = None
+    # specializations розбирає TranslatorLanguageRead
+    return query.order_by(models.Translator.name).all()
+
+
+@router.get("/orders/{order_id}/translator-matches", response_model=schemas.TranslatorShortlistRead)
+def get_translator_matches(
+    order_id: UUID,
+    limit: int = Query(translator_matching.DEFAULT_SHORTLIST_SIZE, ge=1, le=50),
+    language: Optional[str] = None,
+    translation_type: Optional[str] = None,
+    db: Session = Depends(get_db),
+    user: auth_models.User = Depends(get_current_user_db),
+):
+    """Ранжований shortlist перекладачів для замовлення (мова, тип перекладу, дедлайн)."""
+    order = db.get(models.Order, order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
     
-    return translators
+    matches = translator_matching.shortlist(
+        db, order, limit=limit, language=language, translation_type=translation_type,
+    )
+    return schemas.TranslatorShortlistRead(
+        order_id=order.id,
+        language=language or order.language,
+        translation_type=translation_type or order.translation_type,
+        deadline=order.deadline,
+        matches=[
+            schemas.TranslatorMatchRead(
+                translator_id=match.translator.id,
+                name=match.translator.name,
+                email=match.translator.email,
+                phone=match.translator.phone,
+                telegram_id=match.translator.telegram_id,
+                whatsapp=match.translator.whatsapp,
+                status=match.translator.status,
+                rating=match.translator.rating,
+                completed_orders=match.translator.completed_orders,
+                language=match.language,
+                rate=match.rate,
+                specialization_match=match.specialization_match,
+                pending_requests=match.pending_requests,
+                active_orders=match.active_orders,
+                request_status=match.request_status,
+                score=match.score,
+            )
+            for match in matches
+        ],
+    )
 
 
 @router.get("/translators/{translator_id}", response_model=schemas.TranslatorRead)
@@ -1046,6 +1091,8 @@ def update_translator(
         db.query(models.TranslatorLanguage).filter(
             models.TranslatorLanguage.translator_id == translator_id
         ).delete()
+        # Bulk delete не проходить через session events - індекс підбору інвалідуємо явно
+        db.info[translator_matching.SESSION_FLAG] = True
         
         # Add new languages
         import json
@@ -1120,29 +1167,36 @@ def create_translation_request(
     db.commit()
     db.refresh(translation_request)
     
-    # Відправляємо email/telegram/whatsapp notification to translator
-    if request_in.sent_via == "email" and translator.email:
-        try:
-            from email_service import send_translation_request_email
-            deadline_str = None
-            if order.deadline:
-                deadline_str = order.deadline.strftime("%d.%m.%Y %H:%M")
-            send_translation_request_email(
-                to_email=translator.email,
-                translator_name=translator.name,
-                order_number=order.order_number,
-                offered_rate=request_in.offered_rate,
-                notes=request_in.notes,
-                deadline=deadline_str,
-            )
-        except Exception as e:
-            # Не блокуємо створення запиту, якщо email не відправлено
-            print(f"Failed to send translation request email: {e}")
-    # TODO: Додати відправку через telegram/whatsapp
+    # Відправка перекладачу (email / telegram / whatsapp) - у фоні, не блокує запит
+    translation_offers.dispatch_offers([translation_request.id])
     
     return schemas.TranslationRequestRead.model_validate(translation_request)
 
 
+@router.post("/orders/{order_id}/translation-requests/broadcast", response_model=List[schemas.TranslationRequestRead])
+def broadcast_translation_request(
+    order_id: UUID,
+    broadcast_in: schemas.TranslationRequestBroadcast,
+    db: Session = Depends(get_db),
+    user: auth_models.User = Depends(get_current_user_db),
+):
+    """Запропонувати замовлення кільком перекладачам одразу - перший, хто прийме, отримує замовлення."""
+    order = db.get(models.Order, order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    
+    requests = translation_offers.broadcast_offers(
+        db,
+        order,
+        channels=broadcast_in.channels,
+        translator_ids=broadcast_in.translator_ids,
+        count=broadcast_in.count,
+        offered_rate=broadcast_in.offered_rate,
+        notes=broadcast_in.notes,
+    )
+    return [schemas.TranslationRequestRead.model_validate(request) for request in requests]
+
+
 @router.post("/translation-requests/{request_id}/accept", response_model=schemas.TranslationRequestRead)
 def accept_translation_request(
     request_id: int,
@@ -1150,21 +1204,8 @@ def accept_translation_request(
     user: auth_models.User = Depends(get_current_user_db),
 ):
     """Accept translation request (called by translator or admin)."""
-    request = db.query(models.TranslationRequest).filter(
-        models.TranslationRequest.id == request_id
-    ).first()
-    
-    if not request:
-        raise HTTPException(status_code=404, detail="Translation request not found")
-    
-    if request.status != models.TranslationRequestStatus.PENDING:
-        raise HTTPException(status_code=400, detail="Request is not pending")
-    
-    # Update request status
-    from datetime import timezone
-    request.status = models.TranslationRequestStatus.ACCEPTED
-    request.response_at = datetime.now(timezone.utc)
-    db.commit()
+    # Broadcast: перший accept виграє, інші пропозиції відкликаються
+    request = translation_offers.accept_request(db, request_id)
     
     # Auto-update Timeline (step 5: Translator Assigned)
     # Note: translator_id is int, but timeline service expects UUID for translator
@@ -1242,17 +1283,26 @@ def update_translation_request(
     if not request:
         raise HTTPException(status_code=404, detail="Translation request not found")
     
+    changes = {}
     if request_update.offered_rate is not None:
-        request.offered_rate = request_update.offered_rate
+        changes["offered_rate"] = request_update.offered_rate
     if request_update.notes is not None:
-        request.notes = request_update.notes
-    if request_update.status is not None:
-        request.status = request_update.status
-        if request_update.status == models.TranslationRequestStatus.ACCEPTED:
-            from datetime import timezone
-            request.response_at = datetime.now(timezone.utc)
-    
-    db.commit()
+        changes["notes"] = request_update.notes
+    
+    if (
+        request.broadcast_id is not None
+        and request_update.status == models.TranslationRequestStatus.ACCEPTED
+        and request.status != request_update.status
+    ):
+        # Broadcast - через accept_request (перший accept виграє); інші поля
+        # зберігаються тим самим commit, тож 409/400 не лишає часткових змін
+        request = translation_offers.accept_request(db, request_id, changes)
+    else:
+        for key, value in changes.items():
+            setattr(request, key, value)
+        if request_update.status is not None:
+            request.status = request_update.status
+        db.commit()
     db.refresh(request)
     
     return schemas.TranslationRequestRead.model_validate(request)
@@ -388,6 +388,34 @@ class TranslatorRead(BaseModel):
         from_attributes = True
 
 
+class TranslatorMatchRead(BaseModel):
+    """Кандидат у shortlist перекладачів для замовлення"""
+    translator_id: int
+    name: str
+    email: str
+    phone: Optional[str] = None
+    telegram_id: Optional[str] = None
+    whatsapp: Optional[str] = None
+    status: TranslatorStatus
+    rating: float
+    completed_orders: int
+    language: str
+    rate: Optional[float] = None
+    specialization_match: bool
+    pending_requests: int
+    active_orders: int
+    request_status: Optional[TranslationRequestStatus] = None  # Запит на це замовлення, якщо вже надіслано
+    score: float
+
+
+class TranslatorShortlistRead(BaseModel):
+    order_id: UUID
+    language: Optional[str] = None
+    translation_type: Optional[str] = None
+    deadline: Optional[datetime] = None
+    matches: List[TranslatorMatchRead] = []
+
+
 # Translation Request Schemas
 class TranslationRequestCreate(BaseModel):
     order_id: UUID
@@ -397,6 +425,15 @@ class TranslationRequestCreate(BaseModel):
     notes: Optional[str] = None
 
 
+class TranslationRequestBroadcast(BaseModel):
+    """Пропозиція замовлення кільком перекладачам одразу (перший accept виграє)"""
+    translator_ids: Optional[List[int]] = None  # None - топ count із shortlist підбору
+    count: int = Field(5, ge=1, le=20)
+    channels: List[str] = ["email", "telegram", "whatsapp"]
+    offered_rate: Optional[float] = None  # None - ставка перекладача для мови замовлення
+    notes: Optional[str] = None
+
+
 class TranslationRequestUpdate(BaseModel):
     status: Optional[TranslationRequestStatus] = None
     offered_rate: Optional[float] = None
@@ -413,6 +450,7 @@ class TranslationRequestRead(BaseModel):
     response_at: Optional[datetime] = None
     offered_rate: float
     notes: Optional[str] = None
+    broadcast_id: Optional[UUID] = None
     created_at: datetime
     translator: Optional[TranslatorRead] = None
     
@@ -428,6 +466,7 @@ class TimelineStepRead(BaseModel):
     completed: bool
     completed_at: datetime
     completed_by_id: Optional[UUID] = None
+    completed_by_name: Optional[str] = None
     metadata: Optional[str] = None
     created_at: datetime
     
@@ -478,6 +517,14 @@ class TimelineStepRead(BaseModel):
         return data
 
 
+class TimelineProgressRead(BaseModel):
+    """Кешований прогрес Timeline замовлення (для канбану)"""
+    order_id: UUID
+    completed_steps: int
+    total_steps: int
+    current_stage: Optional[TimelineStepType] = None
+
+
 class TimelineStepCreate(BaseModel):
     order_id: UUID
     step_type: TimelineStepType
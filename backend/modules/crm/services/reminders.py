@@ -0,0 +1,365 @@
+"""
+Нагадування про дедлайни та повторний контакт (follow_up_date) замовлень.
+
+Майбутні події лежать у Redis sorted set crm:reminders:due:
+    member = "{kind}:{order_id}" (deadline_warning:24:..., deadline_passed:..., follow_up:...)
+    score  = unix-час, коли подію треба надіслати
+Member для замовлення фіксований, тож зміна дедлайну просто перезаписує
+score - без дублікатів і без сканування таблиці orders.
+
+Черга оновлюється session hooks: після commit замовлення з новим / зміненим
+deadline, follow_up_date, status або is_archived перепланування одним
+pipeline. Bulk UPDATE повз ORM hooks не бачать - їх підхоплює reconcile
+(при старті воркера і раз на годину, індексні range-запити по найближчому
+вікну).
+
+Воркер - один процес (python -m modules.crm.services.reminders):
+забирає due елементи атомарним Lua (ZRANGEBYSCORE + ZREM), перевіряє
+замовлення в БД і шле нотифікацію менеджеру через fan-out. Між подіями
+спить у BLPOP на ключі пробудження з таймаутом до найближчого score, тож
+подія спрацьовує вчасно до секунди, а простій не коштує запитів. Нова
+подія раніше за поточну найближчу будить воркер через LPUSH.
+"""
+import asyncio
+import logging
+import signal
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import event, inspect, or_, select
+from sqlalchemy.orm import Session
+
+from modules.crm.models import Order, OrderStatus
+
+logger = logging.getLogger(__name__)
+
+DUE_KEY = "crm:reminders:due"
+WAKEUP_KEY = "crm:reminders:wakeup"
+
+KIND_DEADLINE_WARNING = "deadline_warning"
+KIND_DEADLINE_PASSED = "deadline_passed"
+KIND_FOLLOW_UP = "follow_up"
+
+# За скільки годин до дедлайну попереджати
+DEADLINE_WARNING_HOURS = (24, 2)
+
+# Найдовший сон воркера без пробудження (страховка від загубленого LPUSH)
+IDLE_WAIT_SECONDS = 60
+POP_BATCH_SIZE = 100
+# Повтор події, яку не вдалося надіслати (БД недоступна тощо)
+RETRY_DELAY_SECONDS = 60
+# Після цього часу від запланованого моменту подія більше не повторюється
+RETRY_WINDOW_SECONDS = 3600
+RECONCILE_INTERVAL_SECONDS = 3600
+# Reconcile відновлює події найближчих годин: решту встигне наступний запуск
+RECONCILE_HORIZON = timedelta(hours=max(DEADLINE_WARNING_HOURS) + 2)
+
+SESSION_KEY = "crm_reminders_orders"
+
+_TRACKED_ATTRIBUTES = ("deadline", "follow_up_date", "status", "is_archived")
+
+# KEYS[1] = due, ARGV[1] = now, ARGV[2] = limit
+_POP_DUE_SCRIPT = """
+local items = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, ARGV[2])
+for i = 1, #items, 2 do
+    redis.call('ZREM', KEYS[1], items[i])
+end
+return items
+"""
+
+# (deadline, follow_up_date, відкрите) або None - замовлення видалене
+OrderSnapshot = Optional[Tuple[Optional[datetime], Optional[datetime], bool]]
+
+
+def _redis():
+    from core.redis_client import get_redis
+    return get_redis()
+
+
+def _timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _is_open(status, is_archived: bool) -> bool:
+    status = status.value if isinstance(status, OrderStatus) else status
+    return not is_archived and status != OrderStatus.CLOSED.value
+
+
+def order_members(order_id: UUID) -> List[str]:
+    """Усі можливі member замовлення в черзі."""
+    return [
+        *(f"{KIND_DEADLINE_WARNING}:{hours}:{order_id}" for hours in DEADLINE_WARNING_HOURS),
+        f"{KIND_DEADLINE_PASSED}:{order_id}",
+        f"{KIND_FOLLOW_UP}:{order_id}",
+    ]
+
+
+def order_events(order_id: UUID, deadline: Optional[datetime], follow_up_date: Optional[datetime]) -> Dict[str, float]:
+    """member -> час надсилання для подій замовлення (включно з минулими)."""
+    events: Dict[str, float] = {}
+    if deadline is not None:
+        deadline_ts = _timestamp(deadline)
+        for hours in DEADLINE_WARNING_HOURS:
+            events[f"{KIND_DEADLINE_WARNING}:{hours}:{order_id}"] = deadline_ts - hours * 3600
+        events[f"{KIND_DEADLINE_PASSED}:{order_id}"] = deadline_ts
+    if follow_up_date is not None:
+        events[f"{KIND_FOLLOW_UP}:{order_id}"] = _timestamp(follow_up_date)
+    return events
+
+
+def schedule_orders(snapshots: Dict[UUID, OrderSnapshot], replace: bool = True) -> None:
+    """
+    Перепланувати події замовлень: старі member видаляються (replace),
+    майбутні події відкритих замовлень додаються. Воркер будиться, якщо
+    щось додано.
+    """
+    if not snapshots:
+        return
+    now = time.time()
+    pipe = _redis().pipeline(transaction=False)
+    added = False
+    for order_id, snapshot in snapshots.items():
+        if replace:
+            pipe.zrem(DUE_KEY, *order_members(order_id))
+        if snapshot is None:
+            continue
+        deadline, follow_up_date, is_open = snapshot
+        if not is_open:
+            continue
+        future = {
+            member: score
+            for member, score in order_events(order_id, deadline, follow_up_date).items()
+            if score > now
+        }
+        if future:
+            pipe.zadd(DUE_KEY, future)
+            added = True
+    if added:
+        pipe.lpush(WAKEUP_KEY, 1)
+        pipe.ltrim(WAKEUP_KEY, 0, 0)
+    pipe.execute()
+
+
+# ---------- Session hooks ----------
+
+@event.listens_for(Session, "after_flush")
+def _collect_order_changes(session, flush_context):
+    changed: Dict[UUID, OrderSnapshot] = session.info.get(SESSION_KEY, {})
+    for obj in session.new:
+        if isinstance(obj, Order) and (obj.deadline is not None or obj.follow_up_date is not None):
+            changed[obj.id] = (obj.deadline, obj.follow_up_date, _is_open(obj.status, obj.is_archived))
+    for obj in session.dirty:
+        if not isinstance(obj, Order):
+            continue
+        state = inspect(obj)
+        if any(state.attrs[name].history.has_changes() for name in _TRACKED_ATTRIBUTES):
+            changed[obj.id] = (obj.deadline, obj.follow_up_date, _is_open(obj.status, obj.is_archived))
+    for obj in session.deleted:
+        if isinstance(obj, Order):
+            changed[obj.id] = None
+    if changed:
+        session.info[SESSION_KEY] = changed
+
+
+@event.listens_for(Session, "after_commit")
+def _schedule_order_changes(session):
+    changed = session.info.pop(SESSION_KEY, None)
+    if not changed:
+        return
+    try:
+        schedule_orders(changed)
+    except Exception as e:
+        # Reconcile воркера відновить події найближчого вікна
+        logger.warning(f"Failed to schedule reminders for {len(changed)} orders: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_order_changes(session):
+    session.info.pop(SESSION_KEY, None)
+
+
+# ---------- Воркер ----------
+
+def _parse_member(member: str) -> Tuple[str, Optional[int], UUID]:
+    kind, _, rest = member.partition(":")
+    hours = None
+    if kind == KIND_DEADLINE_WARNING:
+        raw_hours, _, rest = rest.partition(":")
+        hours = int(raw_hours)
+    return kind, hours, UUID(rest)
+
+
+def _format(value: datetime) -> str:
+    return value.strftime("%d.%m.%Y %H:%M")
+
+
+class ReminderWorker:
+    """Забирає due події з черги та надсилає нотифікації."""
+
+    def __init__(self):
+        import redis.asyncio as aioredis
+        from core.config import settings
+
+        # Окремий клієнт без socket_timeout - BLPOP чекає до IDLE_WAIT_SECONDS
+        self.redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+        self._pop_due = self.redis.register_script(_POP_DUE_SCRIPT)
+
+    async def run(self) -> None:
+        """Головний цикл; зупиняється скасуванням задачі (SIGTERM)."""
+        logger.info("Reminder worker started")
+        next_reconcile = 0.0
+        try:
+            while True:
+                try:
+                    next_reconcile = await self._step(next_reconcile)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Reminder queue unavailable: {e}")
+                    await asyncio.sleep(IDLE_WAIT_SECONDS)
+        finally:
+            await self.redis.aclose()
+            logger.info("Reminder worker stopped")
+
+    async def _step(self, next_reconcile: float) -> float:
+        items = await self._pop_due(keys=[DUE_KEY], args=[time.time(), POP_BATCH_SIZE])
+        if items:
+            await self._fire([(items[i], float(items[i + 1])) for i in range(0, len(items), 2)])
+            return next_reconcile
+
+        # Reconcile лише коли due подій немає - прострочені за час простою
+        # елементи спершу надсилаються, а не перезаписуються
+        if time.monotonic() >= next_reconcile:
+            await self._reconcile_safely()
+            return time.monotonic() + RECONCILE_INTERVAL_SECONDS
+
+        head = await self.redis.zrange(DUE_KEY, 0, 0, withscores=True)
+        wait = min(IDLE_WAIT_SECONDS, next_reconcile - time.monotonic())
+        if head:
+            wait = min(wait, head[0][1] - time.time())
+        if wait > 0:
+            # Timeout 0 у BLPOP - чекати вічно, тож не менше 10 мс
+            await self.redis.blpop([WAKEUP_KEY], timeout=max(wait, 0.01))
+        return next_reconcile
+
+    async def _reconcile_safely(self) -> None:
+        try:
+            count = await self.reconcile()
+            logger.info(f"Reminder reconcile: {count} orders rescheduled")
+        except Exception as e:
+            logger.error(f"Reminder reconcile failed: {e}", exc_info=True)
+
+    async def reconcile(self) -> int:
+        """Відновити події найближчого вікна з БД (індекси deadline / follow_up_date)."""
+        from core.db import AsyncSessionLocal
+
+        now = datetime.now(timezone.utc)
+        horizon = now + RECONCILE_HORIZON
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(Order.id, Order.deadline, Order.follow_up_date)
+                .where(
+                    Order.is_archived == False,  # noqa: E712
+                    Order.status != OrderStatus.CLOSED.value,
+                    or_(
+                        Order.deadline.between(now, horizon + timedelta(hours=max(DEADLINE_WARNING_HOURS))),
+                        Order.follow_up_date.between(now, horizon),
+                    ),
+                )
+            )).all()
+        await asyncio.to_thread(
+            schedule_orders,
+            {order_id: (deadline, follow_up_date, True) for order_id, deadline, follow_up_date in rows},
+            False,
+        )
+        return len(rows)
+
+    async def _fire(self, due: Iterable[Tuple[str, float]]) -> None:
+        from core.db import AsyncSessionLocal
+
+        events = []
+        for member, score in due:
+            try:
+                events.append((member, score, *_parse_member(member)))
+            except ValueError:
+                logger.warning(f"Dropping malformed reminder {member!r}")
+        if not events:
+            return
+
+        async with AsyncSessionLocal() as db:
+            orders = {
+                row.id: row
+                for row in (await db.execute(
+                    select(
+                        Order.id, Order.order_number, Order.manager_id, Order.deadline,
+                        Order.follow_up_date, Order.status, Order.is_archived,
+                    ).where(Order.id.in_({order_id for *_, order_id in events}))
+                )).all()
+            }
+            for member, score, kind, hours, order_id in events:
+                order = orders.get(order_id)
+                # Замовлення закрите / видалене
+                if order is None or not _is_open(order.status, order.is_archived):
+                    continue
+                # Дата перенесена на пізніше повз hooks - актуальну подію додасть reconcile
+                expected = order_events(order_id, order.deadline, order.follow_up_date).get(member)
+                if expected is None or expected > score + 1:
+                    continue
+                if kind == KIND_DEADLINE_WARNING and order.deadline <= datetime.now(timezone.utc):
+                    continue
+                try:
+                    await self._notify(db, kind, hours, order)
+                except Exception as e:
+                    await db.rollback()
+                    if time.time() - expected > RETRY_WINDOW_SECONDS:
+                        logger.error(f"Reminder {member} dropped after retries: {e}")
+                        continue
+                    logger.error(f"Reminder {member} failed, retrying in {RETRY_DELAY_SECONDS}s: {e}")
+                    await self.redis.zadd(DUE_KEY, {member: time.time() + RETRY_DELAY_SECONDS}, nx=True)
+
+    @staticmethod
+    async def _notify(db, kind: str, hours: Optional[int], order) -> None:
+        from modules.notifications import helpers
+
+        order_id = str(order.id)
+        if kind == KIND_DEADLINE_WARNING:
+            await helpers.notify_deadline_warning(
+                db, order.manager_id, order.order_number, _format(order.deadline), hours, order_id,
+            )
+        elif kind == KIND_DEADLINE_PASSED:
+            await helpers.notify_deadline_passed(
+                db, order.manager_id, order.order_number, _format(order.deadline), order_id,
+            )
+        elif kind == KIND_FOLLOW_UP:
+            await helpers.notify_follow_up(
+                db, order.manager_id, order.order_number, _format(order.follow_up_date), order_id,
+            )
+
+
+async def main() -> None:
+    # Моделі зі зв'язків Order - без них mapper не налаштується
+    from modules.auth.models import User  # noqa: F401
+    from modules.autobot.models import AutobotSettings  # noqa: F401
+    from modules.communications.models import Conversation, Message  # noqa: F401
+    from modules.finance.models import Transaction, Shipment  # noqa: F401
+    from modules.notifications.models import Notification, NotificationSettings  # noqa: F401
+    from modules.payment.models import PaymentTransaction  # noqa: F401
+    from modules.postal_services.models import InPostShipment  # noqa: F401
+
+    task = asyncio.create_task(ReminderWorker().run())
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, task.cancel)
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main())
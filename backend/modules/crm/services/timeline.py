@@ -1,13 +1,24 @@
 """
 Сервіс автоматизації Timeline для замовлень
+
+Читання без графа Order: етапи проєктуються колонками (+ ім'я користувача),
+а прогрес замовлення (completed_steps, current_stage) зберігається в
+crm_order_progress і оновлюється одним upsert при додаванні етапу - канбан
+отримує прогрес багатьох замовлень одним запитом (get_progress_bulk).
 """
+import logging
+
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from uuid import UUID
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from modules.crm.models import Order, TimelineStep, TimelineStepType
+from modules.auth.models import User
+from modules.crm.models import Order, OrderProgress, TimelineStep, TimelineStepType
 
+logger = logging.getLogger(__name__)
 
 # Порядок етапів (від 1 до 7)
 TIMELINE_STEP_ORDER = [
@@ -19,24 +30,149 @@ TIMELINE_STEP_ORDER = [
     TimelineStepType.TRANSLATION_READY,  # 6
     TimelineStepType.ISSUED_SENT,  # 7
 ]
+TOTAL_STEPS = len(TIMELINE_STEP_ORDER)
 
+# Колонки етапу для відповіді API (metadata - як у TimelineStepRead)
+STEP_COLUMNS = (
+    TimelineStep.id,
+    TimelineStep.order_id,
+    TimelineStep.step_type,
+    TimelineStep.completed,
+    TimelineStep.completed_at,
+    TimelineStep.completed_by_id,
+    TimelineStep.step_metadata.label("metadata"),
+    TimelineStep.created_at,
+)
 
-def get_completed_steps_count(order: Order) -> int:
-    """Отримати кількість завершених етапів для замовлення"""
-    completed_steps = {
-        step.step_type for step in order.timeline_steps
-        if step.completed
-    }
-    
-    # Рахуємо скільки етапів завершено по порядку
+
+def step_bit(step_type: TimelineStepType) -> int:
+    """Біт етапу в OrderProgress.steps_mask"""
+    return 1 << TIMELINE_STEP_ORDER.index(TimelineStepType(step_type))
+
+
+def progress_from_mask(mask: int) -> Tuple[int, Optional[str]]:
+    """(кількість етапів, завершених по порядку, останній з них)"""
     count = 0
-    for step_type in TIMELINE_STEP_ORDER:
-        if step_type in completed_steps:
-            count += 1
-        else:
+    for index in range(TOTAL_STEPS):
+        if not mask & (1 << index):
             break  # Якщо етап не завершено, зупиняємось
-    
-    return count
+        count += 1
+    return count, TIMELINE_STEP_ORDER[count - 1].value if count else None
+
+
+def _prefix_case(mask, value_for):
+    """SQL аналог progress_from_mask: CASE від найдовшого завершеного префікса"""
+    return case(
+        *(
+            (mask.op("&")((1 << count) - 1) == (1 << count) - 1, value_for(count))
+            for count in range(TOTAL_STEPS, 0, -1)
+        ),
+        else_=value_for(0),
+    )
+
+
+def _record_progress(db: Session, order_id: UUID, step_type: TimelineStepType) -> None:
+    """Upsert прогресу: OR біта етапу і перерахунок у тому ж запиті"""
+    bit = step_bit(step_type)
+    completed, stage = progress_from_mask(bit)
+    statement = pg_insert(OrderProgress).values(
+        order_id=order_id, steps_mask=bit, completed_steps=completed, current_stage=stage,
+    )
+    mask = OrderProgress.steps_mask.op("|")(bit)
+    statement = statement.on_conflict_do_update(
+        index_elements=[OrderProgress.order_id],
+        set_={
+            "steps_mask": mask,
+            "completed_steps": _prefix_case(mask, lambda count: count),
+            "current_stage": _prefix_case(mask, lambda count: TIMELINE_STEP_ORDER[count - 1].value if count else None),
+            "updated_at": func.now(),
+        },
+    )
+    db.execute(statement)
+
+
+def get_progress_bulk(db: Session, order_ids: Iterable[UUID]) -> Dict[UUID, Tuple[int, Optional[str]]]:
+    """
+    Прогрес кількох замовлень: order_id -> (completed_steps, current_stage).
+
+    Замовлення без рядка в crm_order_progress (міграція їх backfill-ить,
+    тож це рідкість) рахуються одним агрегатом по timeline_steps. Дозапис -
+    в окремій короткій сесії: сесія запиту лишається тільки для читання.
+    """
+    order_ids = list(dict.fromkeys(order_ids))
+    if not order_ids:
+        return {}
+    progress = {
+        order_id: (completed, stage)
+        for order_id, completed, stage in db.execute(
+            select(OrderProgress.order_id, OrderProgress.completed_steps, OrderProgress.current_stage)
+            .where(OrderProgress.order_id.in_(order_ids))
+        )
+    }
+    missing = [order_id for order_id in order_ids if order_id not in progress]
+    if missing:
+        masks: Dict[UUID, int] = {}
+        for order_id, step_type in db.execute(
+            select(TimelineStep.order_id, TimelineStep.step_type)
+            .where(TimelineStep.order_id.in_(missing), TimelineStep.completed == True)  # noqa: E712
+            .distinct()
+        ):
+            try:
+                masks[order_id] = masks.get(order_id, 0) | step_bit(step_type)
+            except ValueError:
+                continue  # невідомий тип етапу
+        rows = []
+        for order_id, mask in masks.items():
+            progress[order_id] = progress_from_mask(mask)
+            rows.append({
+                "order_id": order_id,
+                "steps_mask": mask,
+                "completed_steps": progress[order_id][0],
+                "current_stage": progress[order_id][1],
+            })
+        if rows:
+            _store_progress(rows)
+    return progress
+
+
+def _store_progress(rows: List[dict]) -> None:
+    """Дозаписати пораховані рядки прогресу (помилка не ламає читання)"""
+    from core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        db.execute(pg_insert(OrderProgress).values(rows).on_conflict_do_nothing(index_elements=["order_id"]))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Cannot store order progress for {len(rows)} orders: {e}")
+    finally:
+        db.close()
+
+
+def get_completed_steps_count(db: Session, order_id: UUID) -> int:
+    """Отримати кількість завершених етапів для замовлення"""
+    return get_progress_bulk(db, [order_id]).get(order_id, (0, None))[0]
+
+
+def order_exists(db: Session, order_id: UUID) -> bool:
+    """Перевірка замовлення без завантаження графа Order"""
+    return db.scalar(select(Order.id).where(Order.id == order_id)) is not None
+
+
+def list_steps(db: Session, order_id: UUID) -> List[dict]:
+    """Етапи замовлення з іменем виконавця (без завантаження ORM об'єктів)"""
+    completed_by_name = func.coalesce(
+        func.nullif(func.trim(func.concat_ws(" ", User.first_name, User.last_name)), ""),
+        User.email,
+    )
+    rows = db.execute(
+        select(*STEP_COLUMNS, completed_by_name.label("completed_by_name"))
+        .outerjoin(User, User.id == TimelineStep.completed_by_id)
+        .where(TimelineStep.order_id == order_id)
+        .order_by(TimelineStep.created_at)
+    )
+    return [dict(row._mapping) for row in rows]
 
 
 def add_timeline_step(
@@ -45,7 +181,7 @@ def add_timeline_step(
     step_type: TimelineStepType,
     completed_by_id: Optional[UUID] = None,
     metadata: Optional[str] = None,
-) -> TimelineStep:
+) -> dict:
     """
     Додати етап до Timeline замовлення
     
@@ -57,43 +193,54 @@ def add_timeline_step(
         metadata: Додаткові дані (JSON string)
     
     Returns:
-        Створений TimelineStep
+        Етап (колонки STEP_COLUMNS) - без завантаження замовлення
     """
+    step_type = TimelineStepType(step_type)
     # Перевіряємо, чи етап вже існує
-    existing = db.query(TimelineStep).filter(
-        TimelineStep.order_id == order_id,
-        TimelineStep.step_type == step_type,
-        TimelineStep.completed == True
-    ).first()
+    existing_id = db.scalar(
+        select(TimelineStep.id)
+        .where(
+            TimelineStep.order_id == order_id,
+            TimelineStep.step_type == step_type.value,
+            TimelineStep.completed == True,  # noqa: E712
+        )
+        .limit(1)
+    )
     
-    if existing:
+    if existing_id is not None:
         # Якщо етап вже існує, оновлюємо його
+        values = {"completed_at": datetime.now(timezone.utc)}
         if completed_by_id:
-            existing.completed_by_id = completed_by_id
+            values["completed_by_id"] = completed_by_id
         if metadata:
-            existing.metadata = metadata
-        existing.completed_at = datetime.now(timezone.utc)
-        db.commit()
-        db.refresh(existing)
-        return existing
+            values["step_metadata"] = metadata
+        row = db.execute(
+            update(TimelineStep)
+            .where(TimelineStep.id == existing_id)
+            .values(**values)
+            .returning(*STEP_COLUMNS)
+            .execution_options(synchronize_session=False)
+        ).one()
+    else:
+        # Створюємо новий етап і оновлюємо кеш прогресу в тій самій транзакції
+        row = db.execute(
+            insert(TimelineStep)
+            .values(
+                order_id=order_id,
+                step_type=step_type.value,
+                completed=True,
+                completed_by_id=completed_by_id,
+                step_metadata=metadata,
+            )
+            .returning(*STEP_COLUMNS)
+        ).one()
+        _record_progress(db, order_id, step_type)
     
-    # Створюємо новий етап
-    step = TimelineStep(
-        order_id=order_id,
-        step_type=step_type,
-        completed=True,
-        completed_by_id=completed_by_id,
-        metadata=metadata,
-    )
-    
-    db.add(step)
     db.commit()
-    db.refresh(step)
-    
-    return step
+    return dict(row._mapping)
 
 
-def mark_client_created(db: Session, order_id: UUID, client_id: UUID) -> TimelineStep:
+def mark_client_created(db: Session, order_id: UUID, client_id: UUID) -> dict:
     """Автоматично: Створено клієнта (етап 1)"""
     return add_timeline_step(
         db=db,
@@ -103,7 +250,7 @@ def mark_client_created(db: Session, order_id: UUID, client_id: UUID) -> Timelin
     )
 
 
-def mark_order_created(db: Session, order_id: UUID, created_by_id: UUID) -> TimelineStep:
+def mark_order_created(db: Session, order_id: UUID, created_by_id: UUID) -> dict:
     """Автоматично: Створено замовлення (етап 2)"""
     return add_timeline_step(
         db=db,
@@ -113,7 +260,7 @@ def mark_order_created(db: Session, order_id: UUID, created_by_id: UUID) -> Time
     )
 
 
-def mark_payment_link_sent(db: Session, order_id: UUID, sent_by_id: UUID, payment_link: str) -> TimelineStep:
+def mark_payment_link_sent(db: Session, order_id: UUID, sent_by_id: UUID, payment_link: str) -> dict:
     """Автоматично: Надіслано лінк оплати (етап 3)"""
     return add_timeline_step(
         db=db,
@@ -124,7 +271,7 @@ def mark_payment_link_sent(db: Session, order_id: UUID, sent_by_id: UUID, paymen
     )
 
 
-def mark_payment_received(db: Session, order_id: UUID, transaction_id: Optional[str] = None) -> TimelineStep:
+def mark_payment_received(db: Session, order_id: UUID, transaction_id: Optional[str] = None) -> dict:
     """Автоматично/Manual: Оплачено (етап 4)"""
     metadata = None
     if transaction_id:
@@ -138,7 +285,7 @@ def mark_payment_received(db: Session, order_id: UUID, transaction_id: Optional[
     )
 
 
-def mark_translator_assigned(db: Session, order_id: UUID, translator_id: UUID, assigned_by_id: UUID) -> TimelineStep:
+def mark_translator_assigned(db: Session, order_id: UUID, translator_id: UUID, assigned_by_id: UUID) -> dict:
     """Автоматично: Призначено перекладача (етап 5)"""
     # translator_id can be UUID or int (as string in metadata)
     translator_id_str = str(translator_id)
@@ -151,7 +298,7 @@ def mark_translator_assigned(db: Session, order_id: UUID, translator_id: UUID, a
     )
 
 
-def mark_translation_ready(db: Session, order_id: UUID, completed_by_id: UUID) -> TimelineStep:
+def mark_translation_ready(db: Session, order_id: UUID, completed_by_id: UUID) -> dict:
     """Manual/Auto: Переклад готовий (етап 6)"""
     return add_timeline_step(
         db=db,
@@ -161,7 +308,7 @@ def mark_translation_ready(db: Session, order_id: UUID, completed_by_id: UUID) -
     )
 
 
-def mark_issued_sent(db: Session, order_id: UUID, sent_by_id: UUID, tracking_number: Optional[str] = None) -> TimelineStep:
+def mark_issued_sent(db: Session, order_id: UUID, sent_by_id: UUID, tracking_number: Optional[str] = None) -> dict:
     """Автоматично/Manual: Видано/Відправлено (етап 7)"""
     metadata = None
     if tracking_number:
@@ -0,0 +1,220 @@
+"""
+Запити на переклад: відправка пропозицій у фоні та broadcast.
+
+Broadcast - пропозиція замовлення одразу N перекладачам (з shortlist
+підбору або явним списком) по email / Telegram / WhatsApp. Рядки запитів
+створюються одним INSERT зі спільним broadcast_id, відправка йде через
+Celery (tasks/translation_tasks.py) паралельно - API відповідає одразу.
+
+Перший accept виграє: accept блокує всі пропозиції broadcast
+(SELECT ... FOR UPDATE), тож конкурентні accept виконуються по черзі -
+другий бачить свою пропозицію вже відкликаною. Решта pending пропозицій
+переходить у withdrawn, перекладачам іде повідомлення про відкликання.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence
+from uuid import uuid4
+
+from fastapi import HTTPException
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from modules.crm.models import Order, TranslationRequest, TranslationRequestStatus, Translator
+from modules.crm.services import translator_matching
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_EMAIL = "email"
+CHANNEL_TELEGRAM = "telegram"
+CHANNEL_WHATSAPP = "whatsapp"
+CHANNELS = (CHANNEL_EMAIL, CHANNEL_TELEGRAM, CHANNEL_WHATSAPP)
+
+DEFAULT_BROADCAST_SIZE = 5
+
+
+def translator_address(translator, channel: str) -> Optional[str]:
+    """Куди надсилати пропозицію цим каналом (None - у перекладача немає контакту)."""
+    if channel == CHANNEL_EMAIL:
+        return translator.email
+    if channel == CHANNEL_TELEGRAM:
+        return translator.telegram_id
+    if channel == CHANNEL_WHATSAPP:
+        return translator.whatsapp
+    return None
+
+
+def request_channels(request: TranslationRequest) -> List[str]:
+    """Канали, якими надіслано запит (sent_via може містити кілька через кому)."""
+    return [channel for channel in (request.sent_via or "").split(",") if channel]
+
+
+def format_deadline(order: Order) -> Optional[str]:
+    return order.deadline.strftime("%d.%m.%Y %H:%M") if order.deadline else None
+
+
+def offer_text(order: Order, translator_name: str, offered_rate: float, notes: Optional[str] = None) -> str:
+    lines = [
+        f"Вітаємо, {translator_name}!",
+        f"Пропозиція перекладу - замовлення {order.order_number}",
+        f"Ставка: {offered_rate} zł/сторінка",
+    ]
+    if order.language:
+        lines.append(f"Мова: {order.language}")
+    if order.translation_type:
+        lines.append(f"Тип: {order.translation_type}")
+    deadline = format_deadline(order)
+    if deadline:
+        lines.append(f"Дедлайн: {deadline}")
+    if notes:
+        lines.append(f"\n{notes}")
+    lines.append("\nПідтвердіть або відхиліть пропозицію в системі CRM.")
+    return "\n".join(lines)
+
+
+def withdrawal_text(order: Order, translator_name: str) -> str:
+    return (
+        f"Вітаємо, {translator_name}!\n"
+        f"Пропозицію перекладу замовлення {order.order_number} відкликано - "
+        f"його вже прийняв інший перекладач. Дякуємо!"
+    )
+
+
+def dispatch_offers(request_ids: Sequence[int]) -> None:
+    """Поставити відправку пропозицій у чергу (після commit)."""
+    if not request_ids:
+        return
+    from tasks.celery_app import celery_app
+
+    for request_id in request_ids:
+        celery_app.send_task("send_translation_offer_task", kwargs={"request_id": request_id})
+
+
+def dispatch_withdrawals(request_ids: Sequence[int]) -> None:
+    if not request_ids:
+        return
+    from tasks.celery_app import celery_app
+
+    for request_id in request_ids:
+        celery_app.send_task("send_translation_offer_task", kwargs={"request_id": request_id, "withdrawal": True})
+
+
+def broadcast_offers(
+    db: Session,
+    order: Order,
+    channels: Sequence[str],
+    translator_ids: Optional[Sequence[int]] = None,
+    count: int = DEFAULT_BROADCAST_SIZE,
+    offered_rate: Optional[float] = None,
+    notes: Optional[str] = None,
+) -> List[TranslationRequest]:
+    """
+    Запропонувати замовлення кільком перекладачам одночасно.
+
+    Без translator_ids береться топ count із shortlist підбору; ставка -
+    offered_rate або ставка перекладача для мови / спеціалізації замовлення.
+    """
+    channels = [channel for channel in dict.fromkeys(channels) if channel in CHANNELS]
+    if not channels:
+        raise HTTPException(status_code=400, detail=f"Вкажіть хоча б один канал: {', '.join(CHANNELS)}")
+
+    rates: Dict[int, Optional[float]] = {}
+    if translator_ids:
+        rates = translator_matching.order_rates(db, order, list(dict.fromkeys(translator_ids)))
+    else:
+        matches = [
+            match for match in translator_matching.shortlist(db, order, limit=count * 3)
+            if match.request_status is None
+        ][:count]
+        rates = {match.translator.id: match.rate for match in matches}
+    if not rates:
+        raise HTTPException(status_code=404, detail="Немає перекладачів для цього замовлення")
+
+    translators = {
+        row.id: row
+        for row in db.execute(
+            select(Translator.id, Translator.email, Translator.telegram_id, Translator.whatsapp)
+            .where(Translator.id.in_(list(rates)))
+        )
+    }
+    missing = [translator_id for translator_id in rates if translator_id not in translators]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Translators not found: {missing}")
+
+    broadcast_id = uuid4()
+    rows = []
+    for translator_id, rate in rates.items():
+        reachable = [channel for channel in channels if translator_address(translators[translator_id], channel)]
+        if not reachable:
+            continue
+        rate = offered_rate if offered_rate is not None else rate
+        if rate is None:
+            raise HTTPException(status_code=400, detail=f"Невідома ставка перекладача {translator_id} - вкажіть offered_rate")
+        rows.append({
+            "order_id": order.id,
+            "translator_id": translator_id,
+            "sent_via": ",".join(reachable),
+            "offered_rate": rate,
+            "notes": notes,
+            "status": TranslationRequestStatus.PENDING.value,
+            "broadcast_id": broadcast_id,
+        })
+    if not rows:
+        raise HTTPException(status_code=400, detail="Жоден перекладач не має контакту для вибраних каналів")
+
+    requests = list(db.scalars(insert(TranslationRequest).returning(TranslationRequest), rows))
+    db.commit()
+    dispatch_offers([request.id for request in requests])
+    return requests
+
+
+def accept_request(db: Session, request_id: int, changes: Optional[Dict] = None) -> TranslationRequest:
+    """
+    Прийняти запит. Для broadcast - атомарно: перший accept виграє,
+    інші pending пропозиції того ж broadcast відкликаються.
+    changes - інші поля запиту (offered_rate, notes), що зберігаються тим
+    самим commit лише якщо accept пройшов.
+    """
+    request = db.get(TranslationRequest, request_id)
+    if not request:
+        raise HTTPException(status_code=404, detail="Translation request not found")
+
+    withdrawn: List[int] = []
+    now = datetime.now(timezone.utc)
+    if request.broadcast_id is not None:
+        # Блокуємо всі пропозиції broadcast - конкурентні accept чекають тут
+        offers = dict(db.execute(
+            select(TranslationRequest.id, TranslationRequest.status)
+            .where(TranslationRequest.broadcast_id == request.broadcast_id)
+            .order_by(TranslationRequest.id)
+            .with_for_update()
+        ).all())
+        if offers.get(request_id) != TranslationRequestStatus.PENDING.value:
+            db.rollback()
+            if offers.get(request_id) == TranslationRequestStatus.WITHDRAWN.value:
+                raise HTTPException(status_code=409, detail="Замовлення вже прийняв інший перекладач")
+            raise HTTPException(status_code=400, detail="Request is not pending")
+        withdrawn = [
+            offer_id for offer_id, status in offers.items()
+            if offer_id != request_id and status == TranslationRequestStatus.PENDING.value
+        ]
+        if withdrawn:
+            db.execute(
+                update(TranslationRequest)
+                .where(TranslationRequest.id.in_(withdrawn))
+                .values(status=TranslationRequestStatus.WITHDRAWN.value, response_at=now)
+                .execution_options(synchronize_session=False)
+            )
+    elif request.status != TranslationRequestStatus.PENDING:
+        raise HTTPException(status_code=400, detail="Request is not pending")
+
+    db.execute(
+        update(TranslationRequest)
+        .where(TranslationRequest.id == request_id)
+        .values(**(changes or {}), status=TranslationRequestStatus.ACCEPTED.value, response_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    db.refresh(request)
+    dispatch_withdrawals(withdrawn)
+    return request
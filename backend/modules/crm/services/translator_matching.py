@@ -0,0 +1,392 @@
+"""
+Підбір перекладача для замовлення.
+
+Індекс (мова -> перекладачі зі ставками та спеціалізаціями) будується з
+translator_languages (вільний текст + JSON спеціалізацій) і
+translator_language_rates (мова / спеціалізація з довідників) з
+нормалізованими ключами: "Angielski", "angielski ", "English" і код "en"
+дають одну мову. Індекс живе в пам'яті процесу і перебудовується після
+commit змін перекладачів, мов або ставок (версія в Redis - інші процеси
+бачать її при наступному запиті) або через MATCHING_INDEX_MAX_AGE_SECONDS.
+В індексі перекладачі з усіма статусами: фільтр за статусом застосовується
+після пошуку по мові (список перекладачів, shortlist без INACTIVE).
+
+Поточне навантаження (pending запити та accepted на незакритих
+замовленнях) не кешується - shortlist рахує його одним агрегуючим
+запитом тільки по кандидатах.
+"""
+import json
+import logging
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import chain
+from typing import Dict, FrozenSet, List, Optional
+
+from sqlalchemy import and_, case, event, func, or_, select
+from sqlalchemy.orm import Session
+
+from modules.crm.models import (
+    Language, Order, OrderStatus, Specialization, TranslationRequest, TranslationRequestStatus,
+    TranslationType, Translator, TranslatorLanguage, TranslatorLanguageRate, TranslatorStatus,
+)
+
+logger = logging.getLogger(__name__)
+
+MATCHING_INDEX_MAX_AGE_SECONDS = 600
+MATCHING_VERSION_KEY = "crm:translator_index:version"
+
+# Зміни в цих таблицях інвалідують індекс
+MATCHING_TABLES = {
+    "translators", "translator_languages", "translator_language_rates", "languages", "specializations",
+}
+
+DEFAULT_SHORTLIST_SIZE = 10
+# Дедлайн ближче за це - навантаження важить удвічі більше
+URGENT_DEADLINE_HOURS = 48
+
+SPECIALIZATION_WEIGHT = 2.0
+RATING_WEIGHT = 1.0
+PRICE_WEIGHT = 1.0
+LOAD_WEIGHT = 0.5
+URGENT_LOAD_WEIGHT = 1.0
+BUSY_PENALTY = 1.0
+
+# Коди мов у crm_orders.language -> польська назва (як у languages.name_pl)
+LANGUAGE_CODES = {
+    "en": "angielski", "de": "niemiecki", "uk": "ukrainski", "ua": "ukrainski", "ru": "rosyjski",
+    "pl": "polski", "fr": "francuski", "es": "hiszpanski", "it": "wloski", "pt": "portugalski",
+    "cs": "czeski", "sk": "slowacki", "be": "bialoruski", "lt": "litewski", "lv": "lotewski",
+    "nl": "niderlandzki", "sv": "szwedzki", "no": "norweski", "da": "dunski", "fi": "finski",
+    "hu": "wegierski", "ro": "rumunski", "bg": "bulgarski", "hr": "chorwacki", "sr": "serbski",
+    "tr": "turecki", "ka": "gruzinski", "hy": "ormianski", "ar": "arabski", "zh": "chinski",
+    "ja": "japonski", "ko": "koreanski", "he": "hebrajski", "el": "grecki", "kk": "kazachski",
+}
+
+SESSION_FLAG = "translator_index_dirty"
+
+
+def normalize_key(value: Optional[str]) -> str:
+    """Нижній регістр, без діакритики та зайвих пробілів ("Ukraiński " -> "ukrainski")."""
+    text = unicodedata.normalize("NFKD", (value or "").replace("ł", "l").replace("Ł", "L"))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(text.lower().split())
+
+
+def _parse_specializations(raw: Optional[str]) -> List[str]:
+    if not raw:
+        return []
+    try:
+        parsed = json.loads(raw)
+    except (json.JSONDecodeError, TypeError, ValueError):
+        return [raw]
+    return [str(item) for item in parsed] if isinstance(parsed, list) else []
+
+
+@dataclass(frozen=True)
+class TranslatorInfo:
+    id: int
+    name: str
+    email: str
+    phone: Optional[str]
+    telegram_id: Optional[str]
+    whatsapp: Optional[str]
+    status: str
+    rating: float
+    completed_orders: int
+
+
+@dataclass
+class Capability:
+    """Що перекладач вміє в одній мові"""
+    language: str
+    rate: Optional[float] = None
+    specialization_rates: Dict[str, Optional[float]] = field(default_factory=dict)
+
+    def rate_for(self, specialization: str) -> Optional[float]:
+        rate = self.specialization_rates.get(specialization) if specialization else None
+        return rate if rate is not None else self.rate
+
+
+@dataclass(frozen=True)
+class TranslatorIndex:
+    version: str
+    translators: Dict[int, TranslatorInfo]
+    # мова -> перекладач -> можливості
+    languages: Dict[str, Dict[int, Capability]]
+    aliases: Dict[str, str]
+
+    def resolve_language(self, value: Optional[str]) -> str:
+        key = normalize_key(value)
+        key = LANGUAGE_CODES.get(key, key)
+        return self.aliases.get(key, key)
+
+    def translator_ids(self, language: Optional[str]) -> FrozenSet[int]:
+        return frozenset(self.languages.get(self.resolve_language(language), {}))
+
+
+def build_index(db: Session, version: str = "0") -> TranslatorIndex:
+    translators = {
+        row.id: TranslatorInfo(
+            id=row.id, name=row.name, email=row.email, phone=row.phone,
+            telegram_id=row.telegram_id, whatsapp=row.whatsapp, status=row.status,
+            rating=row.rating or 0.0, completed_orders=row.completed_orders or 0,
+        )
+        for row in db.execute(
+            select(
+                Translator.id, Translator.name, Translator.email, Translator.phone,
+                Translator.telegram_id, Translator.whatsapp, Translator.status,
+                Translator.rating, Translator.completed_orders,
+            )
+        )
+    }
+
+    # Назви з довідника мов (pl / en) -> канонічний ключ name_pl
+    aliases: Dict[str, str] = {}
+    for name_pl, name_en in db.execute(select(Language.name_pl, Language.name_en)):
+        canonical = normalize_key(name_pl)
+        aliases[canonical] = canonical
+        if name_en:
+            aliases[normalize_key(name_en)] = canonical
+
+    def canonical(value: str) -> str:
+        key = normalize_key(value)
+        key = LANGUAGE_CODES.get(key, key)
+        return aliases.get(key, key)
+
+    languages: Dict[str, Dict[int, Capability]] = {}
+
+    def capability(translator_id: int, language: str) -> Capability:
+        key = canonical(language)
+        per_language = languages.setdefault(key, {})
+        if translator_id not in per_language:
+            per_language[translator_id] = Capability(language=key)
+        return per_language[translator_id]
+
+    for translator_id, language, rate, specializations in db.execute(
+        select(
+            TranslatorLanguage.translator_id, TranslatorLanguage.language,
+            TranslatorLanguage.rate_per_page, TranslatorLanguage.specializations,
+        )
+    ):
+        if translator_id not in translators or not language:
+            continue
+        item = capability(translator_id, language)
+        item.rate = rate if item.rate is None else min(item.rate, rate)
+        for name in _parse_specializations(specializations):
+            item.specialization_rates.setdefault(normalize_key(name), None)
+
+    for translator_id, name_pl, specialization, rate in db.execute(
+        select(
+            TranslatorLanguageRate.translator_id, Language.name_pl,
+            Specialization.name, TranslatorLanguageRate.translator_rate,
+        )
+        .join(Language, Language.id == TranslatorLanguageRate.language_id)
+        .join(Specialization, Specialization.id == TranslatorLanguageRate.specialization_id)
+        .where(Language.is_active.is_(True))
+    ):
+        if translator_id not in translators:
+            continue
+        item = capability(translator_id, name_pl)
+        item.specialization_rates[normalize_key(specialization)] = float(rate)
+
+    return TranslatorIndex(version=version, translators=translators, languages=languages, aliases=aliases)
+
+
+def _redis():
+    from core.redis_client import get_redis
+    return get_redis()
+
+
+class _IndexCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index: Optional[TranslatorIndex] = None
+        self._loaded_at = 0.0
+
+    def get(self, db: Session) -> TranslatorIndex:
+        try:
+            version = _redis().get(MATCHING_VERSION_KEY) or "0"
+        except Exception as e:
+            logger.warning(f"Translator index: cannot read version from Redis: {e}")
+            version = self._index.version if self._index is not None else "0"
+        index = self._index
+        if self._fresh(index, version):
+            return index
+        with self._lock:
+            if not self._fresh(self._index, version):
+                self._index = build_index(db, version)
+                self._loaded_at = time.monotonic()
+            return self._index
+
+    def _fresh(self, index: Optional[TranslatorIndex], version: str) -> bool:
+        return (
+            index is not None
+            and index.version == version
+            and time.monotonic() - self._loaded_at < MATCHING_INDEX_MAX_AGE_SECONDS
+        )
+
+    def invalidate_local(self) -> None:
+        self._index = None
+
+
+_cache = _IndexCache()
+
+
+def get_translator_index(db: Session) -> TranslatorIndex:
+    return _cache.get(db)
+
+
+def invalidate_translator_index() -> None:
+    """Перебудувати індекс у всіх процесах (для bulk змін поза ORM)."""
+    _cache.invalidate_local()
+    try:
+        _redis().incr(MATCHING_VERSION_KEY)
+    except Exception as e:
+        logger.warning(f"Translator index: cannot publish invalidation: {e}")
+
+
+# ---------- Shortlist ----------
+
+@dataclass(frozen=True)
+class TranslatorMatch:
+    translator: TranslatorInfo
+    language: str
+    rate: Optional[float]
+    specialization_match: bool
+    pending_requests: int
+    active_orders: int
+    request_status: Optional[str]
+    score: float
+
+
+def _is_urgent(order: Order, now: datetime) -> bool:
+    if order.translation_type and normalize_key(order.translation_type) == TranslationType.EKSPRESOWE.value:
+        return True
+    if order.deadline is None:
+        return False
+    deadline = order.deadline if order.deadline.tzinfo else order.deadline.replace(tzinfo=timezone.utc)
+    return (deadline - now).total_seconds() < URGENT_DEADLINE_HOURS * 3600
+
+
+def shortlist(
+    db: Session,
+    order: Order,
+    limit: int = DEFAULT_SHORTLIST_SIZE,
+    language: Optional[str] = None,
+    translation_type: Optional[str] = None,
+) -> List[TranslatorMatch]:
+    """
+    Рейтинг перекладачів для замовлення: збіг спеціалізації, рейтинг,
+    ставка (дешевші вище) і мінус поточне навантаження. Перекладачі, які
+    вже відхилили це замовлення, не пропонуються.
+    """
+    index = get_translator_index(db)
+    candidates = {
+        translator_id: item
+        for translator_id, item in index.languages.get(index.resolve_language(language or order.language), {}).items()
+        if index.translators[translator_id].status != TranslatorStatus.INACTIVE.value
+    }
+    if not candidates:
+        return []
+
+    specialization = normalize_key(translation_type or order.translation_type)
+    urgent = _is_urgent(order, datetime.now(timezone.utc))
+
+    request = TranslationRequest
+    load_rows = db.execute(
+        select(
+            request.translator_id,
+            func.count().filter(request.status == TranslationRequestStatus.PENDING.value),
+            func.count().filter(
+                request.status == TranslationRequestStatus.ACCEPTED.value,
+                Order.status != OrderStatus.CLOSED.value,
+                Order.is_archived.is_(False),
+            ),
+            func.max(case((request.order_id == order.id, request.status))),
+            # Окремо від max(): статуси порівнюються як рядки, і "declined"
+            # програє "pending" при кількох запитах на це замовлення
+            func.bool_or(and_(
+                request.order_id == order.id,
+                request.status == TranslationRequestStatus.DECLINED.value,
+            )),
+        )
+        .join(Order, Order.id == request.order_id)
+        .where(
+            request.translator_id.in_(list(candidates)),
+            or_(
+                request.status.in_([TranslationRequestStatus.PENDING.value, TranslationRequestStatus.ACCEPTED.value]),
+                request.order_id == order.id,
+            ),
+        )
+        .group_by(request.translator_id)
+    ).all()
+    load = {row[0]: row[1:] for row in load_rows}
+
+    rates = [rate for rate in (item.rate_for(specialization) for item in candidates.values()) if rate]
+    max_rate = max(rates) if rates else 0.0
+    load_weight = URGENT_LOAD_WEIGHT if urgent else LOAD_WEIGHT
+
+    matches = []
+    for translator_id, item in candidates.items():
+        translator = index.translators[translator_id]
+        pending, active, request_status, declined = load.get(translator_id, (0, 0, None, False))
+        if declined:
+            continue
+        rate = item.rate_for(specialization)
+        specialization_match = bool(specialization) and specialization in item.specialization_rates
+        score = (
+            SPECIALIZATION_WEIGHT * specialization_match
+            + RATING_WEIGHT * min(translator.rating, 5.0) / 5.0
+            + (PRICE_WEIGHT * (1 - rate / max_rate) if rate and max_rate else 0.0)
+            - load_weight * (pending + active)
+            - (BUSY_PENALTY if translator.status == TranslatorStatus.BUSY.value else 0.0)
+        )
+        matches.append(TranslatorMatch(
+            translator=translator,
+            language=item.language,
+            rate=rate,
+            specialization_match=specialization_match,
+            pending_requests=pending,
+            active_orders=active,
+            request_status=request_status,
+            score=round(score, 4),
+        ))
+    matches.sort(key=lambda match: (-match.score, match.rate if match.rate is not None else float("inf")))
+    return matches[:limit]
+
+
+def order_rates(db: Session, order: Order, translator_ids: List[int]) -> Dict[int, Optional[float]]:
+    """Ставки перекладачів для мови / спеціалізації замовлення (None - невідома)."""
+    index = get_translator_index(db)
+    candidates = index.languages.get(index.resolve_language(order.language), {})
+    specialization = normalize_key(order.translation_type)
+    return {
+        translator_id: candidates[translator_id].rate_for(specialization) if translator_id in candidates else None
+        for translator_id in translator_ids
+    }
+
+
+# ---------- Відстеження змін у сесіях ----------
+
+@event.listens_for(Session, "after_flush")
+def _collect_translator_changes(session, flush_context):
+    if session.info.get(SESSION_FLAG):
+        return
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if getattr(obj, "__tablename__", None) in MATCHING_TABLES:
+            session.info[SESSION_FLAG] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_translator_changes(session):
+    if session.info.pop(SESSION_FLAG, False):
+        invalidate_translator_index()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_translator_changes(session):
+    session.info.pop(SESSION_FLAG, None)
@@ -0,0 +1,133 @@
+"""
+Finance export - Excel реєстр платежів (Płatności).
+
+Рядки читаються server-side курсором (yield_per) з колонкової проекції
+і одразу дописуються у write-only лист, тож пам'ять не росте з кількістю платежів.
+"""
+from datetime import date, datetime
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from core.excel_export import CELL, DATE, MONEY, ExcelWriter, header_style
+from modules.crm.models import Client, Order
+from modules.finance.models import Transaction
+from modules.finance.queries import enum_value, payments_base_query
+import models
+
+# Скільки рядків тягнути з курсора за раз
+EXPORT_FETCH_SIZE = 1000
+
+# Вище цієї кількості синхронний експорт відмовляє і пропонує фонову задачу
+EXPORT_SYNC_MAX_ROWS = 20000
+
+PAYMENT_METHOD_LABELS = {
+    "transfer": "Przelew",
+    "card": "Karta",
+    "blik": "BLIK",
+    "cash": "Gotówka",
+}
+
+# (заголовок, колір заливки, ширина, стиль даних)
+PAYMENT_COLUMNS = [
+    ("LP", "90EE90", 5, CELL),
+    ("Numer zlecenia", "87CEEB", 25, CELL),
+    ("Data wykonania usługi", "DDA0DD", 18, DATE),
+    ("Nabywca (Imię i nazwisko)", "FFD700", 25, CELL),
+    ("Kwota płatności brutto", "FFA500", 20, MONEY),
+    ("Data płatności", "FFB6C1", 15, DATE),
+    ("Data nabicia na KF", "87CEEB", 18, DATE),
+    ("Sposób płatności", "FFC0CB", 18, CELL),
+    ("Numer dowodu sprzedaży", "FFB6C1", 25, CELL),
+    ("Uwagi", "D3D3D3", 30, CELL),
+]
+
+
+def _format_date(value) -> str:
+    return value.strftime("%d.%m.%Y") if value else ""
+
+
+def payments_export_filename() -> str:
+    return f"platnosci_{datetime.now().strftime('%Y%m%d')}.xlsx"
+
+
+def count_payments(
+    db: Session,
+    user: models.User,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    payment_method: Optional[List[str]] = None,
+    payment_status: Optional[List[str]] = None,
+) -> int:
+    return payments_base_query(
+        db, user, date_from, date_to, payment_method, payment_status,
+        func.count(Transaction.id),
+    ).scalar()
+
+
+def write_payments_workbook(
+    db: Session,
+    user: models.User,
+    path: Path,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    payment_method: Optional[List[str]] = None,
+    payment_status: Optional[List[str]] = None,
+) -> int:
+    """
+    Записати реєстр платежів у xlsx за шляхом path.
+    Менеджери отримують тільки свої платежі, бухгалтер та адмін - всі.
+
+    Returns:
+        Кількість записаних платежів
+    """
+    header_styles = {}
+    for _, color, _, _ in PAYMENT_COLUMNS:
+        header_styles.setdefault(color, header_style(f"payments_head_{color}", fill=color))
+
+    writer = ExcelWriter(extra_styles=header_styles.values())
+    ws = writer.sheet("Płatności", widths=[width for _, _, width, _ in PAYMENT_COLUMNS])
+    writer.append(
+        ws,
+        [header for header, _, _, _ in PAYMENT_COLUMNS],
+        styles=[f"payments_head_{color}" for _, color, _, _ in PAYMENT_COLUMNS],
+    )
+    data_styles = [style for _, _, _, style in PAYMENT_COLUMNS]
+
+    rows = (
+        payments_base_query(
+            db, user, date_from, date_to, payment_method, payment_status,
+            Transaction.service_date,
+            Transaction.amount_gross,
+            Transaction.payment_date,
+            Transaction.posting_date,
+            Transaction.payment_method,
+            Transaction.receipt_number,
+            Transaction.notes,
+            Order.order_number,
+            Client.full_name.label("buyer_name"),
+        )
+        .order_by(Transaction.payment_date.desc(), Transaction.id.desc())
+        .yield_per(EXPORT_FETCH_SIZE)
+    )
+
+    count = 0
+    for count, row in enumerate(rows, 1):
+        method = enum_value(row.payment_method)
+        writer.append(ws, [
+            count,
+            row.order_number or "N/A",
+            _format_date(row.service_date),
+            row.buyer_name or "N/A",
+            float(row.amount_gross),
+            _format_date(row.payment_date),
+            _format_date(row.posting_date),
+            PAYMENT_METHOD_LABELS.get(method, str(method)),
+            row.receipt_number,
+            row.notes or "",
+        ], styles=data_styles)
+
+    writer.save(path)
+    return count
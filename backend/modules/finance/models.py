@@ -3,7 +3,7 @@ from enum import Enum
 from datetime import date, datetime
 from decimal import Decimal
 from typing import TYPE_CHECKING, Optional
-from sqlalchemy import String, Date, Text, ForeignKey, Numeric, DateTime
+from sqlalchemy import String, Date, Text, ForeignKey, Numeric, DateTime, Index, Integer
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID as PostgresUUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -75,6 +75,13 @@ class Transaction(Base):
     stripe_payment_link_id: Mapped[str | None] = mapped_column(String(255), nullable=True, index=True)  # ID Payment Link
     
     order: Mapped["Order"] = relationship("Order", back_populates="transactions", lazy="joined")
+    
+    __table_args__ = (
+        # Keyset пагінація GET /finance/payments: ORDER BY <sort_col>, id
+        Index('idx_fin_tx_payment_date_id', 'payment_date', 'id'),
+        Index('idx_fin_tx_service_date_id', 'service_date', 'id'),
+        Index('idx_fin_tx_created_at_id', 'created_at', 'id'),
+    )
 
 
 class Shipment(Base):
@@ -122,3 +129,31 @@ class Shipment(Base):
     # Relationship
     order: Mapped["Order"] = relationship("Order", back_populates="shipments", lazy="joined")
 
+
+class FinanceDailyRollup(Base):
+    """
+    Денні агрегати платежів та замовлень для дашбордів і звітів.
+    
+    Рядки не редагуються вручну: modules/finance/rollups.py перераховує
+    їх цілими днями з finance_transactions, payment_transactions та crm_orders.
+    """
+    __tablename__ = "finance_daily_rollups"
+    
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    source: Mapped[str] = mapped_column(String(20), primary_key=True)  # transaction | payment | order
+    office_id: Mapped[int] = mapped_column(Integer, primary_key=True, default=0)  # 0 = без офісу
+    manager_id: Mapped[UUID] = mapped_column(PostgresUUID(as_uuid=True), primary_key=True)
+    provider: Mapped[str] = mapped_column(String(50), primary_key=True, default="")  # payment_method / provider
+    status: Mapped[str] = mapped_column(String(50), primary_key=True, default="")
+    
+    tx_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    order_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # різні замовлення в межах дня
+    amount: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0, nullable=False)
+    fees: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0, nullable=False)
+    net_amount: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0, nullable=False)
+    
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index('idx_fin_rollup_source_day', 'source', 'day'),
+    )
@@ -0,0 +1,53 @@
+"""
+Finance queries - спільні запити платежів для списку, експорту та фонових задач.
+"""
+from datetime import date
+from enum import Enum
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from core.rbac import Scope, get_user_scopes
+from modules.crm.models import Client, Order
+from modules.finance.models import Transaction
+import models
+
+
+def payments_base_query(
+    db: Session,
+    user: models.User,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    payment_method: Optional[List[str]],
+    payment_status: Optional[List[str]],
+    *columns,
+):
+    """
+    Відфільтрований запит платежів: одна проекція з outer join на order/client.
+    Менеджери без CRM_VIEW_ALL бачать тільки платежі своїх замовлень
+    (фільтр по тому ж join, без повторного приєднання Order).
+    """
+    query = (
+        db.query(*columns)
+        .select_from(Transaction)
+        .outerjoin(Order, Order.id == Transaction.order_id)
+        .outerjoin(Client, Client.id == Order.client_id)
+    )
+
+    user_scopes = get_user_scopes(user)
+    if Scope.CRM_VIEW_ALL not in user_scopes and Scope.ADMIN_ALL not in user_scopes:
+        query = query.filter(Order.manager_id == user.id)
+
+    if date_from:
+        query = query.filter(Transaction.payment_date >= date_from)
+    if date_to:
+        query = query.filter(Transaction.payment_date <= date_to)
+    if payment_method:
+        query = query.filter(Transaction.payment_method.in_(payment_method))
+    if payment_status:
+        query = query.filter(Transaction.payment_status.in_(payment_status))
+    return query
+
+
+def enum_value(value):
+    return value.value if isinstance(value, Enum) else value
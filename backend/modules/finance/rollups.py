@@ -0,0 +1,285 @@
+"""
+Finance rollups - денні агрегати платежів та замовлень (finance_daily_rollups).
+
+Дні перераховуються цілком (DELETE + INSERT ... SELECT GROUP BY), тому refresh
+ідемпотентний і коректний і для вставок, і для змін/видалень:
+- після commit сесії, що змінила Transaction / PaymentTransaction / Order,
+  зачеплені дні ставляться в Celery задачу refresh_finance_rollups_task;
+- beat періодично перераховує останні дні (страховка від пропущених подій
+  і змін, які не видно з однієї сесії, наприклад перепризначення менеджера).
+
+Читання йдуть тільки по rollup таблиці, тож час відповіді не залежить
+від кількості платежів у діапазоні.
+"""
+import logging
+from datetime import date, datetime, timedelta, timezone
+from itertools import chain
+from typing import Iterable, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import Date, String, cast, delete, event, func, insert, inspect, literal, select, text
+from sqlalchemy.orm import Session
+
+from modules.crm.models import Order
+from modules.finance.models import FinanceDailyRollup, PaymentStatus, Transaction
+from modules.payment.models import PaymentTransaction
+
+logger = logging.getLogger(__name__)
+
+SOURCE_TRANSACTION = "transaction"
+SOURCE_PAYMENT = "payment"
+SOURCE_ORDER = "order"
+
+# Статуси реєстру, що рахуються у виручку ("" - ручні платежі без статусу)
+REVENUE_STATUSES = ("", PaymentStatus.SUCCEEDED.value)
+
+# Скільки днів максимум перераховується одним запитом (backfill йде чанками)
+REFRESH_CHUNK_DAYS = 31
+
+# Ключ advisory lock: паралельні refresh одних і тих самих днів не конфліктують по PK
+_ADVISORY_LOCK_KEY = 728_341_001
+
+# Зміни цих полів Order впливають на агрегати
+_ORDER_ROLLUP_FIELDS = ("manager_id", "office_id", "price_brutto", "price_netto")
+
+_SESSION_DAYS_KEY = "finance_rollup_days"
+
+ROLLUP_COLUMNS = [
+    FinanceDailyRollup.day,
+    FinanceDailyRollup.source,
+    FinanceDailyRollup.office_id,
+    FinanceDailyRollup.manager_id,
+    FinanceDailyRollup.provider,
+    FinanceDailyRollup.status,
+    FinanceDailyRollup.tx_count,
+    FinanceDailyRollup.order_count,
+    FinanceDailyRollup.amount,
+    FinanceDailyRollup.fees,
+    FinanceDailyRollup.net_amount,
+]
+
+
+def _transactions_select(days: Sequence[date]):
+    """Реєстр платежів (finance_transactions) по днях платежу."""
+    day = Transaction.payment_date
+    office = func.coalesce(Order.office_id, 0)
+    status = func.coalesce(Transaction.payment_status, "")
+    fee = func.coalesce(Transaction.stripe_fee, 0)
+    return (
+        select(
+            day,
+            literal(SOURCE_TRANSACTION, String),
+            office,
+            Order.manager_id,
+            Transaction.payment_method,
+            status,
+            func.count(Transaction.id),
+            func.count(func.distinct(Transaction.order_id)),
+            func.sum(Transaction.amount_gross),
+            func.sum(fee),
+            func.sum(func.coalesce(Transaction.net_amount, Transaction.amount_gross - fee)),
+        )
+        .join(Order, Order.id == Transaction.order_id)
+        .where(day.in_(days))
+        .group_by(day, office, Order.manager_id, Transaction.payment_method, status)
+    )
+
+
+def _payments_select(days: Sequence[date]):
+    """Онлайн-оплати (payment_transactions) по дню створення."""
+    day = cast(PaymentTransaction.created_at, Date)
+    office = func.coalesce(Order.office_id, 0)
+    return (
+        select(
+            day,
+            literal(SOURCE_PAYMENT, String),
+            office,
+            Order.manager_id,
+            PaymentTransaction.provider,
+            PaymentTransaction.status,
+            func.count(PaymentTransaction.id),
+            func.count(func.distinct(PaymentTransaction.order_id)),
+            func.sum(PaymentTransaction.amount),
+            literal(0),
+            func.sum(PaymentTransaction.amount),
+        )
+        .join(Order, Order.id == PaymentTransaction.order_id)
+        .where(
+            PaymentTransaction.created_at >= min(days),
+            PaymentTransaction.created_at < max(days) + timedelta(days=1),
+            day.in_(days),
+        )
+        .group_by(day, office, Order.manager_id, PaymentTransaction.provider, PaymentTransaction.status)
+    )
+
+
+def _orders_select(days: Sequence[date]):
+    """Нові замовлення по дню створення (amount = брутто, net = нетто)."""
+    day = cast(Order.created_at, Date)
+    office = func.coalesce(Order.office_id, 0)
+    return (
+        select(
+            day,
+            literal(SOURCE_ORDER, String),
+            office,
+            Order.manager_id,
+            literal("", String),
+            literal("", String),
+            func.count(Order.id),
+            func.count(Order.id),
+            func.coalesce(func.sum(Order.price_brutto), 0),
+            literal(0),
+            func.coalesce(func.sum(Order.price_netto), 0),
+        )
+        .where(
+            Order.created_at >= min(days),
+            Order.created_at < max(days) + timedelta(days=1),
+            day.in_(days),
+        )
+        .group_by(day, office, Order.manager_id)
+    )
+
+
+def refresh_days(db: Session, days: Iterable[date]) -> int:
+    """
+    Перерахувати агрегати за вказані дні (в одній транзакції з commit).
+
+    Returns:
+        Кількість перерахованих днів
+    """
+    days = sorted(set(days))
+    for start in range(0, len(days), REFRESH_CHUNK_DAYS):
+        chunk = days[start:start + REFRESH_CHUNK_DAYS]
+        try:
+            db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+            db.execute(delete(FinanceDailyRollup).where(FinanceDailyRollup.day.in_(chunk)))
+            for build in (_transactions_select, _payments_select, _orders_select):
+                db.execute(insert(FinanceDailyRollup).from_select(ROLLUP_COLUMNS, build(chunk)))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    return len(days)
+
+
+def refresh_range(db: Session, date_from: date, date_to: date) -> int:
+    """Перерахувати агрегати за діапазон дат (включно)."""
+    count = (date_to - date_from).days + 1
+    return refresh_days(db, (date_from + timedelta(days=offset) for offset in range(count)))
+
+
+def query_rollups(
+    db: Session,
+    source: str,
+    date_from: date,
+    date_to: date,
+    group_by: Sequence[str] = (),
+    manager_id: Optional[UUID] = None,
+    statuses: Optional[Sequence[str]] = None,
+) -> List:
+    """
+    Сумарні показники за діапазон дат з rollup таблиці.
+
+    group_by - колонки FinanceDailyRollup (day, office_id, manager_id, provider, status);
+    кожен рядок результату має ці колонки + tx_count, order_count, amount, fees, net_amount.
+    """
+    group_columns = [getattr(FinanceDailyRollup, name) for name in group_by]
+    query = (
+        select(
+            *group_columns,
+            func.coalesce(func.sum(FinanceDailyRollup.tx_count), 0).label("tx_count"),
+            func.coalesce(func.sum(FinanceDailyRollup.order_count), 0).label("order_count"),
+            func.coalesce(func.sum(FinanceDailyRollup.amount), 0).label("amount"),
+            func.coalesce(func.sum(FinanceDailyRollup.fees), 0).label("fees"),
+            func.coalesce(func.sum(FinanceDailyRollup.net_amount), 0).label("net_amount"),
+        )
+        .where(
+            FinanceDailyRollup.source == source,
+            FinanceDailyRollup.day >= date_from,
+            FinanceDailyRollup.day <= date_to,
+        )
+    )
+    if manager_id is not None:
+        query = query.where(FinanceDailyRollup.manager_id == manager_id)
+    if statuses is not None:
+        query = query.where(FinanceDailyRollup.status.in_(statuses))
+    if group_columns:
+        query = query.group_by(*group_columns).order_by(*group_columns)
+    return db.execute(query).all()
+
+
+# ---------- Відстеження змін у сесіях ----------
+
+def _utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def _as_day(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).date() if value.tzinfo else value.date()
+    return value
+
+
+def _touched_days(obj, date_field: str, fields: Sequence[str] = ()) -> List[date]:
+    """Дні, агрегати яких змінює flush об'єкта (поточне і старе значення дати)."""
+    state = inspect(obj)
+    if state.persistent and fields and not state.deleted:
+        if not any(state.attrs[name].history.has_changes() for name in (*fields, date_field)):
+            return []
+    history = state.attrs[date_field].history
+    values = [*history.added, *history.unchanged, *history.deleted]
+    # server_default (created_at) ще не завантажений після INSERT - це сьогодні
+    days = [_as_day(value) for value in values if value is not None]
+    return days or [_utc_today()]
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_rollup_days(session, flush_context):
+    days = session.info.setdefault(_SESSION_DAYS_KEY, set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Transaction):
+            days.update(_touched_days(obj, "payment_date", fields=("order_id", "amount_gross", "stripe_fee", "net_amount", "payment_method", "payment_status")))
+        elif isinstance(obj, PaymentTransaction):
+            days.update(_touched_days(obj, "created_at", fields=("order_id", "amount", "provider", "status")))
+        elif isinstance(obj, Order):
+            days.update(_touched_days(obj, "created_at", fields=_ORDER_ROLLUP_FIELDS))
+
+
+@event.listens_for(Session, "after_commit")
+def _schedule_rollup_refresh(session):
+    days = session.info.pop(_SESSION_DAYS_KEY, None)
+    if not days:
+        return
+    try:
+        from tasks.celery_app import celery_app
+        celery_app.send_task(
+            "refresh_finance_rollups_task",
+            kwargs={"days": sorted(day.isoformat() for day in days)},
+        )
+    except Exception as e:
+        # Не блокуємо запис платежу: beat перерахує ці дні найближчим проходом
+        logger.warning(f"Failed to schedule finance rollup refresh for {len(days)} days: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rollup_days(session):
+    session.info.pop(_SESSION_DAYS_KEY, None)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from core.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Перерахувати finance_daily_rollups за період")
+    parser.add_argument("--since", type=date.fromisoformat, required=True, help="YYYY-MM-DD")
+    parser.add_argument("--until", type=date.fromisoformat, default=None, help="YYYY-MM-DD (за замовчуванням сьогодні)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        refreshed = refresh_range(db, args.since, args.until or _utc_today())
+        logger.info(f"Refreshed {refreshed} days of finance rollups")
+    finally:
+        db.close()
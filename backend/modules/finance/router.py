@@ -5,17 +5,21 @@ import logging
 from datetime import datetime, date
 from decimal import Decimal
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 
 from core.database import get_db
 from core.rbac import require_scope, Scope, filter_by_scope, get_user_scopes
+from core.settings_cache import get_singleton
 from modules.auth.dependencies import get_current_user_db, role_required
 from modules.auth.models import UserRole
 from modules.finance.models import Transaction, PaymentMethod, PaymentStatus, Shipment, ShipmentMethod, ShipmentStatus
 from modules.finance.schemas import ShipmentCreate, ShipmentRead, ShipmentUpdate
+from modules.finance.queries import payments_base_query, enum_value
+# Імпорт також реєструє session hooks, що оновлюють агрегати після commit
+from modules.finance.rollups import REVENUE_STATUSES, SOURCE_TRANSACTION, query_rollups
 from modules.crm.models import Order
-from modules.payment.models import PaymentSettings, PaymentProvider
+from modules.payment.models import PaymentProvider
 from modules.payment.services.stripe_service import StripeService
 from modules.payment.services.przelewy24_service import Przelewy24Service
 from modules.payment.schemas import P24TransactionRegisterRequest
@@ -33,30 +37,119 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["finance"])
 
 
+# Розрізи для group_by у фінансових звітах -> колонка FinanceDailyRollup
+REPORT_GROUPS = {
+    "day": "day",
+    "office": "office_id",
+    "manager": "manager_id",
+    "method": "provider",
+}
+
+
+def _report_period(date_from: Optional[date], date_to: Optional[date]):
+    """Період звіту за замовчуванням - поточний місяць до сьогодні."""
+    date_to = date_to or date.today()
+    date_from = date_from or date_to.replace(day=1)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must be before date_to")
+    return date_from, date_to
+
+
+def _report_manager_id(user: models.User):
+    """Менеджери без CRM_VIEW_ALL бачать тільки свої продажі."""
+    user_scopes = get_user_scopes(user)
+    if Scope.CRM_VIEW_ALL in user_scopes or Scope.ADMIN_ALL in user_scopes:
+        return None
+    return user.id
+
+
+def _finance_report(
+    db: Session,
+    user: models.User,
+    date_from: Optional[date],
+    date_to: Optional[date],
+    group_by: Optional[str],
+) -> dict:
+    """
+    Виручка / комісії / нетто з finance_daily_rollups за період.
+    Повертає totals та (якщо заданий group_by) breakdown по розрізу.
+    """
+    if group_by and group_by not in REPORT_GROUPS:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of {list(REPORT_GROUPS)}")
+    date_from, date_to = _report_period(date_from, date_to)
+    params = dict(
+        source=SOURCE_TRANSACTION,
+        date_from=date_from,
+        date_to=date_to,
+        manager_id=_report_manager_id(user),
+        statuses=REVENUE_STATUSES,
+    )
+    
+    totals = query_rollups(db, **params)[0]
+    report = {
+        "date_from": date_from.isoformat(),
+        "date_to": date_to.isoformat(),
+        "currency": "PLN",
+        "revenue": float(totals.amount),
+        "costs": float(totals.fees),
+        "net": float(totals.net_amount),
+        "transactions": totals.tx_count,
+    }
+    if group_by:
+        column = REPORT_GROUPS[group_by]
+        report["breakdown"] = [
+            {
+                group_by: str(getattr(row, column)) if column == "manager_id" else getattr(row, column),
+                "revenue": float(row.amount),
+                "costs": float(row.fees),
+                "net": float(row.net_amount),
+                "transactions": row.tx_count,
+            }
+            for row in query_rollups(db, group_by=[column], **params)
+        ]
+    return report
+
+
 @router.get("/revenue")
 def get_revenue(
+    date_from: Optional[date] = Query(None, description="Дата платежу від (за замовчуванням початок місяця)"),
+    date_to: Optional[date] = Query(None, description="Дата платежу до (за замовчуванням сьогодні)"),
+    group_by: Optional[str] = Query(None, description="day | office | manager | method"),
     db: Session = Depends(get_db),
     user: models.User = Depends(role_required([UserRole.OWNER, UserRole.ACCOUNTANT, UserRole.MANAGER])),
 ):
     """
     Отримати виручку.
     Доступ: менеджери, продажі, бухгалтер, адмін.
-    """
-    from core.rbac import get_user_scopes
-    
-    # Фільтруємо на основі scope
-    # Якщо менеджер - показуємо всі продажі
-    # Якщо sales-manager - показуємо тільки свої продажі
+    Менеджери без CRM_VIEW_ALL бачать тільки свої продажі.
     
+    Рахується з денних агрегатів (finance_daily_rollups), не з сирих транзакцій.
+    """
     user_scopes = get_user_scopes(user)
-    
-    if Scope.FINANCE_VIEW_REVENUE in user_scopes:
-        # TODO: Реалізувати розрахунок виручки
-        return {"revenue": 0, "currency": "UAH"}
+    if Scope.FINANCE_VIEW_REVENUE not in user_scopes and Scope.ADMIN_ALL not in user_scopes:
+        raise HTTPException(status_code=403, detail="У вас немає прав для перегляду виручки")
+    
+    report = _finance_report(db, user, date_from, date_to, group_by)
+    result = {
+        "revenue": report["revenue"],
+        "transactions": report["transactions"],
+        "currency": report["currency"],
+        "date_from": report["date_from"],
+        "date_to": report["date_to"],
+    }
+    if "breakdown" in report:
+        result["breakdown"] = [
+            {key: value for key, value in row.items() if key not in ("costs", "net")}
+            for row in report["breakdown"]
+        ]
+    return result
 
 
 @router.get("/profit")
 def get_profit(
+    date_from: Optional[date] = Query(None, description="Дата платежу від (за замовчуванням початок місяця)"),
+    date_to: Optional[date] = Query(None, description="Дата платежу до (за замовчуванням сьогодні)"),
+    group_by: Optional[str] = Query(None, description="day | office | manager | method"),
     db: Session = Depends(get_db),
     user: models.User = Depends(role_required([UserRole.OWNER, UserRole.ACCOUNTANT])),
 ):
@@ -64,92 +157,216 @@ def get_profit(
     Отримати прибуток (чистий прибуток).
     Доступ: ТІЛЬКИ бухгалтер та адмін.
     Менеджер НЕ бачить цей endpoint (403).
+    
+    Прибуток = Виручка - Витрати (поки що витрати - це комісії платіжних провайдерів).
     """
-    # TODO: Реалізувати розрахунок прибутку
-    # Прибуток = Виручка - Витрати
-    return {"profit": 0, "currency": "UAH", "note": "Only accountant and admin can see this"}
+    report = _finance_report(db, user, date_from, date_to, group_by)
+    result = {
+        "profit": round(report["revenue"] - report["costs"], 2),
+        "revenue": report["revenue"],
+        "costs": report["costs"],
+        "currency": report["currency"],
+        "date_from": report["date_from"],
+        "date_to": report["date_to"],
+    }
+    if "breakdown" in report:
+        result["breakdown"] = [
+            {**row, "profit": round(row["revenue"] - row["costs"], 2)}
+            for row in report["breakdown"]
+        ]
+    return result
 
 
 @router.get("/costs")
 def get_costs(
+    date_from: Optional[date] = Query(None, description="Дата платежу від (за замовчуванням початок місяця)"),
+    date_to: Optional[date] = Query(None, description="Дата платежу до (за замовчуванням сьогодні)"),
+    group_by: Optional[str] = Query(None, description="day | office | manager | method"),
     db: Session = Depends(get_db),
     user: models.User = Depends(role_required([UserRole.OWNER, UserRole.ACCOUNTANT])),
 ):
     """
     Отримати витрати.
     Доступ: бухгалтер, адмін.
+    
+    Поки що витрати - це комісії платіжних провайдерів (stripe_fee) з реєстру платежів.
     """
-    # TODO: Реалізувати розрахунок витрат
-    return {"costs": 0, "currency": "UAH"}
+    report = _finance_report(db, user, date_from, date_to, group_by)
+    result = {
+        "costs": report["costs"],
+        "currency": report["currency"],
+        "date_from": report["date_from"],
+        "date_to": report["date_to"],
+    }
+    if "breakdown" in report:
+        result["breakdown"] = [
+            {key: value for key, value in row.items() if key not in ("revenue", "net")}
+            for row in report["breakdown"]
+        ]
+    return result
+
+
+# Колонки, за якими дозволено сортування списку платежів (усі NOT NULL та індексовані)
+PAYMENT_SORT_COLUMNS = {
+    "payment_date": Transaction.payment_date,
+    "service_date": Transaction.service_date,
+    "created_at": Transaction.created_at,
+}
 
 
 @router.get("/payments")
 def get_payments(
+    date_from: Optional[date] = Query(None, description="Дата платежу від (включно)"),
+    date_to: Optional[date] = Query(None, description="Дата платежу до (включно)"),
+    payment_method: Optional[List[str]] = Query(None, description="Спосіб оплати (можна кілька)"),
+    payment_status: Optional[List[str]] = Query(None, description="Статус оплати (можна кілька)"),
+    sort_by: str = Query("payment_date", description="payment_date | service_date | created_at"),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor з попередньої сторінки"),
+    include_summary: bool = Query(True, description="Порахувати summary (тільки для першої сторінки)"),
     db: Session = Depends(get_db),
     user: models.User = Depends(role_required([UserRole.OWNER, UserRole.ACCOUNTANT, UserRole.MANAGER])),
 ):
     """
-    Отримати список платежів (транзакцій).
+    Отримати сторінку платежів (транзакцій) з keyset пагінацією.
     Менеджери бачать тільки свої платежі.
     Бухгалтер та адмін бачать всі.
-    """
-    user_scopes = get_user_scopes(user)
     
-    # Запит транзакцій з завантаженням order та client
-    query = (
-        db.query(Transaction)
-        .options(
-            joinedload(Transaction.order).joinedload(Order.client)
-        )
-        .order_by(Transaction.payment_date.desc())
+    summary (суми за способом оплати та статусом, кількість) рахується в SQL
+    на тій самій відфільтрованій множині і повертається тільки для першої сторінки.
+    """
+    from modules.crm.models import Client
+    from core.pagination import decode_cursor, keyset_condition, order_by_keyset, page_cursor
+    
+    if sort_by not in PAYMENT_SORT_COLUMNS:
+        raise HTTPException(status_code=400, detail=f"sort_by must be one of {list(PAYMENT_SORT_COLUMNS)}")
+    descending = sort_order == "desc"
+    key_columns = [PAYMENT_SORT_COLUMNS[sort_by], Transaction.id]
+    filters = (date_from, date_to, payment_method, payment_status)
+    
+    query = payments_base_query(
+        db, user, *filters,
+        Transaction.id,
+        Transaction.service_date,
+        Transaction.amount_gross,
+        Transaction.payment_date,
+        Transaction.posting_date,
+        Transaction.payment_method,
+        Transaction.receipt_number,
+        Transaction.notes,
+        Transaction.created_at,
+        Transaction.stripe_payment_intent_id,
+        Transaction.stripe_session_id,
+        Transaction.stripe_customer_email,
+        Transaction.currency,
+        Transaction.stripe_fee,
+        Transaction.net_amount,
+        Transaction.card_brand,
+        Transaction.card_last4,
+        Transaction.stripe_receipt_url,
+        Transaction.payment_status,
+        Transaction.stripe_payment_link_id,
+        Order.order_number,
+        Client.full_name.label("buyer_name"),
     )
     
-    # Фільтрація на основі scope
-    if Scope.CRM_VIEW_ALL not in user_scopes and Scope.ADMIN_ALL not in user_scopes:
-        # Тільки свої платежі (де order.manager_id == user.id)
-        query = query.join(Order).filter(Order.manager_id == user.id)
+    # Порядковий номер (LP) продовжується між сторінками через курсор
+    position = 0
+    if cursor:
+        *key_values, position = decode_cursor(cursor, key_columns, extra=1)
+        query = query.filter(keyset_condition(key_columns, key_values, descending))
     
-    transactions = query.all()
+    rows = query.order_by(*order_by_keyset(key_columns, descending)).limit(limit + 1).all()
     
-    # Формуємо відповідь
     payments = []
-    for idx, trans in enumerate(transactions, 1):
-        order = trans.order
-        client = order.client if order else None
-        buyer_name = client.full_name if client else "N/A"
-        
-        payment_data = {
-            "id": str(trans.id),
+    for idx, row in enumerate(rows[:limit], position + 1):
+        payments.append({
+            "id": str(row.id),
             "lp": idx,  # Порядковий номер
-            "order_number": order.order_number if order else "N/A",
-            "service_date": trans.service_date.isoformat() if trans.service_date else None,
-            "buyer_name": buyer_name,
-            "amount_gross": float(trans.amount_gross),
-            "payment_date": trans.payment_date.isoformat() if trans.payment_date else None,
-            "posting_date": trans.posting_date.isoformat() if trans.posting_date else None,
-            "payment_method": trans.payment_method.value if isinstance(trans.payment_method, PaymentMethod) else trans.payment_method,
-            "receipt_number": trans.receipt_number,
-            "notes": trans.notes,
+            "order_number": row.order_number or "N/A",
+            "service_date": row.service_date.isoformat() if row.service_date else None,
+            "buyer_name": row.buyer_name or "N/A",
+            "amount_gross": float(row.amount_gross),
+            "payment_date": row.payment_date.isoformat() if row.payment_date else None,
+            "posting_date": row.posting_date.isoformat() if row.posting_date else None,
+            "payment_method": enum_value(row.payment_method),
+            "receipt_number": row.receipt_number,
+            "notes": row.notes,
             # Stripe fields
-            "stripe_payment_intent_id": trans.stripe_payment_intent_id,
-            "stripe_session_id": trans.stripe_session_id,
-            "stripe_customer_email": trans.stripe_customer_email,
-            "currency": trans.currency or "PLN",
-            "stripe_fee": float(trans.stripe_fee) if trans.stripe_fee else None,
-            "net_amount": float(trans.net_amount) if trans.net_amount else None,
-            "card_brand": trans.card_brand,
-            "card_last4": trans.card_last4,
-            "stripe_receipt_url": trans.stripe_receipt_url,
-            "payment_status": trans.payment_status.value if isinstance(trans.payment_status, PaymentStatus) else trans.payment_status,
-            "stripe_payment_link_id": trans.stripe_payment_link_id,
-        }
-        payments.append(payment_data)
+            "stripe_payment_intent_id": row.stripe_payment_intent_id,
+            "stripe_session_id": row.stripe_session_id,
+            "stripe_customer_email": row.stripe_customer_email,
+            "currency": row.currency or "PLN",
+            "stripe_fee": float(row.stripe_fee) if row.stripe_fee else None,
+            "net_amount": float(row.net_amount) if row.net_amount else None,
+            "card_brand": row.card_brand,
+            "card_last4": row.card_last4,
+            "stripe_receipt_url": row.stripe_receipt_url,
+            "payment_status": enum_value(row.payment_status),
+            "stripe_payment_link_id": row.stripe_payment_link_id,
+        })
+    
+    next_cursor = page_cursor(
+        rows, limit,
+        lambda row: (getattr(row, sort_by), row.id, position + limit),
+    )
     
-    return {"payments": payments}
+    response = {
+        "payments": payments,
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+    }
+    if include_summary and not cursor:
+        response["summary"] = _payments_summary(db, user, *filters)
+    return response
+
+
+def _payments_summary(db: Session, user: models.User, *filters) -> dict:
+    """Суми та кількість одним GROUP BY (payment_method, payment_status) на відфільтрованій множині."""
+    from sqlalchemy import func
+    
+    groups = payments_base_query(
+        db, user, *filters,
+        Transaction.payment_method,
+        Transaction.payment_status,
+        func.count(Transaction.id).label("count"),
+        func.coalesce(func.sum(Transaction.amount_gross), 0).label("amount_gross"),
+        func.coalesce(func.sum(Transaction.net_amount), 0).label("net_amount"),
+    ).group_by(Transaction.payment_method, Transaction.payment_status).all()
+    
+    summary = {
+        "count": 0,
+        "amount_gross": 0.0,
+        "net_amount": 0.0,
+        "by_method": {},
+        "by_status": {},
+    }
+    for group in groups:
+        count = group.count
+        gross = float(group.amount_gross)
+        summary["count"] += count
+        summary["amount_gross"] += gross
+        summary["net_amount"] += float(group.net_amount)
+        for bucket, key in (("by_method", enum_value(group.payment_method)), ("by_status", enum_value(group.payment_status) or "unknown")):
+            entry = summary[bucket].setdefault(key, {"count": 0, "amount_gross": 0.0})
+            entry["count"] += count
+            entry["amount_gross"] += gross
+    
+    summary["amount_gross"] = round(summary["amount_gross"], 2)
+    summary["net_amount"] = round(summary["net_amount"], 2)
+    for bucket in ("by_method", "by_status"):
+        for entry in summary[bucket].values():
+            entry["amount_gross"] = round(entry["amount_gross"], 2)
+    return summary
 
 
 @router.get("/payments/export")
 def export_payments_excel(
+    date_from: Optional[date] = Query(None, description="Дата платежу від (включно)"),
+    date_to: Optional[date] = Query(None, description="Дата платежу до (включно)"),
+    payment_method: Optional[List[str]] = Query(None, description="Спосіб оплати (можна кілька)"),
+    payment_status: Optional[List[str]] = Query(None, description="Статус оплати (можна кілька)"),
     db: Session = Depends(get_db),
     user: models.User = Depends(get_current_user_db),
 ):
@@ -157,149 +374,120 @@ def export_payments_excel(
     Експортувати платежі в Excel.
     Менеджери бачать тільки свої платежі.
     Бухгалтер та адмін бачать всі.
-    """
-    from fastapi.responses import Response
-    from datetime import datetime
-    from io import BytesIO
     
-    try:
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-        from openpyxl.utils import get_column_letter
-    except ImportError:
-        raise HTTPException(status_code=500, detail="openpyxl is required for Excel export")
-    
-    user_scopes = get_user_scopes(user)
-    
-    # Запит транзакцій з завантаженням order та client
-    query = (
-        db.query(Transaction)
-        .options(
-            joinedload(Transaction.order).joinedload(Order.client)
-        )
-        .order_by(Transaction.payment_date.desc())
+    Файл будується write-only книгою з server-side курсора і віддається потоком.
+    Для великих діапазонів (більше EXPORT_SYNC_MAX_ROWS) - 413 з підказкою
+    використати фоновий експорт POST /payments/export/jobs.
+    """
+    from core.excel_export import temp_export_path, xlsx_response
+    from modules.finance.export import (
+        EXPORT_SYNC_MAX_ROWS,
+        count_payments,
+        payments_export_filename,
+        write_payments_workbook,
     )
     
-    # Фільтрація на основі scope
-    if Scope.CRM_VIEW_ALL not in user_scopes and Scope.ADMIN_ALL not in user_scopes:
-        # Тільки свої платежі (де order.manager_id == user.id)
-        query = query.join(Order).filter(Order.manager_id == user.id)
-    
-    transactions = query.all()
-    
-    # Створюємо Excel workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Płatności"
-    
-    # Стилі
-    header_font = Font(bold=True, color="000000")
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
+    filters = dict(
+        date_from=date_from,
+        date_to=date_to,
+        payment_method=payment_method,
+        payment_status=payment_status,
     )
-    
-    # Кольори для заголовків (згідно з зображенням)
-    header_colors = [
-        "90EE90",  # LP - зелений
-        "87CEEB",  # Numer zlecenia - синій
-        "DDA0DD",  # Data wykonania usługi - фіолетовий
-        "FFD700",  # Nabywca - жовтий
-        "FFA500",  # Kwota płatności brutto - помаранчевий
-        "FFB6C1",  # Data płatności - світло-червоний
-        "87CEEB",  # Data nabicia na KF - синій
-        "FFC0CB",  # Sposób płatności - рожевий
-        "FFB6C1",  # Numer dowodu sprzedaży - світло-червоний
-        "D3D3D3",  # Uwagi - сірий
-    ]
-    
-    # Заголовки
-    headers = [
-        "LP",
-        "Numer zlecenia",
-        "Data wykonania usługi",
-        "Nabywca (Imię i nazwisko)",
-        "Kwota płatności brutto",
-        "Data płatności",
-        "Data nabicia na KF",
-        "Sposób płatności",
-        "Numer dowodu sprzedaży",
-        "Uwagi",
-    ]
-    
-    for col_idx, (header, color) in enumerate(zip(headers, header_colors), 1):
-        cell = ws.cell(row=1, column=col_idx, value=header)
-        cell.font = header_font
-        cell.fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        cell.border = thin_border
-    
-    # Дані
-    for row_idx, trans in enumerate(transactions, 2):
-        order = trans.order
-        client = order.client if order else None
-        buyer_name = client.full_name if client else "N/A"
-        
-        # Форматування способу оплати
-        payment_method_map = {
-            "transfer": "Przelew",
-            "card": "Karta",
-            "blik": "BLIK",
-            "cash": "Gotówka",
-        }
-        payment_method_display = payment_method_map.get(
-            trans.payment_method.value if isinstance(trans.payment_method, PaymentMethod) else trans.payment_method,
-            str(trans.payment_method)
+    total = count_payments(db, user, **filters)
+    if total > EXPORT_SYNC_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many payments for direct export ({total}). Use POST /finance/payments/export/jobs",
         )
-        
-        # Форматування дат
-        def format_date(d):
-            if d:
-                return d.strftime("%d.%m.%Y")
-            return ""
-        
-        row_data = [
-            row_idx - 1,  # LP
-            order.order_number if order else "N/A",
-            format_date(trans.service_date),
-            buyer_name,
-            float(trans.amount_gross),
-            format_date(trans.payment_date),
-            format_date(trans.posting_date),
-            payment_method_display,
-            trans.receipt_number,
-            trans.notes or "",
-        ]
-        
-        for col_idx, value in enumerate(row_data, 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            cell.border = thin_border
-            if col_idx == 5:  # Kwota płatności brutto
-                cell.number_format = '#,##0.00'
-                cell.alignment = Alignment(horizontal="right")
-            elif col_idx in [3, 6, 7]:  # Дати
-                cell.alignment = Alignment(horizontal="center")
-    
-    # Налаштування ширини колонок
-    column_widths = [5, 25, 18, 25, 20, 15, 18, 18, 25, 30]
-    for col_idx, width in enumerate(column_widths, 1):
-        ws.column_dimensions[get_column_letter(col_idx)].width = width
-    
-    # Зберігаємо в BytesIO
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    # Формуємо назву файлу
-    filename = f"platnosci_{datetime.now().strftime('%Y%m%d')}.xlsx"
-    
-    return Response(
-        content=output.read(),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+    
+    path = temp_export_path(prefix="platnosci_")
+    try:
+        write_payments_workbook(db, user, path, **filters)
+    except Exception:
+        path.unlink(missing_ok=True)
+        raise
+    return xlsx_response(path, payments_export_filename())
+
+
+@router.post("/payments/export/jobs", status_code=202)
+def create_payments_export_job(
+    date_from: Optional[date] = Query(None, description="Дата платежу від (включно)"),
+    date_to: Optional[date] = Query(None, description="Дата платежу до (включно)"),
+    payment_method: Optional[List[str]] = Query(None, description="Спосіб оплати (можна кілька)"),
+    payment_status: Optional[List[str]] = Query(None, description="Статус оплати (можна кілька)"),
+    user: models.User = Depends(get_current_user_db),
+):
+    """
+    Запустити фоновий експорт платежів (для великих діапазонів дат).
+    Статус - GET /payments/export/jobs/{job_id}, файл - .../download.
+    """
+    from uuid import uuid4
+
+    from core.redis_client import get_redis
+    from tasks.export_tasks import EXPORT_FILE_TTL_SECONDS, export_payments_task
+    
+    # Власник фіксується до постановки в чергу - статус і файл бачить лише він
+    job_id = str(uuid4())
+    get_redis().set(_export_owner_key(job_id), str(user.id), ex=EXPORT_FILE_TTL_SECONDS)
+    job = export_payments_task.apply_async(
+        args=(str(user.id),),
+        kwargs={
+            "date_from": date_from.isoformat() if date_from else None,
+            "date_to": date_to.isoformat() if date_to else None,
+            "payment_method": payment_method,
+            "payment_status": payment_status,
+        },
+        task_id=job_id,
     )
+    return {"job_id": job.id, "status": job.status}
+
+
+def _export_owner_key(job_id: str) -> str:
+    return f"finance:export_job:{job_id}:owner"
+
+
+def _get_export_job(job_id: str, user: models.User):
+    """AsyncResult експорту; чужий або невідомий job виглядає як неіснуючий у будь-якому стані."""
+    from core.redis_client import get_redis
+    from tasks.celery_app import celery_app
+    
+    if get_redis().get(_export_owner_key(job_id)) != str(user.id):
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return celery_app.AsyncResult(job_id)
+
+
+@router.get("/payments/export/jobs/{job_id}")
+def get_payments_export_job(
+    job_id: str,
+    user: models.User = Depends(get_current_user_db),
+):
+    """Статус фонового експорту платежів."""
+    job = _get_export_job(job_id, user)
+    response = {"job_id": job_id, "status": job.status}
+    if job.successful():
+        response["rows"] = job.result.get("rows")
+        response["download_url"] = f"/api/v1/finance/payments/export/jobs/{job_id}/download"
+    elif job.failed():
+        response["error"] = str(job.result)
+    return response
+
+
+@router.get("/payments/export/jobs/{job_id}/download")
+def download_payments_export_job(
+    job_id: str,
+    user: models.User = Depends(get_current_user_db),
+):
+    """Завантажити готовий файл фонового експорту."""
+    from core.excel_export import job_export_path, xlsx_response
+    
+    job = _get_export_job(job_id, user)
+    if not job.successful():
+        raise HTTPException(status_code=409, detail=f"Export job is {job.status}")
+    
+    path = job_export_path(job_id)
+    if not path.exists():
+        raise HTTPException(status_code=410, detail="Export file expired")
+    return xlsx_response(path, job.result["filename"], delete=False)
 
 
 @router.get("/accounting")
@@ -324,7 +512,7 @@ async def stripe_webhook(
     Stripe webhook handler для автоматичного створення/оновлення Finance Transaction.
     Обробляє події: checkout.session.completed, payment_intent.succeeded, charge.refunded.
     """
-    settings = db.query(PaymentSettings).first()
+    settings = get_singleton("payment")
     if not settings or not settings.stripe_enabled or not settings.stripe_webhook_secret:
         raise HTTPException(status_code=400, detail="Stripe not configured")
     
@@ -665,7 +853,7 @@ async def create_payment_link(
     logger.info(f"Payment link: final amount = {amount} for order {order_id} (order.price_brutto = {order.price_brutto})")
     
     # Get payment settings
-    payment_settings = db.query(PaymentSettings).first()
+    payment_settings = get_singleton("payment")
     if not payment_settings:
         raise HTTPException(status_code=500, detail="Payment settings not configured")
     
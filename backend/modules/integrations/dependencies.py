@@ -4,7 +4,7 @@ Integrations dependencies - helpers for RAG token verification.
 from fastapi import Header, HTTPException, status, Depends
 from sqlalchemy.orm import Session
 from core.database import get_db
-from modules.ai_integration.models import AISettings
+from core.settings_cache import get_singleton
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,8 +19,8 @@ def verify_rag_token(
     Читає токен з налаштувань AI в базі даних.
     Returns the token if valid, raises HTTPException if invalid.
     """
-    # Отримуємо налаштування AI з бази даних
-    ai_settings = db.query(AISettings).first()
+    # Налаштування AI з кешу налаштувань (без запиту до БД)
+    ai_settings = get_singleton("ai")
     
     if not ai_settings:
         logger.error("AI settings not found in database")
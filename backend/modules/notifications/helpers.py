@@ -1,26 +1,37 @@
 """
 Helper functions для створення нотифікацій з інших модулів
+
+recipients - один user_id або набір: подія для кількох менеджерів
+створюється одним fan-out (один запит налаштувань, один INSERT, один commit),
+тож викликати helper у циклі по користувачах не потрібно.
 """
 from uuid import UUID
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Union
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from modules.notifications.service import NotificationService
-from modules.notifications.models import NotificationType, EntityType
+from modules.notifications.service import NotificationService, NotificationEvent
+from modules.notifications.models import Notification, NotificationType, EntityType
+
+Recipients = Union[UUID, Iterable[UUID]]
+
+
+async def _fan_out(db: AsyncSession, recipients: Recipients, **event) -> List[Notification]:
+    user_ids = [recipients] if isinstance(recipients, UUID) else recipients
+    return await NotificationService.fan_out(db, NotificationEvent(**event), user_ids)
 
 
 async def notify_new_message(
     db: AsyncSession,
-    user_id: UUID,
+    recipients: Recipients,
     client_name: str,
     channel: str,
     message_preview: str,
     conversation_id: str,
-):
+) -> List[Notification]:
     """Створити нотифікацію про нове повідомлення"""
-    return await NotificationService.create_notification(
-        db=db,
-        user_id=user_id,
+    return await _fan_out(
+        db,
+        recipients,
         notification_type=NotificationType.NEW_MESSAGE,
         title="💬 Нове повідомлення",
         message=f"{client_name} - {channel}",
@@ -37,18 +48,18 @@ async def notify_new_message(
 
 async def notify_payment_received(
     db: AsyncSession,
-    user_id: UUID,
+    recipients: Recipients,
     order_number: str,
     client_name: str,
     amount: float,
     currency: str,
     payment_method: str,
     order_id: str,
-):
+) -> List[Notification]:
     """Створити нотифікацію про отриману оплату"""
-    return await NotificationService.create_notification(
-        db=db,
-        user_id=user_id,
+    return await _fan_out(
+        db,
+        recipients,
         notification_type=NotificationType.PAYMENT_RECEIVED,
         title="💰 Оплату отримано!",
         message=f"Замовлення: {order_number}\nКлієнт: {client_name}\nСума: {amount} {currency}\nМетод: {payment_method}",
@@ -67,16 +78,16 @@ async def notify_payment_received(
 
 async def notify_translator_accepted(
     db: AsyncSession,
-    user_id: UUID,
+    recipients: Recipients,
     translator_name: str,
     order_number: str,
     deadline: str,
     order_id: str,
-):
+) -> List[Notification]:
     """Створити нотифікацію про прийняття замовлення перекладачем"""
-    return await NotificationService.create_notification(
-        db=db,
-        user_id=user_id,
+    return await _fan_out(
+        db,
+        recipients,
         notification_type=NotificationType.TRANSLATOR_ACCEPTED,
         title="✅ Перекладач прийняв замовлення",
         message=f"Замовлення: {order_number}\nПерекладач: {translator_name}\nДедлайн: {deadline}",
@@ -93,16 +104,16 @@ async def notify_translator_accepted(
 
 async def notify_translator_rejected(
     db: AsyncSession,
-    user_id: UUID,
+    recipients: Recipients,
     translator_name: str,
     order_number: str,
     reason: str,
     order_id: str,
-):
+) -> List[Notification]:
     """Створити нотифікацію про відхилення замовлення перекладачем"""
-    return await NotificationService.create_notification(
-        db=db,
-        user_id=user_id,
+    return await _fan_out(
+        db,
+        recipients,
         notification_type=NotificationType.TRANSLATOR_REJECTED,
         title="❌ Перекладач відхилив замовлення",
         message=f"Замовлення: {order_number}\nПерекладач: {translator_name}\nПричина: {reason}",
@@ -119,15 +130,15 @@ async def notify_translator_rejected(
 
 async def notify_translation_ready(
     db: AsyncSession,
-    user_id: UUID,
+    recipients: Recipients,
     translator_name: str,
     order_number: str,
     order_id: str,
-):
+) -> List[Notification]:
     """Створити нотифікацію про готовий переклад"""
-    return await NotificationService.create_notification(
-        db=db,
-        user_id=user_id,
+    return await _fan_out(
+        db,
+        recipients,
         notification_type=NotificationType.TRANSLATION_READY,
         title="✅ Переклад завершено",
         message=f"Замовлення: {order_number}\nПерекладач: {translator_name}",
@@ -143,16 +154,16 @@ async def notify_translation_ready(
 
 async def notify_internal_note(
     db: AsyncSession,
-    user_id: UUID,
+    recipients: Recipients,
     author_name: str,
     order_number: str,
     note_preview: str,
     order_id: str,
-):
+) -> List[Notification]:
     """Створити нотифікацію про додавання internal note"""
-    return await NotificationService.create_notification(
-        db=db,
-        user_id=user_id,
+    return await _fan_out(
+        db,
+        recipients,
         notification_type=NotificationType.INTERNAL_NOTE,
         title="📝 Нова нотатка",
         message=f"Автор: {author_name}\nЗамовлення: {order_number}\n\n{note_preview}",
@@ -169,16 +180,16 @@ async def notify_internal_note(
 
 async def notify_deadline_warning(
     db: AsyncSession,
-    user_id: UUID,
+    recipients: Recipients,
     order_number: str,
     deadline: str,
     hours_remaining: int,
     order_id: str,
-):
+) -> List[Notification]:
     """Створити нотифікацію про наближення дедлайну"""
-    return await NotificationService.create_notification(
-        db=db,
-        user_id=user_id,
+    return await _fan_out(
+        db,
+        recipients,
         notification_type=NotificationType.DEADLINE_WARNING,
         title=f"⚠️ Дедлайн через {hours_remaining} годин!",
         message=f"Замовлення: {order_number}\nДедлайн: {deadline}",
@@ -195,15 +206,15 @@ async def notify_deadline_warning(
 
 async def notify_deadline_passed(
     db: AsyncSession,
-    user_id: UUID,
+    recipients: Recipients,
     order_number: str,
     deadline: str,
     order_id: str,
-):
+) -> List[Notification]:
     """Створити нотифікацію про прострочений дедлайн"""
-    return await NotificationService.create_notification(
-        db=db,
-        user_id=user_id,
+    return await _fan_out(
+        db,
+        recipients,
         notification_type=NotificationType.DEADLINE_PASSED,
         title="⏰ Дедлайн прострочений",
         message=f"Замовлення: {order_number}\nДедлайн: {deadline}",
@@ -216,3 +227,27 @@ async def notify_deadline_passed(
         },
     )
 
+
+
+async def notify_follow_up(
+    db: AsyncSession,
+    recipients: Recipients,
+    order_number: str,
+    follow_up_date: str,
+    order_id: str,
+) -> List[Notification]:
+    """Створити нагадування про повторний контакт з клієнтом"""
+    return await _fan_out(
+        db,
+        recipients,
+        notification_type=NotificationType.FOLLOW_UP,
+        title="📞 Час повторного контакту",
+        message=f"Замовлення: {order_number}\nКонтакт: {follow_up_date}",
+        entity_type=EntityType.ORDER,
+        entity_id=order_id,
+        action_url=f"/orders/{order_id}",
+        data={
+            "order_number": order_number,
+            "follow_up_date": follow_up_date,
+        },
+    )
@@ -20,6 +20,7 @@ class NotificationType(str, Enum):
     INTERNAL_NOTE = "internal_note"
     DEADLINE_WARNING = "deadline_warning"
     DEADLINE_PASSED = "deadline_passed"
+    FOLLOW_UP = "follow_up"
 
 
 class EntityType(str, Enum):
@@ -90,6 +91,7 @@ class NotificationSettings(Base):
         "internal_note": False,  # За замовчуванням вимкнено
         "deadline_warning": True,
         "deadline_passed": True,
+        "follow_up": True,
     })
     
     # Не турбувати (Do Not Disturb)
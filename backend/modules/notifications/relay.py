@@ -0,0 +1,79 @@
+"""
+Relay WebSocket нотифікацій між процесами через Redis pub/sub.
+
+Нотифікації створюються не лише в API (воркер нагадувань, Celery), а
+WebSocket з'єднання живуть тільки в процесах API. Якщо отримувач не
+підключений до поточного процесу, повідомлення публікується в канал
+notifications:relay; кожен процес API слухає канал і доставляє його своїм
+підключеним користувачам.
+"""
+import asyncio
+import json
+import logging
+from typing import Optional
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "notifications:relay"
+
+
+def publish(user_id: UUID, payload: dict) -> None:
+    """Передати повідомлення процесу API, де підключений користувач."""
+    from core.redis_client import get_redis
+
+    try:
+        get_redis().publish(CHANNEL, json.dumps({"user_id": str(user_id), "payload": payload}, default=str))
+    except Exception as e:
+        logger.warning(f"Notification relay publish failed for user {user_id}: {e}")
+
+
+class RelayListener:
+    """Фонова задача API: доставляє повідомлення з каналу локальним з'єднанням."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+        logger.info("Notification relay listener started")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        import redis.asyncio as aioredis
+        from core.config import settings
+        from modules.notifications.websocket import manager
+
+        while True:
+            client = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(CHANNEL)
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        try:
+                            data = json.loads(message["data"])
+                            user_id = UUID(data["user_id"])
+                        except (ValueError, KeyError, TypeError):
+                            continue
+                        if user_id in manager.active_connections:
+                            await manager.send_personal_notification(user_id, data["payload"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Notification relay disconnected: {e}")
+                await asyncio.sleep(5)
+            finally:
+                await client.aclose()
+
+
+relay_listener = RelayListener()
@@ -1,19 +1,43 @@
 """
 Notification Service - сервіс для створення та відправки нотифікацій
+
+Подія для кількох отримувачів (fan_out): налаштування всіх отримувачів
+одним запитом, DND і типи перевіряються в пам'яті, усі рядки - одним
+multi-row INSERT і одним commit, далі WebSocket push і інкремент
+кешованих лічильників непрочитаних (unread_counter). Отримувачам, не
+підключеним до цього процесу (воркер нагадувань, Celery), push іде через
+relay.
 """
-from uuid import UUID
-from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+import asyncio
+from dataclasses import dataclass
+from uuid import UUID, uuid4
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, Iterable, List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, insert, func
 from sqlalchemy.orm import selectinload
 
 from modules.notifications.models import Notification, NotificationSettings, NotificationType, EntityType
-from modules.notifications.websocket_manager import manager
+from modules.notifications.websocket import manager
+from modules.notifications import relay, unread_counter
 import logging
 
 logger = logging.getLogger(__name__)
 
+NOTIFICATION_TTL_DAYS = 30
+
+
+@dataclass(frozen=True)
+class NotificationEvent:
+    """Подія, про яку треба повідомити одного або кількох користувачів"""
+    notification_type: NotificationType
+    title: str
+    message: str
+    entity_type: Optional[EntityType] = None
+    entity_id: Optional[str] = None
+    action_url: Optional[str] = None
+    data: Optional[Dict[str, Any]] = None
+
 
 class NotificationService:
     """Сервіс для роботи з нотифікаціями"""
@@ -29,47 +53,91 @@ class NotificationService:
         entity_id: Optional[str] = None,
         action_url: Optional[str] = None,
         data: Optional[Dict[str, Any]] = None,
-    ) -> Notification:
-        """Створити нотифікацію"""
-        # Перевірити налаштування користувача
-        settings = await NotificationService.get_user_settings(db, user_id)
-        
-        if not settings or not settings.enabled:
-            logger.debug(f"Notifications disabled for user {user_id}")
-            return None
-        
-        # Перевірити чи увімкнений цей тип нотифікації
-        types_enabled = settings.types_enabled or {}
-        if not types_enabled.get(notification_type.value, True):
-            logger.debug(f"Notification type {notification_type.value} disabled for user {user_id}")
-            return None
-        
-        # Перевірити Do Not Disturb
-        if await NotificationService._is_do_not_disturb(settings):
-            logger.debug(f"User {user_id} is in Do Not Disturb mode")
-            return None
-        
-        # Створити нотифікацію
-        notification = Notification(
-            user_id=user_id,
-            type=notification_type.value,
+    ) -> Optional[Notification]:
+        """Створити нотифікацію для одного користувача (None - вимкнена налаштуваннями)"""
+        event = NotificationEvent(
+            notification_type=notification_type,
             title=title,
             message=message,
-            entity_type=entity_type.value if entity_type else None,
+            entity_type=entity_type,
             entity_id=entity_id,
             action_url=action_url,
             data=data,
-            expires_at=datetime.utcnow() + timedelta(days=30),
         )
+        notifications = await NotificationService.fan_out(db, event, [user_id])
+        return notifications[0] if notifications else None
+    
+    @staticmethod
+    async def fan_out(
+        db: AsyncSession,
+        event: NotificationEvent,
+        user_ids: Iterable[UUID],
+    ) -> List[Notification]:
+        """
+        Створити нотифікацію про подію для набору отримувачів.
         
-        db.add(notification)
-        await db.commit()
-        await db.refresh(notification)
+        Returns:
+            Створені нотифікації (отримувачі з вимкненим типом / DND пропускаються)
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return []
         
-        # Відправити через WebSocket якщо користувач підключений
-        await NotificationService._send_websocket_notification(user_id, notification)
+        result = await db.execute(
+            select(NotificationSettings).where(NotificationSettings.user_id.in_(user_ids))
+        )
+        settings_by_user = {settings.user_id: settings for settings in result.scalars()}
         
-        return notification
+        now = datetime.now(timezone.utc)
+        recipients = [
+            user_id for user_id in user_ids
+            if NotificationService._accepts(settings_by_user.get(user_id), event.notification_type, now)
+        ]
+        if not recipients:
+            return []
+        
+        rows = [
+            {
+                "id": uuid4(),
+                "user_id": user_id,
+                "type": event.notification_type.value,
+                "title": event.title,
+                "message": event.message,
+                "entity_type": event.entity_type.value if event.entity_type else None,
+                "entity_id": event.entity_id,
+                "action_url": event.action_url,
+                "data": event.data,
+                "is_read": False,
+                "created_at": now,
+                "expires_at": now + timedelta(days=NOTIFICATION_TTL_DAYS),
+            }
+            for user_id in recipients
+        ]
+        notifications = list(await db.scalars(insert(Notification).returning(Notification), rows))
+        await db.commit()
+        
+        await asyncio.to_thread(unread_counter.increment, {user_id: 1 for user_id in recipients})
+        await asyncio.gather(*(
+            NotificationService._send_websocket_notification(notification.user_id, notification)
+            for notification in notifications
+        ))
+        return notifications
+    
+    @staticmethod
+    def _accepts(
+        settings: Optional[NotificationSettings],
+        notification_type: NotificationType,
+        now: datetime,
+    ) -> bool:
+        """Чи приймає користувач нотифікацію цього типу зараз (без налаштувань - так)"""
+        if settings is None:
+            return True
+        if not settings.enabled:
+            return False
+        types_enabled = settings.types_enabled or {}
+        if not types_enabled.get(notification_type.value, True):
+            return False
+        return not NotificationService._dnd_active(settings.do_not_disturb, now)
     
     @staticmethod
     async def _send_websocket_notification(user_id: UUID, notification: Notification):
@@ -89,7 +157,10 @@ class NotificationService:
             }
         }
         
-        await manager.send_notification(user_id, notification_data)
+        if user_id in manager.active_connections:
+            await manager.send_personal_notification(user_id, notification_data)
+        else:
+            await asyncio.to_thread(relay.publish, user_id, notification_data)
     
     @staticmethod
     async def get_user_settings(db: AsyncSession, user_id: UUID) -> Optional[NotificationSettings]:
@@ -109,17 +180,14 @@ class NotificationService:
         return settings
     
     @staticmethod
-    async def _is_do_not_disturb(settings: NotificationSettings) -> bool:
+    def _dnd_active(dnd: Optional[Dict[str, Any]], now: datetime) -> bool:
         """Перевірити чи активний режим Do Not Disturb"""
-        if not settings.do_not_disturb:
+        if not dnd:
             return False
         
-        now = datetime.utcnow()
         current_time = now.time()
         weekday = now.weekday()  # 0 = Monday, 6 = Sunday
         
-        dnd = settings.do_not_disturb
-        
         # Вихідні (субота, неділя)
         if weekday >= 5:  # Saturday or Sunday
             if dnd.get("weekend") == "all_day":
@@ -152,11 +220,22 @@ class NotificationService:
         """Позначити нотифікацію як прочитану"""
         result = await db.execute(
             update(Notification)
-            .where(Notification.id == notification_id, Notification.user_id == user_id)
+            .where(
+                Notification.id == notification_id,
+                Notification.user_id == user_id,
+                Notification.is_read == False,
+            )
             .values(is_read=True, read_at=datetime.utcnow())
         )
         await db.commit()
-        return result.rowcount > 0
+        if result.rowcount > 0:
+            await asyncio.to_thread(unread_counter.increment, {user_id: -1})
+            return True
+        # Вже прочитана - лічильник не змінюється
+        exists = await db.execute(
+            select(Notification.id).where(Notification.id == notification_id, Notification.user_id == user_id)
+        )
+        return exists.first() is not None
     
     @staticmethod
     async def mark_all_as_read(db: AsyncSession, user_id: UUID) -> int:
@@ -167,6 +246,7 @@ class NotificationService:
             .values(is_read=True, read_at=datetime.utcnow())
         )
         await db.commit()
+        await asyncio.to_thread(unread_counter.reset, user_id)
         return result.rowcount
     
     @staticmethod
@@ -190,20 +270,31 @@ class NotificationService:
     
     @staticmethod
     async def get_unread_count(db: AsyncSession, user_id: UUID) -> int:
-        """Отримати кількість непрочитаних нотифікацій"""
-        from sqlalchemy import func
+        """Отримати кількість непрочитаних нотифікацій (з кешу, COUNT тільки при промаху)"""
+        cached = await asyncio.to_thread(unread_counter.get_cached, user_id)
+        if cached is not None:
+            return cached
         result = await db.execute(
             select(func.count(Notification.id))
             .where(Notification.user_id == user_id, Notification.is_read == False)
         )
-        return result.scalar() or 0
+        count = result.scalar() or 0
+        await asyncio.to_thread(unread_counter.prime, user_id, count)
+        return count
     
     @staticmethod
     async def delete_expired(db: AsyncSession) -> int:
         """Видалити застарілі нотифікації (старше 30 днів)"""
         result = await db.execute(
-            delete(Notification).where(Notification.expires_at < datetime.utcnow())
+            delete(Notification)
+            .where(Notification.expires_at < datetime.utcnow())
+            .returning(Notification.user_id, Notification.is_read)
         )
+        deleted = result.all()
         await db.commit()
-        return result.rowcount
-
+        deltas: Dict[UUID, int] = {}
+        for user_id, is_read in deleted:
+            if not is_read:
+                deltas[user_id] = deltas.get(user_id, 0) - 1
+        await asyncio.to_thread(unread_counter.increment, deltas)
+        return len(deleted)
@@ -0,0 +1,102 @@
+"""
+Unread counter - кешовані лічильники непрочитаних нотифікацій у Redis.
+
+Ключ notifications:unread:{user_id} з TTL. Лічильник заповнюється з БД
+тільки при промаху (перший запит бейджа), далі змінюється інкрементально:
++N після fan-out, -1 після прочитання, 0 після "прочитати все".
+Інкремент виконується лише для вже існуючого ключа (Lua) - відсутній
+лічильник не створюється з неповним значенням, його заповнить наступний
+запит з БД.
+
+Усі помилки Redis ковтаються: без кешу get_unread_count просто рахує в БД.
+"""
+import logging
+from typing import Dict, Iterable, Optional
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+# Обмежує дрейф лічильника, якщо якесь оновлення загубилось
+UNREAD_COUNTER_TTL_SECONDS = 3600
+
+_KEY_PREFIX = "notifications:unread"
+
+# KEYS[i] = лічильник, ARGV[i] = дельта, ARGV[#KEYS + 1] = TTL
+_INCREMENT_SCRIPT = """
+local ttl = tonumber(ARGV[#KEYS + 1])
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        local value = redis.call('INCRBY', key, ARGV[i])
+        if value < 0 then
+            redis.call('SET', key, 0)
+        end
+        redis.call('EXPIRE', key, ttl)
+    end
+end
+return #KEYS
+"""
+
+
+def _key(user_id: UUID) -> str:
+    return f"{_KEY_PREFIX}:{user_id}"
+
+
+def _redis():
+    from core.redis_client import get_redis
+    return get_redis()
+
+
+def get_cached(user_id: UUID) -> Optional[int]:
+    """Лічильник з кешу або None (промах / Redis недоступний)."""
+    try:
+        value = _redis().get(_key(user_id))
+    except Exception as e:
+        logger.warning(f"Unread counter read failed for user {user_id}: {e}")
+        return None
+    return int(value) if value is not None else None
+
+
+def prime(user_id: UUID, count: int) -> None:
+    """Заповнити лічильник значенням з БД (не перезаписує вже наявний)."""
+    try:
+        _redis().set(_key(user_id), count, ex=UNREAD_COUNTER_TTL_SECONDS, nx=True)
+    except Exception as e:
+        logger.warning(f"Unread counter prime failed for user {user_id}: {e}")
+
+
+def increment(deltas: Dict[UUID, int]) -> None:
+    """Змінити лічильники кількох користувачів одним викликом."""
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    try:
+        _redis().eval(
+            _INCREMENT_SCRIPT,
+            len(deltas),
+            *[_key(user_id) for user_id in deltas],
+            *[str(delta) for delta in deltas.values()],
+            str(UNREAD_COUNTER_TTL_SECONDS),
+        )
+    except Exception as e:
+        logger.warning(f"Unread counter increment failed: {e}")
+        forget(deltas.keys())
+
+
+def reset(user_id: UUID) -> None:
+    """Усі нотифікації прочитані."""
+    try:
+        _redis().set(_key(user_id), 0, ex=UNREAD_COUNTER_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Unread counter reset failed for user {user_id}: {e}")
+        forget([user_id])
+
+
+def forget(user_ids: Iterable[UUID]) -> None:
+    """Скинути лічильники - наступний запит перерахує їх у БД."""
+    keys = [_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+    try:
+        _redis().delete(*keys)
+    except Exception as e:
+        logger.warning(f"Unread counter invalidation failed: {e}")
@@ -3,6 +3,7 @@ Payment routes - Stripe and Przelewy24 integration.
 """
 import json
 import logging
+from types import SimpleNamespace
 from typing import List, Optional
 from uuid import UUID
 from datetime import datetime, timedelta
@@ -15,6 +16,7 @@ from sqlalchemy import and_, or_, func
 
 from core.database import get_db
 from core.rbac import Scope, get_user_scopes
+from core.settings_cache import get_singleton
 from modules.auth.dependencies import get_current_user_db, role_required
 from modules.auth.models import UserRole
 import models
@@ -51,14 +53,14 @@ router = APIRouter(tags=["payment"], prefix="/payment")
 
 
 # Helper functions
-def get_payment_settings(db: Session) -> Optional[PaymentSettings]:
-    """Get payment settings (should be singleton)."""
-    return db.query(PaymentSettings).first()
+def get_payment_settings(db: Session) -> Optional[SimpleNamespace]:
+    """Get payment settings (should be singleton) from the settings cache - read only."""
+    return get_singleton("payment")
 
 
 def get_or_create_settings(db: Session) -> PaymentSettings:
-    """Get or create payment settings."""
-    settings = get_payment_settings(db)
+    """Get or create payment settings (ORM row, for updates)."""
+    settings = db.query(PaymentSettings).first()
     if not settings:
         settings = PaymentSettings()
         db.add(settings)
@@ -952,42 +954,44 @@ def get_payment_stats(
     """
     Get payment statistics.
     Only owner and accountant can view.
+    
+    Рахується з денних агрегатів finance_daily_rollups (source=payment),
+    тому межі періоду округлюються до днів.
     """
+    from modules.finance.rollups import SOURCE_PAYMENT, query_rollups
+    
     # Default date range: last 30 days
     if not end_date:
         end_date = datetime.utcnow()
     if not start_date:
         start_date = end_date - timedelta(days=30)
     
-    query = db.query(PaymentTransaction).filter(
-        and_(
-            PaymentTransaction.created_at >= start_date,
-            PaymentTransaction.created_at <= end_date
-        )
+    groups = query_rollups(
+        db,
+        source=SOURCE_PAYMENT,
+        date_from=start_date.date(),
+        date_to=end_date.date(),
+        group_by=("provider", "status"),
     )
     
-    transactions = query.all()
-    
-    total_amount = sum(t.amount for t in transactions if t.status == PaymentStatus.COMPLETED)
-    
+    total_transactions = 0
+    total_amount = Decimal("0")
     by_provider = {}
     by_status = {}
     
-    for t in transactions:
-        # Count by provider
-        provider_key = get_enum_value(t.provider)
-        by_provider[provider_key] = by_provider.get(provider_key, 0) + 1
-        
-        # Count by status
-        status_key = get_enum_value(t.status)
-        by_status[status_key] = by_status.get(status_key, 0) + 1
+    for group in groups:
+        total_transactions += group.tx_count
+        by_provider[group.provider] = by_provider.get(group.provider, 0) + group.tx_count
+        by_status[group.status] = by_status.get(group.status, 0) + group.tx_count
+        if group.status == PaymentStatus.COMPLETED.value:
+            total_amount += group.amount
     
-    successful = sum(1 for t in transactions if t.status == PaymentStatus.COMPLETED)
-    failed = sum(1 for t in transactions if t.status == PaymentStatus.FAILED)
-    pending = sum(1 for t in transactions if t.status == PaymentStatus.PENDING)
+    successful = by_status.get(PaymentStatus.COMPLETED.value, 0)
+    failed = by_status.get(PaymentStatus.FAILED.value, 0)
+    pending = by_status.get(PaymentStatus.PENDING.value, 0)
     
     return PaymentStatsResponse(
-        total_transactions=len(transactions),
+        total_transactions=total_transactions,
         total_amount=total_amount,
         successful_transactions=successful,
         failed_transactions=failed,
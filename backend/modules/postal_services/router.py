@@ -8,11 +8,12 @@ from sqlalchemy.orm import Session
 import logging
 
 from core.database import get_db  # Використовуємо синхронну версію для InPostService
+from core.settings_cache import get_singleton
 from modules.auth.dependencies import get_current_user_db
 from modules.auth import models as auth_models
 from modules.postal_services.service import InPostService
 from modules.postal_services import schemas
-from modules.postal_services.models import InPostSettings, InPostShipment
+from modules.postal_services.models import InPostShipment
 import crud
 
 logger = logging.getLogger(__name__)
@@ -260,7 +261,7 @@ async def update_inpost_settings(
     user: auth_models.User = Depends(get_current_user_db),
 ):
     """Update InPost settings."""
-    settings = service.settings
+    settings = service.get_settings_row()
     
     # Update fields
     if update.api_key is not None:
@@ -327,7 +328,7 @@ async def inpost_webhook(
     """
     try:
         # Get webhook secret from settings
-        settings = db.query(InPostSettings).first()
+        settings = get_singleton("inpost")
         if not settings:
             raise HTTPException(status_code=500, detail="InPost settings not configured")
         
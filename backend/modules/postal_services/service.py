@@ -1,8 +1,10 @@
 """
 InPost Service - handles all InPost API interactions.
 """
+import copy
 import httpx
 import logging
+from types import SimpleNamespace
 from typing import Optional, Dict, Any, List
 from uuid import UUID
 from datetime import datetime, timezone
@@ -10,6 +12,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import or_
 from fastapi import HTTPException
 import crud
+from core.settings_cache import get_singleton, row_snapshot
 
 from modules.postal_services.models import (
     InPostShipment,
@@ -38,21 +41,22 @@ class InPostService:
         """Initialize InPost service."""
         self.db = db
         self._organization_id: Optional[str] = None
+        self._settings: Optional[SimpleNamespace] = None
     
     @property
-    def settings(self) -> InPostSettings:
-        """Get InPost settings from database (legacy compatibility)."""
-        # Try to get from InPostSettings table first (for backward compatibility)
-        settings = self.db.query(InPostSettings).first()
-        if not settings:
-            settings = InPostSettings(
-                api_url="https://api-shipx-pl.easypack24.net/v1",
-                sandbox_api_url="https://sandbox-api-shipx-pl.easypack24.net/v1",
-                is_enabled=False,
-            )
-            self.db.add(settings)
-            self.db.commit()
-            self.db.refresh(settings)
+    def settings(self) -> SimpleNamespace:
+        """
+        InPost settings (legacy compatibility) - копія з кешу налаштувань
+        з накладеними значеннями AppSetting (new system). Тільки для читання:
+        зміни зберігаються через crud.set_setting.
+        """
+        if self._settings is not None:
+            return self._settings
+        
+        base = get_singleton("inpost")
+        if base is None:
+            base = row_snapshot(self.get_settings_row())
+        settings = copy.copy(base)
         
         # Sync from AppSetting if available (new system)
         app_settings = crud.get_inpost_settings(self.db)
@@ -63,24 +67,29 @@ class InPostService:
         if app_settings.get("inpost_sandbox_mode"):
             settings.sandbox_mode = (app_settings.get("inpost_sandbox_mode") or "false").lower() == "true"
         
-        # Log settings for debugging
-        logger.info(f"InPost settings from DB:")
-        logger.info(f"  id: {settings.id}")
-        logger.info(f"  api_key: '{settings.api_key}' (type: {type(settings.api_key).__name__}, is None: {settings.api_key is None})")
-        logger.info(f"  organization_id: '{settings.organization_id}' (type: {type(settings.organization_id).__name__}, is None: {settings.organization_id is None})")
-        logger.info(f"  sandbox_mode: {settings.sandbox_mode}")
-        logger.info(f"  sandbox_api_key: '{settings.sandbox_api_key}' (type: {type(settings.sandbox_api_key).__name__})")
-        logger.info(f"  is_enabled: {settings.is_enabled}")
-        print(f"[InPost] Settings from DB:")
-        print(f"  id={settings.id}")
-        print(f"  api_key='{settings.api_key}' (type: {type(settings.api_key).__name__}, is None: {settings.api_key is None})")
-        print(f"  organization_id='{settings.organization_id}' (type: {type(settings.organization_id).__name__}, is None: {settings.organization_id is None})")
-        print(f"  sandbox_mode={settings.sandbox_mode}")
-        print(f"  sandbox_api_key='{settings.sandbox_api_key}'")
-        print(f"  is_enabled={settings.is_enabled}")
+        logger.debug(
+            f"InPost settings: id={settings.id}, organization_id='{settings.organization_id}', "
+            f"sandbox_mode={settings.sandbox_mode}, is_enabled={settings.is_enabled}, "
+            f"api_key set={bool(settings.api_key)}"
+        )
         
+        self._settings = settings
         return settings
     
+    def get_settings_row(self) -> InPostSettings:
+        """ORM рядок InPostSettings (створюється, якщо немає) - для змін."""
+        row = self.db.query(InPostSettings).first()
+        if not row:
+            row = InPostSettings(
+                api_url="https://api-shipx-pl.easypack24.net/v1",
+                sandbox_api_url="https://sandbox-api-shipx-pl.easypack24.net/v1",
+                is_enabled=False,
+            )
+            self.db.add(row)
+            self.db.commit()
+            self.db.refresh(row)
+        return row
+    
     def get_api_url(self) -> str:
         """Get API URL based on sandbox mode."""
         app_settings = crud.get_inpost_settings(self.db)
@@ -561,7 +570,6 @@ class InPostService:
                             # Update in database
                             crud.set_setting(self.db, "inpost_organization_id", correct_org_id)
                             self.settings.organization_id = correct_org_id
-                            self.db.commit()
                             # Clear cache and retry with correct organization_id
                             self._organization_id = None
                             organization_id = correct_org_id
@@ -647,7 +655,6 @@ class InPostService:
                     # Save to database for future use
                     crud.set_setting(self.db, "inpost_organization_id", organization_id)
                     self.settings.organization_id = organization_id
-                    self.db.commit()
                     logger.info(f"InPost: Auto-saved organization_id {organization_id} to database")
                     print(f"[InPost] Auto-saved organization_id {organization_id} to database")
             except Exception as e:
@@ -1,16 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Response, UploadFile, File, Form, Body
+from fastapi import APIRouter, Depends, HTTPException, Response, UploadFile, File, Form, Body, Query, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
 from typing import Optional, Any, List
 import logging
 
 logger = logging.getLogger(__name__)
 
 from db import SessionLocal
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from weasyprint import HTML
 from jinja2 import Environment, FileSystemLoader
 
@@ -37,10 +36,15 @@ import uuid
 from pathlib import Path
 import pyotp
 from decimal import Decimal
+from dataclasses import asdict
 from email_service import send_kp_email
 from telegram_service import send_kp_telegram
 import loyalty_service
+import loyalty_engine
 from service_excel_service import generate_service_excel
+from core.excel_export import xlsx_response
+from catalog_service import get_catalog
+from catalog_import import import_menu, read_menu_csv, read_menu_excel
 
 
 router = APIRouter()
@@ -98,6 +102,20 @@ def get_current_user_db(
     return user
 
 
+@router.get("/catalog")
+def read_catalog(request: Request, db: Session = Depends(get_db), user = Depends(get_current_user)):
+    """
+    Увесь каталог одним запитом: items (з назвами підкатегорії / категорії),
+    categories, subcategories. ETag = версія каталогу; якщо клієнт надіслав
+    актуальний If-None-Match - 304 без тіла.
+    """
+    snapshot = get_catalog(db)
+    headers = {"ETag": snapshot.etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == snapshot.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
 @router.get("/items", response_model=list[schema.Item])
 def read_items(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), user = Depends(get_current_user)):
     items = crud.get_items(db, skip=skip, limit=limit)
@@ -1713,9 +1731,43 @@ def create_kp(kp_in: schema.KPCreate, db: Session = Depends(get_db), user = Depe
         raise HTTPException(status_code=400, detail=str(e))
     return kp
 
-@router.get("/kp", response_model=list[schema.KP])
-def list_kp(db: Session = Depends(get_db), user = Depends(get_current_user)):
-    return crud.get_all_kps(db)
+@router.get("/kp", response_model=schema.KPListPage)
+def list_kp(
+    status: Optional[List[str]] = Query(None, description="Статус КП (можна кілька)"),
+    client_id: Optional[int] = Query(None),
+    client: Optional[str] = Query(None, description="Пошук по імені / email / телефону клієнта"),
+    manager_id: Optional[int] = Query(None, description="Хто створив КП (created_by_id)"),
+    date_from: Optional[date] = Query(None, description="Дата заходу від (включно)"),
+    date_to: Optional[date] = Query(None, description="Дата заходу до (включно)"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor з попередньої сторінки"),
+    include: Optional[str] = Query(None, description="items - додати компактні позиції"),
+    db: Session = Depends(get_db),
+    user = Depends(get_current_user),
+):
+    """
+    Список КП з keyset пагінацією та фільтрами.
+    Повертає summary (суми, к-сть гостей, к-сть позицій) без деталізації позицій -
+    повний КП з позиціями та форматами тільки в GET /kp/{id}.
+    """
+    return crud.get_kps_page(
+        db,
+        status=status,
+        client_id=client_id,
+        client=client,
+        manager_id=manager_id,
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit,
+        cursor=cursor,
+        include_items=include == "items",
+    )
+
+
+@router.get("/kp/stats", response_model=schema.KPStats)
+def get_kp_stats(db: Session = Depends(get_db), user = Depends(get_current_user)):
+    """Агрегати КП для дашборда (статуси, виручка, топ клієнтів / товарів, менеджери)."""
+    return crud.get_kp_stats(db)
 
 
 @router.get("/kp/{kp_id}", response_model=schema.KP)
@@ -1797,7 +1849,7 @@ def export_service_excel(
         raise HTTPException(status_code=400, detail="Поки що підтримується лише формат 'excel'")
 
     try:
-        excel_bytes, filename = generate_service_excel(db, export_in.kp_ids)
+        excel_path, filename = generate_service_excel(db, export_in.kp_ids)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -1810,11 +1862,7 @@ def export_service_excel(
     if not safe_filename or safe_filename == '.xlsx':
         safe_filename = 'service.xlsx'
 
-    return Response(
-        content=excel_bytes,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={'Content-Disposition': f'attachment; filename=\"{safe_filename}\"'},
-    )
+    return xlsx_response(excel_path, safe_filename)
 
 
 @router.patch("/kp/{kp_id}/status", response_model=schema.KP)
@@ -1833,6 +1881,15 @@ def update_kp_status(
 
     kp.status = status_in.status
     db.commit()
+
+    # Підтверджене КП - нарахування кешбеку та агрегати клієнта (ідемпотентно по КП)
+    if kp.status == "confirmed" and kp.client_id:
+        try:
+            loyalty_service.earn_cashback_from_kp(db, kp)
+        except Exception as e:
+            db.rollback()
+            print(f"Error earning cashback from KP: {e}")
+
     db.refresh(kp)
     return kp
 
@@ -2489,34 +2546,38 @@ def update_inpost_config(
 @router.post("/settings/import-menu-csv")
 async def import_menu_csv_endpoint(
     file: UploadFile = File(...),
+    dry_run: bool = Query(False, description="Тільки звіт, без змін у БД"),
+    deactivate_missing: bool = Query(False, description="Повний прайс: деактивувати страви, яких немає у файлі"),
+    db: Session = Depends(get_db),
     user = Depends(get_current_user),
 ):
     """
     Імпорт меню з CSV-файлу в базу даних.
 
-    З frontend завантажується CSV (експорт з Excel меню),
-    файл тимчасово зберігається в uploads/imports, парситься
-    та імпортується в таблиці categories / subcategories / items.
+    З frontend завантажується CSV (експорт з Excel меню), файл тимчасово
+    зберігається в uploads/imports і через COPY + set-based upsert
+    імпортується в categories / subcategories / items (див. catalog_import).
+    Невалідні рядки не імпортуються і повертаються в errors з номером рядка.
     """
-    # Зберігаємо тимчасовий файл
-    imports_dir = UPLOADS_DIR / "imports"
-    imports_dir.mkdir(parents=True, exist_ok=True)
-
-    temp_path = imports_dir / file.filename
-    contents = await file.read()
-    with temp_path.open("wb") as f:
-        f.write(contents)
-
-    # Парсимо та імпортуємо в БД
-    items = parse_menu_csv(temp_path)
-    import_menu_items(items)
+    temp_path = await _save_import_upload(file, prefix="menu")
+    try:
+        report = import_menu(
+            db,
+            read_menu_csv(temp_path),
+            insert_missing=True,
+            deactivate_missing=deactivate_missing,
+            dry_run=dry_run,
+        )
+    finally:
+        temp_path.unlink(missing_ok=True)
 
-    return {"status": "success", "created": len(items)}
+    return {"status": "success", "created": report.inserted, **report.to_dict()}
 
 
 @router.post("/items/update-from-excel")
 async def update_items_from_excel_endpoint(
     file: UploadFile = File(...),
+    dry_run: bool = Query(False, description="Тільки звіт, без змін у БД"),
     db: Session = Depends(get_db),
     user = Depends(get_current_user),
 ):
@@ -2529,78 +2590,46 @@ async def update_items_from_excel_endpoint(
     - Рядки з ціною = страви
     
     Оновлює: ціну, категорію, підкатегорію для існуючих страв по назві.
+    Нові страви не створюються - вони повертаються в not_found.
     """
     # Перевіряємо формат файлу
-    if not (file.filename.endswith('.xlsx') or file.filename.endswith('.xls') or file.filename.endswith('.xlsm')):
-        raise HTTPException(status_code=400, detail="Файл має бути у форматі Excel (.xlsx, .xls або .xlsm)")
-    
-    # Зберігаємо тимчасовий файл
-    imports_dir = UPLOADS_DIR / "imports"
-    imports_dir.mkdir(parents=True, exist_ok=True)
-    
-    temp_path = imports_dir / f"update_{uuid.uuid4().hex[:8]}_{file.filename}"
-    contents = await file.read()
-    with temp_path.open("wb") as f:
-        f.write(contents)
-    
+    if not file.filename.endswith(('.xlsx', '.xlsm')):
+        raise HTTPException(status_code=400, detail="Файл має бути у форматі Excel (.xlsx або .xlsm)")
+
+    temp_path = await _save_import_upload(file, prefix="update")
     try:
-        file_size = temp_path.stat().st_size
-        logger.info(f"[UPDATE_EXCEL] Початок обробки файлу: {file.filename}, розмір: {file_size} bytes")
-        print(f"[UPDATE_EXCEL] Початок обробки файлу: {file.filename}, розмір: {file_size} bytes", flush=True)
-        
-        # Генеруємо дані для оновлення з Excel
-        logger.info(f"[UPDATE_EXCEL] Виклик generate_menu_patch_from_excel для файлу: {temp_path}")
-        print(f"[UPDATE_EXCEL] Виклик generate_menu_patch_from_excel", flush=True)
-        
-        items_data = generate_menu_patch_from_excel(temp_path)
-        
-        logger.info(f"[UPDATE_EXCEL] Отримано {len(items_data)} страв для оновлення")
-        print(f"[UPDATE_EXCEL] Отримано {len(items_data)} страв для оновлення", flush=True)
-        
-        if not items_data:
-            error_msg = "Не знайдено жодної страви в Excel файлі. Перевірте формат файлу: перша колонка - назва, друга - ціна"
-            print(f"[UPDATE_EXCEL] ПОМИЛКА: {error_msg}", flush=True)
-            raise HTTPException(status_code=400, detail=error_msg)
-        
-        # Оновлюємо страви в БД
-        stats = update_items_from_data(items_data, dry_run=False, db_session=db)
-        
-        print(f"[UPDATE_EXCEL] Оновлено страв: {stats['updated']}, знайдено: {stats['found']}")
-        
-        # Формуємо результат
-        result = {
-            "status": "success",
-            "found": stats['found'],
-            "updated": stats['updated'],
-            "created_categories": stats['created_categories'],
-            "created_subcategories": stats['created_subcategories'],
-            "not_found_count": len(stats['not_found']),
-            "errors_count": len(stats['errors']),
-            "not_found": stats['not_found'][:50],  # Перші 50 для не перевантаження відповіді
-            "errors": stats['errors'][:20]  # Перші 20 помилок
-        }
-        
-        return result
-        
-    except ValueError as e:
-        import traceback
-        error_detail = str(e)
-        print(f"[UPDATE_EXCEL] ValueError: {error_detail}", flush=True)
-        print(traceback.format_exc(), flush=True)
-        raise HTTPException(status_code=400, detail=error_detail)
+        logger.info(f"[UPDATE_EXCEL] Початок обробки файлу: {file.filename}, розмір: {temp_path.stat().st_size} bytes")
+        report = import_menu(
+            db,
+            read_menu_excel(temp_path),
+            insert_missing=False,
+            dry_run=dry_run,
+        )
     except Exception as e:
-        import traceback
-        error_detail = f"Помилка обробки файлу: {str(e)}"
-        print(f"[UPDATE_EXCEL] Exception: {error_detail}", flush=True)
-        print(traceback.format_exc(), flush=True)
-        raise HTTPException(status_code=500, detail=error_detail)
+        logger.exception(f"[UPDATE_EXCEL] Помилка обробки файлу {file.filename}")
+        raise HTTPException(status_code=400, detail=f"Помилка обробки файлу: {str(e)}")
     finally:
-        # Видаляємо тимчасовий файл
-        try:
-            if temp_path.exists():
-                temp_path.unlink()
-        except Exception:
-            pass
+        temp_path.unlink(missing_ok=True)
+
+    if not report.total_rows:
+        raise HTTPException(
+            status_code=400,
+            detail="Не знайдено жодної страви в Excel файлі. Перевірте формат файлу: перша колонка - назва, друга - ціна",
+        )
+
+    logger.info(f"[UPDATE_EXCEL] Оновлено страв: {report.updated}, знайдено: {report.found}, не знайдено: {len(report.not_found)}")
+    return {"status": "success", **report.to_dict()}
+
+
+async def _save_import_upload(file: UploadFile, prefix: str) -> Path:
+    """Зберегти завантажений файл імпорту в uploads/imports (чанками, без читання цілком у пам'ять)."""
+    imports_dir = UPLOADS_DIR / "imports"
+    imports_dir.mkdir(parents=True, exist_ok=True)
+    temp_path = imports_dir / f"{prefix}_{uuid.uuid4().hex[:8]}_{Path(file.filename).name}"
+    with temp_path.open("wb") as f:
+        while chunk := await file.read(1024 * 1024):
+            f.write(chunk)
+    return temp_path
 
 
 @router.get("/settings/telegram-accounts", response_model=list[schema.TelegramAccount])
@@ -4386,69 +4415,17 @@ def delete_template_gallery_photo(
 
 @router.get("/clients")
 def get_clients(
-    skip: int = 0, 
-    limit: int = 100,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),  # DashboardPage бере 1000 одним запитом
     search: str = None,
+    cursor: Optional[str] = Query(None, description="next_cursor з попередньої сторінки"),
     db: Session = Depends(get_db),
     user = Depends(get_current_user)
 ):
     # Сортуємо клієнтів за датою створення (нові зверху),
     # щоб щойно створені клієнти завжди потрапляли в першу сторінку.
-    query = db.query(models.Client)
-    
-    if search:
-        query = query.filter(
-            or_(
-                models.Client.full_name.ilike(f"%{search}%"),
-                models.Client.company_name.ilike(f"%{search}%"),
-                models.Client.phone.ilike(f"%{search}%"),
-                models.Client.email.ilike(f"%{search}%")
-            )
-        )
-    
-    query = query.order_by(models.Client.created_at.desc())
-    
-    total = query.count()
-    clients = query.offset(skip).limit(limit).all()
-    
-    # Додаємо questionnaire_id до кожного клієнта
-    clients_with_questionnaires = []
-    for client in clients:
-        # Знаходимо останню анкету клієнта
-        latest_questionnaire = db.query(models.ClientQuestionnaire).filter(
-            models.ClientQuestionnaire.client_id == client.id
-        ).order_by(models.ClientQuestionnaire.created_at.desc()).first()
-        
-        client_dict = {
-            "id": client.id,
-            "name": client.full_name,
-            "company_name": client.company_name,
-            "phone": client.phone,
-            "email": client.email,
-            "total_orders": client.total_orders,
-            "lifetime_spent": client.lifetime_spent,
-            "current_year_spent": client.current_year_spent,
-            "cashback_balance": client.cashback_balance,
-            "cashback_earned_total": client.cashback_earned_total,
-            "cashback_used_total": client.cashback_used_total,
-            "cashback_expires_at": client.cashback_expires_at,
-            "loyalty_tier": client.loyalty_tier,
-            "cashback_rate": client.cashback_rate,
-            "is_custom_rate": client.is_custom_rate,
-            "yearly_photographer_used": client.yearly_photographer_used,
-            "yearly_robot_used": client.yearly_robot_used,
-            "bonus_year": client.bonus_year,
-            "notes": client.notes,
-            "created_at": client.created_at,
-            "updated_at": client.updated_at,
-            "questionnaire_id": latest_questionnaire.id if latest_questionnaire else None
-        }
-        clients_with_questionnaires.append(client_dict)
-    
-    return {
-        "total": total,
-        "clients": clients_with_questionnaires
-    }
+    # questionnaire_id (остання анкета) рахується в тому ж запиті.
+    return crud.get_clients_page(db, search=search, limit=limit, cursor=cursor, skip=skip)
 
 
 @router.get("/clients/{client_id}")
@@ -4625,51 +4602,14 @@ def get_client_questionnaires(
 @router.get("/questionnaires")
 def get_all_questionnaires(
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),  # DashboardPage бере 1000 одним запитом
     manager_id: Optional[int] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor з попередньої сторінки"),
     db: Session = Depends(get_db),
     user = Depends(get_current_user)
 ):
-    """Отримати всі анкети з фільтрацією"""
-    query = db.query(models.ClientQuestionnaire)
-    
-    if manager_id:
-        query = query.filter(models.ClientQuestionnaire.manager_id == manager_id)
-    
-    total = query.count()
-    questionnaires = query.order_by(
-        models.ClientQuestionnaire.created_at.desc()
-    ).offset(skip).limit(limit).all()
-    
-    # Додаємо інформацію про клієнта та менеджера
-    result = []
-    for q in questionnaires:
-        client = db.query(models.Client).filter(models.Client.id == q.client_id).first()
-        manager = db.query(models.User).filter(models.User.id == q.manager_id).first() if q.manager_id else None
-        
-        # Формуємо повне ім'я менеджера
-        manager_name = None
-        if manager:
-            if manager.first_name and manager.last_name:
-                manager_name = f"{manager.first_name} {manager.last_name}"
-            elif manager.first_name:
-                manager_name = manager.first_name
-            elif manager.last_name:
-                manager_name = manager.last_name
-            else:
-                manager_name = manager.email
-        
-        q_dict = {
-            **q.__dict__,
-            "client_name": client.full_name if client else None,
-            "client_phone": client.phone if client else None,
-            "client_company": client.company_name if client else None,
-            "manager_name": manager_name,
-            "manager_email": manager.email if manager else None,
-        }
-        result.append(q_dict)
-    
-    return {"questionnaires": result, "total": total}
+    """Отримати всі анкети з фільтрацією (клієнт і менеджер - JOIN, keyset пагінація)"""
+    return crud.get_questionnaires_page(db, manager_id=manager_id, limit=limit, cursor=cursor, skip=skip)
 
 
 @router.get("/questionnaires/{questionnaire_id}")
@@ -4972,24 +4912,16 @@ def update_client_stats(
     db: Session = Depends(get_db),
     user = Depends(get_current_user)
 ):
-    """Оновлює статистику клієнта після створення КП"""
+    """
+    Статистика клієнта після створення КП.
+    Агрегати (замовлення, витрати, кешбек, рівень) підтримуються інкрементально
+    при нарахуванні за КП, тож тут нічого не перераховується; повний
+    перерахунок для всіх клієнтів - POST /loyalty/runs (kind=recalculate)
+    """
     client = db.query(models.Client).filter(models.Client.id == client_id).first()
     if not client:
         raise HTTPException(404, "Client not found")
     
-    # Підрахунок замовлень та витрат
-    kps = db.query(models.KP).filter(models.KP.client_id == client_id).all()
-    client.total_orders = len(kps)
-    client.total_spent = sum(kp.total_price or 0 for kp in kps)
-    
-    # Підрахунок кешбеку
-    total_cashback = sum(kp.cashback_earned or 0 for kp in kps) - sum(kp.cashback_used or 0 for kp in kps)
-    client.cashback_balance = total_cashback
-    
-    client.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(client)
-    
     return client
 
 
@@ -5104,67 +5036,69 @@ def use_diamond_bonus_endpoint(
         raise HTTPException(400, str(e))
 
 
+# ==================== ЗАПУСКИ LOYALTY ENGINE ====================
+
+@router.post("/loyalty/runs")
+def create_loyalty_run(
+    kind: str = Body(..., embed=True),
+    run_id: Optional[str] = Body(None, embed=True),
+    dry_run: bool = Body(True, embed=True),
+    db: Session = Depends(get_db),
+    user_payload = Depends(get_current_user),
+):
+    """
+    Set-based запуск для всіх клієнтів (тільки для адміна):
+    year_end - згоряння кешбеку і річні скидання, recalculate - агрегати
+    з нарахувань по КП і рівні. За замовчуванням dry_run - лише звіт.
+    Повторний run_id повертає збережений звіт без змін.
+    """
+    if not user_payload.get("is_admin", False):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    try:
+        report = loyalty_engine.run(db, kind, run_id=run_id, dry_run=dry_run)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    return asdict(report)
+
+
+@router.get("/loyalty/runs/{run_id}")
+def get_loyalty_run(
+    run_id: str,
+    db: Session = Depends(get_db),
+    user_payload = Depends(get_current_user),
+):
+    """Звіт застосованого запуску"""
+    if not user_payload.get("is_admin", False):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    run = db.get(models.LoyaltyRun, run_id)
+    if not run:
+        raise HTTPException(404, "Loyalty run not found")
+    return {"run_id": run.run_id, "kind": run.kind, "report": run.report, "created_at": run.created_at}
+
+
 # ==================== ЧЕКЛІСТИ (БОКСИ / КЕЙТЕРИНГ) ====================
 
 @router.get("/checklists")
 def get_all_checklists(
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
     checklist_type: Optional[str] = None,
     status: Optional[str] = None,
     manager_id: Optional[int] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor з попередньої сторінки"),
     db: Session = Depends(get_db),
     user = Depends(get_current_user)
 ):
-    """Отримати всі чекліста з фільтрацією"""
-    query = db.query(models.Checklist)
-    
-    if checklist_type:
-        query = query.filter(models.Checklist.checklist_type == checklist_type)
-    if status:
-        query = query.filter(models.Checklist.status == status)
-    if manager_id:
-        query = query.filter(models.Checklist.manager_id == manager_id)
-    
-    total = query.count()
-    box_count = query.filter(models.Checklist.checklist_type == "box").count()
-    catering_count = query.filter(models.Checklist.checklist_type == "catering").count()
-    
-    checklists = query.order_by(
-        models.Checklist.created_at.desc()
-    ).offset(skip).limit(limit).all()
-    
-    # Додаємо інформацію про клієнта та менеджера
-    result = []
-    for c in checklists:
-        client = db.query(models.Client).filter(models.Client.id == c.client_id).first() if c.client_id else None
-        manager = db.query(models.User).filter(models.User.id == c.manager_id).first() if c.manager_id else None
-        
-        # Формуємо повне ім'я менеджера
-        manager_name = None
-        if manager:
-            if manager.first_name and manager.last_name:
-                manager_name = f"{manager.first_name} {manager.last_name}"
-            elif manager.first_name:
-                manager_name = manager.first_name
-            elif manager.last_name:
-                manager_name = manager.last_name
-            else:
-                manager_name = manager.email
-        
-        c_dict = {
-            **{k: v for k, v in c.__dict__.items() if not k.startswith('_')},
-            "client_name": client.full_name if client else c.contact_name,
-            "manager_name": manager_name,
-        }
-        result.append(c_dict)
-    
-    return {
-        "checklists": result,
-        "total": total,
-        "box_count": box_count,
-        "catering_count": catering_count
-    }
+    """Отримати всі чекліста з фільтрацією (лічильники - одним GROUP BY, keyset пагінація)"""
+    return crud.get_checklists_page(
+        db,
+        checklist_type=checklist_type,
+        status=status,
+        manager_id=manager_id,
+        limit=limit,
+        cursor=cursor,
+        skip=skip,
+    )
 
 
 @router.get("/checklists/{checklist_id}")
@@ -349,6 +349,90 @@ class KP(KPBase):
         from_attributes = True
 
 
+class KPSummaryItem(BaseModel):
+    """Компактна позиція КП у списку (тільки для include=items)."""
+    item_id: Optional[int] = None
+    quantity: Optional[int] = None
+    event_format_id: Optional[int] = None
+
+
+class KPSummary(BaseModel):
+    """Рядок списку КП: поля для таблиць/фільтрів + агрегати, пораховані в SQL."""
+    id: int
+    title: str
+    status: Optional[str] = None
+    created_at: Optional[datetime] = None
+    created_by_id: Optional[int] = None
+    manager_name: Optional[str] = None
+    client_id: Optional[int] = None
+    client_name: Optional[str] = None
+    client_email: Optional[str] = None
+    client_phone: Optional[str] = None
+    event_format: Optional[str] = None
+    event_group: Optional[str] = None
+    event_date: Optional[datetime] = None
+    event_time: Optional[str] = None
+    event_location: Optional[str] = None
+    people_count: Optional[int] = None
+    template_id: Optional[int] = None
+    total_price: Optional[float] = None
+    price_per_person: Optional[float] = None
+    menu_total: Optional[float] = None
+    equipment_total: Optional[float] = None
+    service_total: Optional[float] = None
+    transport_total: Optional[float] = None
+    total_amount: Optional[float] = None
+    final_amount: Optional[float] = None
+    discount_amount: Optional[float] = None
+    cashback_amount: Optional[float] = None
+    # Агрегати
+    item_count: int = 0
+    items_quantity: int = 0
+    format_count: int = 0
+    items: Optional[list[KPSummaryItem]] = None
+
+
+class KPListPage(BaseModel):
+    items: list[KPSummary]
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+
+class KPStatusStats(BaseModel):
+    status: Optional[str] = None
+    count: int
+    revenue: float
+
+
+class KPClientStats(BaseModel):
+    client_id: int
+    client_name: Optional[str] = None
+    revenue: float
+    kp_count: int
+
+
+class KPManagerStats(BaseModel):
+    manager_id: int
+    kp_count: int
+    revenue: float
+
+
+class KPItemStats(BaseModel):
+    item_id: int
+    quantity: int
+    revenue: float
+
+
+class KPStats(BaseModel):
+    """Агрегати КП для дашборда (по всіх КП, пораховані в SQL)."""
+    total: int
+    total_revenue: float
+    by_status: list[KPStatusStats]
+    top_clients: list[KPClientStats]
+    managers: list[KPManagerStats]
+    top_items: list[KPItemStats]
+
+
 class KPStatusUpdate(BaseModel):
     status: str
 
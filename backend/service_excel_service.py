@@ -12,31 +12,34 @@ from __future__ import annotations
 
 from collections import defaultdict
 from datetime import datetime
-from io import BytesIO
-from typing import Dict, List, Tuple, Iterable
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, selectinload
 
 import models
 
 try:
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-    from openpyxl.utils import get_column_letter
+    from core.excel_export import BOLD, CELL, TITLE, ExcelWriter, header_style, temp_export_path
 except ImportError as e:
     raise RuntimeError("openpyxl is required for service Excel export") from e
 
+HEADER = "service_header"
+
 
 def _load_kps_with_details(db: Session, kp_ids: List[int]) -> List[models.KP]:
     """
     Завантажує КП разом із позиціями, форматами подій та клієнтом.
+
+    Колекції вантажаться окремими selectin запитами, а не join-ом,
+    щоб items x event_formats.items не множили рядки результату.
     """
     return (
         db.query(models.KP)
         .options(
-            joinedload(models.KP.items).joinedload(models.KPItem.item),
-            joinedload(models.KP.event_formats).joinedload(models.KPEventFormat.items),
-            joinedload(models.KP.client),
+            selectinload(models.KP.items),
+            selectinload(models.KP.event_formats).selectinload(models.KPEventFormat.items),
+            selectinload(models.KP.client),
         )
         .filter(models.KP.id.in_(kp_ids))
         .all()
@@ -56,44 +59,45 @@ def _safe_sheet_title(base: str) -> str:
     return cleaned
 
 
-def _apply_header_style(ws, row: int, col_start: int, col_end: int):
-    """Застосовує стиль заголовка до діапазону клітинок."""
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    header_font = Font(color="FFFFFF", bold=True)
-    header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
-    for col in range(col_start, col_end + 1):
-        cell = ws.cell(row=row, column=col)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = header_alignment
-        cell.border = thin_border
-
-
-def _apply_cell_border(ws, row: int, col_start: int, col_end: int):
-    """Застосовує рамку до діапазону клітинок."""
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    for col in range(col_start, col_end + 1):
-        cell = ws.cell(row=row, column=col)
-        cell.border = thin_border
+def _iter_kp_items(kp: models.KP) -> Iterator[models.KPItem]:
+    """Позиції КП: спочатку з форматів подій, потім загальні."""
+    for event_format in kp.event_formats:
+        yield from event_format.items
+    yield from kp.items
+
+
+def _item_type(item: models.KPItem) -> Optional[str]:
+    return getattr(item, "type", None) or getattr(item.item, "type", None)
+
+
+def _item_name(item: models.KPItem) -> str:
+    return item.name or (item.item.name if item.item else "Без назви")
+
+
+def _item_unit(item: models.KPItem, default: str) -> str:
+    return item.unit or (item.item.unit if item.item else default)
+
+
+def _item_price(item: models.KPItem) -> float:
+    if item.price:
+        return float(item.price)
+    return float(item.item.price) if item.item and item.item.price else 0
+
 
+def _format_event_date(kp: models.KP) -> str:
+    if not kp.event_date:
+        return ""
+    if isinstance(kp.event_date, datetime):
+        return kp.event_date.strftime("%d.%m.%Y")
+    return str(kp.event_date)
 
-def generate_service_excel(db: Session, kp_ids: List[int]) -> Tuple[bytes, str]:
+
+def generate_service_excel(db: Session, kp_ids: List[int]) -> Tuple[Path, str]:
     """
     Генерує Excel-файл для відділу сервісу на основі вибраних КП.
 
-    Повертає (bytes, filename).
+    Книга пишеться write-only у тимчасовий файл.
+    Повертає (path, filename); файл видаляє той, хто його віддає.
     """
     if not kp_ids:
         raise ValueError("Список KP ID порожній")
@@ -102,321 +106,157 @@ def generate_service_excel(db: Session, kp_ids: List[int]) -> Tuple[bytes, str]:
     if not kps:
         raise ValueError("Не знайдено жодного КП для вказаних ID")
 
-    wb = Workbook()
+    # Агрегації по всіх КП рахуються до запису: листи пишуться тільки послідовно
+    equipment_totals: Dict[str, Dict] = defaultdict(lambda: {"quantity": 0, "unit": None})
+    service_totals: Dict[str, Dict] = defaultdict(lambda: {"quantity": 0, "unit": None, "price": 0})
+    for kp in kps:
+        for item in _iter_kp_items(kp):
+            item_type = _item_type(item)
+            name = _item_name(item)
+            qty = item.quantity or 0
+            if item_type == 'equipment':
+                equipment_totals[name]["quantity"] += qty
+                if not equipment_totals[name]["unit"]:
+                    equipment_totals[name]["unit"] = _item_unit(item, "шт")
+            elif item_type == 'service':
+                service_totals[name]["quantity"] += qty
+                service_totals[name]["price"] += _item_price(item) * qty
+                if not service_totals[name]["unit"]:
+                    service_totals[name]["unit"] = _item_unit(item, "послуга")
+
+    writer = ExcelWriter(extra_styles=[header_style(HEADER, fill="4472C4", font_color="FFFFFF", wrap=True)])
 
     # ---------- Лист "Загальна інформація" ----------
-    ws_info = wb.active
-    ws_info.title = "Загальна інформація"
-    
-    # Заголовки
-    headers = ["№", "Назва КП", "Клієнт", "Дата події", "Час", "Локація", "К-сть гостей", "Формат", "Статус"]
-    ws_info.append(headers)
-    _apply_header_style(ws_info, 1, 1, len(headers))
-    
-    # Дані
+    ws_info = writer.sheet("Загальна інформація", widths=[5, 35, 25, 12, 10, 35, 12, 20, 12])
+    writer.append(
+        ws_info,
+        ["№", "Назва КП", "Клієнт", "Дата події", "Час", "Локація", "К-сть гостей", "Формат", "Статус"],
+        style=HEADER,
+    )
     for idx, kp in enumerate(kps, 1):
         client_name = kp.client_name or (kp.client.full_name if kp.client else "")
-        event_date_str = ""
-        if kp.event_date:
-            if isinstance(kp.event_date, datetime):
-                event_date_str = kp.event_date.strftime("%d.%m.%Y")
-            else:
-                event_date_str = str(kp.event_date)
-        
-        row_data = [
+        writer.append(ws_info, [
             idx,
             kp.title or "",
             client_name,
-            event_date_str,
+            _format_event_date(kp),
             kp.event_time or "",
             kp.event_location or "",
             kp.people_count or 0,
             kp.event_format or "",
             kp.status or "",
-        ]
-        ws_info.append(row_data)
-        _apply_cell_border(ws_info, idx + 1, 1, len(headers))
-    
-    # Налаштування ширини колонок
-    ws_info.column_dimensions['A'].width = 5
-    ws_info.column_dimensions['B'].width = 35
-    ws_info.column_dimensions['C'].width = 25
-    ws_info.column_dimensions['D'].width = 12
-    ws_info.column_dimensions['E'].width = 10
-    ws_info.column_dimensions['F'].width = 35
-    ws_info.column_dimensions['G'].width = 12
-    ws_info.column_dimensions['H'].width = 20
-    ws_info.column_dimensions['I'].width = 12
+        ], style=CELL)
 
     # ---------- Лист "Обладнання" (агрегація по всіх КП) ----------
-    ws_equipment = wb.create_sheet("Обладнання")
-    
-    # Збираємо обладнання з event_formats
-    equipment_totals: Dict[str, Dict] = defaultdict(lambda: {"quantity": 0, "unit": None})
-    
-    for kp in kps:
-        for event_format in kp.event_formats:
-            for item in event_format.items:
-                # Визначаємо назву
-                name = item.name or (item.item.name if item.item else "Без назви")
-                qty = item.quantity or 0
-                
-                # Перевіряємо, чи це обладнання (type = 'equipment')
-                item_type = item.type or (item.item.type if item.item else None)
-                if item_type == 'equipment':
-                    equipment_totals[name]["quantity"] += qty
-                    if not equipment_totals[name]["unit"]:
-                        equipment_totals[name]["unit"] = item.unit or (item.item.unit if item.item else "шт")
-    
-    # Також додаємо з items (якщо там є обладнання)
-    for kp in kps:
-        for item in kp.items:
-            item_type = item.type or (item.item.type if item.item else None)
-            if item_type == 'equipment':
-                name = item.name or (item.item.name if item.item else "Без назви")
-                qty = item.quantity or 0
-                equipment_totals[name]["quantity"] += qty
-                if not equipment_totals[name]["unit"]:
-                    equipment_totals[name]["unit"] = item.unit or (item.item.unit if item.item else "шт")
-    
-    # Записуємо обладнання
-    eq_headers = ["№", "Назва", "Кількість", "Одиниця"]
-    ws_equipment.append(eq_headers)
-    _apply_header_style(ws_equipment, 1, 1, len(eq_headers))
-    
+    ws_equipment = writer.sheet("Обладнання", widths=[5, 50, 12, 12])
+    writer.append(ws_equipment, ["№", "Назва", "Кількість", "Одиниця"], style=HEADER)
     for idx, (name, data) in enumerate(sorted(equipment_totals.items()), 1):
-        ws_equipment.append([
-            idx,
-            name,
-            data["quantity"],
-            data["unit"] or "шт"
-        ])
-        _apply_cell_border(ws_equipment, idx + 1, 1, len(eq_headers))
-    
-    ws_equipment.column_dimensions['A'].width = 5
-    ws_equipment.column_dimensions['B'].width = 50
-    ws_equipment.column_dimensions['C'].width = 12
-    ws_equipment.column_dimensions['D'].width = 12
+        writer.append(ws_equipment, [idx, name, data["quantity"], data["unit"] or "шт"], style=CELL)
 
     # ---------- Лист "Сервіс" (агрегація по всіх КП) ----------
-    ws_service = wb.create_sheet("Сервіс")
-    
-    service_totals: Dict[str, Dict] = defaultdict(lambda: {"quantity": 0, "unit": None, "price": 0})
-    
-    for kp in kps:
-        for event_format in kp.event_formats:
-            for item in event_format.items:
-                name = item.name or (item.item.name if item.item else "Без назви")
-                qty = item.quantity or 0
-                price = float(item.price or 0) if item.price else (float(item.item.price) if item.item and item.item.price else 0)
-                
-                item_type = item.type or (item.item.type if item.item else None)
-                if item_type == 'service':
-                    service_totals[name]["quantity"] += qty
-                    service_totals[name]["price"] += price * qty
-                    if not service_totals[name]["unit"]:
-                        service_totals[name]["unit"] = item.unit or (item.item.unit if item.item else "послуга")
-        
-        for item in kp.items:
-            item_type = item.type or (item.item.type if item.item else None)
-            if item_type == 'service':
-                name = item.name or (item.item.name if item.item else "Без назви")
-                qty = item.quantity or 0
-                price = float(item.price or 0) if item.price else (float(item.item.price) if item.item and item.item.price else 0)
-                service_totals[name]["quantity"] += qty
-                service_totals[name]["price"] += price * qty
-                if not service_totals[name]["unit"]:
-                    service_totals[name]["unit"] = item.unit or (item.item.unit if item.item else "послуга")
-    
-    svc_headers = ["№", "Назва послуги", "Кількість", "Одиниця", "Сума, грн"]
-    ws_service.append(svc_headers)
-    _apply_header_style(ws_service, 1, 1, len(svc_headers))
-    
+    ws_service = writer.sheet("Сервіс", widths=[5, 50, 12, 12, 15])
+    writer.append(ws_service, ["№", "Назва послуги", "Кількість", "Одиниця", "Сума, грн"], style=HEADER)
     for idx, (name, data) in enumerate(sorted(service_totals.items()), 1):
-        ws_service.append([
+        writer.append(ws_service, [
             idx,
             name,
             data["quantity"],
             data["unit"] or "послуга",
-            data["price"]
-        ])
-        _apply_cell_border(ws_service, idx + 1, 1, len(svc_headers))
-    
-    ws_service.column_dimensions['A'].width = 5
-    ws_service.column_dimensions['B'].width = 50
-    ws_service.column_dimensions['C'].width = 12
-    ws_service.column_dimensions['D'].width = 12
-    ws_service.column_dimensions['E'].width = 15
+            data["price"],
+        ], style=CELL)
 
     # ---------- Лист "Транспорт" ----------
-    ws_transport = wb.create_sheet("Транспорт")
-    
-    transport_headers = ["№", "Назва КП", "Клієнт", "Локація", "Обладнання, грн", "Персонал, грн", "Всього, грн"]
-    ws_transport.append(transport_headers)
-    _apply_header_style(ws_transport, 1, 1, len(transport_headers))
-    
+    ws_transport = writer.sheet("Транспорт", widths=[5, 35, 25, 35, 15, 15, 15])
+    writer.append(
+        ws_transport,
+        ["№", "Назва КП", "Клієнт", "Локація", "Обладнання, грн", "Персонал, грн", "Всього, грн"],
+        style=HEADER,
+    )
+
     total_transport_eq = 0
     total_transport_pers = 0
     total_transport = 0
-    
+
     for idx, kp in enumerate(kps, 1):
         client_name = kp.client_name or (kp.client.full_name if kp.client else "")
         eq_cost = float(kp.transport_equipment_total or 0)
         pers_cost = float(kp.transport_personnel_total or 0)
         total_cost = float(kp.transport_total or 0) or (eq_cost + pers_cost)
-        
+
         total_transport_eq += eq_cost
         total_transport_pers += pers_cost
         total_transport += total_cost
-        
-        ws_transport.append([
+
+        writer.append(ws_transport, [
             idx,
             kp.title or "",
             client_name,
             kp.event_location or "",
             eq_cost,
             pers_cost,
-            total_cost
-        ])
-        _apply_cell_border(ws_transport, idx + 1, 1, len(transport_headers))
-    
+            total_cost,
+        ], style=CELL)
+
     # Підсумок
-    summary_row = len(kps) + 2
-    ws_transport.cell(row=summary_row, column=4, value="РАЗОМ:").font = Font(bold=True)
-    ws_transport.cell(row=summary_row, column=5, value=total_transport_eq).font = Font(bold=True)
-    ws_transport.cell(row=summary_row, column=6, value=total_transport_pers).font = Font(bold=True)
-    ws_transport.cell(row=summary_row, column=7, value=total_transport).font = Font(bold=True)
-    
-    ws_transport.column_dimensions['A'].width = 5
-    ws_transport.column_dimensions['B'].width = 35
-    ws_transport.column_dimensions['C'].width = 25
-    ws_transport.column_dimensions['D'].width = 35
-    ws_transport.column_dimensions['E'].width = 15
-    ws_transport.column_dimensions['F'].width = 15
-    ws_transport.column_dimensions['G'].width = 15
+    writer.append(
+        ws_transport,
+        [None, None, None, "РАЗОМ:", total_transport_eq, total_transport_pers, total_transport],
+        styles=[None, None, None, BOLD, BOLD, BOLD, BOLD],
+    )
 
     # ---------- Окремі листи для кожного КП ----------
     for kp in kps:
         client_name = kp.client_name or (kp.client.full_name if kp.client else "")
         sheet_title = client_name or kp.title or f"KP {kp.id}"
-        ws_kp = wb.create_sheet(_safe_sheet_title(sheet_title))
-        
+        ws_kp = writer.sheet(_safe_sheet_title(sheet_title), widths=[20, 50, 12, 12, 15])
+
         # Шапка з інформацією про захід
-        ws_kp["A1"] = "Дата проведення:"
-        if kp.event_date:
-            if isinstance(kp.event_date, datetime):
-                ws_kp["B1"] = kp.event_date.strftime("%d.%m.%Y")
-            else:
-                ws_kp["B1"] = str(kp.event_date)
-        ws_kp["A1"].font = Font(bold=True)
-        
-        ws_kp["A2"] = "Час:"
-        ws_kp["B2"] = kp.event_time or ""
-        ws_kp["A2"].font = Font(bold=True)
-        
-        ws_kp["A3"] = "Замовник:"
-        ws_kp["B3"] = client_name
-        ws_kp["A3"].font = Font(bold=True)
-        
-        ws_kp["A4"] = "Місце проведення:"
-        ws_kp["B4"] = kp.event_location or ""
-        ws_kp["A4"].font = Font(bold=True)
-        
-        ws_kp["A5"] = "Формат заходу:"
-        ws_kp["B5"] = kp.event_format or ""
-        ws_kp["A5"].font = Font(bold=True)
-        
-        ws_kp["A6"] = "Кількість осіб:"
-        ws_kp["B6"] = kp.people_count or 0
-        ws_kp["A6"].font = Font(bold=True)
-        
-        current_row = 8
-        
+        for label, value in (
+            ("Дата проведення:", _format_event_date(kp)),
+            ("Час:", kp.event_time or ""),
+            ("Замовник:", client_name),
+            ("Місце проведення:", kp.event_location or ""),
+            ("Формат заходу:", kp.event_format or ""),
+            ("Кількість осіб:", kp.people_count or 0),
+        ):
+            writer.append(ws_kp, [label, value], styles=[BOLD, None])
+        writer.append(ws_kp, [])
+
+        kp_items = list(_iter_kp_items(kp))
+
         # Обладнання для цього КП
-        ws_kp.cell(row=current_row, column=1, value="ОБЛАДНАННЯ ТА СЕРВІС").font = Font(bold=True, size=12)
-        current_row += 1
-        
-        kp_eq_headers = ["№", "Назва", "Кількість", "Одиниця"]
-        for col, header in enumerate(kp_eq_headers, 1):
-            ws_kp.cell(row=current_row, column=col, value=header)
-        _apply_header_style(ws_kp, current_row, 1, len(kp_eq_headers))
-        current_row += 1
-        
-        eq_idx = 1
-        for event_format in kp.event_formats:
-            for item in event_format.items:
-                item_type = item.type or (item.item.type if item.item else None)
-                if item_type == 'equipment':
-                    name = item.name or (item.item.name if item.item else "Без назви")
-                    qty = item.quantity or 0
-                    unit = item.unit or (item.item.unit if item.item else "шт")
-                    ws_kp.append([eq_idx, name, qty, unit])
-                    _apply_cell_border(ws_kp, current_row, 1, 4)
-                    current_row += 1
-                    eq_idx += 1
-        
-        for item in kp.items:
-            item_type = item.type or (item.item.type if item.item else None)
-            if item_type == 'equipment':
-                name = item.name or (item.item.name if item.item else "Без назви")
-                qty = item.quantity or 0
-                unit = item.unit or (item.item.unit if item.item else "шт")
-                ws_kp.append([eq_idx, name, qty, unit])
-                _apply_cell_border(ws_kp, current_row, 1, 4)
-                current_row += 1
-                eq_idx += 1
-        
-        current_row += 1
-        
+        writer.append(ws_kp, ["ОБЛАДНАННЯ ТА СЕРВІС"], style=TITLE)
+        writer.append(ws_kp, ["№", "Назва", "Кількість", "Одиниця"], style=HEADER)
+        equipment = [item for item in kp_items if _item_type(item) == 'equipment']
+        for eq_idx, item in enumerate(equipment, 1):
+            writer.append(ws_kp, [
+                eq_idx,
+                _item_name(item),
+                item.quantity or 0,
+                _item_unit(item, "шт"),
+            ], style=CELL)
+        writer.append(ws_kp, [])
+
         # Послуги для цього КП
-        ws_kp.cell(row=current_row, column=1, value="ПОСЛУГИ").font = Font(bold=True, size=12)
-        current_row += 1
-        
-        kp_svc_headers = ["№", "Назва", "Кількість", "Одиниця", "Сума, грн"]
-        for col, header in enumerate(kp_svc_headers, 1):
-            ws_kp.cell(row=current_row, column=col, value=header)
-        _apply_header_style(ws_kp, current_row, 1, len(kp_svc_headers))
-        current_row += 1
-        
-        svc_idx = 1
-        for event_format in kp.event_formats:
-            for item in event_format.items:
-                item_type = item.type or (item.item.type if item.item else None)
-                if item_type == 'service':
-                    name = item.name or (item.item.name if item.item else "Без назви")
-                    qty = item.quantity or 0
-                    unit = item.unit or (item.item.unit if item.item else "послуга")
-                    price = float(item.price or 0) if item.price else (float(item.item.price) if item.item and item.item.price else 0)
-                    total = price * qty
-                    ws_kp.append([svc_idx, name, qty, unit, total])
-                    _apply_cell_border(ws_kp, current_row, 1, 5)
-                    current_row += 1
-                    svc_idx += 1
-        
-        for item in kp.items:
-            item_type = item.type or (item.item.type if item.item else None)
-            if item_type == 'service':
-                name = item.name or (item.item.name if item.item else "Без назви")
-                qty = item.quantity or 0
-                unit = item.unit or (item.item.unit if item.item else "послуга")
-                price = float(item.price or 0) if item.price else (float(item.item.price) if item.item and item.item.price else 0)
-                total = price * qty
-                ws_kp.append([svc_idx, name, qty, unit, total])
-                _apply_cell_border(ws_kp, current_row, 1, 5)
-                current_row += 1
-                svc_idx += 1
-        
-        # Налаштування ширини колонок
-        ws_kp.column_dimensions['A'].width = 20
-        ws_kp.column_dimensions['B'].width = 50
-        ws_kp.column_dimensions['C'].width = 12
-        ws_kp.column_dimensions['D'].width = 12
-        ws_kp.column_dimensions['E'].width = 15
-
-    # Збереження у bytes
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
+        writer.append(ws_kp, ["ПОСЛУГИ"], style=TITLE)
+        writer.append(ws_kp, ["№", "Назва", "Кількість", "Одиниця", "Сума, грн"], style=HEADER)
+        services = [item for item in kp_items if _item_type(item) == 'service']
+        for svc_idx, item in enumerate(services, 1):
+            qty = item.quantity or 0
+            writer.append(ws_kp, [
+                svc_idx,
+                _item_name(item),
+                qty,
+                _item_unit(item, "послуга"),
+                _item_price(item) * qty,
+            ], style=CELL)
+
+    path = temp_export_path(prefix="service_")
+    try:
+        writer.save(path)
+    except Exception:
+        path.unlink(missing_ok=True)
+        raise
 
     # Ім'я файлу
     unique_dates = {
@@ -430,5 +270,4 @@ def generate_service_excel(db: Session, kp_ids: List[int]) -> Tuple[bytes, str]:
     else:
         filename = "service.xlsx"
 
-    return buffer.getvalue(), filename
-
+    return path, filename
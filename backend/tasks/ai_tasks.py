@@ -3,30 +3,43 @@ AI RAG background tasks - асинхронна обробка AI відпові
 """
 import logging
 from typing import Optional, Dict, Any
+from uuid import UUID
 from sqlalchemy.orm import Session
 
 from tasks.celery_app import celery_app
 from core.database import SessionLocal
-from modules.communications.models import Conversation, PlatformEnum
+from modules.communications.models import Conversation, Message, MessageDirection, PlatformEnum
 
 logger = logging.getLogger(__name__)
 
 
+def _manager_replied_since(db: Session, conversation_id: str, since) -> bool:
+    """Чи є у розмові вихідне повідомлення не від AI після since."""
+    rows = db.query(Message.meta_data).filter(
+        Message.conversation_id == UUID(conversation_id),
+        Message.direction == MessageDirection.OUTBOUND,
+        Message.created_at >= since,
+    ).all()
+    return any(not (meta_data or {}).get("ai_generated") for (meta_data,) in rows)
+
+
 @celery_app.task(name="process_ai_reply_task")
 def process_ai_reply_task(
     conversation_id: str,
-    message: str,
+    message: Optional[str],
     platform: str,
-    context: Optional[Dict[str, Any]] = None
+    context: Optional[Dict[str, Any]] = None,
+    burst_seq: Optional[int] = None,
 ):
     """
     Асинхронна обробка AI відповіді через RAG API.
     
     Args:
         conversation_id: ID розмови
-        message: Текст повідомлення від клієнта
+        message: Текст повідомлення від клієнта (None - серія з debouncer)
         platform: Платформа (telegram, whatsapp, email, etc.)
         context: Додатковий контекст (опціонально)
+        burst_seq: Номер серії повідомлень (ставить modules.ai_integration.debouncer)
     
     Returns:
         dict: Результат обробки
@@ -35,6 +48,29 @@ def process_ai_reply_task(
     try:
         from modules.ai_integration.service import AIService
         
+        if burst_seq is not None:
+            from modules.ai_integration.debouncer import burst_started_at, claim_burst, merge_burst
+            
+            burst = claim_burst(conversation_id, burst_seq)
+            if not burst:
+                # Прийшло новіше повідомлення - відповідь дасть його задача
+                return {
+                    "status": "superseded",
+                    "conversation_id": conversation_id
+                }
+            if _manager_replied_since(db, conversation_id, burst_started_at(burst)):
+                logger.info(f"Skipping AI reply for conversation {conversation_id}: manager already replied")
+                return {
+                    "status": "manager_replied",
+                    "conversation_id": conversation_id
+                }
+            message = merge_burst(burst)
+            context = {
+                **(context or {}),
+                "message_ids": [item["id"] for item in burst if item.get("id")],
+                "messages_count": len(burst),
+            }
+        
         service = AIService(db)
         
         # Викликати RAG API
@@ -4,6 +4,7 @@ Autobot background tasks - асинхронна обробка повідомл
 import logging
 from typing import Dict, Any
 from uuid import UUID
+from celery.signals import worker_process_shutdown
 from sqlalchemy.orm import Session
 
 from tasks.celery_app import celery_app
@@ -113,3 +114,29 @@ def process_autobot_message_task(
     finally:
         db.close()
 
+
+
+@celery_app.task(name="maintain_autobot_logs_task", time_limit=600, soft_time_limit=550)
+def maintain_autobot_logs_task(retention_months: int = None):
+    """
+    Обслуговування autobot_logs: партиції на наступні місяці + видалення
+    партицій, старших за retention (AUTOBOT_LOG_RETENTION_MONTHS).
+    """
+    from core.config import settings
+    from modules.autobot.log_stats import drop_expired_partitions, ensure_partitions
+
+    db: Session = SessionLocal()
+    try:
+        created = ensure_partitions(db)
+        dropped = drop_expired_partitions(db, retention_months or settings.AUTOBOT_LOG_RETENTION_MONTHS)
+        logger.info(f"Autobot logs maintenance: partitions ensured {created}, dropped {dropped}")
+        return {"ensured": created, "dropped": dropped}
+    finally:
+        db.close()
+
+
+@worker_process_shutdown.connect
+def _flush_autobot_logs(**kwargs):
+    """Prefork дочірні процеси завершуються без atexit - скидаємо буфер логів явно."""
+    from modules.autobot.log_sink import flush_logs
+    flush_logs()
@@ -7,9 +7,18 @@ Celery application configuration and initialization.
 - Додано retry політики
 """
 import os
+import time
 from celery import Celery
+from celery.schedules import crontab
 from kombu import Queue, Exchange
 
+# prometheus_client створює файли метрик уже при імпорті core.metrics (через
+# модулі задач нижче), тож каталог multiprocess має існувати до цього.
+# Файли попереднього запуску очищає команда запуску контейнера, а не імпорт:
+# celery_app імпортують і допоміжні процеси (inspect ping) поруч з живим воркером.
+if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
 # Get Redis URL from environment
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
@@ -74,6 +83,7 @@ celery_app.conf.update(
         'send_message_task': {'queue': 'high_priority'},
         'process_ai_reply_task': {'queue': 'high_priority'},
         'process_autobot_message_task': {'queue': 'high_priority'},
+        'send_translation_offer_task': {'queue': 'high_priority'},
         
         # Середній пріоритет - обробка webhook
         'process_webhook_task': {'queue': 'default'},
@@ -83,6 +93,11 @@ celery_app.conf.update(
         'download_and_save_media_task': {'queue': 'low_priority'},
         'archive_old_conversations_task': {'queue': 'low_priority'},
         'update_all_active_shipments_task': {'queue': 'low_priority'},
+        'export_payments_task': {'queue': 'low_priority'},
+        'refresh_finance_rollups_task': {'queue': 'low_priority'},
+        'maintain_autobot_logs_task': {'queue': 'low_priority'},
+        'delete_expired_notifications_task': {'queue': 'low_priority'},
+        'expire_cashback_task': {'queue': 'low_priority'},
     },
     
     # Broker налаштування для Redis
@@ -102,6 +117,35 @@ celery_app.conf.update(
             'task': 'update_all_active_shipments_task',
             'schedule': 300.0,  # Кожні 5 хвилин
         },
+        'refresh-finance-rollups': {
+            'task': 'refresh_finance_rollups_task',
+            'schedule': 900.0,  # Кожні 15 хвилин - останні 3 дні
+            'kwargs': {'days_back': 3},
+        },
+        'rebuild-finance-rollups': {
+            'task': 'refresh_finance_rollups_task',
+            'schedule': crontab(hour=2, minute=30),  # Щоночі - останні 35 днів
+            'kwargs': {'days_back': 35},
+        },
+        'maintain-autobot-logs': {
+            'task': 'maintain_autobot_logs_task',
+            'schedule': crontab(hour=3, minute=15),  # Щоночі: партиції наперед + retention
+        },
+        # Housekeeping - батчами, з lock проти перекриття запусків (core/housekeeping.py)
+        'archive-old-conversations': {
+            'task': 'archive_old_conversations_task',
+            'schedule': crontab(hour=3, minute=0),
+        },
+        'delete-expired-notifications': {
+            'task': 'delete_expired_notifications_task',
+            'schedule': crontab(hour=3, minute=45),
+        },
+        'expire-cashback': {
+            'task': 'expire_cashback_task',
+            # Перший тиждень січня: пропущений запуск підхопить наступний день,
+            # run_id year-end-{рік} робить решту запусків no-op (loyalty_engine.py)
+            'schedule': crontab(hour=0, minute=30, day_of_month='1-7', month_of_year=1),
+        },
     },
 )
 
@@ -118,5 +162,46 @@ import modules.ai_integration.models  # noqa: F401, E402
 import modules.notifications.models  # noqa: F401, E402
 
 # Import tasks to register them
-from tasks import messaging_tasks, ai_tasks, media_tasks, autobot_tasks, webhook_tasks, postal_tasks  # noqa: F401, E402
+from tasks import messaging_tasks, ai_tasks, media_tasks, autobot_tasks, webhook_tasks, postal_tasks, export_tasks, finance_tasks, housekeeping_tasks, translation_tasks  # noqa: F401, E402
+
+
+
+# --- Prometheus метрики воркера (core/metrics.py) ---
+# Задачі виконуються в дочірніх процесах prefork пулу: вони пишуть метрики в
+# PROMETHEUS_MULTIPROC_DIR, sidecar головного процесу агрегує їх разом з
+# довжиною черг брокера.
+from celery import signals  # noqa: E402
+
+
+@signals.worker_init.connect
+def _start_metrics_sidecar(**kwargs):
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if not multiproc_dir or not os.getenv("METRICS_PORT"):
+        return
+    from core import metrics
+
+    queues = [queue.name for queue in celery_app.conf.task_queues]
+    metrics.start_sidecar(registry=metrics.multiprocess_registry(metrics.CeleryQueueCollector(queues)))
+
+
+@signals.task_prerun.connect
+def _task_started(task_id=None, task=None, **kwargs):
+    task.request.metrics_started = time.perf_counter()
+
+
+@signals.task_postrun.connect
+def _task_finished(task_id=None, task=None, state=None, **kwargs):
+    started = getattr(task.request, "metrics_started", None)
+    if started is None:
+        return
+    from core import metrics
+
+    metrics.CELERY_TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
+
+
+@signals.worker_process_shutdown.connect
+def _mark_metrics_process_dead(pid=None, **kwargs):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
 
+        multiprocess.mark_process_dead(pid or os.getpid())
@@ -0,0 +1,65 @@
+"""
+Export Tasks - фонова генерація великих Excel експортів.
+
+Готовий файл лежить у core.excel_export.EXPORTS_DIR (uploads volume, спільний
+для backend та celery worker) і віддається через download endpoint.
+"""
+import logging
+from datetime import date
+from typing import List, Optional
+
+from tasks.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+# Скільки зберігати готові файли (збігається з result_expires Celery)
+EXPORT_FILE_TTL_SECONDS = 3600
+
+
+@celery_app.task(name="export_payments_task", bind=True, time_limit=1800, soft_time_limit=1700)
+def export_payments_task(
+    self,
+    user_id: str,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    payment_method: Optional[List[str]] = None,
+    payment_status: Optional[List[str]] = None,
+):
+    """
+    Згенерувати реєстр платежів у файл <job_id>.xlsx.
+
+    Args:
+        user_id: ID користувача, від імені якого робиться експорт (scope фільтр)
+        date_from / date_to: ISO дати платежу
+    """
+    from core.database import SessionLocal
+    from core.excel_export import cleanup_exports, job_export_path
+    from modules.finance.export import payments_export_filename, write_payments_workbook
+    import crud_user
+
+    removed = cleanup_exports(EXPORT_FILE_TTL_SECONDS)
+    if removed:
+        logger.info(f"Removed {removed} expired export files")
+
+    db = SessionLocal()
+    try:
+        user = crud_user.get_user_by_id(db, user_id)
+        if not user:
+            raise ValueError(f"User {user_id} not found")
+
+        path = job_export_path(self.request.id)
+        rows = write_payments_workbook(
+            db, user, path,
+            date_from=date.fromisoformat(date_from) if date_from else None,
+            date_to=date.fromisoformat(date_to) if date_to else None,
+            payment_method=payment_method,
+            payment_status=payment_status,
+        )
+        logger.info(f"Payments export {self.request.id}: {rows} rows")
+        return {
+            "user_id": user_id,
+            "filename": payments_export_filename(),
+            "rows": rows,
+        }
+    finally:
+        db.close()
@@ -0,0 +1,37 @@
+"""
+Finance Tasks - підтримка finance_daily_rollups.
+"""
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+
+from tasks.celery_app import celery_app
+# Реєструє session hooks, щоб записи платежів з worker теж оновлювали агрегати
+import modules.finance.rollups  # noqa: F401
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="refresh_finance_rollups_task", time_limit=900, soft_time_limit=850)
+def refresh_finance_rollups_task(days: Optional[List[str]] = None, days_back: Optional[int] = None):
+    """
+    Перерахувати денні агрегати.
+
+    Args:
+        days: ISO дати, зачеплені останніми змінами (після commit)
+        days_back: перерахувати останні N днів, включно з сьогодні (beat)
+    """
+    from core.database import SessionLocal
+    from modules.finance.rollups import refresh_days, refresh_range
+
+    db = SessionLocal()
+    try:
+        if days:
+            refreshed = refresh_days(db, [date.fromisoformat(day) for day in days])
+        else:
+            today = datetime.now(timezone.utc).date()
+            refreshed = refresh_range(db, today - timedelta(days=(days_back or 1) - 1), today)
+        logger.info(f"Refreshed finance rollups for {refreshed} days")
+        return {"days": refreshed}
+    finally:
+        db.close()
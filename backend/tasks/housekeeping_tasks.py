@@ -0,0 +1,53 @@
+"""
+Housekeeping Tasks - планове прибирання даних (core/housekeeping.py).
+"""
+import logging
+from dataclasses import asdict
+
+from tasks.celery_app import celery_app
+from core.database import SessionLocal
+from core import housekeeping
+
+logger = logging.getLogger(__name__)
+
+HOUSEKEEPING_TIME_LIMIT = 900
+# Lock живе довше за time_limit - інакше другий запуск міг би стартувати поверх першого
+HOUSEKEEPING_LOCK_SECONDS = HOUSEKEEPING_TIME_LIMIT + 60
+
+
+def _run(job: str, runner, **kwargs) -> dict:
+    def run():
+        db = SessionLocal()
+        try:
+            return runner(db, **kwargs)
+        finally:
+            db.close()
+
+    return asdict(housekeeping.run_exclusive(job, run, HOUSEKEEPING_LOCK_SECONDS))
+
+
+@celery_app.task(name="archive_old_conversations_task", time_limit=HOUSEKEEPING_TIME_LIMIT, soft_time_limit=HOUSEKEEPING_TIME_LIMIT - 50)
+def archive_old_conversations_task(older_than_days: int = housekeeping.ARCHIVE_AFTER_DAYS):
+    """Архівувати розмови без повідомлень довше older_than_days днів."""
+    return _run(housekeeping.JOB_ARCHIVE_CONVERSATIONS, housekeeping.archive_conversations, older_than_days=older_than_days)
+
+
+@celery_app.task(name="delete_expired_notifications_task", time_limit=HOUSEKEEPING_TIME_LIMIT, soft_time_limit=HOUSEKEEPING_TIME_LIMIT - 50)
+def delete_expired_notifications_task():
+    """Видалити прострочені нотифікації."""
+    return _run(housekeeping.JOB_DELETE_EXPIRED_NOTIFICATIONS, housekeeping.delete_expired_notifications)
+
+
+@celery_app.task(name="expire_cashback_task", time_limit=HOUSEKEEPING_TIME_LIMIT, soft_time_limit=HOUSEKEEPING_TIME_LIMIT - 50)
+def expire_cashback_task(dry_run: bool = False):
+    """
+    Згоряння кешбеку за минулий рік - set-based запуск loyalty_engine.
+    run_id "year-end-{рік}": повторні запуски першого тижня січня нічого не змінюють.
+    """
+    import loyalty_engine
+
+    db = SessionLocal()
+    try:
+        return asdict(loyalty_engine.run(db, loyalty_engine.RUN_YEAR_END, dry_run=dry_run))
+    finally:
+        db.close()
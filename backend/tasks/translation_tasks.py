@@ -0,0 +1,95 @@
+"""
+Translation Tasks - відправка пропозицій перекладу перекладачам.
+
+Кожна пропозиція - окрема задача, тож broadcast на N перекладачів
+відправляється воркерами паралельно. Email іде через SMTP тут же,
+Telegram / WhatsApp - через send_message_task у розмову з перекладачем.
+"""
+import asyncio
+import logging
+
+from tasks.celery_app import celery_app
+from core.database import SessionLocal
+from modules.communications.models import PlatformEnum
+from modules.crm.models import TranslationRequest, TranslationRequestStatus
+from modules.crm.services import translation_offers
+
+logger = logging.getLogger(__name__)
+
+
+def _conversation_id(db, channel: str, external_id: str) -> str:
+    if channel == translation_offers.CHANNEL_TELEGRAM:
+        from modules.communications.services.telegram import TelegramService
+        service = TelegramService(db)
+    else:
+        from modules.communications.services.whatsapp import WhatsAppService
+        service = WhatsAppService(db)
+    conversation = asyncio.run(service.get_or_create_conversation(external_id))
+    return str(conversation.id)
+
+
+@celery_app.task(name="send_translation_offer_task", max_retries=3, bind=True)
+def send_translation_offer_task(self, request_id: int, withdrawal: bool = False):
+    """
+    Надіслати перекладачу пропозицію (або повідомлення про відкликання)
+    усіма каналами запиту.
+
+    Args:
+        request_id: ID translation_requests
+        withdrawal: True - пропозицію відкликано (broadcast прийняв інший)
+    """
+    db = SessionLocal()
+    try:
+        request = db.get(TranslationRequest, request_id)
+        if request is None:
+            return {"status": "not_found", "request_id": request_id}
+        expected = TranslationRequestStatus.WITHDRAWN if withdrawal else TranslationRequestStatus.PENDING
+        if request.status != expected:
+            # Пропозицію вже прийнято / відкликано, поки задача чекала в черзі
+            return {"status": "skipped", "request_id": request_id, "request_status": request.status}
+
+        order, translator = request.order, request.translator
+        if withdrawal:
+            text = translation_offers.withdrawal_text(order, translator.name)
+        else:
+            text = translation_offers.offer_text(order, translator.name, request.offered_rate, request.notes)
+
+        sent, failed = [], []
+        for channel in translation_offers.request_channels(request):
+            address = translation_offers.translator_address(translator, channel)
+            if not address:
+                continue
+            try:
+                if channel == translation_offers.CHANNEL_EMAIL:
+                    if withdrawal:
+                        from email_service import send_translation_withdrawal_email
+                        send_translation_withdrawal_email(address, order.order_number, text)
+                    else:
+                        from email_service import send_translation_request_email
+                        send_translation_request_email(
+                            to_email=address,
+                            translator_name=translator.name,
+                            order_number=order.order_number,
+                            offered_rate=request.offered_rate,
+                            notes=request.notes,
+                            deadline=translation_offers.format_deadline(order),
+                        )
+                else:
+                    celery_app.send_task(
+                        "send_message_task",
+                        kwargs={
+                            "conversation_id": _conversation_id(db, channel, address),
+                            "platform": PlatformEnum(channel).value,
+                            "content": text,
+                        },
+                    )
+                sent.append(channel)
+            except Exception as e:
+                logger.error(f"Failed to send translation offer {request_id} via {channel}: {e}", exc_info=True)
+                failed.append(channel)
+
+        if failed and not sent:
+            raise self.retry(countdown=2 ** self.request.retries * 10)
+        return {"status": "sent", "request_id": request_id, "channels": sent, "failed": failed}
+    finally:
+        db.close()
@@ -0,0 +1,31 @@
+-- Migration: Legacy part of client spend aggregates
+-- Date: 2026-10-19
+-- Description: total_orders / lifetime_spent / current_year_spent = legacy частина + нарахування
+-- по КП (loyalty_engine recalculate). Legacy частина - все, що не покрито транзакціями "earned"
+-- на момент міграції (дані до loyalty engine, імпорт, ручні правки).
+
+ALTER TABLE clients ADD COLUMN IF NOT EXISTS legacy_orders INTEGER DEFAULT 0;
+ALTER TABLE clients ADD COLUMN IF NOT EXISTS legacy_spent NUMERIC(10, 2) DEFAULT 0;
+ALTER TABLE clients ADD COLUMN IF NOT EXISTS legacy_year_spent NUMERIC(10, 2) DEFAULT 0;
+
+WITH earned AS (
+    SELECT
+        ct.client_id,
+        COUNT(*) AS orders,
+        COALESCE(SUM(COALESCE(k.total_amount, 0)), 0) AS lifetime,
+        COALESCE(SUM(COALESCE(k.total_amount, 0)) FILTER (
+            WHERE ct.created_at >= date_trunc('year', NOW())
+        ), 0) AS current_year
+    FROM cashback_transactions ct
+    JOIN kps k ON k.id = ct.kp_id
+    WHERE ct.transaction_type = 'earned'
+    GROUP BY ct.client_id
+)
+UPDATE clients c
+SET
+    legacy_orders = GREATEST(COALESCE(c.total_orders, 0) - COALESCE(e.orders, 0), 0),
+    legacy_spent = GREATEST(COALESCE(c.lifetime_spent, 0) - COALESCE(e.lifetime, 0), 0),
+    legacy_year_spent = GREATEST(COALESCE(c.current_year_spent, 0) - COALESCE(e.current_year, 0), 0)
+FROM clients src
+LEFT JOIN earned e ON e.client_id = src.id
+WHERE src.id = c.id;
@@ -0,0 +1,6 @@
+-- Migration: Keyset pagination index for GET /crm/orders
+-- Date: 2026-10-19
+-- Description: ORDER BY created_at DESC, id DESC із row-value курсором
+-- (created_at NOT NULL - зворотне сканування індексу, без Sort)
+
+CREATE INDEX IF NOT EXISTS idx_crm_orders_created_at_id ON crm_orders (created_at, id);
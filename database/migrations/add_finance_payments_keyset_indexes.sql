@@ -0,0 +1,12 @@
+-- Індекси для keyset пагінації GET /finance/payments
+-- ORDER BY <sort_col> DESC, id DESC + WHERE (sort_col, id) < (:v, :id)
+-- Колонки NOT NULL: DESC читається зворотним скануванням індексу (ASC - прямим)
+
+CREATE INDEX IF NOT EXISTS idx_fin_tx_payment_date_id
+ON finance_transactions(payment_date, id);
+
+CREATE INDEX IF NOT EXISTS idx_fin_tx_service_date_id
+ON finance_transactions(service_date, id);
+
+CREATE INDEX IF NOT EXISTS idx_fin_tx_created_at_id
+ON finance_transactions(created_at, id);
@@ -0,0 +1,22 @@
+-- Migration: Keyset pagination indexes for legacy listings
+-- Date: 2026-10-19
+-- Description: GET /clients, /questionnaires, /checklists (crud._listing_page) і GET /kp
+-- сортують ORDER BY created_at DESC NULLS LAST, id DESC (created_at nullable) і гортають
+-- сторінки курсором. Порядок індексу збігається з сортуванням - сторінка читається
+-- з індексу без Sort. Індекси (created_at, id) з попередньої версії міграції
+-- перестворюються.
+
+DROP INDEX IF EXISTS ix_clients_created_at_id;
+CREATE INDEX ix_clients_created_at_id
+    ON clients (created_at DESC NULLS LAST, id DESC);
+
+DROP INDEX IF EXISTS ix_client_questionnaires_created_at_id;
+CREATE INDEX ix_client_questionnaires_created_at_id
+    ON client_questionnaires (created_at DESC NULLS LAST, id DESC);
+
+DROP INDEX IF EXISTS ix_checklists_created_at_id;
+CREATE INDEX ix_checklists_created_at_id
+    ON checklists (created_at DESC NULLS LAST, id DESC);
+
+CREATE INDEX IF NOT EXISTS ix_kps_created_at_id
+    ON kps (created_at DESC NULLS LAST, id DESC);
@@ -0,0 +1,9 @@
+-- ============================================
+-- Міграція: Додавання поля reply_cache_faq до таблиці ai_settings
+-- Дата: 2026-10-19
+-- Опис: FAQ питання, відповіді RAG на які кешуються (reply_cache) навіть
+--       без metadata.cacheable від RAG
+-- ============================================
+
+ALTER TABLE ai_settings
+ADD COLUMN IF NOT EXISTS reply_cache_faq JSONB NOT NULL DEFAULT '[]'::jsonb;
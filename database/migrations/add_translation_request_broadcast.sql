@@ -0,0 +1,9 @@
+-- Migration: Broadcast translation requests
+-- Date: 2026-10-19
+-- Description: offers of one broadcast share broadcast_id; the first accepted
+-- offer wins, the remaining pending ones become 'withdrawn'
+
+ALTER TABLE translation_requests ADD COLUMN IF NOT EXISTS broadcast_id UUID;
+
+CREATE INDEX IF NOT EXISTS ix_translation_requests_broadcast_id
+    ON translation_requests (broadcast_id);
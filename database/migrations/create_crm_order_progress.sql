@@ -0,0 +1,53 @@
+-- Migration: Create crm_order_progress table
+-- Date: 2026-10-19
+-- Description: Кешований прогрес Timeline замовлення (modules/crm/services/timeline.py).
+-- steps_mask - біт i означає завершений етап i (порядок TIMELINE_STEP_ORDER),
+-- completed_steps/current_stage - завершений префікс етапів для канбану.
+
+CREATE TABLE IF NOT EXISTS crm_order_progress (
+    order_id UUID PRIMARY KEY REFERENCES crm_orders(id) ON DELETE CASCADE,
+    steps_mask INTEGER NOT NULL DEFAULT 0,
+    completed_steps INTEGER NOT NULL DEFAULT 0,
+    current_stage VARCHAR,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Backfill з існуючих етапів
+INSERT INTO crm_order_progress (order_id, steps_mask)
+SELECT order_id,
+       bit_or(CASE step_type
+           WHEN 'client_created' THEN 1
+           WHEN 'order_created' THEN 2
+           WHEN 'payment_link_sent' THEN 4
+           WHEN 'payment_received' THEN 8
+           WHEN 'translator_assigned' THEN 16
+           WHEN 'translation_ready' THEN 32
+           WHEN 'issued_sent' THEN 64
+           ELSE 0
+       END)
+FROM timeline_steps
+WHERE completed = TRUE
+GROUP BY order_id
+ON CONFLICT (order_id) DO NOTHING;
+
+UPDATE crm_order_progress
+SET completed_steps = CASE
+        WHEN steps_mask & 127 = 127 THEN 7
+        WHEN steps_mask & 63 = 63 THEN 6
+        WHEN steps_mask & 31 = 31 THEN 5
+        WHEN steps_mask & 15 = 15 THEN 4
+        WHEN steps_mask & 7 = 7 THEN 3
+        WHEN steps_mask & 3 = 3 THEN 2
+        WHEN steps_mask & 1 = 1 THEN 1
+        ELSE 0
+    END,
+    current_stage = CASE
+        WHEN steps_mask & 127 = 127 THEN 'issued_sent'
+        WHEN steps_mask & 63 = 63 THEN 'translation_ready'
+        WHEN steps_mask & 31 = 31 THEN 'translator_assigned'
+        WHEN steps_mask & 15 = 15 THEN 'payment_received'
+        WHEN steps_mask & 7 = 7 THEN 'payment_link_sent'
+        WHEN steps_mask & 3 = 3 THEN 'order_created'
+        WHEN steps_mask & 1 = 1 THEN 'client_created'
+        ELSE NULL
+    END;
@@ -0,0 +1,27 @@
+-- Migration: Create finance_daily_rollups table
+-- Date: 2026-10-19
+-- Description: Daily aggregates of finance transactions, payment transactions and orders
+-- per office / manager / provider / status. Rebuilt by modules/finance/rollups.py.
+
+CREATE TABLE IF NOT EXISTS finance_daily_rollups (
+    day DATE NOT NULL,
+    source VARCHAR(20) NOT NULL,
+    office_id INTEGER NOT NULL DEFAULT 0,
+    manager_id UUID NOT NULL,
+    provider VARCHAR(50) NOT NULL DEFAULT '',
+    status VARCHAR(50) NOT NULL DEFAULT '',
+    
+    tx_count INTEGER NOT NULL DEFAULT 0,
+    order_count INTEGER NOT NULL DEFAULT 0,
+    amount NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    fees NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    net_amount NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    
+    refreshed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    
+    PRIMARY KEY (day, source, office_id, manager_id, provider, status)
+);
+
+CREATE INDEX IF NOT EXISTS idx_fin_rollup_source_day ON finance_daily_rollups (source, day);
+
+-- Початкове заповнення: python -m modules.finance.rollups --since 2024-01-01
@@ -0,0 +1,17 @@
+-- Migration: Create loyalty_runs table
+-- Date: 2026-10-19
+-- Description: Applied loyalty engine runs (loyalty_engine.py). run_id makes year-end expiry
+-- and aggregate recalculation idempotent; report keeps the run summary.
+
+CREATE TABLE IF NOT EXISTS loyalty_runs (
+    run_id VARCHAR(100) PRIMARY KEY,
+    kind VARCHAR(30) NOT NULL,
+    report JSON,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Агрегати по нарахуваннях: cashback_transactions (kp_id, transaction_type)
+CREATE INDEX IF NOT EXISTS ix_cashback_transactions_kp_id_type
+    ON cashback_transactions (kp_id, transaction_type);
+CREATE INDEX IF NOT EXISTS ix_cashback_transactions_client_id
+    ON cashback_transactions (client_id);
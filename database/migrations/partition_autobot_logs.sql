@@ -0,0 +1,101 @@
+-- Migration: Partition autobot_logs by month, add autobot_daily_stats
+-- Date: 2026-10-19
+-- Description: autobot_logs becomes a RANGE (created_at) partitioned table with
+-- monthly partitions (autobot_logs_YYYYMM). Existing rows are copied into the new
+-- partitions. autobot_daily_stats holds per-day counters used by GET /autobot/stats.
+-- Future partitions are created and expired ones dropped by modules/autobot/log_stats.py.
+
+BEGIN;
+
+DO $$
+DECLARE
+    idx RECORD;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_class WHERE relname = 'autobot_logs' AND relkind = 'r') THEN
+        ALTER TABLE autobot_logs RENAME TO autobot_logs_legacy;
+        IF EXISTS (SELECT 1 FROM pg_class WHERE relname = 'autobot_logs_id_seq' AND relkind = 'S') THEN
+            ALTER SEQUENCE autobot_logs_id_seq RENAME TO autobot_logs_legacy_id_seq;
+        END IF;
+        -- Звільняємо назви індексів для нової таблиці
+        FOR idx IN SELECT indexname FROM pg_indexes WHERE tablename = 'autobot_logs_legacy' LOOP
+            EXECUTE format('ALTER INDEX %I RENAME TO %I', idx.indexname, left(idx.indexname, 55) || '_legacy');
+        END LOOP;
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS autobot_logs (
+    id SERIAL,
+    settings_id INTEGER NOT NULL REFERENCES autobot_settings(id) ON DELETE CASCADE,
+    office_id INTEGER NOT NULL REFERENCES offices(id) ON DELETE CASCADE,
+    message_id VARCHAR(255),
+    client_id UUID REFERENCES crm_clients(id) ON DELETE SET NULL,
+    order_id UUID REFERENCES crm_orders(id) ON DELETE SET NULL,
+    action_taken VARCHAR(100) NOT NULL,
+    success BOOLEAN NOT NULL DEFAULT TRUE,
+    error_message TEXT,
+    meta_data JSONB,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Партиції від найстаршого логу до поточного місяця + 2 наперед (межі в UTC)
+DO $$
+DECLARE
+    month_start TIMESTAMP;
+    last_month TIMESTAMP := date_trunc('month', now() AT TIME ZONE 'UTC') + interval '2 months';
+BEGIN
+    month_start := date_trunc('month', now() AT TIME ZONE 'UTC');
+    IF EXISTS (SELECT 1 FROM pg_class WHERE relname = 'autobot_logs_legacy') THEN
+        SELECT LEAST(month_start, COALESCE(date_trunc('month', min(created_at) AT TIME ZONE 'UTC'), month_start))
+        INTO month_start FROM autobot_logs_legacy;
+    END IF;
+    WHILE month_start <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF autobot_logs FOR VALUES FROM (%L) TO (%L)',
+            'autobot_logs_' || to_char(month_start, 'YYYYMM'),
+            month_start::text || '+00',
+            (month_start + interval '1 month')::text || '+00'
+        );
+        month_start := month_start + interval '1 month';
+    END LOOP;
+END $$;
+
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_class WHERE relname = 'autobot_logs_legacy') THEN
+        INSERT INTO autobot_logs (id, settings_id, office_id, message_id, client_id, order_id,
+                                  action_taken, success, error_message, meta_data, created_at)
+        SELECT id, settings_id, office_id, message_id, client_id, order_id,
+               action_taken, success, error_message, meta_data::jsonb, created_at
+        FROM autobot_logs_legacy;
+        PERFORM setval('autobot_logs_id_seq', COALESCE((SELECT max(id) FROM autobot_logs), 0) + 1, false);
+        DROP TABLE autobot_logs_legacy;
+    END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_autobot_logs_settings_id ON autobot_logs (settings_id);
+CREATE INDEX IF NOT EXISTS idx_autobot_logs_office_id ON autobot_logs (office_id);
+CREATE INDEX IF NOT EXISTS idx_autobot_logs_message_id ON autobot_logs (message_id);
+CREATE INDEX IF NOT EXISTS idx_autobot_logs_client_id ON autobot_logs (client_id);
+CREATE INDEX IF NOT EXISTS idx_autobot_logs_order_id ON autobot_logs (order_id);
+CREATE INDEX IF NOT EXISTS idx_autobot_logs_action_taken ON autobot_logs (action_taken);
+CREATE INDEX IF NOT EXISTS idx_autobot_logs_created_at ON autobot_logs (created_at);
+
+CREATE TABLE IF NOT EXISTS autobot_daily_stats (
+    day DATE NOT NULL,
+    office_id INTEGER NOT NULL,
+    action_taken VARCHAR(100) NOT NULL,
+    success BOOLEAN NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, office_id, action_taken, success)
+);
+
+-- Початкове заповнення агрегатів з усіх наявних логів (тільки при першому запуску)
+INSERT INTO autobot_daily_stats (day, office_id, action_taken, success, count)
+SELECT (created_at AT TIME ZONE 'Europe/Warsaw')::date, office_id, action_taken, success, count(*)
+FROM autobot_logs
+WHERE NOT EXISTS (SELECT 1 FROM autobot_daily_stats)
+GROUP BY 1, 2, 3, 4
+ON CONFLICT (day, office_id, action_taken, success) DO NOTHING;
+
+COMMIT;
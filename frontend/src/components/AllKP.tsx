@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useMemo, useState } from "react";
 import { Search, FileText, Calendar, User, ChevronDown, Eye, Download, Trash2, Edit } from "lucide-react";
 import { Button } from "./ui/button";
 import { Input } from "./ui/input";
@@ -25,7 +25,8 @@ import {
   kpApi,
   templatesApi,
   usersApi,
-  type KP,
+  type KPListQuery,
+  type KPSummary,
   type Template,
   type User as ApiUser,
 } from "../lib/api";
@@ -94,6 +95,45 @@ function getStatusColor(status: KPStatus): string {
   }
 }
 
+// Сторінка списку; наступні - кнопкою "Завантажити ще" (next_cursor)
+const KP_PAGE_SIZE = 100;
+
+function toListItem(
+  kp: KPSummary,
+  templateMap: Map<number, string>,
+  userMap: Map<string, ApiUser>,
+): KPListItem {
+  const status = ((kp.status as KPStatus) || "sent") as KPStatus;
+  const createdByUser =
+    (kp.created_by_id && userMap.get(kp.created_by_id)) || undefined;
+
+  return {
+    id: kp.id,
+    number: `KP-${kp.id.toString().padStart(4, "0")}`,
+    clientName: kp.title,
+    createdDate: kp.created_at
+      ? new Date(kp.created_at).toISOString().split("T")[0]
+      : "",
+    eventDate: kp.event_date
+      ? new Date(kp.event_date).toISOString().split("T")[0]
+      : undefined,
+    status,
+    statusLabel: getStatusLabel(status),
+    totalAmount: kp.total_price || 0,
+    dishCount: kp.item_count,
+    guestCount: kp.people_count,
+    template: kp.template_id
+      ? templateMap.get(kp.template_id) || "Шаблон"
+      : "Шаблон",
+    templateId: kp.template_id,
+    createdBy: createdByUser
+      ? `${createdByUser.first_name || ""} ${
+          createdByUser.last_name || ""
+        }`.trim() || createdByUser.email
+      : undefined,
+  };
+}
+
 interface AllKPProps {
   onEditKP?: (kpId: number) => void;
 }
@@ -101,87 +141,92 @@ interface AllKPProps {
 export function AllKP({ onEditKP }: AllKPProps = {}) {
   const [searchQuery, setSearchQuery] = useState("");
   const [selectedStatus, setSelectedStatus] = useState<string>("all");
-  const [kpItems, setKpItems] = useState<KPListItem[]>([]);
+  const [kps, setKps] = useState<KPSummary[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [updatingStatusId, setUpdatingStatusId] = useState<number | null>(null);
   const [deletingId, setDeletingId] = useState<number | null>(null);
+  const [templates, setTemplates] = useState<Template[]>([]);
   const [users, setUsers] = useState<ApiUser[]>([]);
   const [selectedManager, setSelectedManager] = useState<string>("all");
 
   useEffect(() => {
-    const loadData = async () => {
+    const loadLookups = async () => {
       try {
-        const [kps, templates, usersData] = await Promise.all([
-          kpApi.getKPs(),
+        const [templatesData, usersData] = await Promise.all([
           templatesApi.getTemplates(),
           usersApi.getUsers().catch(() => [] as ApiUser[]),
         ]);
-
-        const templateMap = new Map<number, string>();
-        templates.forEach((t) => templateMap.set(t.id, t.name));
-
-        const userMap = new Map<string, ApiUser>();
-        usersData.forEach((u) => userMap.set(u.id, u));
-
-        const mapped: KPListItem[] = kps.map((kp) => {
-          const status = ((kp.status as KPStatus) || "sent") as KPStatus;
-          const createdByUser =
-            (kp.created_by_id && userMap.get(kp.created_by_id)) || undefined;
-
-          return {
-            id: kp.id,
-            number: `KP-${kp.id.toString().padStart(4, "0")}`,
-            clientName: kp.title,
-            createdDate: kp.created_at
-              ? new Date(kp.created_at).toISOString().split("T")[0]
-              : "",
-            eventDate: kp.event_date
-              ? new Date(kp.event_date).toISOString().split("T")[0]
-              : undefined,
-            status,
-            statusLabel: getStatusLabel(status),
-            totalAmount: kp.total_price || 0,
-            dishCount: kp.items?.length || 0,
-            guestCount: kp.people_count,
-            template: kp.template_id
-              ? templateMap.get(kp.template_id) || "Шаблон"
-              : "Шаблон",
-            templateId: kp.template_id,
-            createdBy: createdByUser
-              ? `${createdByUser.first_name || ""} ${
-                  createdByUser.last_name || ""
-                }`.trim() || createdByUser.email
-              : undefined,
-          };
-        });
-
-        setKpItems(mapped);
+        setTemplates(templatesData);
         setUsers(usersData);
+      } catch (error: any) {
+        console.error("Error loading templates:", error);
+      }
+    };
+
+    loadLookups();
+  }, []);
+
+  // Статус фільтрується на сервері; пошук і менеджер - по завантажених сторінках
+  const listQuery = (): KPListQuery => ({
+    status: selectedStatus === "all" ? undefined : [selectedStatus],
+    limit: KP_PAGE_SIZE,
+  });
+
+  useEffect(() => {
+    let cancelled = false;
+    const loadFirstPage = async () => {
+      try {
+        const page = await kpApi.listKPs(listQuery());
+        if (cancelled) return;
+        setKps(page.items);
+        setNextCursor(page.next_cursor);
       } catch (error: any) {
         console.error("Error loading KPs:", error);
         toast.error("Помилка завантаження КП");
       }
     };
 
-    loadData();
-  }, []);
+    loadFirstPage();
+    return () => {
+      cancelled = true;
+    };
+  }, [selectedStatus]);
+
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const page = await kpApi.listKPs({ ...listQuery(), cursor: nextCursor });
+      setKps((prev) => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error: any) {
+      console.error("Error loading more KPs:", error);
+      toast.error("Помилка завантаження КП");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const kpItems = useMemo(() => {
+    const templateMap = new Map<number, string>();
+    templates.forEach((t) => templateMap.set(t.id, t.name));
+
+    const userMap = new Map<string, ApiUser>();
+    users.forEach((u) => userMap.set(u.id, u));
+
+    return kps.map((kp) => toListItem(kp, templateMap, userMap));
+  }, [kps, templates, users]);
 
   const handleStatusChange = async (item: KPListItem, newStatus: KPStatus) => {
     if (item.status === newStatus) return;
 
-    const previous = [...kpItems];
+    const previous = [...kps];
     setUpdatingStatusId(item.id);
 
     // Оптимістичне оновлення UI
-    setKpItems((items) =>
-      items.map((kp) =>
-        kp.id === item.id
-          ? {
-              ...kp,
-              status: newStatus,
-              statusLabel: getStatusLabel(newStatus),
-            }
-          : kp
-      )
+    setKps((items) =>
+      items.map((kp) => (kp.id === item.id ? { ...kp, status: newStatus } : kp))
     );
 
     try {
@@ -190,7 +235,7 @@ export function AllKP({ onEditKP }: AllKPProps = {}) {
     } catch (error: any) {
       console.error("Error updating KP status:", error);
       toast.error("Не вдалося оновити статус КП");
-      setKpItems(previous);
+      setKps(previous);
     } finally {
       setUpdatingStatusId(null);
     }
@@ -229,10 +274,10 @@ export function AllKP({ onEditKP }: AllKPProps = {}) {
       return;
     }
 
-    const previous = [...kpItems];
+    const previous = [...kps];
     setDeletingId(item.id);
     // Оптимістично прибираємо з таблиці
-    setKpItems((items) => items.filter((kp) => kp.id !== item.id));
+    setKps((items) => items.filter((kp) => kp.id !== item.id));
 
     try {
       await kpApi.deleteKP(item.id);
@@ -240,7 +285,7 @@ export function AllKP({ onEditKP }: AllKPProps = {}) {
     } catch (error: any) {
       console.error("Помилка видалення КП:", error);
       toast.error(error?.data?.detail || "Не вдалося видалити КП");
-      setKpItems(previous);
+      setKps(previous);
     } finally {
       setDeletingId(null);
     }
@@ -564,8 +609,15 @@ export function AllKP({ onEditKP }: AllKPProps = {}) {
               </Table>
             </div>
 
-            <div className="text-sm text-gray-600">
-              Показано {filteredItems.length} з {kpItems.length} КП
+            <div className="flex items-center justify-between gap-4">
+              <div className="text-sm text-gray-600">
+                Показано {filteredItems.length} з {kpItems.length} завантажених КП
+              </div>
+              {nextCursor && (
+                <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+                  {loadingMore ? "Завантаження..." : "Завантажити ще"}
+                </Button>
+              )}
             </div>
           </div>
         </CardContent>
@@ -17,9 +17,7 @@ import { ImageWithFallback } from "./figma/ImageWithFallback";
 import { toast } from "sonner";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "./ui/tabs";
 import {
-  itemsApi,
-  categoriesApi,
-  subcategoriesApi,
+  catalogApi,
   kpApi,
   templatesApi,
   menusApi,
@@ -37,7 +35,7 @@ import {
   type Benefit,
   type ClientQuestionnaire,
   type Checklist,
-  type KP,
+  type KPSummary,
 } from "../lib/api";
 import { InfoTooltip } from "./InfoTooltip";
 import { Info } from "lucide-react";
@@ -377,7 +375,7 @@ export function CreateKP({ kpId, onClose }: CreateKPProps = {}) {
   const [clientAutofillSource, setClientAutofillSource] = useState<{ type: 'client' | 'checklist'; date?: string } | null>(null);
   
   // Стани для копіювання з існуючого КП
-  const [allKPs, setAllKPs] = useState<KP[]>([]);
+  const [allKPs, setAllKPs] = useState<KPSummary[]>([]);
   const [selectedKPToCopy, setSelectedKPToCopy] = useState<number | null>(null);
   const [loadingKPs, setLoadingKPs] = useState(false);
   const [copySuccessMessage, setCopySuccessMessage] = useState<string | null>(null);
@@ -917,14 +915,10 @@ export function CreateKP({ kpId, onClose }: CreateKPProps = {}) {
     const loadDishes = async () => {
       setLoading(true);
       try {
-        const [itemsData, categoriesData, subcategoriesData] = await Promise.all([
-          itemsApi.getItems(0, 1000),
-          categoriesApi.getCategories(),
-          subcategoriesApi.getSubcategories(),
-        ]);
+        const catalog = await catalogApi.getCatalog();
         
         // Filter only active dishes and map to our Dish interface
-        const activeDishes: Dish[] = itemsData
+        const activeDishes: Dish[] = catalog.items
           .filter(item => item.active)
           .map(item => ({
             id: item.id,
@@ -932,17 +926,16 @@ export function CreateKP({ kpId, onClose }: CreateKPProps = {}) {
             description: item.description || "",
             weight: item.weight || 0,
             unit: item.unit || "",
-            price: item.price,
+            price: item.price ?? 0,
             photo_url: item.photo_url || "",
-            icon_name: item.icon_name,
-            can_cook_on_location: item.can_cook_on_location || false,
-            category: item.subcategory?.category?.name || "Інше",
-            subcategory: item.subcategory?.name || "",
+            can_cook_on_location: false,
+            category: item.category_name || "Інше",
+            subcategory: item.subcategory_name || "",
           }));
         
         setDishes(activeDishes);
-        setCategories(categoriesData);
-        setSubcategories(subcategoriesData);
+        setCategories(catalog.categories);
+        setSubcategories(catalog.subcategories);
         toast.success("Страви завантажено");
       } catch (error: any) {
         toast.error("Помилка завантаження страв");
@@ -1101,8 +1094,9 @@ export function CreateKP({ kpId, onClose }: CreateKPProps = {}) {
       const loadKPs = async () => {
         setLoadingKPs(true);
         try {
-          const kpsData = await kpApi.getKPs();
-          setAllKPs(kpsData);
+          // Останні КП - для копіювання достатньо однієї сторінки
+          const kpsData = await kpApi.listKPs({ limit: 100 });
+          setAllKPs(kpsData.items);
         } catch (error: any) {
           console.error("Помилка завантаження КП:", error);
           toast.error("Не вдалося завантажити список КП");
@@ -10,7 +10,7 @@ import {
   DialogHeader,
   DialogTitle,
 } from "./ui/dialog";
-import { clientsApi, kpApi, type Client, type KP } from "../lib/api";
+import { clientsApi, kpApi, type Client, type KPSummary } from "../lib/api";
 import { toast } from "sonner";
 
 interface Event {
@@ -24,9 +24,12 @@ interface Event {
   clientName?: string;
   format?: string;
   status?: string;
-  data: Client | KP;
+  data: Client | KPSummary;
 }
 
+const toISODate = (date: Date) =>
+  `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, "0")}-${String(date.getDate()).padStart(2, "0")}`;
+
 export function EventsCalendar() {
   const [currentDate, setCurrentDate] = useState(new Date());
   const [events, setEvents] = useState<Event[]>([]);
@@ -37,17 +40,23 @@ export function EventsCalendar() {
   const year = currentDate.getFullYear();
   const month = currentDate.getMonth();
 
+  // КП - тільки з датою заходу в показаному місяці
   useEffect(() => {
     loadEvents();
-  }, []);
+  }, [year, month]);
 
   const loadEvents = async () => {
     setLoading(true);
     try {
-      const [clientsData, kps] = await Promise.all([
+      const [clientsData, kpPage] = await Promise.all([
         clientsApi.getClients(),
-        kpApi.getKPs(),
+        kpApi.listKPs({
+          date_from: toISODate(new Date(year, month, 1)),
+          date_to: toISODate(new Date(year, month + 1, 0)),
+          limit: 500,
+        }),
       ]);
+      const kps = kpPage.items;
 
       const eventsList: Event[] = [];
       const clients = clientsData.clients || [];
@@ -529,19 +538,19 @@ export function EventsCalendar() {
                 <div className="pt-4 border-t">
                   <div className="text-sm text-gray-600 mb-2">Додаткова інформація</div>
                   <div className="space-y-1 text-sm">
-                    {(selectedEvent.data as KP).total_price && (
+                    {(selectedEvent.data as KPSummary).total_price && (
                       <div>
                         Сума КП:{" "}
                         <span className="font-medium">
-                          {(selectedEvent.data as KP).total_price} грн
+                          {(selectedEvent.data as KPSummary).total_price} грн
                         </span>
                       </div>
                     )}
-                    {(selectedEvent.data as KP).coordinator_name && (
+                    {(selectedEvent.data as KPSummary).coordinator_name && (
                       <div>
                         Координатор:{" "}
                         <span className="font-medium">
-                          {(selectedEvent.data as KP).coordinator_name}
+                          {(selectedEvent.data as KPSummary).coordinator_name}
                         </span>
                       </div>
                     )}
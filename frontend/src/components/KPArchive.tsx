@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useMemo } from "react";
 import {
   Search,
   Filter,
@@ -35,7 +35,7 @@ import {
   DropdownMenuTrigger,
 } from "./ui/dropdown-menu";
 import { toast } from "sonner";
-import { kpApi, templatesApi, type KP, type Template } from "../lib/api";
+import { kpApi, templatesApi, type KPListQuery, type KPSummary, type Template } from "../lib/api";
 
 interface KPArchiveItem {
   id: number;
@@ -54,53 +54,68 @@ interface KPArchiveItem {
   templateId?: number;
 }
 
+// Статуси, які показує архів (фільтр "Всі статуси")
+const ARCHIVE_STATUSES: KPArchiveItem["status"][] = ["sent", "approved", "rejected", "completed"];
+const KP_PAGE_SIZE = 100;
+
+function toArchiveItem(kp: KPSummary, templateMap: Map<number, string>): KPArchiveItem {
+  return {
+    id: kp.id,
+    number: `KP-${kp.id.toString().padStart(4, "0")}`,
+    clientName: kp.title,
+    createdDate: kp.created_at
+      ? new Date(kp.created_at).toISOString().split("T")[0]
+      : "",
+    status: (kp.status as KPArchiveItem["status"]) || "sent",
+    statusLabel:
+      kp.status === "completed"
+        ? "Виконано"
+        : kp.status === "approved"
+        ? "Затверджено"
+        : kp.status === "rejected"
+        ? "Відхилено"
+        : "Відправлено",
+    totalAmount: kp.total_price || 0,
+    dishCount: kp.item_count,
+    guestCount: kp.people_count,
+    template: kp.template_id
+      ? templateMap.get(kp.template_id) || "Шаблон"
+      : "Шаблон",
+    templateId: kp.template_id,
+  };
+}
+
 export function KPArchive() {
   const [searchQuery, setSearchQuery] = useState("");
   // В архіві показуємо лише виконані КП, але залишаємо фільтр за статусом на майбутнє
   const [selectedStatus, setSelectedStatus] = useState<string>("completed");
   const [selectedPeriod, setSelectedPeriod] = useState<string>("all");
-  const [archiveItems, setArchiveItems] = useState<KPArchiveItem[]>([]);
+  const [kps, setKps] = useState<KPSummary[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [templateMap, setTemplateMap] = useState<Map<number, string>>(new Map());
 
   useEffect(() => {
-    const loadArchive = async () => {
-      try {
-        const [kps, templates] = await Promise.all([
-          kpApi.getKPs(),
-          templatesApi.getTemplates(),
-        ]);
-
-        const templateMap = new Map<number, string>();
-        templates.forEach((t) => templateMap.set(t.id, t.name));
-
-        // Беремо лише КП зі статусом "completed"
-        const completedKps = kps.filter((kp) => kp.status === "completed");
+    templatesApi
+      .getTemplates()
+      .then((templates) => setTemplateMap(new Map(templates.map((t) => [t.id, t.name]))))
+      .catch((error) => console.error("Error loading templates:", error));
+  }, []);
 
-        const mapped: KPArchiveItem[] = completedKps.map((kp) => ({
-          id: kp.id,
-          number: `KP-${kp.id.toString().padStart(4, "0")}`,
-          clientName: kp.title,
-          createdDate: kp.created_at
-            ? new Date(kp.created_at).toISOString().split("T")[0]
-            : "",
-          status: (kp.status as KPArchiveItem["status"]) || "sent",
-          statusLabel:
-            kp.status === "completed"
-              ? "Виконано"
-              : kp.status === "approved"
-              ? "Затверджено"
-              : kp.status === "rejected"
-              ? "Відхилено"
-              : "Відправлено",
-          totalAmount: kp.total_price || 0,
-          dishCount: kp.items?.length || 0,
-          guestCount: kp.people_count,
-          template: kp.template_id
-            ? templateMap.get(kp.template_id) || "Шаблон"
-            : "Шаблон",
-          templateId: kp.template_id,
-        }));
+  // Статус фільтрується на сервері, пошук і період - по завантажених сторінках
+  const listQuery = (): KPListQuery => ({
+    status: selectedStatus === "all" ? ARCHIVE_STATUSES : [selectedStatus],
+    limit: KP_PAGE_SIZE,
+  });
 
-        setArchiveItems(mapped);
+  useEffect(() => {
+    let cancelled = false;
+    const loadArchive = async () => {
+      try {
+        const page = await kpApi.listKPs(listQuery());
+        if (cancelled) return;
+        setKps(page.items);
+        setNextCursor(page.next_cursor);
       } catch (error: any) {
         console.error("Error loading KP archive:", error);
         toast.error("Помилка завантаження архіву КП");
@@ -108,7 +123,30 @@ export function KPArchive() {
     };
 
     loadArchive();
-  }, []);
+    return () => {
+      cancelled = true;
+    };
+  }, [selectedStatus]);
+
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const page = await kpApi.listKPs({ ...listQuery(), cursor: nextCursor });
+      setKps((prev) => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error: any) {
+      console.error("Error loading KP archive:", error);
+      toast.error("Помилка завантаження архіву КП");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  const archiveItems = useMemo(
+    () => kps.map((kp) => toArchiveItem(kp, templateMap)),
+    [kps, templateMap],
+  );
 
   const getStatusColor = (status: string) => {
     switch (status) {
@@ -374,8 +412,15 @@ export function KPArchive() {
               </Table>
             </div>
 
-            <div className="text-sm text-gray-600">
-              Показано {filteredItems.length} з {archiveItems.length} КП
+            <div className="flex items-center justify-between gap-4">
+              <div className="text-sm text-gray-600">
+                Показано {filteredItems.length} з {archiveItems.length} завантажених КП
+              </div>
+              {nextCursor && (
+                <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+                  {loadingMore ? "Завантаження..." : "Завантажити ще"}
+                </Button>
+              )}
             </div>
           </div>
         </CardContent>
@@ -1,5 +1,5 @@
 import { useEffect, useMemo, useState } from "react";
-import { KP, kpApi, purchaseApi } from "../lib/api";
+import { kpApi, purchaseApi, type KPListQuery, type KPSummary } from "../lib/api";
 import { useDebounce } from "../hooks/useDebounce";
 import { Card, CardContent, CardHeader, CardTitle } from "./ui/card";
 import { Badge } from "./ui/badge";
@@ -20,8 +20,12 @@ import { toast } from "sonner";
 
 type KPStatusFilter = "all" | "in_progress" | "sent" | "approved" | "completed";
 
+const KP_PAGE_SIZE = 100;
+
 export function ProcurementExcel() {
-  const [kps, setKps] = useState<KP[]>([]);
+  const [kps, setKps] = useState<KPSummary[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(false);
   const [exporting, setExporting] = useState(false);
   const [selectedIds, setSelectedIds] = useState<number[]>([]);
@@ -32,22 +36,51 @@ export function ProcurementExcel() {
   const [search, setSearch] = useState<string>("");
   const debouncedSearch = useDebounce(search, 300);
 
+  // Статус і дати події фільтруються на сервері, пошук - по завантажених КП
+  const listQuery = (): KPListQuery => ({
+    status: statusFilter === "all" ? undefined : [statusFilter],
+    date_from: dateFrom || undefined,
+    date_to: dateTo || undefined,
+    limit: KP_PAGE_SIZE,
+  });
+
   useEffect(() => {
+    let cancelled = false;
     const loadKPs = async () => {
       setLoading(true);
       try {
-        const data = await kpApi.getKPs();
-        setKps(data);
+        const page = await kpApi.listKPs(listQuery());
+        if (cancelled) return;
+        setKps(page.items);
+        setNextCursor(page.next_cursor);
       } catch (e) {
         console.error(e);
         toast.error("Не вдалося завантажити КП для закупки");
       } finally {
-        setLoading(false);
+        if (!cancelled) setLoading(false);
       }
     };
 
     loadKPs();
-  }, []);
+    return () => {
+      cancelled = true;
+    };
+  }, [statusFilter, dateFrom, dateTo]);
+
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const page = await kpApi.listKPs({ ...listQuery(), cursor: nextCursor });
+      setKps((prev) => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (e) {
+      console.error(e);
+      toast.error("Не вдалося завантажити КП для закупки");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   const filteredKps = useMemo(() => {
     return kps.filter((kp) => {
@@ -404,10 +437,15 @@ export function ProcurementExcel() {
               </>
             )}
           </div>
+          {nextCursor && !loading && (
+            <div className="flex justify-center mt-4">
+              <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+                {loadingMore ? "Завантаження..." : "Завантажити ще"}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
     </div>
   );
 }
-
-
@@ -1,5 +1,5 @@
 import { useEffect, useMemo, useState } from "react";
-import { KP, kpApi, serviceApi } from "../lib/api";
+import { kpApi, serviceApi, type KPListQuery, type KPSummary } from "../lib/api";
 import { useDebounce } from "../hooks/useDebounce";
 import { Card, CardContent, CardHeader, CardTitle } from "./ui/card";
 import { Button } from "./ui/button";
@@ -19,8 +19,12 @@ import { toast } from "sonner";
 
 type KPStatusFilter = "all" | "in_progress" | "sent" | "approved" | "completed";
 
+const KP_PAGE_SIZE = 100;
+
 export function ServiceExcel() {
-  const [kps, setKps] = useState<KP[]>([]);
+  const [kps, setKps] = useState<KPSummary[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(false);
   const [exporting, setExporting] = useState(false);
   const [selectedIds, setSelectedIds] = useState<number[]>([]);
@@ -31,22 +35,51 @@ export function ServiceExcel() {
   const [search, setSearch] = useState<string>("");
   const debouncedSearch = useDebounce(search, 300);
 
+  // Статус і дати події фільтруються на сервері, пошук - по завантажених КП
+  const listQuery = (): KPListQuery => ({
+    status: statusFilter === "all" ? undefined : [statusFilter],
+    date_from: dateFrom || undefined,
+    date_to: dateTo || undefined,
+    limit: KP_PAGE_SIZE,
+  });
+
   useEffect(() => {
+    let cancelled = false;
     const loadKPs = async () => {
       setLoading(true);
       try {
-        const data = await kpApi.getKPs();
-        setKps(data);
+        const page = await kpApi.listKPs(listQuery());
+        if (cancelled) return;
+        setKps(page.items);
+        setNextCursor(page.next_cursor);
       } catch (e) {
         console.error(e);
         toast.error("Не вдалося завантажити КП для сервісу");
       } finally {
-        setLoading(false);
+        if (!cancelled) setLoading(false);
       }
     };
 
     loadKPs();
-  }, []);
+    return () => {
+      cancelled = true;
+    };
+  }, [statusFilter, dateFrom, dateTo]);
+
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const page = await kpApi.listKPs({ ...listQuery(), cursor: nextCursor });
+      setKps((prev) => [...prev, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (e) {
+      console.error(e);
+      toast.error("Не вдалося завантажити КП для сервісу");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   const filteredKps = useMemo(() => {
     return kps.filter((kp) => {
@@ -292,9 +325,15 @@ export function ServiceExcel() {
               </TableBody>
             </Table>
           </div>
+          {nextCursor && !loading && (
+            <div className="flex justify-center mt-4">
+              <Button variant="outline" onClick={loadMore} disabled={loadingMore}>
+                {loadingMore ? "Завантаження..." : "Завантажити ще"}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
     </div>
   );
 }
-
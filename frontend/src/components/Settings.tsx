@@ -5,6 +5,7 @@ import { Card, CardContent, CardHeader, CardTitle } from "./ui/card";
 import { Button } from "./ui/button";
 import { Label } from "./ui/label";
 import { Input } from "./ui/input";
+import { Textarea } from "./ui/textarea";
 import { Badge } from "./ui/badge";
 import { Checkbox } from "./ui/checkbox";
 import { Switch } from "./ui/switch";
@@ -29,6 +30,7 @@ import {
   type InPostConfig,
   type AISettings,
   type AISettingsUpdate,
+  type AIReplyCacheStats,
 } from "../lib/api";
 import { officesApi, type Office, type OfficeCreate } from "../modules/crm/api/offices";
 import { WhatsAppConnectDialog } from "./WhatsAppConnectDialog";
@@ -193,6 +195,8 @@ export function Settings() {
   const [aiSettings, setAiSettings] = useState<AISettings | null>(null);
   const [isLoadingAI, setIsLoadingAI] = useState(false);
   const [isSavingAI, setIsSavingAI] = useState(false);
+  const [aiCacheStats, setAiCacheStats] = useState<AIReplyCacheStats | null>(null);
+  const [isClearingAICache, setIsClearingAICache] = useState(false);
 
 
   // Danger zone state
@@ -373,6 +377,7 @@ export function Settings() {
             is_enabled: false,
             trigger_delay_seconds: 10,
             active_channels: [],
+            reply_cache_faq: [],
             webhook_secret: "",
             created_at: new Date().toISOString(),
             updated_at: new Date().toISOString(),
@@ -2697,6 +2702,7 @@ export function Settings() {
                             is_enabled: false,
                             trigger_delay_seconds: 10,
                             active_channels: [],
+                            reply_cache_faq: [],
                             webhook_secret: "",
                             created_at: new Date().toISOString(),
                             updated_at: new Date().toISOString(),
@@ -2725,6 +2731,7 @@ export function Settings() {
                             is_enabled: false,
                             trigger_delay_seconds: 10,
                             active_channels: [],
+                            reply_cache_faq: [],
                             webhook_secret: "",
                             created_at: new Date().toISOString(),
                             updated_at: new Date().toISOString(),
@@ -2753,6 +2760,7 @@ export function Settings() {
                             is_enabled: false,
                             trigger_delay_seconds: 10,
                             active_channels: [],
+                            reply_cache_faq: [],
                             webhook_secret: "",
                             created_at: new Date().toISOString(),
                             updated_at: new Date().toISOString(),
@@ -2847,6 +2855,77 @@ export function Settings() {
                     </div>
                   )}
 
+                  <div className="space-y-2">
+                    <Label>Кеш відповідей AI</Label>
+                    <div className="flex items-center gap-2 flex-wrap">
+                      {aiCacheStats ? (
+                        <>
+                          <Badge variant="outline">Точні: {aiCacheStats.hits_exact}</Badge>
+                          <Badge variant="outline">Схожі: {aiCacheStats.hits_similar}</Badge>
+                          <Badge variant="outline">Промахи: {aiCacheStats.misses}</Badge>
+                          <Badge variant="outline">Hit rate: {Math.round(aiCacheStats.hit_rate * 100)}%</Badge>
+                        </>
+                      ) : (
+                        <span className="text-sm text-gray-500">Статистика не завантажена</span>
+                      )}
+                    </div>
+                    <div className="flex items-center gap-2">
+                      <Button
+                        type="button"
+                        variant="outline"
+                        size="sm"
+                        onClick={async () => {
+                          try {
+                            setAiCacheStats(await settingsApi.getAIReplyCacheStats());
+                          } catch (error) {
+                            toast.error("Не вдалося отримати статистику кешу");
+                          }
+                        }}
+                      >
+                        Оновити статистику
+                      </Button>
+                      <Button
+                        type="button"
+                        variant="outline"
+                        size="sm"
+                        disabled={isClearingAICache}
+                        onClick={async () => {
+                          setIsClearingAICache(true);
+                          try {
+                            setAiCacheStats(await settingsApi.invalidateAIReplyCache());
+                            toast.success("Кеш відповідей AI очищено");
+                          } catch (error) {
+                            toast.error("Не вдалося очистити кеш відповідей AI");
+                          } finally {
+                            setIsClearingAICache(false);
+                          }
+                        }}
+                      >
+                        Очистити кеш
+                      </Button>
+                    </div>
+                    <p className="text-sm text-gray-500">
+                      Повторні питання клієнтів отримують відповідь з кешу без запиту до RAG. Очистіть кеш після оновлення бази знань.
+                    </p>
+                  </div>
+
+                  <div className="space-y-2">
+                    <Label htmlFor="reply-cache-faq">FAQ для кешу відповідей</Label>
+                    <Textarea
+                      id="reply-cache-faq"
+                      rows={5}
+                      value={(aiSettings?.reply_cache_faq || []).join("\n")}
+                      onChange={(e) => {
+                        if (aiSettings) {
+                          setAiSettings({ ...aiSettings, reply_cache_faq: e.target.value.split("\n") });
+                        }
+                      }}
+                    />
+                    <p className="text-sm text-gray-500">
+                      По одному питанню на рядок. Відповіді RAG на ці питання (і схожі формулювання) кешуються; решта - тільки якщо RAG позначив відповідь як загальну.
+                    </p>
+                  </div>
+
                   <div className="flex justify-end pt-4">
                     <Button
                       type="button"
@@ -2863,6 +2942,7 @@ export function Settings() {
                             is_enabled: aiSettings.is_enabled,
                             trigger_delay_seconds: aiSettings.trigger_delay_seconds,
                             active_channels: aiSettings.active_channels,
+                            reply_cache_faq: aiSettings.reply_cache_faq,
                           };
                           const updated = await settingsApi.updateAISettings(update);
                           setAiSettings(updated);
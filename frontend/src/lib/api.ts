@@ -591,6 +591,60 @@ export const itemsApi = {
   }
 };
 
+export interface ImportRowError {
+  row: number;
+  field: string;
+  error: string;
+}
+
+export interface MenuImportReport {
+  status: string;
+  created: number;
+  dry_run: boolean;
+  total_rows: number;
+  inserted: number;
+  updated: number;
+  unchanged: number;
+  deactivated: number;
+  found: number;
+  created_categories: number;
+  created_subcategories: number;
+  errors_count: number;
+  errors: ImportRowError[];
+}
+
+// Catalog API - увесь каталог одним запитом (ETag: повторні запити браузер ревалідує через 304)
+export interface CatalogItem {
+  id: number;
+  name: string;
+  description?: string | null;
+  price: number | null;
+  stock_quantity?: number | null;
+  loss_price?: number | null;
+  weight?: string | null;
+  volume?: string | null;
+  unit?: string | null;
+  photo_url?: string | null;
+  active: boolean;
+  subcategory_id: number | null;
+  subcategory_name: string | null;
+  category_id: number | null;
+  category_name: string | null;
+}
+
+export interface Catalog {
+  version: number;
+  items: CatalogItem[];
+  categories: Category[];
+  subcategories: Subcategory[];
+}
+
+export const catalogApi = {
+  async getCatalog(): Promise<Catalog> {
+    return apiFetch<Catalog>('/catalog');
+  },
+};
+
 // Categories API
 export const categoriesApi = {
   async getCategories(): Promise<Category[]> {
@@ -721,6 +775,8 @@ export interface KP {
   discount_include_menu?: boolean;
   discount_include_equipment?: boolean;
   discount_include_service?: boolean;
+  // Тільки в списку (GET /kp): кількість позицій без завантаження items
+  item_count?: number;
 }
 
 export interface PurchaseExportRequest {
@@ -785,10 +841,69 @@ export interface TelegramSendRequest {
   telegram_account_id?: number;
 }
 
+export interface KPSummary extends Omit<KP, 'items' | 'event_formats'> {
+  client_id?: number;
+  manager_name?: string | null;
+  menu_total?: number;
+  total_amount?: number;
+  final_amount?: number;
+  item_count: number;
+  items_quantity: number;
+  format_count: number;
+  // Тільки з include=items
+  items?: Pick<KPItem, 'item_id' | 'quantity' | 'event_format_id'>[];
+}
+
+export interface KPListPage {
+  items: KPSummary[];
+  next_cursor: string | null;
+  has_more: boolean;
+}
+
+// Агрегати КП для дашборда (GET /kp/stats) - по всіх КП, пораховані на сервері
+export interface KPStats {
+  total: number;
+  total_revenue: number;
+  by_status: Array<{ status: string | null; count: number; revenue: number }>;
+  top_clients: Array<{ client_id: number; client_name: string | null; revenue: number; kp_count: number }>;
+  managers: Array<{ manager_id: number; kp_count: number; revenue: number }>;
+  top_items: Array<{ item_id: number; quantity: number; revenue: number }>;
+}
+
+export interface KPListQuery {
+  status?: string[];
+  client_id?: number;
+  client?: string;
+  manager_id?: number;
+  date_from?: string;
+  date_to?: string;
+  limit?: number;
+  cursor?: string;
+  withItems?: boolean;
+}
+
 // KP API
 export const kpApi = {
-  async getKPs(): Promise<KP[]> {
-    return apiFetch<KP[]>('/kp');
+  /**
+   * Сторінка КП (summary), новіші першими. Наступна - з cursor: next_cursor.
+   * Повні позиції та формати - тільки через getKP(id).
+   */
+  async listKPs(params: KPListQuery = {}): Promise<KPListPage> {
+    const query = new URLSearchParams();
+    params.status?.forEach((status) => query.append('status', status));
+    if (params.client_id) query.append('client_id', String(params.client_id));
+    if (params.client) query.append('client', params.client);
+    if (params.manager_id) query.append('manager_id', String(params.manager_id));
+    if (params.date_from) query.append('date_from', params.date_from);
+    if (params.date_to) query.append('date_to', params.date_to);
+    if (params.limit) query.append('limit', String(params.limit));
+    if (params.cursor) query.append('cursor', params.cursor);
+    if (params.withItems) query.append('include', 'items');
+    return apiFetch<KPListPage>(`/kp?${query.toString()}`);
+  },
+
+  async getKPStats(): Promise<KPStats> {
+    return apiFetch<KPStats>('/kp/stats');
   },
 
   async getKP(kpId: number): Promise<KP> {
@@ -1266,6 +1381,7 @@ export interface AISettings {
   is_enabled: boolean;
   trigger_delay_seconds: number;
   active_channels: string[];
+  reply_cache_faq: string[];
   webhook_secret: string;
   created_at: string;
   updated_at: string;
@@ -1278,6 +1394,18 @@ export interface AISettingsUpdate {
   is_enabled?: boolean;
   trigger_delay_seconds?: number;
   active_channels?: string[];
+  reply_cache_faq?: string[];
+}
+
+export interface AIReplyCacheStats {
+  generation: number;
+  hits_exact: number;
+  hits_similar: number;
+  misses: number;
+  stores: number;
+  invalidations: number;
+  hit_rate: number;
+  ttl_seconds: number;
 }
 
 export interface ManagerSmtpAccount {
@@ -1612,11 +1740,18 @@ export const settingsApi = {
     );
   },
 
-  async importMenuCsv(file: File): Promise<{ status: string; created: number }> {
+  async importMenuCsv(
+    file: File,
+    options: { dryRun?: boolean; deactivateMissing?: boolean } = {}
+  ): Promise<MenuImportReport> {
     const formData = new FormData();
     formData.append("file", file);
-    return apiFetchMultipart<{ status: string; created: number }>(
-      "/settings/import-menu-csv",
+    const params = new URLSearchParams();
+    if (options.dryRun) params.append("dry_run", "true");
+    if (options.deactivateMissing) params.append("deactivate_missing", "true");
+    const query = params.toString();
+    return apiFetchMultipart<MenuImportReport>(
+      `/settings/import-menu-csv${query ? `?${query}` : ""}`,
       formData,
       "POST"
     );
@@ -1892,6 +2027,14 @@ export const settingsApi = {
   async getWebhookSecret(): Promise<{ webhook_secret: string }> {
     return apiFetch<{ webhook_secret: string }>("/ai/settings/webhook-secret");
   },
+  async getAIReplyCacheStats(): Promise<AIReplyCacheStats> {
+    return apiFetch<AIReplyCacheStats>("/ai/reply-cache/stats");
+  },
+  async invalidateAIReplyCache(): Promise<AIReplyCacheStats> {
+    return apiFetch<AIReplyCacheStats>("/ai/reply-cache/invalidate", {
+      method: "POST",
+    });
+  },
 };
 
 // Communications API (danger zone)
@@ -1920,12 +2063,13 @@ export const usersApi = {
 
 // Clients API
 export const clientsApi = {
-  async getClients(skip?: number, limit?: number, search?: string): Promise<{ total: number; clients: Client[] }> {
+  async getClients(skip?: number, limit?: number, search?: string, cursor?: string): Promise<{ total: number; clients: Client[]; next_cursor?: string | null; has_more?: boolean }> {
     const params = new URLSearchParams();
     if (skip !== undefined) params.append("skip", skip.toString());
     if (limit !== undefined) params.append("limit", limit.toString());
     if (search) params.append("search", search);
-    return apiFetch<{ total: number; clients: Client[] }>(`/clients?${params.toString()}`);
+    if (cursor) params.append("cursor", cursor);
+    return apiFetch<{ total: number; clients: Client[]; next_cursor?: string | null; has_more?: boolean }>(`/clients?${params.toString()}`);
   },
 
   async getClient(id: number): Promise<{ client: Client; kps: KP[]; questionnaire?: ClientQuestionnaire }> {
@@ -1970,12 +2114,13 @@ export const clientsApi = {
 
 // Questionnaires API
 export const questionnairesApi = {
-  async getAll(skip?: number, limit?: number, managerId?: number): Promise<{ total: number; questionnaires: ClientQuestionnaire[] }> {
+  async getAll(skip?: number, limit?: number, managerId?: number, cursor?: string): Promise<{ total: number; questionnaires: ClientQuestionnaire[]; next_cursor?: string | null; has_more?: boolean }> {
     const params = new URLSearchParams();
     if (skip !== undefined) params.append("skip", skip.toString());
     if (limit !== undefined) params.append("limit", limit.toString());
     if (managerId !== undefined) params.append("manager_id", managerId.toString());
-    return apiFetch<{ total: number; questionnaires: ClientQuestionnaire[] }>(`/questionnaires?${params.toString()}`);
+    if (cursor) params.append("cursor", cursor);
+    return apiFetch<{ total: number; questionnaires: ClientQuestionnaire[]; next_cursor?: string | null; has_more?: boolean }>(`/questionnaires?${params.toString()}`);
   },
 
   async getById(id: number): Promise<ClientQuestionnaire> {
@@ -2241,6 +2386,8 @@ export interface ChecklistListResponse {
   total: number;
   box_count: number;
   catering_count: number;
+  next_cursor?: string | null;
+  has_more?: boolean;
 }
 
 // ========== Checklist API ==========
@@ -2251,7 +2398,8 @@ export const checklistsApi = {
     limit?: number,
     checklistType?: "box" | "catering",
     status?: string,
-    managerId?: number
+    managerId?: number,
+    cursor?: string
   ): Promise<ChecklistListResponse> {
     const params = new URLSearchParams();
     if (skip !== undefined) params.append("skip", skip.toString());
@@ -2259,6 +2407,7 @@ export const checklistsApi = {
     if (checklistType) params.append("checklist_type", checklistType);
     if (status) params.append("status", status);
     if (managerId !== undefined) params.append("manager_id", managerId.toString());
+    if (cursor) params.append("cursor", cursor);
     return apiFetch<ChecklistListResponse>(`/checklists?${params.toString()}`);
   },
 
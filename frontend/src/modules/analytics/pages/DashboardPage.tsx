@@ -24,7 +24,7 @@ import {
 } from "../../../components/ui/dropdown-menu";
 import { InfoTooltip } from "../../../components/InfoTooltip";
 import { Skeleton } from "../../../components/ui/skeleton";
-import { itemsApi, categoriesApi, kpApi, clientsApi, questionnairesApi, usersApi, type Item, type Category, type KP, type Client, type ClientQuestionnaire, type User } from "../../../lib/api";
+import { itemsApi, categoriesApi, kpApi, clientsApi, questionnairesApi, usersApi, type Item, type Category, type KPSummary, type KPStats, type Client, type ClientQuestionnaire, type User } from "../../../lib/api";
 import { toast } from "sonner";
 import { mockKPs, mockClients, mockQuestionnaires, mockUsers } from "../mockData";
 
@@ -88,16 +88,310 @@ interface DashboardStats {
 
 type KPStatus = "sent" | "approved" | "rejected" | "completed";
 
+// КП зі списку (summary) або мок дані
+type DashboardKP = Omit<KPSummary, "item_count" | "items_quantity" | "format_count">;
+
+interface DashboardData {
+  items: Item[];
+  categories: Category[];
+  kpStats: KPStats;
+  recentKPs: DashboardKP[];
+  clients: Client[];
+  questionnaires: ClientQuestionnaire[];
+  users: User[];
+}
+
+const RECENT_KP_COUNT = 5;
+
+const EMPTY_KP_STATS: KPStats = {
+  total: 0,
+  total_revenue: 0,
+  by_status: [],
+  top_clients: [],
+  managers: [],
+  top_items: [],
+};
+
+// Ті самі агрегати, що й GET /kp/stats, - для мок даних
+function kpStatsFromList(kps: DashboardKP[]): KPStats {
+  const byStatus = new Map<string | null, { count: number; revenue: number }>();
+  const clients = new Map<number, { client_name: string | null; revenue: number; kp_count: number }>();
+  const managers = new Map<number, { kp_count: number; revenue: number }>();
+  const items = new Map<number, number>();
+  kps.forEach(kp => {
+    const total = kp.total_price || 0;
+    const status = byStatus.get(kp.status ?? null) || { count: 0, revenue: 0 };
+    byStatus.set(kp.status ?? null, { count: status.count + 1, revenue: status.revenue + total });
+    if (kp.client_id) {
+      const client = clients.get(kp.client_id) || { client_name: kp.client_name || null, revenue: 0, kp_count: 0 };
+      clients.set(kp.client_id, { ...client, revenue: client.revenue + total, kp_count: client.kp_count + 1 });
+    }
+    if (kp.created_by_id) {
+      const manager = managers.get(kp.created_by_id) || { kp_count: 0, revenue: 0 };
+      managers.set(kp.created_by_id, { kp_count: manager.kp_count + 1, revenue: manager.revenue + total });
+    }
+    kp.items?.forEach(kpItem => {
+      if (kpItem.item_id) items.set(kpItem.item_id, (items.get(kpItem.item_id) || 0) + (kpItem.quantity || 1));
+    });
+  });
+  return {
+    total: kps.length,
+    total_revenue: kps.reduce((sum, kp) => sum + (kp.total_price || 0), 0),
+    by_status: Array.from(byStatus, ([status, data]) => ({ status, ...data })),
+    top_clients: Array.from(clients, ([client_id, data]) => ({ client_id, ...data })),
+    managers: Array.from(managers, ([manager_id, data]) => ({ manager_id, ...data })),
+    // Виручку рахує applyDashboardData за цінами товарів
+    top_items: Array.from(items, ([item_id, quantity]) => ({ item_id, quantity, revenue: 0 })),
+  };
+}
+
 export function DashboardEnhanced({ userRole, onNavigate }: DashboardProps) {
   const [loading, setLoading] = useState(true);
   const [stats, setStats] = useState<DashboardStats | null>(null);
-  const [recentKP, setRecentKP] = useState<KP[] | null>(null);
+  const [recentKP, setRecentKP] = useState<DashboardKP[] | null>(null);
   const [useMockData, setUseMockData] = useState(false);
+  const [kpTotal, setKpTotal] = useState(0);
 
   useEffect(() => {
     loadDashboardData();
   }, []);
 
+  const applyDashboardData = (data: DashboardData) => {
+    let { items, categories, kpStats, recentKPs, clients, questionnaires, users } = data;
+
+    // Перевірка чи є дані для обробки
+    if (!items || !categories || !kpStats || !clients) {
+      console.warn('[Analytics] Missing required data:', { items: !!items, categories: !!categories, kpStats: !!kpStats, clients: !!clients });
+      // Встановлюємо порожні значення якщо дані відсутні
+      items = items || [];
+      categories = categories || [];
+      kpStats = kpStats || EMPTY_KP_STATS;
+      recentKPs = recentKPs || [];
+      clients = clients || [];
+      questionnaires = questionnaires || [];
+      users = users || [];
+    }
+    setKpTotal(kpStats.total);
+
+    // Calculate statistics
+    const totalItems = items.length;
+    const activeItems = items.filter(i => i.active).length;
+    const inactiveItems = totalItems - activeItems;
+    const totalValue = items.reduce((sum, i) => sum + (i.price || 0), 0);
+    const averagePrice = totalItems > 0 ? totalValue / totalItems : 0;
+
+    // Categories breakdown
+    const categoriesMap = new Map<number, { name: string; count: number; totalValue: number }>();
+    
+    items.forEach(item => {
+      if (item.subcategory?.category) {
+        const catId = item.subcategory.category.id;
+        const catName = item.subcategory.category.name;
+        
+        if (!categoriesMap.has(catId)) {
+          categoriesMap.set(catId, { name: catName, count: 0, totalValue: 0 });
+        }
+        
+        const cat = categoriesMap.get(catId)!;
+        cat.count += 1;
+        cat.totalValue += item.price;
+      }
+    });
+
+    const categoriesBreakdown = Array.from(categoriesMap.entries()).map(([categoryId, data]) => ({
+      categoryId,
+      categoryName: data.name,
+      count: data.count,
+      percentage: totalItems > 0 ? (data.count / totalItems) * 100 : 0,
+      totalValue: data.totalValue
+    })).sort((a, b) => b.count - a.count);
+
+    // Price ranges
+    const priceRanges = {
+      cheap: items.filter(i => i.price < 50).length,
+      medium: items.filter(i => i.price >= 50 && i.price <= 200).length,
+      expensive: items.filter(i => i.price > 200).length
+    };
+
+    // === НОВІ МЕТРИКИ ===
+
+    // 1. Топ клієнтів за фінансами (КП - агрегати сервера по всіх КП)
+    const clientRevenueMap = new Map<number, { name: string; total: number; count: number }>();
+    
+    // Створюємо мапу клієнтів для швидкого пошуку
+    const clientsMap = new Map<number, Client>();
+    clients.forEach(client => {
+      if (client.id) {
+        clientsMap.set(client.id, client);
+      }
+    });
+
+    kpStats.top_clients.forEach(row => {
+      const client = clientsMap.get(row.client_id);
+      clientRevenueMap.set(row.client_id, {
+        name: client?.name || row.client_name || 'Без імені',
+        total: row.revenue,
+        count: row.kp_count,
+      });
+    });
+
+    // Додаємо дані з lifetime_spent клієнтів
+    clients.forEach(client => {
+      if (client.id) {
+        if (!clientRevenueMap.has(client.id)) {
+          clientRevenueMap.set(client.id, {
+            name: client.name,
+            total: client.lifetime_spent || 0,
+            count: client.total_orders || 0,
+          });
+        } else {
+          const existing = clientRevenueMap.get(client.id)!;
+          // Використовуємо більшу суму з lifetime_spent або суму з КП
+          existing.total = Math.max(existing.total, client.lifetime_spent || 0);
+          existing.count = Math.max(existing.count, client.total_orders || 0);
+        }
+      }
+    });
+
+    const topClients = Array.from(clientRevenueMap.entries())
+      .map(([clientId, data]) => ({
+        clientId,
+        clientName: data.name,
+        totalSpent: data.total,
+        kpCount: data.count,
+      }))
+      .sort((a, b) => b.totalSpent - a.totalSpent)
+      .slice(0, 10);
+
+    // 2. Найпопулярніші товари (по використанню та по фінансам)
+    const itemUsageMap = new Map<number, { name: string; count: number; revenue: number; categoryName?: string }>();
+    const itemMap = new Map<number, Item>();
+    items.forEach(item => itemMap.set(item.id, item));
+
+    kpStats.top_items.forEach(row => {
+      const item = itemMap.get(row.item_id);
+      if (item) {
+        itemUsageMap.set(row.item_id, {
+          name: item.name,
+          count: row.quantity,
+          // Приблизна виручка = кількість * ціна товару
+          revenue: row.revenue || (item.price || 0) * row.quantity,
+          categoryName: item.subcategory?.category?.name,
+        });
+      }
+    });
+
+    const popularItems = Array.from(itemUsageMap.entries())
+      .map(([itemId, data]) => ({
+        itemId,
+        itemName: data.name,
+        usageCount: data.count,
+        totalRevenue: data.revenue,
+        categoryName: data.categoryName,
+      }))
+      .sort((a, b) => b.totalRevenue - a.totalRevenue) // Сортуємо по фінансам
+      .slice(0, 10);
+
+    // 3. Активні менеджери (КП та анкети)
+    const managerStatsMap = new Map<string, { name: string; kpCount: number; questionnaireCount: number; revenue: number }>();
+    const userMap = new Map<string, User>();
+    users.forEach(user => {
+      userMap.set(user.id, user);
+      const fullName = `${user.first_name || ''} ${user.last_name || ''}`.trim() || user.email;
+      managerStatsMap.set(user.id, { name: fullName, kpCount: 0, questionnaireCount: 0, revenue: 0 });
+    });
+
+    // Підрахунок КП по менеджерах
+    kpStats.managers.forEach(row => {
+      // created_by_id is still a number in KP, but User.id is now UUID (string)
+      // We need to convert it to string for lookup, but this indicates a schema mismatch
+      const manager = managerStatsMap.get(String(row.manager_id));
+      if (manager) {
+        manager.kpCount += row.kp_count;
+        manager.revenue += row.revenue;
+      }
+    });
+
+    // Підрахунок анкет по менеджерах
+    questionnaires.forEach(q => {
+      if (q.manager_id) {
+        // manager_id is still a number, but User.id is now UUID (string)
+        // Convert to string for lookup
+        const manager = managerStatsMap.get(String(q.manager_id));
+        if (manager) {
+          manager.questionnaireCount += 1;
+        } else {
+          // Якщо менеджера немає в списку, додаємо
+          const user = userMap.get(String(q.manager_id));
+          if (user) {
+            const fullName = `${user.first_name || ''} ${user.last_name || ''}`.trim() || user.email;
+            managerStatsMap.set(user.id, { name: fullName, kpCount: 0, questionnaireCount: 1, revenue: 0 });
+          }
+        }
+      }
+    });
+
+    const activeManagers = Array.from(managerStatsMap.entries())
+      .map(([managerId, data]) => ({
+        managerId,
+        managerName: data.name,
+        kpCount: data.kpCount,
+        questionnaireCount: data.questionnaireCount,
+        totalRevenue: data.revenue,
+      }))
+      .filter(m => m.kpCount > 0 || m.questionnaireCount > 0)
+      .sort((a, b) => (b.kpCount + b.questionnaireCount) - (a.kpCount + a.questionnaireCount))
+      .slice(0, 10);
+
+    // 4. Статистика по статусах КП
+    const statusStats = new Map(kpStats.by_status.map(row => [row.status, row]));
+    const statusCount = (status: string) => statusStats.get(status)?.count || 0;
+    const kpStatusStats = {
+      in_progress: statusCount('in_progress'),
+      sent: statusCount('sent'),
+      approved: statusCount('approved'),
+      rejected: statusCount('rejected'),
+      completed: statusCount('completed'),
+      draft: statusCount('draft'),
+    };
+
+    // 5. Загальна виручка та середній чек
+    const totalRevenue = kpStats.total_revenue;
+    const approvedCount = kpStatusStats.approved + kpStatusStats.completed;
+    const approvedRevenue = (statusStats.get('approved')?.revenue || 0) + (statusStats.get('completed')?.revenue || 0);
+    const averageCheck = approvedCount > 0 ? approvedRevenue / approvedCount : 0;
+
+    // 6. Конверсія (від sent до approved)
+    const sentCount = kpStatusStats.sent;
+    const conversionRate = sentCount > 0 ? (kpStatusStats.approved / sentCount) * 100 : 0;
+
+    setStats({
+      totalItems,
+      activeItems,
+      inactiveItems,
+      totalCategories: categories.length,
+      totalValue,
+      averagePrice,
+      categoriesBreakdown,
+      priceRanges,
+      topClients,
+      popularItems,
+      activeManagers,
+      kpStatusStats,
+      totalRevenue,
+      averageCheck,
+      conversionRate,
+    });
+
+    // Recent KP: беремо останні 5 за датою створення
+    const sortedKps = [...recentKPs].sort((a, b) => {
+      const da = a.created_at ? new Date(a.created_at).getTime() : 0;
+      const db = b.created_at ? new Date(b.created_at).getTime() : 0;
+      return db - da;
+    });
+    setRecentKP(sortedKps.slice(0, RECENT_KP_COUNT));
+  };
+
   const loadDashboardData = async () => {
     setLoading(true);
     try {
@@ -107,7 +401,8 @@ export function DashboardEnhanced({ userRole, onNavigate }: DashboardProps) {
       
       let items: Item[] = [];
       let categories: Category[] = [];
-      let kps: KP[] = [];
+      let kpStats: KPStats = EMPTY_KP_STATS;
+      let recentKPs: DashboardKP[] = [];
       let clients: Client[] = [];
       let questionnaires: ClientQuestionnaire[] = [];
       let users: User[] = [];
@@ -115,7 +410,8 @@ export function DashboardEnhanced({ userRole, onNavigate }: DashboardProps) {
       if (shouldUseMockData) {
         // Використовуємо мок дані
         console.log('[Analytics] Using mock data');
-        kps = mockKPs;
+        kpStats = kpStatsFromList(mockKPs);
+        recentKPs = mockKPs;
         clients = mockClients;
         questionnaires = mockQuestionnaires;
         users = mockUsers;
@@ -137,10 +433,11 @@ export function DashboardEnhanced({ userRole, onNavigate }: DashboardProps) {
         const results = await Promise.allSettled([
           itemsApi.getItems(0, 1000),
           categoriesApi.getCategories(),
-          kpApi.getKPs(),
+          kpApi.getKPStats(),
           clientsApi.getClients(0, 1000),
           questionnairesApi.getAll(0, 1000),
           usersApi.getUsers(),
+          kpApi.listKPs({ limit: RECENT_KP_COUNT }),
         ]);
 
         // Обробляємо результати окремо
@@ -159,11 +456,10 @@ export function DashboardEnhanced({ userRole, onNavigate }: DashboardProps) {
         }
 
         if (results[2].status === 'fulfilled') {
-          kps = results[2].value;
+          kpStats = results[2].value;
         } else {
-          console.error('[Analytics] Failed to load KPs:', results[2].reason);
-          kps = [];
-          toast.error(`Помилка завантаження КП: ${results[2].reason?.message || 'Невідома помилка'}`);
+          console.error('[Analytics] Failed to load KP stats:', results[2].reason);
+          toast.error(`Помилка завантаження статистики КП: ${results[2].reason?.message || 'Невідома помилка'}`);
         }
 
         if (results[3].status === 'fulfilled') {
@@ -188,274 +484,16 @@ export function DashboardEnhanced({ userRole, onNavigate }: DashboardProps) {
           console.error('[Analytics] Failed to load users:', results[5].reason);
           users = [];
         }
-      }
-
-      // Перевірка чи є дані для обробки
-      if (!items || !categories || !kps || !clients) {
-        console.warn('[Analytics] Missing required data:', { items: !!items, categories: !!categories, kps: !!kps, clients: !!clients });
-        // Встановлюємо порожні масиви якщо дані відсутні
-        items = items || [];
-        categories = categories || [];
-        kps = kps || [];
-        clients = clients || [];
-        questionnaires = questionnaires || [];
-        users = users || [];
-      }
-
-      // Calculate statistics
-      const totalItems = items.length;
-      const activeItems = items.filter(i => i.active).length;
-      const inactiveItems = totalItems - activeItems;
-      const totalValue = items.reduce((sum, i) => sum + (i.price || 0), 0);
-      const averagePrice = totalItems > 0 ? totalValue / totalItems : 0;
-
-      // Categories breakdown
-      const categoriesMap = new Map<number, { name: string; count: number; totalValue: number }>();
-      
-      items.forEach(item => {
-        if (item.subcategory?.category) {
-          const catId = item.subcategory.category.id;
-          const catName = item.subcategory.category.name;
-          
-          if (!categoriesMap.has(catId)) {
-            categoriesMap.set(catId, { name: catName, count: 0, totalValue: 0 });
-          }
-          
-          const cat = categoriesMap.get(catId)!;
-          cat.count += 1;
-          cat.totalValue += item.price;
-        }
-      });
 
-      const categoriesBreakdown = Array.from(categoriesMap.entries()).map(([categoryId, data]) => ({
-        categoryId,
-        categoryName: data.name,
-        count: data.count,
-        percentage: totalItems > 0 ? (data.count / totalItems) * 100 : 0,
-        totalValue: data.totalValue
-      })).sort((a, b) => b.count - a.count);
-
-      // Price ranges
-      const priceRanges = {
-        cheap: items.filter(i => i.price < 50).length,
-        medium: items.filter(i => i.price >= 50 && i.price <= 200).length,
-        expensive: items.filter(i => i.price > 200).length
-      };
-
-      // === НОВІ МЕТРИКИ ===
-
-      // 1. Топ клієнтів за фінансами
-      const clientRevenueMap = new Map<number | string, { name: string; total: number; count: number }>();
-      
-      // Створюємо мапу клієнтів для швидкого пошуку
-      const clientsMap = new Map<number, Client>();
-      clients.forEach(client => {
-        if (client.id) {
-          clientsMap.set(client.id, client);
-        }
-      });
-
-      // Збираємо дані з КП
-      kps.forEach(kp => {
-        const clientId = kp.client_id;
-        const clientName = kp.client_name || 'Без імені';
-        const total = kp.total_price || 0;
-        
-        if (clientId) {
-          // Якщо є client_id, використовуємо його як ключ
-          if (!clientRevenueMap.has(clientId)) {
-            const client = clientsMap.get(clientId);
-            clientRevenueMap.set(clientId, {
-              name: client?.name || clientName,
-              total: 0,
-              count: 0,
-            });
-          }
-          const client = clientRevenueMap.get(clientId)!;
-          client.total += total;
-          client.count += 1;
-        } else if (clientName && clientName !== 'Без імені') {
-          // Якщо немає client_id, але є ім'я, використовуємо ім'я як ключ
-          const key = `name_${clientName}`;
-          if (!clientRevenueMap.has(key)) {
-            clientRevenueMap.set(key, { name: clientName, total: 0, count: 0 });
-          }
-          const client = clientRevenueMap.get(key)!;
-          client.total += total;
-          client.count += 1;
-        }
-      });
-
-      // Додаємо дані з lifetime_spent клієнтів
-      clients.forEach(client => {
-        if (client.id) {
-          if (!clientRevenueMap.has(client.id)) {
-            clientRevenueMap.set(client.id, {
-              name: client.name,
-              total: client.lifetime_spent || 0,
-              count: client.total_orders || 0,
-            });
-          } else {
-            const existing = clientRevenueMap.get(client.id)!;
-            // Використовуємо більшу суму з lifetime_spent або суму з КП
-            existing.total = Math.max(existing.total, client.lifetime_spent || 0);
-            existing.count = Math.max(existing.count, client.total_orders || 0);
-          }
-        }
-      });
-
-      const topClients = Array.from(clientRevenueMap.entries())
-        .filter(([key]) => typeof key === 'number') // Фільтруємо тільки числові ID
-        .map(([clientId, data]) => ({
-          clientId: clientId as number,
-          clientName: data.name,
-          totalSpent: data.total,
-          kpCount: data.count,
-        }))
-        .sort((a, b) => b.totalSpent - a.totalSpent)
-        .slice(0, 10);
-
-      // 2. Найпопулярніші товари (по використанню та по фінансам)
-      const itemUsageMap = new Map<number, { name: string; count: number; revenue: number; categoryName?: string }>();
-      const itemMap = new Map<number, Item>();
-      items.forEach(item => itemMap.set(item.id, item));
-
-      kps.forEach(kp => {
-        kp.items?.forEach(kpItem => {
-          const itemId = kpItem.item_id;
-          if (!itemId) return; // Пропускаємо custom items без item_id
-          
-          const item = itemMap.get(itemId);
-          if (item) {
-            if (!itemUsageMap.has(itemId)) {
-              itemUsageMap.set(itemId, {
-                name: item.name,
-                count: 0,
-                revenue: 0,
-                categoryName: item.subcategory?.category?.name,
-              });
-            }
-            const itemUsage = itemUsageMap.get(itemId)!;
-            const quantity = kpItem.quantity || 1;
-            itemUsage.count += quantity;
-            // Приблизна виручка = кількість * ціна товару
-            const itemPrice = item.price || 0;
-            itemUsage.revenue += itemPrice * quantity;
-          }
-        });
-      });
-
-      const popularItems = Array.from(itemUsageMap.entries())
-        .map(([itemId, data]) => ({
-          itemId,
-          itemName: data.name,
-          usageCount: data.count,
-          totalRevenue: data.revenue,
-          categoryName: data.categoryName,
-        }))
-        .sort((a, b) => b.totalRevenue - a.totalRevenue) // Сортуємо по фінансам
-        .slice(0, 10);
-
-      // 3. Активні менеджери (КП та анкети)
-      const managerStatsMap = new Map<string, { name: string; kpCount: number; questionnaireCount: number; revenue: number }>();
-      const userMap = new Map<string, User>();
-      users.forEach(user => {
-        userMap.set(user.id, user);
-        const fullName = `${user.first_name || ''} ${user.last_name || ''}`.trim() || user.email;
-        managerStatsMap.set(user.id, { name: fullName, kpCount: 0, questionnaireCount: 0, revenue: 0 });
-      });
-
-      // Підрахунок КП по менеджерах
-      kps.forEach(kp => {
-        if (kp.created_by_id) {
-          // created_by_id is still a number in KP, but User.id is now UUID (string)
-          // We need to convert it to string for lookup, but this indicates a schema mismatch
-          const manager = managerStatsMap.get(String(kp.created_by_id));
-          if (manager) {
-            manager.kpCount += 1;
-            manager.revenue += kp.total_price || 0;
-          }
-        }
-      });
-
-      // Підрахунок анкет по менеджерах
-      questionnaires.forEach(q => {
-        if (q.manager_id) {
-          // manager_id is still a number, but User.id is now UUID (string)
-          // Convert to string for lookup
-          const manager = managerStatsMap.get(String(q.manager_id));
-          if (manager) {
-            manager.questionnaireCount += 1;
-          } else {
-            // Якщо менеджера немає в списку, додаємо
-            const user = userMap.get(String(q.manager_id));
-            if (user) {
-              const fullName = `${user.first_name || ''} ${user.last_name || ''}`.trim() || user.email;
-              managerStatsMap.set(user.id, { name: fullName, kpCount: 0, questionnaireCount: 1, revenue: 0 });
-            }
-          }
+        if (results[6].status === 'fulfilled') {
+          recentKPs = results[6].value.items;
+        } else {
+          console.error('[Analytics] Failed to load recent KPs:', results[6].reason);
+          recentKPs = [];
         }
-      });
-
-      const activeManagers = Array.from(managerStatsMap.entries())
-        .map(([managerId, data]) => ({
-          managerId,
-          managerName: data.name,
-          kpCount: data.kpCount,
-          questionnaireCount: data.questionnaireCount,
-          totalRevenue: data.revenue,
-        }))
-        .filter(m => m.kpCount > 0 || m.questionnaireCount > 0)
-        .sort((a, b) => (b.kpCount + b.questionnaireCount) - (a.kpCount + a.questionnaireCount))
-        .slice(0, 10);
-
-      // 4. Статистика по статусах КП
-      const kpStatusStats = {
-        in_progress: kps.filter(kp => kp.status === 'in_progress').length,
-        sent: kps.filter(kp => kp.status === 'sent').length,
-        approved: kps.filter(kp => kp.status === 'approved').length,
-        rejected: kps.filter(kp => kp.status === 'rejected').length,
-        completed: kps.filter(kp => kp.status === 'completed').length,
-        draft: kps.filter(kp => kp.status === 'draft').length,
-      };
-
-      // 5. Загальна виручка та середній чек
-      const totalRevenue = kps.reduce((sum, kp) => sum + (kp.total_price || 0), 0);
-      const approvedKPs = kps.filter(kp => kp.status === 'approved' || kp.status === 'completed');
-      const averageCheck = approvedKPs.length > 0
-        ? approvedKPs.reduce((sum, kp) => sum + (kp.total_price || 0), 0) / approvedKPs.length
-        : 0;
-
-      // 6. Конверсія (від sent до approved)
-      const sentCount = kpStatusStats.sent;
-      const approvedCount = kpStatusStats.approved;
-      const conversionRate = sentCount > 0 ? (approvedCount / sentCount) * 100 : 0;
-
-      setStats({
-        totalItems,
-        activeItems,
-        inactiveItems,
-        totalCategories: categories.length,
-        totalValue,
-        averagePrice,
-        categoriesBreakdown,
-        priceRanges,
-        topClients,
-        popularItems,
-        activeManagers,
-        kpStatusStats,
-        totalRevenue,
-        averageCheck,
-        conversionRate,
-      });
+      }
 
-      // Recent KP: беремо останні 5 за датою створення
-      const sortedKps = [...kps].sort((a, b) => {
-        const da = a.created_at ? new Date(a.created_at).getTime() : 0;
-        const db = b.created_at ? new Date(b.created_at).getTime() : 0;
-        return db - da;
-      });
-      setRecentKP(sortedKps.slice(0, 5));
+      applyDashboardData({ items, categories, kpStats, recentKPs, clients, questionnaires, users });
     } catch (error: any) {
       const errorMessage = error?.message || error?.data?.detail || "Невідома помилка";
       console.error("Dashboard load error:", error);
@@ -526,7 +564,7 @@ export function DashboardEnhanced({ userRole, onNavigate }: DashboardProps) {
     }
   };
 
-  const handleViewKP = async (kp: KP) => {
+  const handleViewKP = async (kp: DashboardKP) => {
     try {
       const blob = await kpApi.generateKPPDF(kp.id, kp.template_id);
       const url = URL.createObjectURL(blob);
@@ -537,7 +575,7 @@ export function DashboardEnhanced({ userRole, onNavigate }: DashboardProps) {
     }
   };
 
-  const handleDownloadKP = async (kp: KP) => {
+  const handleDownloadKP = async (kp: DashboardKP) => {
     try {
       const blob = await kpApi.generateKPPDF(kp.id, kp.template_id);
       const url = URL.createObjectURL(blob);
@@ -554,7 +592,7 @@ export function DashboardEnhanced({ userRole, onNavigate }: DashboardProps) {
     }
   };
 
-  const handleDeleteKP = async (kp: KP) => {
+  const handleDeleteKP = async (kp: DashboardKP) => {
     if (!window.confirm("Видалити цю КП?")) return;
     try {
       await kpApi.deleteKP(kp.id);
@@ -624,6 +662,9 @@ export function DashboardEnhanced({ userRole, onNavigate }: DashboardProps) {
           <p className="text-gray-600">
             Огляд основних метрик та статистики системи
           </p>
+          {!useMockData && (
+            <p className="mt-1 text-xs text-gray-500">Статистика КП по всіх {kpTotal} КП</p>
+          )}
         </div>
         {import.meta.env.DEV && (
           <div className="flex items-center gap-2">
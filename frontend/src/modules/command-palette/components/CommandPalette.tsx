@@ -34,10 +34,10 @@ export function CommandPalette({ open, onOpenChange }: CommandPaletteProps) {
     try {
       const [clientsData, kpsData] = await Promise.all([
         clientsApi.getClients(0, 20, ""),
-        kpApi.getKPs(),
+        kpApi.listKPs({ limit: 50 }),
       ]);
       setClients(clientsData.clients || []);
-      setKps(kpsData || []);
+      setKps(kpsData.items || []);
     } catch (error) {
       console.error("Failed to load data:", error);
     } finally {
@@ -10,7 +10,7 @@ import { Button } from "../../../components/ui/button";
 import { ScrollArea } from "../../../components/ui/scroll-area";
 import { Card } from "../../../components/ui/card";
 import { Plus, FileText, Calendar, DollarSign, Loader2 } from "lucide-react";
-import { clientsApi, kpApi, KP } from "../../../lib/api";
+import { clientsApi, kpApi, type KPSummary } from "../../../lib/api";
 
 interface ContextSidebarProps {
   clientId: number | null;
@@ -26,7 +26,7 @@ export function ContextSidebar({
   onCreateOrder,
 }: ContextSidebarProps) {
   const [client, setClient] = useState<any>(null);
-  const [orders, setOrders] = useState<KP[]>([]);
+  const [orders, setOrders] = useState<KPSummary[]>([]);
   const [payments, setPayments] = useState<any[]>([]);
   const [isLoading, setIsLoading] = useState(false);
 
@@ -41,15 +41,13 @@ export function ContextSidebar({
 
     setIsLoading(true);
     try {
-      const [clientData, allKps] = await Promise.all([
+      const [clientData, clientKps] = await Promise.all([
         clientsApi.getClient(clientId),
-        kpApi.getKPs(),
+        kpApi.listKPs({ client_id: clientId, limit: 100 }),
       ]);
 
       setClient(clientData.client);
-      // Фільтруємо замовлення для цього клієнта
-      const clientOrders = allKps.filter((kp) => kp.client_id === clientId);
-      setOrders(clientOrders);
+      setOrders(clientKps.items);
 
       // TODO: Завантажити історію оплат з API
       setPayments([]);
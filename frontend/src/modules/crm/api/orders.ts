@@ -1,5 +1,5 @@
 import { apiFetch } from "../../../lib/api/client";
-import type { Order, TimelineStep } from "./clients";
+import type { Order, TimelineStep, TranslationRequest } from "./clients";
 
 export interface OrderCreate {
   client_id: string;
@@ -45,23 +45,124 @@ export interface OrderUpdate {
   amount_gross?: number; // Для автоматичного створення транзакції
 }
 
+// Поля списку за замовчуванням (див. DEFAULT_ORDER_LIST_FIELDS на бекенді)
+export const ORDER_LIST_DEFAULT_FIELDS = [
+  "order_number", "status", "client_id", "client_name", "manager_id", "manager_name",
+  "office_id", "office_name", "description", "deadline", "file_url", "language",
+  "translation_type", "payment_method", "price_netto", "price_brutto", "reference_code",
+  "repertorium_number", "follow_up_date", "order_source", "is_archived", "updated_at",
+  "paid_amount", "payment_status", "last_step_type", "last_step_at", "shipment_status",
+  "accepted_translator",
+];
+
+export interface OrderListItem {
+  id: string;
+  created_at: string;
+  order_number?: string;
+  status?: Order["status"];
+  client_id?: string;
+  client_name?: string | null;
+  manager_id?: string;
+  manager_name?: string | null;
+  office_id?: number | null;
+  office_name?: string | null;
+  description?: string | null;
+  deadline?: string | null;
+  file_url?: string | null;
+  language?: string | null;
+  translation_type?: string | null;
+  payment_method?: string | null;
+  price_netto?: number | null;
+  price_brutto?: number | null;
+  reference_code?: string | null;
+  repertorium_number?: string | null;
+  follow_up_date?: string | null;
+  order_source?: string | null;
+  is_archived?: boolean;
+  updated_at?: string;
+  // Агрегати, пораховані на сервері
+  paid_amount?: number;
+  payment_status?: string | null;
+  last_step_type?: TimelineStep["step_type"] | null;
+  last_step_at?: string | null;
+  shipment_status?: string | null;
+  accepted_translator?: { id: number; name: string; rate: number; response_at: string | null } | null;
+  timeline_steps?: Pick<TimelineStep, "step_type" | "completed" | "completed_at">[];
+}
+
+export interface OrdersPage {
+  items: OrderListItem[];
+  next_cursor: string | null;
+  has_more: boolean;
+}
+
+export interface OrdersQuery {
+  status?: string;
+  client_id?: string;
+  include_archived?: boolean;
+  fields?: string[];
+  limit?: number;
+  cursor?: string;
+}
+
+/**
+ * Привести рядок списку до форми Order, яку очікують існуючі компоненти
+ * (client / manager / payment_transactions як у повному замовленні).
+ */
+function listItemToOrder(item: OrderListItem): Order {
+  const [firstName, ...lastName] = (item.manager_name || "").split(" ");
+  const translator = item.accepted_translator;
+  return {
+    ...(item as any),
+    client: item.client_name ? ({ id: item.client_id, full_name: item.client_name } as any) : undefined,
+    manager: item.manager_name ? { first_name: firstName, last_name: lastName.join(" ") } : undefined,
+    payment_transactions: item.payment_status ? [{ status: item.payment_status }] : [],
+    timeline_steps: item.timeline_steps as TimelineStep[] | undefined,
+    // Список повертає тільки прийнятий запит - у формі translation_requests повного замовлення
+    translation_requests: translator
+      ? [{
+          translator_id: translator.id,
+          status: "accepted",
+          offered_rate: translator.rate,
+          response_at: translator.response_at ?? undefined,
+          translator: { id: translator.id, name: translator.name },
+        } as TranslationRequest]
+      : [],
+  };
+}
+
 export const ordersApi = {
   /**
-   * Get list of orders
+   * Get page of orders (projection + keyset cursor)
    */
-  async getOrders(params?: {
-    status?: string;
-    client_id?: string;
-    skip?: number;
-    limit?: number;
-  }): Promise<Order[]> {
+  async getOrdersPage(params?: OrdersQuery): Promise<OrdersPage> {
     const queryParams = new URLSearchParams();
     if (params?.status) queryParams.append("status", params.status);
     if (params?.client_id) queryParams.append("client_id", params.client_id);
-    if (params?.skip) queryParams.append("skip", params.skip.toString());
+    if (params?.include_archived) queryParams.append("include_archived", "true");
+    if (params?.fields?.length) queryParams.append("fields", params.fields.join(","));
     if (params?.limit) queryParams.append("limit", params.limit.toString());
+    if (params?.cursor) queryParams.append("cursor", params.cursor);
     
-    return apiFetch<Order[]>(`/crm/orders?${queryParams.toString()}`);
+    return apiFetch<OrdersPage>(`/crm/orders?${queryParams.toString()}`);
+  },
+
+  /**
+   * Get list of orders (перша сторінка, у форматі Order)
+   */
+  async getOrders(params?: {
+    status?: string;
+    client_id?: string;
+    limit?: number;
+    withTimeline?: boolean;
+  }): Promise<Order[]> {
+    const page = await ordersApi.getOrdersPage({
+      status: params?.status,
+      client_id: params?.client_id,
+      limit: params?.limit,
+      fields: params?.withTimeline ? [...ORDER_LIST_DEFAULT_FIELDS, "timeline_steps"] : undefined,
+    });
+    return page.items.map(listItemToOrder);
   },
 
   /**
@@ -10,10 +10,18 @@ export interface TimelineStep {
   completed: boolean;
   completed_at: string;
   completed_by_id?: string;
+  completed_by_name?: string;
   metadata?: string;
   created_at: string;
 }
 
+export interface TimelineProgress {
+  order_id: string;
+  completed_steps: number;
+  total_steps: number;
+  current_stage: TimelineStep['step_type'] | null;
+}
+
 export const timelineApi = {
   /**
    * Get timeline steps for an order
@@ -22,6 +30,15 @@ export const timelineApi = {
     return apiFetch<TimelineStep[]>(`/crm/orders/${orderId}/timeline`);
   },
 
+  /**
+   * Get cached timeline progress for many orders (kanban)
+   */
+  async getProgress(orderIds: string[]): Promise<TimelineProgress[]> {
+    if (orderIds.length === 0) return [];
+    const params = orderIds.map((id) => `order_ids=${encodeURIComponent(id)}`).join('&');
+    return apiFetch<TimelineProgress[]>(`/crm/timeline/progress?${params}`);
+  },
+
   /**
    * Mark translation as ready (step 6)
    */
@@ -63,12 +63,13 @@ export interface TranslationRequest {
   id: number;
   order_id: string;
   translator_id: number;
-  sent_via: 'email' | 'telegram' | 'whatsapp';
+  sent_via: string; // 'email' | 'telegram' | 'whatsapp', broadcast - кілька через кому
   sent_at: string;
-  status: 'pending' | 'accepted' | 'declined';
+  status: 'pending' | 'accepted' | 'declined' | 'withdrawn';
   response_at?: string;
   offered_rate: number;
   notes?: string;
+  broadcast_id?: string | null;
   created_at: string;
   translator?: Translator;
 }
@@ -81,6 +82,14 @@ export interface TranslationRequestCreate {
   notes?: string;
 }
 
+export interface TranslationRequestBroadcast {
+  translator_ids?: number[];
+  count?: number;
+  channels?: Array<'email' | 'telegram' | 'whatsapp'>;
+  offered_rate?: number;
+  notes?: string;
+}
+
 export const translatorsApi = {
   /**
    * Get list of translators
@@ -143,6 +152,16 @@ export const translatorsApi = {
     });
   },
 
+  /**
+   * Offer an order to several translators at once (first accept wins)
+   */
+  async broadcastTranslationRequest(orderId: string, data: TranslationRequestBroadcast): Promise<TranslationRequest[]> {
+    return apiFetch<TranslationRequest[]>(`/crm/orders/${orderId}/translation-requests/broadcast`, {
+      method: 'POST',
+      body: JSON.stringify(data),
+    });
+  },
+
   /**
    * Accept translation request
    */
@@ -35,7 +35,7 @@ import {
 } from "../../../components/ui/select";
 import { 
   clientsApi, kpApi, checklistsApi, questionnairesApi,
-  type Client, type ClientUpdate, type KP, type Checklist, type ClientQuestionnaire 
+  type Client, type ClientUpdate, type KP, type KPSummary, type Checklist, type ClientQuestionnaire 
 } from "../../../lib/api";
 import { toast } from "sonner";
 import { LoyaltyBadge } from "../../../components/LoyaltyBadge";
@@ -540,7 +540,7 @@ export function Clients() {
   const [editForm, setEditForm] = useState<ClientUpdate>({});
   const [saving, setSaving] = useState(false);
   const [selectedClientForEvents, setSelectedClientForEvents] = useState<Client | null>(null);
-  const [clientKPs, setClientKPs] = useState<KP[]>([]);
+  const [clientKPs, setClientKPs] = useState<KPSummary[]>([]);
   const [loadingKPs, setLoadingKPs] = useState(false);
   const [deletingClient, setDeletingClient] = useState<Client | null>(null);
   const [isDeleting, setIsDeleting] = useState(false);
@@ -600,14 +600,9 @@ export function Clients() {
 
       setLoadingKPs(true);
       try {
-        const allKPs = await kpApi.getKPs();
-        const filtered = allKPs.filter(
-          (kp) =>
-            (kp.client_name && kp.client_name === selectedClientForEvents.name) ||
-            (kp.client_phone && kp.client_phone === selectedClientForEvents.phone) ||
-            (kp.client_email && kp.client_email === selectedClientForEvents.email)
-        );
-        setClientKPs(filtered);
+        // КП прив'язуються до клієнта при створенні (upsert_client_from_kp)
+        const page = await kpApi.listKPs({ client_id: selectedClientForEvents.id, limit: 100 });
+        setClientKPs(page.items);
       } catch (error: any) {
         console.error("Error loading client KPs:", error);
         toast.error("Помилка завантаження КП клієнта");
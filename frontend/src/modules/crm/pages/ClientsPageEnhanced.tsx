@@ -259,7 +259,7 @@ export function ClientsPageEnhanced() {
       setActiveClient(client);
       
       // Load client orders
-      const orders = await ordersApi.getOrders({ client_id: clientId });
+      const orders = await ordersApi.getOrders({ client_id: clientId, withTimeline: true });
       setActiveOrders(orders);
     } catch (error) {
       console.error('Error loading client data:', error);
@@ -29,41 +29,113 @@ export interface Payment {
   stripe_payment_link_id?: string | null; // ID Stripe Payment Link
 }
 
+export interface PaymentsSummaryBucket {
+  count: number;
+  amount_gross: number;
+}
+
+export interface PaymentsSummary {
+  count: number;
+  amount_gross: number;
+  net_amount: number;
+  by_method: Record<string, PaymentsSummaryBucket>;
+  by_status: Record<string, PaymentsSummaryBucket>;
+}
+
 export interface PaymentsResponse {
   payments: Payment[];
+  next_cursor: string | null;
+  has_more: boolean;
+  summary?: PaymentsSummary; // Тільки для першої сторінки
+}
+
+export interface PaymentsQuery {
+  date_from?: string;
+  date_to?: string;
+  payment_method?: string[];
+  payment_status?: string[];
+  sort_by?: 'payment_date' | 'service_date' | 'created_at';
+  sort_order?: 'asc' | 'desc';
+  limit?: number;
+  cursor?: string | null;
+}
+
+export interface PaymentsExportJob {
+  job_id: string;
+  status: string;
+  rows?: number;
+  download_url?: string;
+  error?: string;
+}
+
+const EXPORT_JOB_POLL_INTERVAL_MS = 2000;
+
+function exportHeaders(): Record<string, string> {
+  const token = tokenManager.getToken();
+  return token ? { Authorization: `Bearer ${token}` } : {};
+}
+
+async function readExportBlob(response: Response): Promise<Blob> {
+  if (!response.ok) {
+    const errorText = await response.text().catch(() => 'Failed to export payments');
+    throw new Error(errorText || 'Failed to export payments');
+  }
+  return await response.blob();
+}
+
+/**
+ * Фоновий експорт: POST job, опитування статусу до SUCCESS/FAILURE, завантаження файлу
+ */
+async function exportPaymentsViaJob(): Promise<Blob> {
+  let job = await apiFetch<PaymentsExportJob>('/finance/payments/export/jobs', { method: 'POST' });
+  const jobId = job.job_id;
+
+  while (job.status !== 'SUCCESS') {
+    if (job.status === 'FAILURE' || job.status === 'REVOKED') {
+      throw new Error(job.error || 'Failed to export payments');
+    }
+    await new Promise((resolve) => setTimeout(resolve, EXPORT_JOB_POLL_INTERVAL_MS));
+    job = await apiFetch<PaymentsExportJob>(`/finance/payments/export/jobs/${jobId}`);
+  }
+
+  const downloadUrl = job.download_url || `${API_BASE_URL}/finance/payments/export/jobs/${jobId}/download`;
+  const response = await fetch(downloadUrl, { method: 'GET', headers: exportHeaders() });
+  return readExportBlob(response);
 }
 
 export const financeApi = {
   /**
-   * Отримати список платежів
+   * Отримати сторінку платежів (keyset пагінація через next_cursor)
    */
-  async getPayments(): Promise<Payment[]> {
-    const response = await apiFetch<PaymentsResponse>('/finance/payments');
-    return response.payments;
+  async getPaymentsPage(params?: PaymentsQuery): Promise<PaymentsResponse> {
+    const queryParams = new URLSearchParams();
+    if (params?.date_from) queryParams.append("date_from", params.date_from);
+    if (params?.date_to) queryParams.append("date_to", params.date_to);
+    params?.payment_method?.forEach((m) => queryParams.append("payment_method", m));
+    params?.payment_status?.forEach((s) => queryParams.append("payment_status", s));
+    if (params?.sort_by) queryParams.append("sort_by", params.sort_by);
+    if (params?.sort_order) queryParams.append("sort_order", params.sort_order);
+    if (params?.limit) queryParams.append("limit", params.limit.toString());
+    if (params?.cursor) queryParams.append("cursor", params.cursor);
+    
+    return apiFetch<PaymentsResponse>(`/finance/payments?${queryParams.toString()}`);
   },
 
   /**
-   * Експортувати платежі в Excel
+   * Експортувати платежі в Excel.
+   * Великий обсяг (413 від синхронного ендпоінту) експортується фоновим job:
+   * запуск, опитування статусу і завантаження готового файлу.
    */
   async exportPaymentsToExcel(): Promise<Blob> {
-    const token = tokenManager.getToken();
-    const headers: Record<string, string> = {};
-    
-    if (token) {
-      headers['Authorization'] = `Bearer ${token}`;
-    }
-
     const response = await fetch(`${API_BASE_URL}/finance/payments/export`, {
       method: 'GET',
-      headers,
+      headers: exportHeaders(),
     });
 
-    if (!response.ok) {
-      const errorText = await response.text().catch(() => 'Failed to export payments');
-      throw new Error(errorText || 'Failed to export payments');
+    if (response.status === 413) {
+      return exportPaymentsViaJob();
     }
-
-    return await response.blob();
+    return readExportBlob(response);
   },
 
   /**
@@ -3,7 +3,7 @@ import { Wallet, FileText, StickyNote, Settings, Download } from "lucide-react";
 import { FinancePaymentsTable } from "../components/FinancePaymentsTable";
 import { ShipmentsTable } from "../components/ShipmentsTable";
 import { OrderProfitTable, type OrderProfit } from "../components/OrderProfitTable";
-import { financeApi, Payment } from "../api/transactions";
+import { financeApi, Payment, PaymentsSummary } from "../api/transactions";
 import { shipmentsApi, Shipment } from "../api/shipments";
 import { mockPayments } from "../api/mockData";
 import { ordersApi } from "../../crm/api/orders";
@@ -28,6 +28,9 @@ const USE_MOCK_DATA = false;
 export function FinancePage() {
   const { t } = useI18n();
   const [payments, setPayments] = useState<Payment[]>([]);
+  const [paymentsCursor, setPaymentsCursor] = useState<string | null>(null);
+  const [paymentsSummary, setPaymentsSummary] = useState<PaymentsSummary | null>(null);
+  const [loadingMorePayments, setLoadingMorePayments] = useState(false);
   const [shipments, setShipments] = useState<Shipment[]>([]);
   const [orderProfits, setOrderProfits] = useState<OrderProfit[]>([]);
   
@@ -116,9 +119,11 @@ export function FinancePage() {
         await new Promise(resolve => setTimeout(resolve, 500)); // Симуляція затримки
         setPayments(mockPayments);
       } else {
-        // Завантажуємо дані з API
-        const data = await financeApi.getPayments();
-        setPayments(data);
+        // Завантажуємо першу сторінку з API
+        const data = await financeApi.getPaymentsPage();
+        setPayments(data.payments);
+        setPaymentsCursor(data.next_cursor);
+        setPaymentsSummary(data.summary ?? null);
       }
     } catch (error: any) {
       console.error("Error loading payments:", error);
@@ -134,6 +139,21 @@ export function FinancePage() {
     }
   };
 
+  const loadMorePayments = async () => {
+    if (!paymentsCursor) return;
+    try {
+      setLoadingMorePayments(true);
+      const data = await financeApi.getPaymentsPage({ cursor: paymentsCursor });
+      setPayments((prev) => [...prev, ...data.payments]);
+      setPaymentsCursor(data.next_cursor);
+    } catch (error: any) {
+      console.error("Error loading more payments:", error);
+      toast.error(t('finance.payments.loadError'));
+    } finally {
+      setLoadingMorePayments(false);
+    }
+  };
+
   const loadShipments = async () => {
     try {
       setLoadingShipments(true);
@@ -246,6 +266,13 @@ export function FinancePage() {
             {/* min-w-0 тут критично важливий для вкладених флексів */}
             <div className="min-w-0 w-full">
               <FinancePaymentsTable payments={payments || []} loading={loading} />
+              {paymentsCursor && (
+                <div className="flex justify-center mt-4">
+                  <Button variant="outline" onClick={loadMorePayments} disabled={loadingMorePayments}>
+                    {loadingMorePayments ? "Завантаження..." : "Завантажити ще"}
+                  </Button>
+                </div>
+              )}
             </div>
           </TabsContent>
           
@@ -281,7 +308,7 @@ export function FinancePage() {
             <div className="space-y-2 text-sm">
               <div>
                 <span className="text-gray-500">Всього платежів:</span>
-                <span className="ml-2 font-medium text-gray-900">{payments.length}</span>
+                <span className="ml-2 font-medium text-gray-900">{paymentsSummary?.count ?? payments.length}</span>
               </div>
               <div>
                 <span className="text-gray-500">Відправок:</span>
@@ -2,7 +2,7 @@
  * NotificationItem - окремий елемент нотифікації в списку
  */
 import React from 'react';
-import { MessageSquare, DollarSign, CheckCircle, XCircle, FileText, AlertTriangle, Clock } from 'lucide-react';
+import { MessageSquare, DollarSign, CheckCircle, XCircle, FileText, AlertTriangle, Clock, PhoneCall } from 'lucide-react';
 import { cn } from '@/components/ui/utils';
 import type { Notification } from '../types';
 
@@ -21,6 +21,7 @@ const NOTIFICATION_ICONS = {
   internal_note: FileText,
   deadline_warning: AlertTriangle,
   deadline_passed: Clock,
+  follow_up: PhoneCall,
 };
 
 const NOTIFICATION_COLORS = {
@@ -32,6 +33,7 @@ const NOTIFICATION_COLORS = {
   internal_note: 'text-gray-500',
   deadline_warning: 'text-yellow-500',
   deadline_passed: 'text-red-500',
+  follow_up: 'text-blue-500',
 };
 
 export function NotificationItem({ notification, onClick, onMarkAsRead }: NotificationItemProps) {
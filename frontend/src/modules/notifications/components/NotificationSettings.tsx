@@ -28,6 +28,7 @@ const NOTIFICATION_TYPE_LABELS: Record<NotificationType, string> = {
   internal_note: 'Internal Notes',
   deadline_warning: 'Дедлайни (попередження)',
   deadline_passed: 'Дедлайни (прострочені)',
+  follow_up: 'Повторний контакт',
 };
 
 interface NotificationSettingsProps {
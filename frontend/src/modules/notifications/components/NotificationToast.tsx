@@ -4,7 +4,7 @@
 import React, { useEffect, useState } from 'react';
 import { Card } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
-import { X, MessageSquare, DollarSign, CheckCircle, XCircle, FileText, AlertTriangle, Clock } from 'lucide-react';
+import { X, MessageSquare, DollarSign, CheckCircle, XCircle, FileText, AlertTriangle, Clock, PhoneCall } from 'lucide-react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { cn } from '@/components/ui/utils';
 import type { Notification } from '../types';
@@ -57,6 +57,11 @@ const NOTIFICATION_CONFIG = {
     color: 'bg-red-500',
     title: '⏰ Дедлайн прострочений',
   },
+  follow_up: {
+    icon: PhoneCall,
+    color: 'bg-blue-500',
+    title: '📞 Час повторного контакту',
+  },
 };
 
 export function NotificationToast({
@@ -188,6 +193,7 @@ export function NotificationToast({
                     {notification.type === 'internal_note' && 'Переглянути'}
                     {notification.type === 'deadline_warning' && 'Нагадати перекладачу'}
                     {notification.type === 'deadline_passed' && 'Переглянути'}
+                    {notification.type === 'follow_up' && 'Відкрити замовлення'}
                     {!notification.action_url && 'Переглянути'}
                   </Button>
                 </div>
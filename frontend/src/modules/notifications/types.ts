@@ -10,7 +10,8 @@ export type NotificationType =
   | 'translation_ready'
   | 'internal_note'
   | 'deadline_warning'
-  | 'deadline_passed';
+  | 'deadline_passed'
+  | 'follow_up';
 
 export type EntityType = 'order' | 'client' | 'chat' | 'message' | 'transaction';
 